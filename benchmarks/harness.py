@@ -0,0 +1,169 @@
+"""
+Timing helpers and the JSON result format of the benchmark suite.
+"""
+
+import asyncio
+import json
+import platform
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from importlib import metadata
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+
+@dataclass
+class Result:
+    """
+    One measured benchmark. ``samples`` holds the duration, in seconds, of
+    each timed call and ``elapsed`` the wall time of the whole run, so
+    ``ops_per_sec`` accounts for concurrency. A call may cover several
+    ``operations`` (e.g. all proofs of a tree); one per sample by default.
+    """
+
+    name: str
+    samples: List[float]
+    elapsed: float
+    params: Dict[str, Any] = field(default_factory=dict)
+    operations: Optional[int] = None
+
+    @property
+    def count(self) -> int:
+        return len(self.samples) if self.operations is None else self.operations
+
+    @property
+    def ops_per_sec(self) -> float:
+        return self.count / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, q: float) -> float:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "params": self.params,
+            "count": self.count,
+            "elapsed_s": self.elapsed,
+            "ops_per_sec": self.ops_per_sec,
+            "mean_ms": 1e3 * sum(self.samples) / len(self.samples)
+            if self.samples
+            else 0.0,
+            "p50_ms": 1e3 * self.percentile(0.50),
+            "p99_ms": 1e3 * self.percentile(0.99),
+            "max_ms": 1e3 * max(self.samples, default=0.0),
+        }
+
+
+def measure(
+    name: str,
+    operation: Callable[[], Any],
+    iterations: int,
+    operations: Optional[int] = None,
+    **params: Any,
+) -> Result:
+    """
+    Time ``iterations`` sequential calls of ``operation``, each covering
+    ``operations`` operations if given.
+    """
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        begin = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - begin)
+    total = None if operations is None else operations * iterations
+    return Result(name, samples, time.perf_counter() - started, params, total)
+
+
+async def measure_async(
+    name: str,
+    operation: Callable[[], Awaitable[Any]],
+    iterations: int,
+    concurrency: int = 1,
+    **params: Any,
+) -> Result:
+    """Time ``iterations`` awaits of ``operation``, ``concurrency`` at a time."""
+    samples: List[float] = []
+    remaining = iter(range(iterations))
+
+    async def worker() -> None:
+        for _ in remaining:
+            begin = time.perf_counter()
+            await operation()
+            samples.append(time.perf_counter() - begin)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return Result(
+        name,
+        samples,
+        time.perf_counter() - started,
+        {"concurrency": concurrency, **params},
+    )
+
+
+def environment() -> Dict[str, Any]:
+    """What the results were measured on."""
+    try:
+        version = metadata.version("cowdao-cowpy")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    return {
+        "package_version": version,
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "created": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def report(results: Sequence[Result]) -> Dict[str, Any]:
+    return {
+        "environment": environment(),
+        "results": [result.to_dict() for result in results],
+    }
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.1
+) -> List[Dict[str, Any]]:
+    """
+    Match results of two reports by name and parameters. Each entry has the
+    ``ops_per_sec`` and ``p99_ms`` ratios (current / baseline) and whether
+    throughput dropped by more than ``threshold``.
+    """
+
+    def key(result: Dict[str, Any]) -> str:
+        return result["name"] + json.dumps(result["params"], sort_keys=True)
+
+    previous = {key(result): result for result in baseline["results"]}
+    changes = []
+    for result in current["results"]:
+        before: Optional[Dict[str, Any]] = previous.get(key(result))
+        if before is None or not before["ops_per_sec"] or not before["p99_ms"]:
+            continue
+        throughput = result["ops_per_sec"] / before["ops_per_sec"]
+        changes.append(
+            {
+                "name": result["name"],
+                "params": result["params"],
+                "ops_per_sec_ratio": throughput,
+                "p99_ratio": result["p99_ms"] / before["p99_ms"],
+                "regressed": throughput < 1 - threshold,
+            }
+        )
+    return changes
+
+
+def summary_line(result: Result) -> str:
+    data = result.to_dict()
+    params = " ".join(f"{k}={v}" for k, v in result.params.items())
+    return (
+        f"{result.name:<32} {params:<28} {data['ops_per_sec']:>12.1f}/s "
+        f"p50 {data['p50_ms']:>9.3f}ms p99 {data['p99_ms']:>9.3f}ms"
+    )
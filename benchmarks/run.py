@@ -0,0 +1,432 @@
+"""
+Client throughput and latency benchmarks.
+
+Network calls go to the in-process `FakeOrderBook`, so results measure the
+client itself and are comparable between runs and releases:
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --quick --baseline results.json
+
+Summaries are printed to stderr; the JSON report goes to ``--output`` (or
+stdout). With ``--baseline`` the run is compared with an earlier report and
+exits with status 1 when a benchmark lost more than ``--threshold`` of its
+throughput.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Sequence
+
+from eth_account import Account
+from hexbytes import HexBytes
+from web3 import Web3
+
+from cowdao_cowpy.app_data.utils import ensure_app_data_uploaded
+from cowdao_cowpy.codegen.__generated__.ComposableCow import GPv2Order_Data
+from cowdao_cowpy.common.chains import Chain
+from cowdao_cowpy.common.constants import CowContractAddress
+from cowdao_cowpy.composable.conditional_order import ConditionalOrderFactory
+from cowdao_cowpy.composable.multiplexer import Multiplexer
+from cowdao_cowpy.composable.order_types.twap import (
+    DurationType,
+    StartType,
+    Twap,
+    TwapData,
+)
+from cowdao_cowpy.composable.types import PollParams
+from cowdao_cowpy.contracts.domain import domain
+from cowdao_cowpy.contracts.order import Order, hash_order
+from cowdao_cowpy.contracts.sign import SigningScheme, sign_order
+from cowdao_cowpy.cow.swap import (
+    build_order,
+    build_quote_request,
+    get_order_quote,
+    post_order,
+)
+from cowdao_cowpy.cow.swap import sign_order as sign_swap_order
+from cowdao_cowpy.order_book.api import OrderBookApi
+from cowdao_cowpy.order_book.fake_server import FakeOrderBook
+from cowdao_cowpy.order_book.generated.model import UID, Auction
+from cowdao_cowpy.order_book.generated.model import Order as OrderModel
+
+from benchmarks.harness import (
+    Result,
+    compare,
+    measure,
+    measure_async,
+    report,
+    summary_line,
+)
+
+GROUPS = ("fetch", "serialization", "swap", "signing", "poll", "multiplexer")
+CHAIN = Chain.MAINNET
+SELL_TOKEN = Web3.to_checksum_address("0x" + "11" * 20)
+BUY_TOKEN = Web3.to_checksum_address("0x" + "22" * 20)
+# A fixed key keeps signatures, and with them UIDs, identical between runs.
+ACCOUNT = Account.from_key("0x" + "42" * 32)
+
+
+def sample_order(i: int = 0) -> Order:
+    return Order(
+        sell_token=SELL_TOKEN,
+        buy_token=BUY_TOKEN,
+        receiver=ACCOUNT.address,
+        sell_amount=str(10**18 + i),
+        buy_amount=str(10**20),
+        valid_to=1893456000,
+        app_data="0x" + "00" * 32,
+        fee_amount="0",
+        kind="sell",
+        partially_fillable=False,
+        sell_token_balance="erc20",
+        buy_token_balance="erc20",
+    )
+
+
+async def bench_fetch(iterations: int) -> List[Result]:
+    """`_fetch` latency and throughput, next to plain httpx on the same transport."""
+    server = FakeOrderBook()
+    server.seed(orders=1)
+    uid = UID(server.uids[0])
+    validated = server.order_book_api()
+    trusted = server.order_book_api(trusted_responses=True)
+    raw = server.client()
+    url = f"{validated.config.get_base_url()}/api/v1/orders/{uid.root}"
+
+    results = []
+    for concurrency in (1, 64):
+        results.append(
+            await measure_async(
+                "fetch.raw_httpx", lambda: raw.get(url), iterations, concurrency
+            )
+        )
+        results.append(
+            await measure_async(
+                "fetch.version", validated.get_version, iterations, concurrency
+            )
+        )
+        for api, name in ((validated, "fetch.order"), (trusted, "fetch.order_trusted")):
+            results.append(
+                await measure_async(
+                    name,
+                    lambda api=api: api.get_order_by_uid(uid),
+                    iterations,
+                    concurrency,
+                )
+            )
+    await raw.aclose()
+    return results
+
+
+async def bench_serialization(iterations: int, orders: int) -> List[Result]:
+    """`serialize_model` / `deserialize_model` on auction and order list payloads."""
+    server = FakeOrderBook()
+    server.seed(orders=orders, fulfilled_ratio=0.0)
+    api = server.order_book_api()
+    auction = await api.get_auction()
+    payload = OrderBookApi.serialize_model(auction)
+    order_list = list(server.orders.values())
+
+    def deserialize(data, model, lite=False) -> Callable[[], object]:
+        return lambda: OrderBookApi.deserialize_model(data, model, lite=lite)
+
+    return [
+        measure(
+            "serialize.auction",
+            lambda: OrderBookApi.serialize_model(auction),
+            iterations,
+            orders=orders,
+        ),
+        measure(
+            "deserialize.auction",
+            deserialize(payload, Auction),
+            iterations,
+            orders=orders,
+        ),
+        measure(
+            "deserialize.orders",
+            deserialize(order_list, List[OrderModel]),
+            iterations,
+            orders=orders,
+        ),
+        measure(
+            "deserialize.orders_lite",
+            deserialize(order_list, List[OrderModel], lite=True),
+            iterations,
+            orders=orders,
+        ),
+    ]
+
+
+async def bench_swap(iterations: int) -> List[Result]:
+    """The stages of `swap_tokens`, run against the fake orderbook."""
+    server = FakeOrderBook(chain=CHAIN)
+    api = server.order_book_api()
+    stages: Dict[str, List[float]] = {
+        name: []
+        for name in ("app_data", "quote", "build_order", "sign", "post", "total")
+    }
+
+    def timed(name: str, started: float) -> float:
+        now = time.perf_counter()
+        stages[name].append(now - started)
+        return now
+
+    for i in range(iterations):
+        amount = 10**18 + i
+        begin = started = time.perf_counter()
+        app_data = await ensure_app_data_uploaded(api, app_code="benchmarks")
+        started = timed("app_data", started)
+        request, side = build_quote_request(
+            amount, ACCOUNT, SELL_TOKEN, BUY_TOKEN, app_data
+        )
+        quote = await get_order_quote(request, side, api)
+        started = timed("quote", started)
+        order = build_order(amount, ACCOUNT, SELL_TOKEN, BUY_TOKEN, quote, app_data)
+        started = timed("build_order", started)
+        signature = sign_swap_order(CHAIN, ACCOUNT, order)
+        started = timed("sign", started)
+        await post_order(ACCOUNT, None, order, signature, api, chain=CHAIN)
+        timed("post", started)
+        timed("total", begin)
+
+    return [
+        Result(f"swap.{name}", samples, sum(samples))
+        for name, samples in stages.items()
+    ]
+
+
+def bench_signing(iterations: int) -> List[Result]:
+    """EIP-712 order hashing and signing throughput."""
+    settlement = domain(CHAIN, CowContractAddress.SETTLEMENT_CONTRACT.value)
+    orders = [sample_order(i) for i in range(iterations)]
+    hashed = iter(orders)
+    signed = iter(orders)
+    return [
+        measure("order.hash", lambda: hash_order(settlement, next(hashed)), iterations),
+        measure(
+            "order.sign",
+            lambda: sign_order(settlement, next(signed), ACCOUNT, SigningScheme.EIP712),
+            iterations,
+        ),
+    ]
+
+
+def make_twaps(count: int, seed: int = 0) -> List[Twap]:
+    rng = random.Random(seed)
+
+    def address() -> str:
+        return Web3.to_checksum_address(f"0x{rng.getrandbits(160):040x}")
+
+    return [
+        Twap.from_data(
+            TwapData(
+                sell_token=address(),
+                buy_token=address(),
+                receiver=address(),
+                sell_amount=10**18,
+                buy_amount=10**18,
+                start_type=StartType.AT_MINING_TIME,
+                number_of_parts=10,
+                time_between_parts=3600,
+                duration_type=DurationType.AUTO,
+                app_data=f"0x{rng.getrandbits(256):064x}",
+            ),
+            salt=f"0x{rng.getrandbits(256):064x}",  # type: ignore[arg-type]
+        )
+        for _ in range(count)
+    ]
+
+
+class InstantComposableCow:
+    """ComposableCoW reads answered in-process, so polls measure the SDK only."""
+
+    start = 1_700_000_000
+
+    async def single_orders(self, owner, ctx) -> bool:
+        return True
+
+    async def cabinet(self, owner, ctx) -> HexBytes:
+        return HexBytes(self.start.to_bytes(32, "big"))
+
+    async def get_tradeable_order_with_signature(self, owner, params, *args):
+        order = GPv2Order_Data(
+            sellToken=SELL_TOKEN,
+            buyToken=BUY_TOKEN,
+            receiver=ACCOUNT.address,
+            sellAmount=10**17,
+            buyAmount=10**17,
+            validTo=self.start + 3600,
+            appData=HexBytes(32),
+            feeAmount=0,
+            kind=Web3.keccak(text="sell"),
+            partiallyFillable=False,
+            sellTokenBalance=Web3.keccak(text="erc20"),
+            buyTokenBalance=Web3.keccak(text="erc20"),
+        )
+        return order, HexBytes(b"")
+
+
+class EmptyOrderBook:
+    async def get_order_by_uid(self, uid, context_override={}):
+        raise LookupError(uid)
+
+
+async def bench_poll(iterations: int) -> List[Result]:
+    """`ConditionalOrder.poll` and order identity, without any RPC."""
+    twap = make_twaps(1)[0]
+    params = PollParams(
+        owner=ACCOUNT.address,
+        chain=CHAIN,
+        provider=None,  # type: ignore[arg-type]
+        order_book_api=EmptyOrderBook(),  # type: ignore[arg-type]
+        block_info={"number": 1, "timestamp": InstantComposableCow.start + 60},  # type: ignore[typeddict-item]
+        composable_cow=InstantComposableCow(),
+    )
+
+    def cold_id() -> None:
+        twap.invalidate()
+        twap.id
+
+    return [
+        await measure_async("poll.twap", lambda: twap.poll(params), iterations, 1),
+        measure("order.id", lambda: twap.id, iterations),
+        measure("order.id_cold", cold_id, iterations),
+    ]
+
+
+def bench_multiplexer(sizes: Sequence[int]) -> List[Result]:
+    """
+    Merkle tree construction, proofs and single-order updates of a `Multiplexer`,
+    and decoding its orders back from their params.
+    """
+    Multiplexer.register_order_type("twap", Twap)
+    results = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for size in sizes:
+            multiplexer = Multiplexer()
+            for twap in make_twaps(size):
+                multiplexer.add(twap)
+
+            def build() -> None:
+                multiplexer.reset()
+                multiplexer.get_or_generate_tree()
+
+            results.append(
+                measure("multiplexer.tree", build, 1, operations=size, orders=size)
+            )
+            results.append(
+                measure(
+                    "multiplexer.proofs",
+                    multiplexer.get_proofs,
+                    1,
+                    operations=size,
+                    orders=size,
+                )
+            )
+            replacements = iter(make_twaps(100, seed=size))
+
+            def update() -> None:
+                order = multiplexer.get_by_index(random.randrange(size))
+                replacement = next(replacements)
+                multiplexer.update(order.id, lambda order, ctx: replacement)
+                multiplexer.root
+
+            results.append(measure("multiplexer.update", update, 100, orders=size))
+            leaves = [order.leaf for order in multiplexer.get_orders()]
+            results.append(
+                measure(
+                    "factory.from_params_many",
+                    lambda: ConditionalOrderFactory.from_params_many(leaves),
+                    1,
+                    operations=size,
+                    orders=size,
+                )
+            )
+    return results
+
+
+async def run_async(groups: Sequence[str], quick: bool) -> List[Result]:
+    results = []
+    if "fetch" in groups:
+        results += await bench_fetch(200 if quick else 2000)
+    if "serialization" in groups:
+        results += await bench_serialization(3 if quick else 20, 200 if quick else 2000)
+    if "swap" in groups:
+        results += await bench_swap(20 if quick else 200)
+    if "poll" in groups:
+        results += await bench_poll(200 if quick else 2000)
+    return results
+
+
+def run(
+    groups: Sequence[str] = GROUPS,
+    quick: bool = False,
+    multiplexer_sizes: Sequence[int] = (1_000, 10_000, 100_000),
+    progress: Callable[[Result], None] = lambda result: None,
+) -> List[Result]:
+    results = asyncio.run(run_async(groups, quick))
+    if "signing" in groups:
+        results += bench_signing(100 if quick else 1000)
+    if "multiplexer" in groups:
+        results += bench_multiplexer(multiplexer_sizes)
+    for result in results:
+        progress(result)
+    return results
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="compare with this earlier JSON report")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument(
+        "--only", default=",".join(GROUPS), help=f"any of {', '.join(GROUPS)}"
+    )
+    parser.add_argument("--quick", action="store_true", help="fewer iterations")
+    parser.add_argument(
+        "--multiplexer-sizes", default="1000,10000,100000", help="orders per tree"
+    )
+    args = parser.parse_args(argv)
+
+    groups = [group.strip() for group in args.only.split(",") if group.strip()]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"unknown benchmark groups: {', '.join(sorted(unknown))}")
+    sizes = [int(size) for size in args.multiplexer_sizes.split(",") if size]
+
+    results = run(
+        groups,
+        quick=args.quick,
+        multiplexer_sizes=sizes,
+        progress=lambda result: print(summary_line(result), file=sys.stderr),
+    )
+    document = report(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+    else:
+        json.dump(document, sys.stdout, indent=2)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as f:
+        changes = compare(document, json.load(f), args.threshold)
+    for change in changes:
+        flag = "REGRESSED" if change["regressed"] else ""
+        print(
+            f"{change['name']:<32} {change['ops_per_sec_ratio']:>6.2f}x throughput "
+            f"{change['p99_ratio']:>6.2f}x p99 {flag}",
+            file=sys.stderr,
+        )
+    return 1 if any(change["regressed"] for change in changes) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
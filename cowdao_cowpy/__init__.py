@@ -5,6 +5,7 @@ try:
 except importlib.metadata.PackageNotFoundError:
     __version__ = "development"
 
+from cowdao_cowpy.cow.pipeline import swap_tokens_many
 from cowdao_cowpy.cow.swap import swap_tokens
 
-__all__ = ["swap_tokens", "__version__"]
+__all__ = ["swap_tokens", "swap_tokens_many", "__version__"]
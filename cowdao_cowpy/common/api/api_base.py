@@ -2,15 +2,25 @@ from abc import ABC
 import asyncio
 import importlib.metadata
 import json
-from typing import Any, Dict, List, Literal, Optional, Type, TypeVar, Union, get_args
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Type,
+    TypeVar,
+    Union,
+    get_args,
+)
 
 import httpx
+from pydantic import BaseModel as PydanticBaseModel, RootModel
 
-from cowdao_cowpy.common.api.decorators import (
-    RETRYABLE_STATUS_CODES,
-    rate_limitted,
-    with_backoff,
-)
+from cowdao_cowpy.common.api.compression import CompressionConfig, TransferStats
+from cowdao_cowpy.common.api.decorators import RETRYABLE_STATUS_CODES, with_backoff
 from cowdao_cowpy.common.api.errors import (
     ApiResponseError,
     BaseApiError,
@@ -18,9 +28,15 @@ from cowdao_cowpy.common.api.errors import (
     SerializationError,
     UnexpectedResponseError,
 )
+from cowdao_cowpy.common.api.scheduler import (
+    Lane,
+    RequestScheduler,
+    get_host_scheduler,
+)
 from cowdao_cowpy.common.config import SupportedChainId
 
 from cowdao_cowpy.order_book.generated.model import BaseModel
+from cowdao_cowpy.order_book.lite import LiteModel, MaybeLite, lite_model_class
 
 Envs = Literal["prod", "staging"]
 
@@ -97,25 +113,92 @@ class APIConfig(ABC):
 
 
 class RequestStrategy:
-    async def make_request(
+    def __init__(
         self,
-        client: httpx.AsyncClient,
-        url: str,
-        method: str,
-        headers: Optional[Dict[str, str]] = None,
-        **request_kwargs,
+        compression: Optional[CompressionConfig] = None,
+        stats: Optional[TransferStats] = None,
     ):
+        self.compression = compression or CompressionConfig()
+        self.stats = stats or TransferStats()
+
+    def merge_headers(self, headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
         merged_headers = {
             "accept": "application/json",
+            "accept-encoding": self.compression.accept_encoding_header,
             "content-type": "application/json",
             "user-agent": USER_AGENT,
         }
         if headers:
             merged_headers.update({k.lower(): v for k, v in headers.items()})
+        return merged_headers
+
+    def _encode_body(
+        self, headers: Dict[str, str], request_kwargs: Dict[str, Any]
+    ) -> Optional[int]:
+        """Compress a JSON body in place; returns its uncompressed size if it was."""
+        if "json" not in request_kwargs or not self.compression.compress_requests:
+            return None
+        body = json.dumps(request_kwargs["json"]).encode("utf-8")
+        encoded = self.compression.encode_body(body)
+        if encoded is None:
+            return None
+        del request_kwargs["json"]
+        request_kwargs["content"] = encoded
+        headers["content-encoding"] = self.compression.request_encoding
+        return len(body)
+
+    def _record_request(self, request: httpx.Request, plain_size: Optional[int]):
+        try:
+            wire_size = len(request.content)
+        except httpx.RequestNotRead:
+            return
+        self.stats.record_request(
+            wire_size, plain_size if plain_size is not None else wire_size
+        )
 
-        return await client.request(
+    async def make_request(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        method: str,
+        headers: Optional[Dict[str, str]] = None,
+        **request_kwargs,
+    ):
+        merged_headers = self.merge_headers(headers)
+        plain_size = self._encode_body(merged_headers, request_kwargs)
+        response = await client.request(
             url=url, headers=merged_headers, method=method, **request_kwargs
         )
+        self._record_request(response.request, plain_size)
+        self.stats.record_response(response, len(response.content))
+        return response
+
+    async def open_stream(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        method: str,
+        headers: Optional[Dict[str, str]] = None,
+        **request_kwargs,
+    ) -> httpx.Response:
+        merged_headers = self.merge_headers(headers)
+        plain_size = self._encode_body(merged_headers, request_kwargs)
+        request = client.build_request(
+            method=method, url=url, headers=merged_headers, **request_kwargs
+        )
+        response = await client.send(request, stream=True)
+        self._record_request(request, plain_size)
+        return response
+
+    async def iter_bytes(self, response: httpx.Response) -> AsyncGenerator[bytes, None]:
+        """Iterate a streamed response body, recording its size once consumed."""
+        decoded_size = 0
+        try:
+            async for chunk in response.aiter_bytes():
+                decoded_size += len(chunk)
+                yield chunk
+        finally:
+            self.stats.record_response(response, decoded_size)
 
 
 class ResponseAdapter:
@@ -158,10 +241,32 @@ def _extract_error_type(response: httpx.Response) -> str:
     return str(response.status_code)
 
 
+def _item_factory(
+    model_class: Type[T], lite: bool
+) -> Callable[[Dict[str, Any]], MaybeLite[T]]:
+    if (
+        lite
+        and isinstance(model_class, type)
+        and issubclass(model_class, PydanticBaseModel)
+        and not issubclass(model_class, RootModel)
+    ):
+        return lite_model_class(model_class)
+    return lambda item: model_class(**item)
+
+
 class ApiBase:
-    def __init__(self, config: APIConfig, client: Optional[httpx.AsyncClient] = None):
+    def __init__(
+        self,
+        config: APIConfig,
+        client: Optional[httpx.AsyncClient] = None,
+        trusted_responses: bool = False,
+        compression: Optional[CompressionConfig] = None,
+        scheduler: Optional[RequestScheduler] = None,
+    ):
         self.config = config
-        self.request_strategy = RequestStrategy()
+        self.trusted_responses = trusted_responses
+        self.scheduler = scheduler
+        self.request_strategy = RequestStrategy(compression)
         self.response_adapter = JsonResponseAdapter()
         self.request_builder = RequestBuilder(
             self.request_strategy, self.response_adapter
@@ -170,6 +275,11 @@ class ApiBase:
         self._client: Optional[httpx.AsyncClient] = None
         self._client_loop: Optional[asyncio.AbstractEventLoop] = None
 
+    @property
+    def transfer_stats(self) -> TransferStats:
+        """Compressed (wire) and uncompressed byte counters for this client."""
+        return self.request_strategy.stats
+
     def _get_client(self) -> httpx.AsyncClient:
         """Return the HTTP client to use, creating (and reusing) one if none was injected.
 
@@ -202,6 +312,18 @@ class ApiBase:
         if self._client is not None and not self._client.is_closed:
             await self._client.aclose()
 
+    def _scheduler_for(self, url: str) -> RequestScheduler:
+        """The injected scheduler, or the one shared by all clients of the host."""
+        return self.scheduler or get_host_scheduler(httpx.URL(url).host)
+
+    async def _acquire_slot(
+        self, url: str, method: str, context_override: Context
+    ) -> None:
+        lane = context_override.get("lane")
+        if lane is None:
+            lane = Lane.INTERACTIVE if method.upper() == "GET" else Lane.WRITE
+        await self._scheduler_for(url).acquire(lane)
+
     def _build_auth_headers(self, context_override: Context) -> Dict[str, str]:
         headers: Dict[str, str] = {}
         bearer_token = context_override.get("bearer_token", self.config.bearer_token)
@@ -212,39 +334,100 @@ class ApiBase:
             headers["X-API-Key"] = api_key
         return headers
 
+    def _resolve_url(self, path: str, context_override: Context) -> str:
+        url_override = None
+        # A request-scoped api_key must also affect URL routing (partner
+        # gateway), not just the X-API-Key header.
+        api_key_override = context_override.get("api_key")
+
+        # Handle environment override. Read non-destructively: backoff retries
+        # re-invoke the request coroutine with the *same* context_override
+        # dict, so mutating it here (e.g. pop) would strip the override on the
+        # 2nd+ try and silently fall back to the default-env URL.
+        if "env" in context_override:
+            env = context_override.get("env")
+            try:
+                # Use the config's with_env method to get a config for the desired environment
+                temp_config = self.config.with_env(env)
+                url_override = temp_config.get_base_url(api_key=api_key_override) + path
+            except Exception as e:
+                # Log the error but continue with the default URL
+                print(f"Error switching environment: {e}")
+
+        # Use the overridden URL or the default one
+        return url_override or self.config.get_base_url(api_key=api_key_override) + path
+
+    def _prepare_request(
+        self, path: str, kwargs: Dict[str, Any]
+    ) -> tuple[str, Dict[str, Any]]:
+        """Resolve the request URL and build the httpx kwargs for a request.
+
+        context_override is consumed here and never reaches httpx.
+        """
+        context_override = kwargs.get("context_override", {})
+        url = self._resolve_url(path, context_override)
+
+        kwargs = {k: v for k, v in kwargs.items() if k != "context_override"}
+
+        headers = {
+            **self._build_auth_headers(context_override),
+            **(kwargs.pop("headers", None) or {}),
+        }
+        if headers:
+            kwargs["headers"] = headers
+
+        if "json" in kwargs:
+            kwargs["json"] = self.serialize_model(kwargs["json"])
+
+        return url, kwargs
+
     @staticmethod
-    def serialize_model(data: Union[BaseModel, Dict[str, Any]]) -> Dict[str, Any]:
+    def serialize_model(
+        data: Union[BaseModel, LiteModel, Dict[str, Any], List[Any]],
+    ) -> Union[Dict[str, Any], List[Any]]:
         if isinstance(data, BaseModel):
             return json.loads(data.model_dump_json(by_alias=True))
-        elif isinstance(data, dict):
+        elif isinstance(data, LiteModel):
+            # Lite records hold the response item as the API sent it.
+            return dict(data.raw)
+        elif isinstance(data, (dict, list)):
             return data
         else:
             raise ValueError(f"Unsupported type for serialization: {type(data)}")
 
     @staticmethod
     def deserialize_model(
-        data: Union[Dict[str, Any], List[Dict[str, Any]], str], model_class: Type[T]
-    ) -> Union[T, List[T]]:
+        data: Union[Dict[str, Any], List[Dict[str, Any]], str],
+        model_class: Type[T],
+        lite: bool = False,
+    ) -> Union[MaybeLite[T], List[MaybeLite[T]]]:
+        """
+        Deserialize a decoded response into `model_class` (or a list of it).
+
+        With ``lite=True`` object models are wrapped in `LiteModel` records that
+        only validate a field when it is read. Use it for trusted responses on
+        high-volume read paths.
+        """
         if isinstance(data, str):
             return model_class(data)  # type: ignore
         if isinstance(data, list):
             model_class, *_ = get_args(model_class)
+            factory = _item_factory(model_class, lite)
             errors = []
             results = []
             for item in data:
                 try:
-                    results.append(model_class(**item))
+                    results.append(factory(item))
                 except Exception as e:
                     errors.append((item, str(e)))
             if errors:
                 raise ValueError(f"Failed to deserialize some items: {errors}")
             return results
         if isinstance(data, dict):
-            return model_class(**data)
+            return _item_factory(model_class, lite)(data)
         raise ValueError(f"Unsupported data type for deserialization: {type(data)}")
 
     @with_backoff()
-    @rate_limitted()
     async def _fetch(
         self,
         path: str,
@@ -253,7 +436,10 @@ class ApiBase:
         **kwargs,
     ) -> Union[T, Any]:
         """
-        Makes an API request with backoff and rate limiting applied.
+        Makes an API request with backoff and scheduling applied.
+
+        Requests wait for a slot in the per-host `RequestScheduler`, which
+        shares the rate budget between priority lanes.
 
         Args:
             path: The API endpoint path to request
@@ -265,46 +451,19 @@ class ApiBase:
                     - backoff_opts: Custom backoff options
                     - bearer_token: Request-specific Authorization bearer token
                     - api_key: Request-specific X-API-Key header
+                    - trusted_responses: Override the client's trusted_responses
+                      mode (lazily validated `LiteModel` records) for this request
+                    - lane: Scheduling `Lane` ("write", "interactive",
+                      "background"); defaults to write for non-GET requests
                     - Any other httpx client parameters
 
         Returns:
             The API response, deserialized into response_model if provided
         """
         context_override = kwargs.get("context_override", {})
-        url_override = None
-        # A request-scoped api_key must also affect URL routing (partner
-        # gateway), not just the X-API-Key header.
-        api_key_override = context_override.get("api_key")
-
-        # Handle environment override. Read non-destructively: backoff retries
-        # re-invoke this coroutine with the *same* context_override dict, so
-        # mutating it here (e.g. pop) would strip the override on the 2nd+ try
-        # and silently fall back to the default-env URL. context_override is
-        # excluded from the httpx kwargs below, so it never reaches httpx.
-        if "env" in context_override:
-            env = context_override.get("env")
-            try:
-                # Use the config's with_env method to get a config for the desired environment
-                temp_config = self.config.with_env(env)
-                url_override = temp_config.get_base_url(api_key=api_key_override) + path
-            except Exception as e:
-                # Log the error but continue with the default URL
-                print(f"Error switching environment: {e}")
-
-        # Use the overridden URL or the default one
-        url = url_override or self.config.get_base_url(api_key=api_key_override) + path
-
-        kwargs = {k: v for k, v in kwargs.items() if k != "context_override"}
-
-        headers = {
-            **self._build_auth_headers(context_override),
-            **(kwargs.pop("headers", None) or {}),
-        }
-        if headers:
-            kwargs["headers"] = headers
-
-        if "json" in kwargs:
-            kwargs["json"] = self.serialize_model(kwargs["json"])
+        lite = context_override.get("trusted_responses", self.trusted_responses)
+        url, kwargs = self._prepare_request(path, kwargs)
+        await self._acquire_slot(url, method, context_override)
 
         try:
             client = self._get_client()
@@ -317,7 +476,9 @@ class ApiBase:
                 )
 
             return (
-                self.deserialize_model(data, response_model) if response_model else data
+                self.deserialize_model(data, response_model, lite=lite)
+                if response_model
+                else data
             )
 
         except httpx.TransportError as e:
@@ -336,3 +497,40 @@ class ApiBase:
             raise
         except Exception as e:
             raise UnexpectedResponseError(f"An unexpected error occurred: {str(e)}")
+
+    @with_backoff()
+    async def _open_stream(
+        self, path: str, method: str = "GET", **kwargs
+    ) -> httpx.Response:
+        """
+        Opens a streaming API request with backoff and scheduling applied.
+
+        Accepts the same arguments as `_fetch`. Only establishing the response
+        is retried; the caller owns the returned response and must close it
+        (e.g. with ``await response.aclose()``) once the body is consumed.
+
+        Returns:
+            An httpx response whose body has not been read yet.
+        """
+        context_override = kwargs.get("context_override", {})
+        url, kwargs = self._prepare_request(path, kwargs)
+        await self._acquire_slot(url, method, context_override)
+        client = self._get_client()
+        try:
+            response = await self.request_strategy.open_stream(
+                client, url, method, **kwargs
+            )
+        except httpx.TransportError as e:
+            raise NetworkError(f"Network error occurred: {str(e)}") from e
+
+        if response.is_error:
+            await response.aread()
+            await response.aclose()
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                response.raise_for_status()
+            raise ApiResponseError(
+                f"HTTP error {response.status_code}: {response.text}",
+                _extract_error_type(response),
+                response,
+            )
+        return response
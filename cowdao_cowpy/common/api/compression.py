@@ -0,0 +1,152 @@
+import gzip
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import httpx
+
+try:
+    import brotli  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional codec
+    try:
+        import brotlicffi as brotli  # type: ignore[import-not-found,no-redef]
+    except ImportError:
+        brotli = None
+
+try:
+    import zstandard  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional codec
+    zstandard = None
+
+# Most effective first; advertised in this order.
+ENCODING_PREFERENCE = ("zstd", "br", "gzip", "deflate")
+
+# httpx decodes gzip and deflate itself, br with brotli or brotlicffi, and
+# zstd with zstandard from httpx 0.27.1 on.
+_HTTPX_VERSION = tuple(int(part) for part in re.findall(r"\d+", httpx.__version__)[:3])
+DECODABLE_ENCODINGS = {"gzip", "deflate"}
+if brotli is not None:
+    DECODABLE_ENCODINGS.add("br")
+if zstandard is not None and _HTTPX_VERSION >= (0, 27, 1):
+    DECODABLE_ENCODINGS.add("zstd")
+
+REQUEST_ENCODERS: Dict[str, Callable[[bytes], bytes]] = {
+    "gzip": lambda body: gzip.compress(body, compresslevel=6),
+}
+if brotli is not None:
+    REQUEST_ENCODERS["br"] = lambda body: brotli.compress(body)
+if zstandard is not None:
+    REQUEST_ENCODERS["zstd"] = lambda body: zstandard.ZstdCompressor().compress(body)
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """Content codings httpx can decode with the codecs installed here."""
+    return tuple(e for e in ENCODING_PREFERENCE if e in DECODABLE_ENCODINGS)
+
+
+@dataclass
+class CompressionConfig:
+    """
+    Content-encoding negotiation for API requests.
+
+    Args:
+        accept_encodings: Codings to advertise in ``accept-encoding``, most
+            preferred first. Defaults to every coding that can be decoded
+            (`available_encodings`); an empty sequence asks for ``identity``.
+        compress_requests: Compress request bodies. Off by default: only enable
+            it for deployments whose gateway accepts ``content-encoding``.
+        request_encoding: Coding used for request bodies.
+        min_request_size: Bodies smaller than this are sent uncompressed.
+    """
+
+    accept_encodings: Optional[Sequence[str]] = None
+    compress_requests: bool = False
+    request_encoding: str = "gzip"
+    min_request_size: int = 1024
+
+    def __post_init__(self):
+        supported = available_encodings()
+        if self.accept_encodings is not None:
+            unsupported = set(self.accept_encodings) - set(supported)
+            if unsupported:
+                raise ValueError(
+                    f"Cannot decode content encodings {sorted(unsupported)}; "
+                    f"available: {list(supported)}"
+                )
+        if self.compress_requests and self.request_encoding not in REQUEST_ENCODERS:
+            raise ValueError(
+                f"Cannot encode request bodies as {self.request_encoding!r}; "
+                f"available: {list(REQUEST_ENCODERS)}"
+            )
+
+    @property
+    def accept_encoding_header(self) -> str:
+        encodings = (
+            available_encodings()
+            if self.accept_encodings is None
+            else tuple(self.accept_encodings)
+        )
+        return ", ".join(encodings) if encodings else "identity"
+
+    def encode_body(self, body: bytes) -> Optional[bytes]:
+        """Compress a request body, or return None if it should be sent as-is."""
+        if not self.compress_requests or len(body) < self.min_request_size:
+            return None
+        return REQUEST_ENCODERS[self.request_encoding](body)
+
+
+@dataclass
+class EncodingStats:
+    count: int = 0
+    wire_bytes: int = 0
+    decoded_bytes: int = 0
+
+
+@dataclass
+class TransferStats:
+    """
+    Byte counters for the traffic of one API client.
+
+    ``*_wire_bytes`` are what crossed the network (after compression) and
+    ``*_bytes`` the uncompressed payload sizes; both exclude headers.
+    """
+
+    requests: int = 0
+    request_wire_bytes: int = 0
+    request_bytes: int = 0
+    responses: int = 0
+    response_wire_bytes: int = 0
+    response_bytes: int = 0
+    by_encoding: Dict[str, EncodingStats] = field(default_factory=dict)
+
+    @property
+    def bytes_saved(self) -> int:
+        return (self.request_bytes - self.request_wire_bytes) + (
+            self.response_bytes - self.response_wire_bytes
+        )
+
+    @property
+    def response_compression_ratio(self) -> float:
+        """Decoded over wire size of responses; 1.0 means no savings."""
+        if not self.response_wire_bytes:
+            return 1.0
+        return self.response_bytes / self.response_wire_bytes
+
+    def record_request(self, wire_bytes: int, decoded_bytes: int) -> None:
+        self.requests += 1
+        self.request_wire_bytes += wire_bytes
+        self.request_bytes += decoded_bytes
+
+    def record_response(self, response: httpx.Response, decoded_bytes: int) -> None:
+        wire_bytes = response.num_bytes_downloaded
+        encoding = response.headers.get("content-encoding", "identity").lower()
+        self.responses += 1
+        self.response_wire_bytes += wire_bytes
+        self.response_bytes += decoded_bytes
+        stats = self.by_encoding.setdefault(encoding, EncodingStats())
+        stats.count += 1
+        stats.wire_bytes += wire_bytes
+        stats.decoded_bytes += decoded_bytes
+
+    def reset(self) -> None:
+        self.__init__()  # type: ignore[misc]
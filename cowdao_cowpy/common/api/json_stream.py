@@ -0,0 +1,118 @@
+import codecs
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Optional
+
+from cowdao_cowpy.common.api.errors import SerializationError
+
+_WHITESPACE = " \t\n\r"
+
+# Once this much of the buffer has been consumed it is dropped, so memory stays
+# bounded by roughly one chunk plus the largest single array item.
+_COMPACT_THRESHOLD = 1 << 16
+
+
+class _JsonCursor:
+    """A pull-style reader over a stream of JSON bytes.
+
+    Values are decoded with the C-accelerated ``json.JSONDecoder.raw_decode``;
+    when a value is cut off by a chunk boundary the cursor reads more data and
+    retries, so only the value currently being decoded is held in memory.
+    """
+
+    def __init__(self, chunks: AsyncIterable[bytes]):
+        self._chunks = chunks.__aiter__()
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    async def _fill(self) -> bool:
+        if self._eof:
+            return False
+        if self._pos >= _COMPACT_THRESHOLD:
+            self._buf = self._buf[self._pos :]
+            self._pos = 0
+        try:
+            chunk = await self._chunks.__anext__()
+        except StopAsyncIteration:
+            self._eof = True
+            self._buf += self._decoder.decode(b"", final=True)
+            return False
+        self._buf += self._decoder.decode(chunk)
+        return True
+
+    async def peek(self) -> Optional[str]:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not await self._fill():
+                return None
+
+    async def expect(self, char: str) -> None:
+        found = await self.peek()
+        if found != char:
+            raise SerializationError(
+                f"Malformed JSON stream: expected {char!r}, found {found!r}"
+            )
+        self._pos += 1
+
+    async def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        await self.peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                if await self._fill():
+                    continue
+                raise SerializationError(f"Malformed JSON stream: {e}") from e
+            # A number or literal ending exactly at the buffer end may have
+            # been truncated by the chunk boundary, so only trust it at EOF.
+            if end == len(self._buf) and await self._fill():
+                continue
+            self._pos = end
+            return value
+
+
+async def iter_json_array_items(
+    chunks: AsyncIterable[bytes], key: str
+) -> AsyncIterator[Any]:
+    """Incrementally yield the items of the array stored under a top-level key.
+
+    Sibling values that precede ``key`` are decoded and discarded; the stream is
+    not read past the end of the array. Nothing is yielded if ``key`` is absent
+    or null.
+
+    :param chunks: Raw bytes of a JSON object, e.g. ``httpx.Response.aiter_bytes()``.
+    :param key: The top-level key holding the array.
+    :raises SerializationError: If the stream is not well-formed JSON.
+    """
+    cursor = _JsonCursor(chunks)
+    await cursor.expect("{")
+    if await cursor.peek() == "}":
+        return
+    while True:
+        name = await cursor.value()
+        await cursor.expect(":")
+        if name == key:
+            break
+        await cursor.value()
+        if await cursor.peek() == "}":
+            return
+        await cursor.expect(",")
+
+    if await cursor.peek() == "n":
+        await cursor.value()
+        return
+    await cursor.expect("[")
+    if await cursor.peek() == "]":
+        return
+    while True:
+        yield await cursor.value()
+        if await cursor.peek() == "]":
+            return
+        await cursor.expect(",")
@@ -0,0 +1,297 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Deque, Dict, Mapping, Optional, Protocol, Tuple, Union
+
+from cowdao_cowpy.common.api.decorators import DEFAULT_LIMITER_OPTIONS
+
+
+class Lane(str, Enum):
+    """Request priority lanes, most latency-sensitive first."""
+
+    WRITE = "write"
+    INTERACTIVE = "interactive"
+    BACKGROUND = "background"
+
+
+DEFAULT_LANE_WEIGHTS: Dict[Lane, float] = {
+    Lane.WRITE: 6,
+    Lane.INTERACTIVE: 3,
+    Lane.BACKGROUND: 1,
+}
+
+
+@dataclass
+class LaneStats:
+    """Queue depth and admission wait times of one lane."""
+
+    depth: int = 0
+    max_depth: int = 0
+    admitted: int = 0
+    promoted: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def average_wait(self) -> float:
+        return self.total_wait / self.admitted if self.admitted else 0.0
+
+
+class Bucket(Protocol):
+    """A source of request tokens, see `TokenBucket`."""
+
+    def try_acquire(self) -> float:
+        """Take a token and return 0, or return the seconds until one is available."""
+        ...
+
+    def release(self) -> None:
+        """Return an unused token."""
+        ...
+
+
+class TokenBucket:
+    """
+    An in-process token bucket: bursts of up to ``rate`` tokens, refilled at
+    ``rate`` per ``per`` seconds.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_LIMITER_OPTIONS["rate"],
+        per: float = DEFAULT_LIMITER_OPTIONS["per"],
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate <= 0 or per <= 0:
+            raise ValueError("rate and per must be positive")
+        self.rate = rate
+        self.per = per
+        self.clock = clock
+        self._tokens = float(rate)
+        self._updated = clock()
+        # Schedulers of different event loops may share a bucket.
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(
+                float(self.rate),
+                self._tokens + (now - self._updated) * self.rate / self.per,
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) * self.per / self.rate
+
+    def release(self) -> None:
+        with self._lock:
+            self._tokens = min(float(self.rate), self._tokens + 1)
+
+
+class RequestScheduler:
+    """
+    A token-bucket rate limiter that admits queued requests by priority lane.
+
+    Allows bursts of up to ``rate`` requests and ``rate`` per ``per`` seconds on
+    average, like `rate_limitted`. When requests queue up, each freed slot
+    goes to the lane with the lowest virtual time, which advances by
+    ``1 / weight`` per admitted request: backlogged lanes share the budget in
+    proportion to their weights, and an idle lane cannot bank credit. A request
+    that has waited ``max_wait`` seconds or more is admitted ahead of the
+    weighted order, so no lane starves.
+
+    Tokens come from an in-process `TokenBucket` unless ``bucket`` is given,
+    e.g. a `SharedTokenBucket` to share one budget between processes.
+
+    Queued requests can only be resumed on their own event loop: when the
+    scheduler is used from another loop, requests still queued on the
+    previous one are cancelled.
+
+    Args:
+        rate: Requests per ``per`` seconds, also the burst size.
+        per: Length of the rate window in seconds.
+        weights: Share of each `Lane` under contention.
+        max_wait: Waiting time after which a request is admitted first.
+        clock: Monotonic time source.
+        bucket: Token source replacing the ``rate``/``per`` bucket.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_LIMITER_OPTIONS["rate"],
+        per: float = DEFAULT_LIMITER_OPTIONS["per"],
+        weights: Optional[Mapping[Lane, float]] = None,
+        max_wait: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+        bucket: Optional[Bucket] = None,
+    ):
+        weights = {**DEFAULT_LANE_WEIGHTS, **(weights or {})}
+        if rate <= 0 or per <= 0:
+            raise ValueError("rate and per must be positive")
+        if any(weight <= 0 for weight in weights.values()):
+            raise ValueError("Lane weights must be positive")
+        self.rate = rate
+        self.per = per
+        self.weights = weights
+        self.max_wait = max_wait
+        self.clock = clock
+        self.bucket: Bucket = bucket or TokenBucket(rate, per, clock)
+        self.stats: Dict[Lane, LaneStats] = {lane: LaneStats() for lane in Lane}
+        self._queues: Dict[Lane, Deque[Tuple[float, "asyncio.Future[None]"]]] = {
+            lane: deque() for lane in Lane
+        }
+        self._vtime: Dict[Lane, float] = {lane: 0.0 for lane in Lane}
+        self._global_vtime = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def queue_depth(self, lane: Union[Lane, str]) -> int:
+        return len(self._queues[Lane(lane)])
+
+    async def acquire(self, lane: Union[Lane, str] = Lane.INTERACTIVE) -> None:
+        """Wait until a request in ``lane`` may be sent."""
+        lane = Lane(lane)
+        self._bind_loop()
+        stats = self.stats[lane]
+        queue = self._queues[lane]
+
+        if not any(self._queues.values()) and self.bucket.try_acquire() == 0:
+            self._admitted(lane, 0.0)
+            return
+
+        if not queue:
+            # An idle lane rejoins at the current virtual time.
+            self._vtime[lane] = max(self._vtime[lane], self._global_vtime)
+        entry = (self.clock(), self._loop.create_future())  # type: ignore[union-attr]
+        queue.append(entry)
+        stats.depth = len(queue)
+        stats.max_depth = max(stats.max_depth, stats.depth)
+        self._pump()
+
+        try:
+            await entry[1]
+        except asyncio.CancelledError:
+            if entry in queue:
+                queue.remove(entry)
+                stats.depth = len(queue)
+            elif entry[1].done() and not entry[1].cancelled():
+                # Admitted just before the cancellation: hand the slot back.
+                self.bucket.release()
+                self._pump()
+            raise
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Waiters and timers of another loop can't be resumed from this one.
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            for lane, queue in self._queues.items():
+                for _, future in queue:
+                    _cancel_waiter(future)
+                queue.clear()
+                self.stats[lane].depth = 0
+            self._loop = loop
+
+    def _next_lane(self) -> Tuple[Optional[Lane], bool]:
+        """The lane to admit from next, and whether it is a promotion."""
+        for lane, queue in self._queues.items():
+            while queue and queue[0][1].done():
+                queue.popleft()
+                self.stats[lane].depth = len(queue)
+        waiting = [lane for lane in Lane if self._queues[lane]]
+        if not waiting:
+            return None, False
+        oldest = min(waiting, key=lambda lane: self._queues[lane][0][0])
+        if self.clock() - self._queues[oldest][0][0] >= self.max_wait:
+            return oldest, True
+        # Ties go to the more latency-sensitive lane (enum order).
+        return min(waiting, key=lambda lane: self._vtime[lane]), False
+
+    def _pump(self) -> None:
+        while True:
+            lane, promoted = self._next_lane()
+            if lane is None:
+                return
+            wait = self.bucket.try_acquire()
+            if wait > 0:
+                if self._timer is None:
+                    self._timer = self._loop.call_later(wait, self._on_timer)  # type: ignore[union-attr]
+                return
+            queue = self._queues[lane]
+            enqueued_at, future = queue.popleft()
+            self.stats[lane].depth = len(queue)
+            if promoted:
+                self.stats[lane].promoted += 1
+            self._global_vtime = self._vtime[lane]
+            self._vtime[lane] += 1 / self.weights[lane]
+            self._admitted(lane, self.clock() - enqueued_at)
+            future.set_result(None)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._pump()
+
+    def _admitted(self, lane: Lane, wait: float) -> None:
+        stats = self.stats[lane]
+        stats.admitted += 1
+        stats.total_wait += wait
+        stats.max_wait = max(stats.max_wait, wait)
+
+
+def _cancel_waiter(future: "asyncio.Future[None]") -> None:
+    loop = future.get_loop()
+    if loop.is_closed():
+        return
+    try:
+        if loop.is_running():
+            # Running in another thread.
+            loop.call_soon_threadsafe(future.cancel)
+        else:
+            future.cancel()
+    except RuntimeError:
+        # Closed in the meantime.
+        pass
+
+
+_host_schedulers: Dict[str, RequestScheduler] = {}
+_host_buckets: Dict[str, TokenBucket] = {}
+_loop_schedulers: Dict[
+    Optional[asyncio.AbstractEventLoop], Dict[str, RequestScheduler]
+] = {}
+
+
+def get_host_scheduler(host: str) -> RequestScheduler:
+    """
+    The scheduler shared by every client sending requests to ``host``.
+
+    Unless one was set with `set_host_scheduler`, each event loop gets its own
+    scheduler, and the schedulers of a host draw from one `TokenBucket`.
+    """
+    scheduler = _host_schedulers.get(host)
+    if scheduler is not None:
+        return scheduler
+    try:
+        loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    schedulers = _loop_schedulers.get(loop)
+    if schedulers is None:
+        for closed in [key for key in _loop_schedulers if key and key.is_closed()]:
+            del _loop_schedulers[closed]
+        schedulers = _loop_schedulers[loop] = {}
+    scheduler = schedulers.get(host)
+    if scheduler is None:
+        bucket = _host_buckets.setdefault(host, TokenBucket())
+        scheduler = schedulers[host] = RequestScheduler(bucket=bucket)
+    return scheduler
+
+
+def set_host_scheduler(host: str, scheduler: RequestScheduler) -> None:
+    """Make every client without its own scheduler use ``scheduler`` for ``host``."""
+    _host_schedulers[host] = scheduler
@@ -0,0 +1,111 @@
+import mmap
+import os
+import struct
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Tuple, Union
+
+from cowdao_cowpy.common.api.decorators import DEFAULT_LIMITER_OPTIONS
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
+# Bucket state: available tokens and the monotonic time they were counted at.
+_STATE = struct.Struct("<dd")
+
+
+class SharedTokenBucket:
+    """
+    A token bucket shared by every process on the host that opens ``path``.
+
+    Works like `TokenBucket` (bursts of up to ``rate``, ``rate`` per ``per``
+    seconds), but the bucket state lives in a small memory-mapped file and
+    each update holds an exclusive ``flock`` on it. Workers of one deployment
+    (gunicorn, multiprocessing, ...) that pass the same ``path`` therefore
+    stay within one budget together, e.g. the limit of a shared partner API
+    key. All of them must use the same ``rate`` and ``per``.
+
+    Plug it into a `RequestScheduler` with ``bucket=``. Requires ``fcntl``
+    (POSIX); the clock must be system-wide, as `time.monotonic` is on Linux
+    and macOS.
+
+    Args:
+        path: The state file, created if missing.
+        rate: Requests per ``per`` seconds, also the burst size.
+        per: Length of the rate window in seconds.
+        clock: Monotonic time source shared by all processes.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        rate: float = DEFAULT_LIMITER_OPTIONS["rate"],
+        per: float = DEFAULT_LIMITER_OPTIONS["per"],
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if fcntl is None:
+            raise RuntimeError("SharedTokenBucket requires fcntl (POSIX)")
+        if rate <= 0 or per <= 0:
+            raise ValueError("rate and per must be positive")
+        self.path = os.fspath(path)
+        self.rate = rate
+        self.per = per
+        self.clock = clock
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(self._fd).st_size < _STATE.size:
+                    os.ftruncate(self._fd, _STATE.size)
+                    os.pwrite(self._fd, _STATE.pack(float(rate), clock()), 0)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            self._map = mmap.mmap(self._fd, _STATE.size)
+        except BaseException:
+            os.close(self._fd)
+            raise
+
+    def __enter__(self) -> "SharedTokenBucket":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def tokens(self) -> float:
+        """Tokens available now, across all processes."""
+        with self._locked() as (tokens, _):
+            return tokens
+
+    def try_acquire(self) -> float:
+        """Take a token and return 0, or return the seconds until one is available."""
+        with self._locked() as (tokens, now):
+            if tokens >= 1:
+                _STATE.pack_into(self._map, 0, tokens - 1, now)
+                return 0.0
+            _STATE.pack_into(self._map, 0, tokens, now)
+            return (1 - tokens) * self.per / self.rate
+
+    def release(self) -> None:
+        """Return an unused token."""
+        with self._locked() as (tokens, now):
+            _STATE.pack_into(self._map, 0, min(float(self.rate), tokens + 1), now)
+
+    def close(self) -> None:
+        if not self._map.closed:
+            self._map.close()
+            os.close(self._fd)
+
+    @contextmanager
+    def _locked(self) -> Iterator[Tuple[float, float]]:
+        """Hold the file lock, yielding the refilled token count and the time."""
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            tokens, updated = _STATE.unpack_from(self._map, 0)
+            now = self.clock()
+            elapsed = max(now - updated, 0.0)
+            yield min(float(self.rate), tokens + elapsed * self.rate / self.per), now
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
@@ -1,5 +1,6 @@
-from .conditional_order import ConditionalOrder
+from .conditional_order import ConditionalOrder, ConditionalOrderFactory
 from .multiplexer import Multiplexer
+from .poll_scheduler import PollOutcome, PollScheduler
 from .types import (
     ProofLocation,
     ContextFactory,
@@ -15,13 +16,17 @@ from .utils import (
     hash_order_cancellation,
     hash_order_cancellations,
 )
-from .order_types.twap import Twap, TwapData, DurationType, StartType
+from .order_types.twap import TWAP_ADDRESS, Twap, TwapData, DurationType, StartType
 
 Multiplexer.register_order_type("twap", Twap)
+ConditionalOrderFactory.register("twap", Twap, TWAP_ADDRESS)
 
 __all__ = [
     "ConditionalOrder",
+    "ConditionalOrderFactory",
     "Multiplexer",
+    "PollScheduler",
+    "PollOutcome",
     "ProofLocation",
     "ContextFactory",
     "ConditionalOrderParams",
@@ -1,4 +1,6 @@
+import functools
 import os
+from dataclasses import dataclass, field
 from typing import Iterable, Tuple, Type, TypeVar
 import re
 from typing import Any, Callable, Dict, List, Optional
@@ -68,6 +70,33 @@ def is_valid_hex(value: str) -> bool:
 
 D = TypeVar("D")
 S = TypeVar("S")
+R = TypeVar("R")
+
+# Attributes whose assignment invalidates the memoized encodings of an order.
+IDENTITY_ATTRIBUTES = frozenset(
+    {"handler", "salt", "data", "static_input", "has_off_chain_input", "chain"}
+)
+
+
+def memoized(method: Callable[[T], R]) -> Callable[[T], R]:
+    """
+    Cache the result of a no-argument `ConditionalOrder` method on the instance.
+
+    The cache is cleared whenever one of `IDENTITY_ATTRIBUTES` is assigned and
+    by `ConditionalOrder.invalidate`.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self: T) -> R:
+        cache = self.__dict__.setdefault("_memo", {})
+        try:
+            return cache[name]
+        except KeyError:
+            value = cache[name] = method(self)
+            return value
+
+    return wrapper
 
 
 class ConditionalOrder(abc.ABC, Generic[D, S]):
@@ -86,6 +115,12 @@ class ConditionalOrder(abc.ABC, Generic[D, S]):
         Instances of conditional orders have an `id` property that is a `keccak256` hash of
         the serialized conditional order.
 
+    Note:
+        `id`, `leaf` and `composableCow` are computed once per instance, as are
+        `serialize` and `encode_static_input` where subclasses mark them `memoized`.
+        Assigning `handler`, `salt`, `data`, `static_input` or `chain` clears them;
+        call `invalidate` after mutating `data` in place.
+
     Type Parameters:
         D: The type of the data structure used for friendly representation
         S: The type of the static input structure used by the contract
@@ -132,10 +167,28 @@ class ConditionalOrder(abc.ABC, Generic[D, S]):
         self.has_off_chain_input = has_off_chain_input
         self.chain = chain
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in IDENTITY_ATTRIBUTES:
+            self.__dict__.pop("_memo", None)
+
+    def invalidate(self) -> None:
+        """
+        Rebuild `static_input` from `data` and drop the memoized encodings.
+
+        Call this after changing `data` in place, e.g. ``order.data.sell_amount = x``.
+        """
+        self.static_input = self.transform_data_to_struct(self.data)
+
     @property
+    @memoized
     def composableCow(self) -> ComposableCow:
         return getComposableCoW(self.chain)
 
+    def _composable_cow(self, params: OwnerParams) -> ComposableCow:
+        """The contract to read for ``params``: its override, if it has one."""
+        return getattr(params, "composable_cow", None) or self.composableCow
+
     @property
     @abc.abstractmethod
     def is_single_order(self) -> bool:
@@ -210,6 +263,7 @@ class ConditionalOrder(abc.ABC, Generic[D, S]):
         )
 
     @property
+    @memoized
     def id(self) -> HexStr:
         """
         Calculate the id of the conditional order (which also happens to be the key used for `ctx`
@@ -233,6 +287,7 @@ class ConditionalOrder(abc.ABC, Generic[D, S]):
         return self.id if self.is_single_order else "0x" + "0" * 64
 
     @property
+    @memoized
     def leaf(self) -> ConditionalOrderParams:
         """
         Get the `leaf` of the conditional order. This is the data that is used to create the merkle tree.
@@ -448,7 +503,9 @@ class ConditionalOrder(abc.ABC, Generic[D, S]):
         Returns:
             bool: True if the owner authorized the order, false otherwise.
         """
-        return await self.composableCow.single_orders(params.owner, HexBytes(self.id))
+        return await self._composable_cow(params).single_orders(
+            params.owner, HexBytes(self.id)
+        )
 
     async def cabinet(self, params: OwnerParams) -> str:
         """
@@ -460,7 +517,7 @@ class ConditionalOrder(abc.ABC, Generic[D, S]):
         Returns:
             str: The cabinet value as a hex string without the '0x' prefix.
         """
-        cabinet_bytes = await self.composableCow.cabinet(
+        cabinet_bytes = await self._composable_cow(params).cabinet(
             params.owner, HexBytes(self.ctx)
         )
         return Web3.to_hex(cabinet_bytes)[2:]
@@ -513,6 +570,17 @@ class ConditionalOrder(abc.ABC, Generic[D, S]):
         """
         return Web3.to_hex(encode(order_data_types, [static_input]))
 
+    @classmethod
+    def from_params(cls, params: ConditionalOrderParams) -> "ConditionalOrder":
+        """
+        The order of ``params``, as `deserialize` of their encoding gives it.
+
+        Order types can override this to decode ``params.static_input``
+        directly, as `ConditionalOrderFactory.from_params_many` calls it for
+        every order.
+        """
+        return cls.deserialize(encode_params(params))  # type: ignore[attr-defined]
+
     def assert_is_valid(self):
         """
         Assert that the conditional order is valid.
@@ -547,7 +615,8 @@ class ConditionalOrder(abc.ABC, Generic[D, S]):
         Returns:
             Tuple[Order, HexStr]: A tuple containing the order data and its signature.
         """
-        order, salt = await self.composableCow.get_tradeable_order_with_signature(
+        composable_cow = self._composable_cow(params)
+        order, salt = await composable_cow.get_tradeable_order_with_signature(
             params.owner,
             IConditionalOrder_ConditionalOrderParams(
                 staticInput=HexBytes(self.leaf.static_input),
@@ -637,26 +706,92 @@ class ConditionalOrder(abc.ABC, Generic[D, S]):
         return callback(decoded_data, HexStr(decoded_params.salt))
 
 
+@dataclass
+class DecodedOrders:
+    """
+    The orders decoded by `ConditionalOrderFactory.from_params_many`.
+
+    ``orders`` lines up with the params given, with None for each that was
+    not decoded: ``unknown`` lists those whose handler is not registered, and
+    ``errors`` has the exception raised for each of the others.
+    """
+
+    orders: List[Optional[ConditionalOrder]]
+    errors: Dict[int, Exception] = field(default_factory=dict)
+    unknown: List[int] = field(default_factory=list)
+
+
 class ConditionalOrderFactory:
     """
     A factory class for creating conditional orders.
 
     This class maintains a registry of order types and their corresponding classes,
-    allowing for dynamic creation of conditional orders based on their type.
+    allowing for dynamic creation of conditional orders based on their type, and
+    a map of handler addresses to classes for decoding orders found on chain.
     """
 
     registry: Dict[str, Type[ConditionalOrder]] = {}
+    handlers: Dict[str, Type[ConditionalOrder]] = {}
 
     @classmethod
-    def register(cls, order_type: str, order_class: Type[ConditionalOrder]):
+    def register(
+        cls,
+        order_type: str,
+        order_class: Type[ConditionalOrder],
+        handler: Optional[str] = None,
+    ):
         """
         Register a new conditional order type.
 
         Args:
             order_type: The identifier for this type of conditional order.
             order_class: The class that implements this type of conditional order.
+            handler: The address of the handler contract for this type, if orders
+                of it are to be decoded with `from_params`.
         """
         cls.registry[order_type] = order_class
+        if handler is not None:
+            cls.handlers[handler.lower()] = order_class
+
+    @classmethod
+    def from_params(cls, params: ConditionalOrderParams) -> ConditionalOrder:
+        """
+        Decode the conditional order of ``params`` with the class registered for
+        its handler.
+
+        Raises:
+            ValueError: If no class is registered for the handler.
+        """
+        order_class = cls.handlers.get(params.handler.lower())
+        if order_class is None:
+            raise ValueError(f"Unknown handler: {params.handler}")
+        return order_class.from_params(params)
+
+    @classmethod
+    def from_params_many(
+        cls, params_list: Iterable[ConditionalOrderParams]
+    ) -> DecodedOrders:
+        """
+        Decode the conditional orders of many ``params``, e.g. from logs.
+
+        Unlike `from_params`, a failure does not stop the others: params with
+        an unregistered handler are skipped and decoding errors are collected
+        by position in the result.
+        """
+        handlers = cls.handlers
+        result = DecodedOrders(orders=[])
+        for i, params in enumerate(params_list):
+            order_class = handlers.get(params.handler.lower())
+            order = None
+            if order_class is None:
+                result.unknown.append(i)
+            else:
+                try:
+                    order = order_class.from_params(params)
+                except Exception as e:
+                    result.errors[i] = e
+            result.orders.append(order)
+        return result
 
     @classmethod
     def create(cls, order_type: str, params: Dict[str, Any]) -> ConditionalOrder:
@@ -0,0 +1,293 @@
+import asyncio
+import json
+import os
+import re
+from dataclasses import dataclass
+from logging import getLogger
+from typing import AsyncIterator, List, Optional, Sequence, Tuple, Union, cast
+
+from hexbytes import HexBytes
+from web3 import AsyncWeb3, Web3
+from web3.types import FilterParams, LogReceipt
+
+from cowdao_cowpy.common.chains import Chain
+from cowdao_cowpy.common.constants import COMPOSABLE_COW_CONTRACT_CHAIN_ADDRESS_MAP
+
+from .conditional_order import ConditionalOrder, ConditionalOrderFactory
+from .types import ConditionalOrderParams
+from .utils import abi_decoder
+
+logger = getLogger(__name__)
+
+CONDITIONAL_ORDER_CREATED_TOPIC = Web3.keccak(
+    text="ConditionalOrderCreated(address,(address,bytes32,bytes))"
+)
+MERKLE_ROOT_SET_TOPIC = Web3.keccak(
+    text="MerkleRootSet(address,bytes32,(uint256,bytes))"
+)
+
+# What providers answer when an eth_getLogs range holds too many logs.
+RANGE_ERROR_PATTERN = re.compile(
+    r"more than \d+ results"
+    r"|too many (results|logs)"
+    r"|response size (exceeded|should not)"
+    r"|log response size"
+    r"|limit exceeded"
+    r"|block range (is )?too (large|wide)"
+    r"|exceed(s|ed)? (the )?max(imum)? block range",
+    re.IGNORECASE,
+)
+
+
+_TOPICS = [
+    Web3.to_hex(CONDITIONAL_ORDER_CREATED_TOPIC),
+    Web3.to_hex(MERKLE_ROOT_SET_TOPIC),
+]
+
+
+def is_range_error(error: Exception) -> bool:
+    """Whether ``error`` asks for a smaller ``eth_getLogs`` block range."""
+    return RANGE_ERROR_PATTERN.search(str(error)) is not None
+
+
+@dataclass(frozen=True)
+class ConditionalOrderCreatedEvent:
+    """
+    A ``ConditionalOrderCreated`` log.
+
+    ``order`` is the order decoded by the class registered with
+    `ConditionalOrderFactory` for its handler, or None with the reason in
+    ``error``.
+    """
+
+    owner: str
+    params: ConditionalOrderParams
+    order: Optional[ConditionalOrder]
+    error: Optional[str]
+    block_number: int
+    transaction_hash: str
+    log_index: int
+
+
+@dataclass(frozen=True)
+class MerkleRootSetEvent:
+    """A ``MerkleRootSet`` log; ``location`` and ``data`` are its `ProofStruct`."""
+
+    owner: str
+    root: str
+    location: int
+    data: str
+    block_number: int
+    transaction_hash: str
+    log_index: int
+
+
+IndexedEvent = Union[ConditionalOrderCreatedEvent, MerkleRootSetEvent]
+
+# Block number, transaction hash and log index.
+_LogMeta = Tuple[int, str, int]
+
+_decode_created = abi_decoder(("(address,bytes32,bytes)",))
+_decode_root_set = abi_decoder(("bytes32", "(uint256,bytes)"))
+
+
+@dataclass
+class IndexerStats:
+    requests: int = 0
+    logs: int = 0
+    splits: int = 0
+
+
+class FileCheckpoint:
+    """The next block an indexer scans, kept in a JSON file."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self, address: str) -> Optional[int]:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        if data["address"].lower() != address.lower():
+            raise ValueError(
+                f"Checkpoint {self.path} is for {data['address']}, not {address}"
+            )
+        return data["next_block"]
+
+    def save(self, address: str, next_block: int) -> None:
+        # Write to a temporary file first so a crash never leaves a torn checkpoint.
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"address": address, "next_block": next_block}, f)
+        os.replace(tmp, self.path)
+
+
+class ComposableCowIndexer:
+    """
+    Scans ComposableCoW for ``ConditionalOrderCreated`` and ``MerkleRootSet`` logs.
+
+    Each batch requests ``concurrency`` consecutive ranges of ``range_size``
+    blocks at once. A range the provider refuses as holding too many logs is
+    split in two and retried, and ``range_size`` shrinks to match; after a
+    batch without splits it doubles again, up to ``max_range_size``. Events
+    come out in chain order, and the checkpoint, if any, moves past a batch
+    once it has been consumed, so a restarted indexer resumes where it left
+    off without skipping events.
+
+    Args:
+        provider: The provider logs are read through.
+        chain: The chain whose ComposableCoW deployment is scanned.
+        address: A ComposableCoW deployment other than the chain's.
+        start_block: The first block to scan when there is no checkpoint.
+        checkpoint: Where progress is kept between runs.
+        range_size: Blocks per ``eth_getLogs`` to start with.
+        max_range_size: The most blocks ``range_size`` grows to.
+        concurrency: ``eth_getLogs`` requests in flight per batch.
+        confirmations: Blocks behind the head to stop at when scanning to it.
+    """
+
+    def __init__(
+        self,
+        provider: AsyncWeb3,
+        chain: Chain = Chain.MAINNET,
+        address: Optional[str] = None,
+        start_block: int = 0,
+        checkpoint: Optional[FileCheckpoint] = None,
+        range_size: int = 2_000,
+        max_range_size: int = 100_000,
+        concurrency: int = 4,
+        confirmations: int = 0,
+    ):
+        if range_size < 1 or max_range_size < range_size:
+            raise ValueError("range_size must be between 1 and max_range_size")
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.provider = provider
+        self.address = Web3.to_checksum_address(
+            address or COMPOSABLE_COW_CONTRACT_CHAIN_ADDRESS_MAP[chain.chain_id].value
+        )
+        self.checkpoint = checkpoint
+        self.range_size = range_size
+        self.max_range_size = max_range_size
+        self.concurrency = concurrency
+        self.confirmations = confirmations
+        self.stats = IndexerStats()
+        saved = checkpoint.load(self.address) if checkpoint else None
+        self.next_block = start_block if saved is None else saved
+
+    async def scan(self, to_block: Optional[int] = None) -> List[IndexedEvent]:
+        """Every event from `next_block` to ``to_block``, or to the head."""
+        events: List[IndexedEvent] = []
+        async for batch in self.batches(to_block):
+            events.extend(batch)
+        return events
+
+    async def batches(
+        self, to_block: Optional[int] = None
+    ) -> AsyncIterator[List[IndexedEvent]]:
+        """
+        The events from `next_block` to ``to_block`` (or the head), a batch of
+        ranges at a time.
+        """
+        if to_block is None:
+            to_block = await self.provider.eth.block_number - self.confirmations
+        while self.next_block <= to_block:
+            ranges = self._next_ranges(to_block)
+            splits = self.stats.splits
+            results = await asyncio.gather(
+                *(self._get_logs(start, end) for start, end in ranges)
+            )
+            if self.stats.splits == splits:
+                self.range_size = min(self.max_range_size, self.range_size * 2)
+            events = self.decode([log for logs in results for log in logs])
+            yield events
+            self.next_block = ranges[-1][1] + 1
+            if self.checkpoint is not None:
+                self.checkpoint.save(self.address, self.next_block)
+
+    def decode(self, logs: Sequence[LogReceipt]) -> List[IndexedEvent]:
+        """The events of ``logs``, skipping logs of other events."""
+        events: List[Optional[IndexedEvent]] = []
+        created: List[Tuple[int, str, ConditionalOrderParams, _LogMeta]] = []
+        for log in logs:
+            topics = log["topics"]
+            if len(topics) < 2:
+                continue
+            owner = Web3.to_checksum_address(HexBytes(topics[1])[-20:])
+            meta = (
+                log["blockNumber"],
+                Web3.to_hex(log["transactionHash"]),
+                log["logIndex"],
+            )
+            if topics[0] == CONDITIONAL_ORDER_CREATED_TOPIC:
+                [(handler, salt, static_input)] = _decode_created(log["data"])
+                params = ConditionalOrderParams(
+                    handler=handler,
+                    salt=Web3.to_hex(salt),
+                    static_input=Web3.to_hex(static_input),
+                )
+                # Filled in below, once the orders of the batch are decoded.
+                created.append((len(events), owner, params, meta))
+                events.append(None)
+            elif topics[0] == MERKLE_ROOT_SET_TOPIC:
+                root, (proof_location, data) = _decode_root_set(log["data"])
+                events.append(
+                    MerkleRootSetEvent(
+                        owner,
+                        Web3.to_hex(root),
+                        proof_location,
+                        Web3.to_hex(data),
+                        *meta,
+                    )
+                )
+
+        decoded = ConditionalOrderFactory.from_params_many(
+            params for _, _, params, _ in created
+        )
+        for j, (i, owner, params, meta) in enumerate(created):
+            order = decoded.orders[j]
+            error = None
+            if j in decoded.errors:
+                error = str(decoded.errors[j])
+                logger.debug("Could not decode order of %s: %s", params.handler, error)
+            elif order is None:
+                error = f"Unknown handler: {params.handler}"
+            events[i] = ConditionalOrderCreatedEvent(owner, params, order, error, *meta)
+        return cast(List[IndexedEvent], events)
+
+    def _next_ranges(self, to_block: int) -> List[Tuple[int, int]]:
+        ranges = []
+        start = self.next_block
+        while start <= to_block and len(ranges) < self.concurrency:
+            end = min(start + self.range_size - 1, to_block)
+            ranges.append((start, end))
+            start = end + 1
+        return ranges
+
+    async def _get_logs(self, from_block: int, to_block: int) -> List[LogReceipt]:
+        self.stats.requests += 1
+        try:
+            logs = await self.provider.eth.get_logs(
+                FilterParams(
+                    address=self.address,
+                    fromBlock=from_block,
+                    toBlock=to_block,
+                    topics=[_TOPICS],
+                )
+            )
+        except Exception as e:
+            if from_block == to_block or not is_range_error(e):
+                raise
+            self.stats.splits += 1
+            middle = (from_block + to_block) // 2
+            self.range_size = max(1, min(self.range_size, middle - from_block + 1))
+            logger.debug(
+                "Splitting blocks %d-%d at %d: %r", from_block, to_block, middle, e
+            )
+            return await self._get_logs(from_block, middle) + await self._get_logs(
+                middle + 1, to_block
+            )
+        self.stats.logs += len(logs)
+        return list(logs)
@@ -0,0 +1,292 @@
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
+
+from hexbytes import HexBytes
+from web3 import Web3
+
+
+def hash_pair(a: bytes, b: bytes) -> HexBytes:
+    """The parent of two nodes, hashed in sorted order as OpenZeppelin's `MerkleProof` does."""
+    return HexBytes(Web3.keccak(a + b if a <= b else b + a))
+
+
+def hash_leaf(serialized_params: bytes) -> HexBytes:
+    """
+    The leaf of a conditional order, as ComposableCoW computes it.
+
+    That is ``keccak256(bytes.concat(keccak256(abi.encode(params))))``; the inner
+    hash is the order's `id`.
+    """
+    return HexBytes(Web3.keccak(Web3.keccak(serialized_params)))
+
+
+@dataclass
+class MerkleProof:
+    """The sibling hashes proving that ``leaf`` is in a tree."""
+
+    leaf: HexBytes
+    path: List[HexBytes] = field(default_factory=list)
+    index: Optional[int] = None
+
+    def compute_root(self) -> HexBytes:
+        node = HexBytes(self.leaf)
+        for sibling in self.path:
+            node = hash_pair(node, sibling)
+        return node
+
+    def verify(self, root: bytes) -> bool:
+        return self.compute_root() == HexBytes(root)
+
+
+@dataclass
+class MultiProof:
+    """
+    One proof for several leaves of a tree, shaped for OpenZeppelin's
+    `MerkleProof.multiProofVerify`.
+
+    ``proof`` holds each sibling hash needed once, however many of the
+    ``leaves`` share it, and ``proof_flags`` tells, for each hash computed on
+    the way to the root, whether its second input is the next leaf or
+    computed hash (True) or the next ``proof`` hash (False).
+    """
+
+    leaves: List[HexBytes]
+    proof: List[HexBytes]
+    proof_flags: List[bool]
+    indices: List[int] = field(default_factory=list)
+
+    def _process(self) -> Tuple[HexBytes, List[List[HexBytes]]]:
+        """The root, and the path of each leaf recovered along the way."""
+        if len(self.leaves) + len(self.proof) != len(self.proof_flags) + 1:
+            raise ValueError("Invalid multiproof")
+        paths: List[List[HexBytes]] = [[] for _ in self.leaves]
+        queue = deque((leaf, [i]) for i, leaf in enumerate(self.leaves))
+        proof = iter(self.proof)
+        node: Tuple[HexBytes, List[int]] = (HexBytes(b""), [])
+        for flag in self.proof_flags:
+            a, under_a = queue.popleft()
+            b, under_b = queue.popleft() if flag else (next(proof), [])
+            for i in under_a:
+                paths[i].append(b)
+            for i in under_b:
+                paths[i].append(a)
+            node = (hash_pair(a, b), under_a + under_b)
+            queue.append(node)
+        if self.proof_flags:
+            return node[0], paths
+        return (self.leaves[0] if self.leaves else self.proof[0]), paths
+
+    def compute_root(self) -> HexBytes:
+        return self._process()[0]
+
+    def verify(self, root: bytes) -> bool:
+        try:
+            return self.compute_root() == HexBytes(root)
+        except (ValueError, IndexError, StopIteration):
+            return False
+
+    def expand(self) -> List[MerkleProof]:
+        """The single-leaf proof of each of ``leaves``, e.g. for `getTradeableOrderWithSignature`."""
+        _, paths = self._process()
+        indices = self.indices or [None] * len(self.leaves)
+        return [
+            MerkleProof(leaf=leaf, path=path, index=index)
+            for leaf, path, index in zip(self.leaves, paths, indices)
+        ]
+
+
+class MerkleTree:
+    """
+    A Merkle tree over an ordered list of leaves, kept up to date on every edit.
+
+    Nodes are stored as a complete binary tree in an array: node ``i`` has
+    children ``2i + 1`` and ``2i + 2`` and the ``n`` leaves take the last
+    ``n`` slots. Appending a leaf splits the first leaf slot in two, and
+    removing the last leaf joins them again, so edits rehash only one path to
+    the root (O(log n)) and a proof is read from stored hashes without hashing
+    anything.
+
+    Pairs are hashed in sorted order, which makes roots, proofs and
+    multiproofs verifiable with OpenZeppelin's `MerkleProof`, as
+    ComposableCoW does. A leaf's slot depends only on its index and the
+    number of leaves, so the same list of leaves always gives the same root.
+
+    Roots are not compatible with OpenZeppelin's `StandardMerkleTree` or
+    cow-sdk: those place leaf ``i`` at slot ``2n - 2 - i``, so the same leaves
+    give a different root there. Proofs from either still verify on-chain
+    against their own root.
+    """
+
+    def __init__(self, leaves: Iterable[bytes] = ()):
+        leaves = [HexBytes(leaf) for leaf in leaves]
+        n = len(leaves)
+        # Place the leaves as n appends would, then hash each internal node once.
+        self._slots: List[int] = []
+        self._indices: List[int] = []
+        for i in range(n):
+            self._place(i)
+        self.nodes: List[HexBytes] = [HexBytes(b"")] * len(self._indices)
+        for i, slot in enumerate(self._slots):
+            self.nodes[slot] = leaves[i]
+        for slot in range(n - 2, -1, -1):
+            self.nodes[slot] = hash_pair(
+                self.nodes[2 * slot + 1], self.nodes[2 * slot + 2]
+            )
+
+    @classmethod
+    def from_nodes(
+        cls, nodes: List[HexBytes], slots: Optional[List[int]] = None
+    ) -> "MerkleTree":
+        """
+        A tree from the `nodes` (and `slots`) of another, without hashing anything.
+
+        The nodes are trusted; check them with `verify` if they may be corrupt.
+        """
+        tree = cls()
+        n = (len(nodes) + 1) // 2
+        if slots is None:
+            for i in range(n):
+                tree._place(i)
+        else:
+            if len(slots) != n:
+                raise ValueError(f"Expected {n} slots, got {len(slots)}")
+            tree._slots = list(slots)
+            tree._indices = [-1] * len(nodes)
+            for i, slot in enumerate(slots):
+                tree._indices[slot] = i
+        tree.nodes = list(nodes)
+        return tree
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @property
+    def slots(self) -> List[int]:
+        """The slot in `nodes` of each leaf."""
+        return self._slots
+
+    def verify(self) -> bool:
+        """Whether every internal node is the hash of its children."""
+        return all(
+            self.nodes[slot]
+            == hash_pair(self.nodes[2 * slot + 1], self.nodes[2 * slot + 2])
+            for slot in range(len(self) - 1)
+        )
+
+    @property
+    def root(self) -> Optional[HexBytes]:
+        return self.nodes[0] if self.nodes else None
+
+    def leaf(self, index: int) -> HexBytes:
+        return self.nodes[self._slots[index]]
+
+    def append(self, leaf: bytes) -> int:
+        index = len(self)
+        self._place(index)
+        self.nodes.extend([HexBytes(b""), HexBytes(leaf)])
+        if index == 0:
+            self.nodes = [HexBytes(leaf)]
+            return index
+        split = index - 1
+        self.nodes[2 * split + 1] = self.nodes[split]
+        self._rehash(2 * split + 2)
+        return index
+
+    def update(self, index: int, leaf: bytes) -> None:
+        if not 0 <= index < len(self):
+            raise IndexError(f"leaf index {index} out of range")
+        slot = self._slots[index]
+        self.nodes[slot] = HexBytes(leaf)
+        self._rehash(slot)
+
+    def pop(self) -> HexBytes:
+        """Remove and return the last leaf."""
+        index = len(self) - 1
+        leaf = self.nodes[self._slots.pop()]
+        if index == 0:
+            self.nodes, self._indices = [], []
+            return leaf
+        # The last two slots are siblings; the first moves back to their parent.
+        parent, moved = index - 1, self._indices[-2]
+        self.nodes[parent] = self.nodes[-2]
+        self._indices[parent] = moved
+        self._slots[moved] = parent
+        del self.nodes[-2:], self._indices[-2:]
+        self._rehash(parent)
+        return leaf
+
+    def remove(self, index: int) -> None:
+        """Remove a leaf by moving the last leaf into its place."""
+        last = self.pop()
+        if index < len(self):
+            self.update(index, last)
+
+    def proof(self, index: int) -> MerkleProof:
+        if not 0 <= index < len(self):
+            raise IndexError(f"leaf index {index} out of range")
+        path = []
+        slot = self._slots[index]
+        while slot > 0:
+            path.append(self.nodes[slot - 1 if slot % 2 == 0 else slot + 1])
+            slot = (slot - 1) // 2
+        return MerkleProof(leaf=self.leaf(index), path=path, index=index)
+
+    def multiproof(self, indices: Iterable[int]) -> MultiProof:
+        """
+        A proof for the leaves at ``indices``.
+
+        The leaves come back in the order the verifier consumes them, which is
+        reflected in `MultiProof.indices`.
+        """
+        indices = list(indices)
+        if len(set(indices)) != len(indices):
+            raise ValueError("Cannot prove duplicated leaves")
+        for index in indices:
+            if not 0 <= index < len(self):
+                raise IndexError(f"leaf index {index} out of range")
+        if not self.nodes:
+            raise ValueError("Cannot prove leaves of an empty tree")
+
+        # OpenZeppelin's getMultiProof: walk up from the deepest slots, taking
+        # a sibling from the queue when it is known and from the tree otherwise.
+        slots = sorted((self._slots[index] for index in indices), reverse=True)
+        queue = deque(slots)
+        proof, flags = [], []
+        while queue and queue[0] > 0:
+            slot = queue.popleft()
+            sibling = slot - 1 if slot % 2 == 0 else slot + 1
+            if queue and queue[0] == sibling:
+                flags.append(True)
+                queue.popleft()
+            else:
+                flags.append(False)
+                proof.append(self.nodes[sibling])
+            queue.append((slot - 1) // 2)
+        if not indices:
+            proof.append(self.nodes[0])
+        return MultiProof(
+            leaves=[self.nodes[slot] for slot in slots],
+            proof=proof,
+            proof_flags=flags,
+            indices=[self._indices[slot] for slot in slots],
+        )
+
+    def _place(self, index: int) -> None:
+        """Give leaf ``index`` a slot, splitting the first leaf slot if needed."""
+        if index == 0:
+            self._slots, self._indices = [0], [0]
+            return
+        split = index - 1
+        moved = self._indices[split]
+        self._indices[split] = -1
+        self._indices.extend([moved, index])
+        self._slots[moved] = 2 * split + 1
+        self._slots.append(2 * split + 2)
+
+    def _rehash(self, slot: int) -> None:
+        while slot > 0:
+            slot = (slot - 1) // 2
+            self.nodes[slot] = hash_pair(
+                self.nodes[2 * slot + 1], self.nodes[2 * slot + 2]
+            )
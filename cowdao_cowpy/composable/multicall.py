@@ -0,0 +1,148 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from eth_abi.abi import decode, encode
+from eth_abi.grammar import ABIType, TupleType, parse
+from eth_typing import BlockIdentifier
+from eth_utils.abi import (
+    function_abi_to_4byte_selector,
+    get_abi_input_types,
+    get_abi_output_types,
+)
+from hexbytes import HexBytes
+from web3 import Web3
+
+from cowdao_cowpy.codegen.__generated__.ComposableCow import (
+    GPv2Order_Data,
+    IConditionalOrder_ConditionalOrderParams,
+)
+from cowdao_cowpy.codegen.components import FileAbiLoader, get_abi_file
+from cowdao_cowpy.common.chains import Chain
+from cowdao_cowpy.common.constants import COMPOSABLE_COW_CONTRACT_CHAIN_ADDRESS_MAP
+from cowdao_cowpy.web3.multicall import MulticallBatcher
+
+
+@lru_cache(maxsize=None)
+def _functions() -> Dict[str, Tuple[bytes, List[str], List[str]]]:
+    """Selector, input and output types of each ComposableCoW function."""
+    abi = FileAbiLoader(get_abi_file("ComposableCow")).load_abi()
+    return {
+        entry["name"]: (
+            function_abi_to_4byte_selector(entry),
+            list(get_abi_input_types(entry)),
+            list(get_abi_output_types(entry)),
+        )
+        for entry in abi
+        if entry.get("type") == "function"
+    }
+
+
+def _checksum(abi_type: ABIType, value: Any) -> Any:
+    """Checksum decoded addresses, as web3 does for direct calls."""
+    if abi_type.is_array:
+        return [_checksum(abi_type.item_type, item) for item in value]
+    if isinstance(abi_type, TupleType):
+        return tuple(
+            _checksum(component, item)
+            for component, item in zip(abi_type.components, value)
+        )
+    if abi_type.base == "address":  # type: ignore[attr-defined]
+        return Web3.to_checksum_address(value)
+    return value
+
+
+class BatchedComposableCow:
+    """
+    The ComposableCoW views used by `ConditionalOrder.poll`, read through a
+    `MulticallBatcher`.
+
+    Methods have the signatures and return types of the generated
+    `ComposableCow` contract, so the two are interchangeable in
+    `PollParams.composable_cow`. Reads of concurrent polls that share a
+    batcher are sent together as one ``aggregate3`` per block; reverts raise
+    `ContractLogicError` for their caller only.
+
+    Args:
+        batcher: The batcher reads are queued on.
+        chain: The chain whose ComposableCoW deployment is read.
+        block_identifier: The block reads are made at.
+        address: Overrides the chain's ComposableCoW address.
+    """
+
+    def __init__(
+        self,
+        batcher: MulticallBatcher,
+        chain: Chain = Chain.MAINNET,
+        block_identifier: BlockIdentifier = "latest",
+        address: Optional[str] = None,
+    ):
+        self.batcher = batcher
+        self.chain = chain
+        self.block_identifier = block_identifier
+        self.address = (
+            address or COMPOSABLE_COW_CONTRACT_CHAIN_ADDRESS_MAP[chain.chain_id].value
+        )
+
+    async def call(self, function: str, *args: Any) -> Any:
+        """Call a view function by ABI name, e.g. ``"singleOrders"``."""
+        selector, inputs, outputs = _functions()[function]
+        return_data = await self.batcher.call(
+            self.address, selector + encode(inputs, args), self.block_identifier
+        )
+        values = decode(outputs, return_data)
+        values = tuple(
+            _checksum(parse(output), value) for output, value in zip(outputs, values)
+        )
+        return values[0] if len(values) == 1 else values
+
+    async def single_orders(self, str_arg_0: str, hexbytes_arg_0: HexBytes) -> bool:
+        return await self.call("singleOrders", str_arg_0, hexbytes_arg_0)
+
+    async def cabinet(self, str_arg_0: str, hexbytes_arg_0: HexBytes) -> HexBytes:
+        return HexBytes(await self.call("cabinet", str_arg_0, hexbytes_arg_0))
+
+    async def get_tradeable_order_with_signature(
+        self,
+        owner: str,
+        params: IConditionalOrder_ConditionalOrderParams,
+        offchain_input: HexBytes,
+        proof: Sequence[HexBytes],
+    ) -> Tuple[GPv2Order_Data, HexBytes]:
+        order, signature = await self.call(
+            "getTradeableOrderWithSignature",
+            owner,
+            (params.handler, params.salt, params.staticInput),
+            offchain_input,
+            list(proof),
+        )
+        (
+            sell_token,
+            buy_token,
+            receiver,
+            sell_amount,
+            buy_amount,
+            valid_to,
+            app_data,
+            fee_amount,
+            kind,
+            partially_fillable,
+            sell_token_balance,
+            buy_token_balance,
+        ) = order
+        return (
+            GPv2Order_Data(
+                sellToken=sell_token,
+                buyToken=buy_token,
+                receiver=receiver,
+                sellAmount=sell_amount,
+                buyAmount=buy_amount,
+                validTo=valid_to,
+                appData=HexBytes(app_data),
+                feeAmount=fee_amount,
+                kind=HexBytes(kind),
+                partiallyFillable=partially_fillable,
+                sellTokenBalance=HexBytes(sell_token_balance),
+                buyTokenBalance=HexBytes(buy_token_balance),
+            ),
+            HexBytes(signature),
+        )
@@ -1,12 +1,20 @@
-from dataclasses import asdict
+from dataclasses import asdict, replace
 import json
 
-from typing import Awaitable, Callable, Dict, Optional, List, Tuple
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Optional,
+    List,
+    Set,
+    Tuple,
+    Union,
+)
 from eth_typing import HexStr
 from hexbytes import HexBytes
 from web3 import Web3
-from pymerkle import InmemoryTree as MerkleTree
-
 
 from cowdao_cowpy.common.chains import Chain
 from cowdao_cowpy.composable.utils import (
@@ -19,10 +27,51 @@ from cowdao_cowpy.codegen.__generated__.ComposableCow import (
 )
 
 from .conditional_order import ConditionalOrder
-from .types import ProofLocation, ProofWithParams, ConditionalOrderParams
+from .merkle import MerkleProof, MerkleTree, MultiProof, hash_leaf
+from .snapshot import MultiplexerSnapshot, encode_snapshot
+from .types import (
+    ConditionalOrderParams,
+    MultiProofWithParams,
+    ProofLocation,
+    ProofWithParams,
+)
+from .utils import encode_params
+
+# Version 1 exports (no "version" key) carry a root from the pymerkle tree
+# used before roots followed ComposableCoW.
+JSON_VERSION = 2
+
+
+def order_leaf(order: ConditionalOrder) -> HexBytes:
+    """The Merkle leaf of ``order``: the hash of its `id`, as ComposableCoW computes it."""
+    return HexBytes(Web3.keccak(HexBytes(order.id)))
+
+
+def order_tokens(order: ConditionalOrder) -> Set[str]:
+    """The (lowercased) addresses of the tokens ``order`` sells or buys, if its data names them."""
+    tokens = set()
+    for name in ("sell_token", "buy_token"):
+        token = getattr(order.data, name, None)
+        if isinstance(token, str):
+            tokens.add(token.lower())
+    return tokens
 
 
 class Multiplexer:
+    """
+    A set of conditional orders authorised together by one ComposableCoW root.
+
+    Orders are the leaves of a `MerkleTree` in the order they were added.
+    `add`, `remove` and `update` edit the tree in place, rehashing only the
+    path of the changed leaf; removing an order moves the last one into its
+    place. `root` and proofs are those ComposableCoW verifies. Roots are not
+    compatible with cow-sdk or OpenZeppelin's `StandardMerkleTree`, which lay
+    the same orders out differently; see `MerkleTree`.
+
+    Orders are also indexed by handler, order type and token, so `query` can
+    filter and page through large books without scanning every order.
+    """
+
     order_type_registry: Dict[str, type] = {}
 
     def __init__(
@@ -35,6 +84,11 @@ class Multiplexer:
         self.orders: Dict[str, ConditionalOrder] = orders or {}
         self.tree: Optional[MerkleTree] = None
         self.ctx: Optional[str] = None
+        self._ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._by_handler: Dict[str, Set[str]] = {}
+        self._by_type: Dict[str, Set[str]] = {}
+        self._by_token: Dict[str, Set[str]] = {}
 
         if orders is not None and len(orders) == 0:
             raise ValueError("orders must have non-zero length")
@@ -46,67 +100,136 @@ class Multiplexer:
             if order.order_type not in self.order_type_registry:
                 raise ValueError(f"Unknown order type: {order.order_type}")
 
+        self.reset()
         if orders:
-            self.tree = self.get_or_generate_tree()
             if self.root != root:
                 raise ValueError("root mismatch")
 
     def add(self, order: ConditionalOrder):
         order.assert_is_valid()
+        if order.id in self._index:
+            self._unindex_order(self.orders[order.id])
+            self.orders[order.id] = order
+            self._index_order(order)
+            return
         self.orders[order.id] = order
-        self.reset()
+        self._index_order(order)
+        self._index[order.id] = len(self._ids)
+        self._ids.append(order.id)
+        if self.tree is not None:
+            self.tree.append(order_leaf(order))
 
     def remove(self, id: str):
-        del self.orders[id]
-        self.reset()
+        self._unindex_order(self.orders.pop(id))
+        index = self._index.pop(id)
+        last = self._ids.pop()
+        if last != id:
+            self._ids[index] = last
+            self._index[last] = index
+        if self.tree is not None:
+            self.tree.remove(index)
 
     def update(self, id: str, updater: Callable):
         order = updater(self.orders[id], self.ctx)
-        del self.orders[id]
+        if order.id != id and order.id in self._index:
+            # The updated order is already in the tree; drop the old one.
+            self.remove(id)
+            self._unindex_order(self.orders[order.id])
+            self.orders[order.id] = order
+            self._index_order(order)
+            return
+        index = self._index.pop(id)
+        self._unindex_order(self.orders.pop(id))
         self.orders[order.id] = order
-        self.reset()
+        self._index_order(order)
+        self._ids[index] = order.id
+        self._index[order.id] = index
+        if self.tree is not None:
+            self.tree.update(index, order_leaf(order))
 
     def get_by_id(self, id: str) -> ConditionalOrder:
         return self.orders[id]
 
     def get_by_index(self, i: int) -> ConditionalOrder:
-        return self.orders[list(self.orders.keys())[i]]
+        return self.orders[self._ids[i]]
+
+    def index_of(self, id: str) -> int:
+        """The leaf index of order ``id``."""
+        return self._index[id]
+
+    def query(
+        self,
+        handler: Optional[str] = None,
+        order_type: Optional[str] = None,
+        token: Optional[str] = None,
+        start: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[ConditionalOrder]:
+        """
+        The orders matching every given filter, in tree order, from the
+        ``start``-th match on and at most ``limit`` of them.
+
+        ``token`` matches orders selling or buying it. Without filters this
+        reads only the requested page; with filters it costs as much as the
+        smallest set of matches.
+        """
+        stop = None if limit is None else start + limit
+        matches = []
+        if handler is not None:
+            matches.append(self._by_handler.get(handler.lower(), set()))
+        if order_type is not None:
+            matches.append(self._by_type.get(order_type, set()))
+        if token is not None:
+            matches.append(self._by_token.get(token.lower(), set()))
+        if not matches:
+            ids: Iterable[str] = self._ids[start:stop]
+        else:
+            matches.sort(key=len)
+            found = matches[0].intersection(*matches[1:])
+            ids = sorted(found, key=self._index.__getitem__)[start:stop]
+        return [self.orders[id] for id in ids]
 
     @property
     def order_ids(self) -> List[str]:
-        return list(self.orders.keys())
+        return list(self._ids)
 
     def get_or_generate_tree(self) -> MerkleTree:
         if self.tree is None:
-            self.tree = MerkleTree(hash_type="keccak_256")
-            for order in self.orders.values():
-                print(order.serialize().encode())
-                self.tree.append_entry(order.serialize().encode())
+            self.tree = MerkleTree(order_leaf(self.orders[id]) for id in self._ids)
         return self.tree
 
     @property
     def root(self) -> str:
-        tree = self.get_or_generate_tree()
-        root = tree.root
+        root = self.get_or_generate_tree().root
         if root is None:
             raise ValueError("Merkle tree root is None")
-        return Web3.to_hex(root.digest)
+        return Web3.to_hex(root)
 
     def get_proofs(self, filter: Optional[Callable] = None) -> List[ProofWithParams]:
         tree = self.get_or_generate_tree()
         proofs = []
-        for i, order in enumerate(self.orders.values()):
+        for i, id in enumerate(self._ids):
+            order = self.orders[id]
             if filter is None or filter(order):
-                params = ConditionalOrderParams(
-                    handler=order.handler,
-                    salt=order.salt,
-                    static_input=order.encode_static_input(),
-                )
-                proofs.append(
-                    ProofWithParams(proof=tree.prove_inclusion(i + 1), params=params)
-                )
+                params = replace(order.leaf)
+                proofs.append(ProofWithParams(proof=tree.proof(i), params=params))
         return proofs
 
+    def get_multiproof(self, filter: Optional[Callable] = None) -> MultiProofWithParams:
+        """
+        One proof for all orders passing ``filter``, sharing the sibling hashes
+        that separate proofs from `get_proofs` would repeat.
+        """
+        tree = self.get_or_generate_tree()
+        indices = [
+            i
+            for i, id in enumerate(self._ids)
+            if filter is None or filter(self.orders[id])
+        ]
+        proof = tree.multiproof(indices)
+        params = [replace(self.orders[self._ids[i]].leaf) for i in proof.indices]
+        return MultiProofWithParams(proof=proof, params=params)
+
     def encode_to_abi(self, filter: Optional[Callable] = None) -> str:
         proofs = self.get_proofs(filter)
         return Web3.to_hex(Web3.keccak(text=str(proofs)))
@@ -119,6 +242,44 @@ class Multiplexer:
         ]
         return json.dumps(list_to_dump)
 
+    def encode_to_compact_json(self, filter: Optional[Callable] = None) -> str:
+        """
+        Like `encode_to_json`, but with one multiproof for all orders instead of a
+        path per order. `decode_proofs` reads both.
+        """
+        multiproof = self.get_multiproof(filter)
+        return json.dumps(
+            {
+                "proof": [Web3.to_hex(p) for p in multiproof.proof.proof],
+                "proof_flags": multiproof.proof.proof_flags,
+                "orders": [asdict(params) for params in multiproof.params],
+            }
+        )
+
+    @staticmethod
+    def decode_proofs(s: str) -> List[ProofWithParams]:
+        """The proof of each order in `encode_to_json` or `encode_to_compact_json` output."""
+        data = json.loads(s)
+        if isinstance(data, list):
+            proofs = []
+            for item in data:
+                path = [HexBytes(p) for p in item.pop("path")]
+                params = ConditionalOrderParams(**item)
+                leaf = hash_leaf(HexBytes(encode_params(params)))
+                proofs.append(ProofWithParams(MerkleProof(leaf, path), params))
+            return proofs
+
+        all_params = [ConditionalOrderParams(**item) for item in data["orders"]]
+        multiproof = MultiProof(
+            leaves=[hash_leaf(HexBytes(encode_params(p))) for p in all_params],
+            proof=[HexBytes(p) for p in data["proof"]],
+            proof_flags=data["proof_flags"],
+        )
+        return [
+            ProofWithParams(proof=proof, params=params)
+            for proof, params in zip(multiproof.expand(), all_params)
+        ]
+
     @classmethod
     def from_json(cls, s: str) -> "Multiplexer":
         data = json.loads(s)
@@ -129,10 +290,22 @@ class Multiplexer:
                 raise ValueError(f"Unknown order type: {order_type}")
             order_class = cls.order_type_registry[order_type]
             orders[order_id] = order_class.from_data_dict(order_data)
-        return cls(orders, data["root"], ProofLocation(data["location"]))
+        location = ProofLocation(data["location"])
+        if data.get("version", 1) < JSON_VERSION:
+            # The old root can't be recomputed, so check every order against
+            # its stored id instead and rebuild the tree.
+            for order_id, order in orders.items():
+                if order.id != order_id:
+                    raise ValueError(f"order id mismatch: {order_id}")
+            multiplexer = cls(location=location)
+            multiplexer.orders = orders
+            multiplexer.reset()
+            return multiplexer
+        return cls(orders, data["root"], location)
 
     def to_json(self) -> str:
         data = {
+            "version": JSON_VERSION,
             "root": str(self.root),
             "location": self.location.value,
             "orders": {
@@ -141,18 +314,66 @@ class Multiplexer:
                     "salt": order.salt,
                     **order.data.to_dict(),
                 }
-                for order_id, order in self.orders.items()
+                for order_id, order in zip(self._ids, self.get_orders())
             },
         }
         return json.dumps(data)
 
+    def to_snapshot(self) -> bytes:
+        """
+        A binary snapshot of the orders and their tree; see `open_snapshot`.
+
+        Unlike `to_json`, loading one needs no hashing, and orders can be
+        decoded one at a time.
+        """
+        return encode_snapshot(
+            self.get_or_generate_tree(), self.get_orders(), self._ids, self.location
+        )
+
+    @classmethod
+    def open_snapshot(cls, source: Union[str, bytes]) -> MultiplexerSnapshot:
+        """
+        Lazily open a snapshot, from bytes or by memory-mapping a file.
+
+        Orders are decoded and checked against the root as they are read.
+        """
+        if isinstance(source, str):
+            return MultiplexerSnapshot.open(source, cls.order_type_registry)
+        return MultiplexerSnapshot(source, cls.order_type_registry)
+
+    @classmethod
+    def from_snapshot(
+        cls, source: Union[str, bytes], verify: bool = False
+    ) -> "Multiplexer":
+        """
+        Load every order of a snapshot into a `Multiplexer` for editing.
+
+        The stored ids and tree are used as they are; with ``verify``, every
+        order and node is first checked against the root in O(n).
+        """
+        with cls.open_snapshot(source) as snapshot:
+            if verify and not snapshot.verify():
+                raise ValueError("root mismatch")
+            multiplexer = cls(location=snapshot.location)
+            multiplexer.tree = snapshot.tree()
+            multiplexer._ids = snapshot.order_ids
+            multiplexer._index = {id: i for i, id in enumerate(multiplexer._ids)}
+            multiplexer.orders = {
+                id: snapshot.get_by_index(i, verify=False)
+                for i, id in enumerate(multiplexer._ids)
+            }
+            multiplexer._reindex()
+        return multiplexer
+
     async def prepare_proof_struct(
         self,
         location: ProofLocation = None,
         filter: Callable = None,
         uploader: Callable = None,
+        compact: bool = False,
     ) -> tuple[int, HexBytes]:
         location = location or self.location
+        encode = self.encode_to_compact_json if compact else self.encode_to_json
 
         async def get_data() -> str:
             if location == ProofLocation.PRIVATE:
@@ -167,7 +388,7 @@ class Multiplexer:
                 if not uploader:
                     raise ValueError("Must provide an uploader function")
                 try:
-                    return await uploader(self.encode_to_json(filter))
+                    return await uploader(encode(filter))
                 except Exception as e:
                     raise ValueError(
                         f"Error uploading to decentralized storage {location}: {e}"
@@ -223,8 +444,40 @@ class Multiplexer:
     def dump_proofs_and_params(self, filter: Callable = None) -> List[ProofWithParams]:
         return self.get_proofs(filter)
 
+    def get_orders(self) -> List[ConditionalOrder]:
+        """The orders in tree order."""
+        return [self.orders[id] for id in self._ids]
+
     def reset(self):
+        """Re-read the order of leaves from `orders` and rebuild the tree on next use."""
+        self._ids = list(self.orders)
+        self._index = {id: i for i, id in enumerate(self._ids)}
         self.tree = None
+        self._reindex()
+
+    def _reindex(self):
+        self._by_handler, self._by_type, self._by_token = {}, {}, {}
+        for order in self.orders.values():
+            self._index_order(order)
+
+    def _index_order(self, order: ConditionalOrder):
+        self._by_handler.setdefault(order.handler.lower(), set()).add(order.id)
+        self._by_type.setdefault(order.order_type, set()).add(order.id)
+        for token in order_tokens(order):
+            self._by_token.setdefault(token, set()).add(order.id)
+
+    def _unindex_order(self, order: ConditionalOrder):
+        keys = [
+            (self._by_handler, order.handler.lower()),
+            (self._by_type, order.order_type),
+        ]
+        keys.extend((self._by_token, token) for token in order_tokens(order))
+        for index, key in keys:
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(order.id)
+                if not ids:
+                    del index[key]
 
     @classmethod
     def register_order_type(cls, order_type: str, conditional_order_class: type):
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from decimal import Decimal
 from enum import Enum
 import json
@@ -11,15 +11,17 @@ from eth_abi.abi import encode
 from cowdao_cowpy.contracts.order import Order
 
 
-from ..conditional_order import ConditionalOrder
+from ..conditional_order import ConditionalOrder, memoized
 from ..types import (
+    ConditionalOrderParams,
     ContextFactory,
     IsValidResult,
     PollParams,
+    PollResult,
     PollResultCode,
     PollResultError,
 )
-from ..utils import encode_params, format_epoch
+from ..utils import abi_decoder, encode_params, format_epoch
 
 TWAP_ADDRESS = HexStr("0x6cF1e9cA41f7611dEf408122793c358a3d11E5a5")
 CURRENT_BLOCK_TIMESTAMP_FACTORY_ADDRESS = "0x52eD56Da04309Aca4c3FECC595298d80C2f16BAc"
@@ -64,10 +66,10 @@ class TwapData:
             "receiver": self.receiver,
             "sellAmount": self.sell_amount,
             "buyAmount": self.buy_amount,
-            "startType": self.start_type.value,
+            "startType": StartType(self.start_type).value,
             "numberOfParts": self.number_of_parts,
             "timeBetweenParts": self.time_between_parts,
-            "durationType": self.duration_type.value,
+            "durationType": DurationType(self.duration_type).value,
             "appData": self.app_data,
             "startTimeEpoch": self.start_time_epoch,
             "durationOfPart": self.duration_of_part,
@@ -183,9 +185,11 @@ class Twap(ConditionalOrder[TwapData, TwapStruct]):
             else IsValidResult(is_valid=True)
         )
 
+    @memoized
     def serialize(self) -> HexStr:
         return encode_params(self.leaf)
 
+    @memoized
     def encode_static_input(self) -> HexStr:
         return Web3.to_hex(
             encode(
@@ -213,6 +217,21 @@ class Twap(ConditionalOrder[TwapData, TwapStruct]):
             twap_serialized, TWAP_ADDRESS, TWAP_STRUCT_ABI, Twap.deserialize_callback
         )
 
+    async def poll(self, params: PollParams) -> PollResult:
+        if params.block_info is None:
+            # Every check of this poll reads the head fetched here. It goes on
+            # a copy: the caller's params would keep a stale block.
+            try:
+                block_info = await params.provider.eth.get_block("latest")
+            except Exception as error:
+                return PollResultError(
+                    result=PollResultCode.UNEXPECTED_ERROR,
+                    reason="Unexpected error",
+                    error=error,
+                )
+            params = replace(params, block_info=block_info)
+        return await super().poll(params)
+
     async def get_block_timestamp(self, params: PollParams) -> int:
         block_info = params.block_info or await params.provider.eth.get_block("latest")
         block_timestamp = block_info.get("timestamp")
@@ -220,6 +239,15 @@ class Twap(ConditionalOrder[TwapData, TwapStruct]):
             raise ValueError("Block timestamp not found")
         return int(block_timestamp) & 0xFFFFFFFF
 
+    @classmethod
+    def from_params(cls, params: ConditionalOrderParams) -> "Twap":
+        if params.handler.lower() != TWAP_ADDRESS.lower():
+            raise ValueError("HandlerMismatch")
+        [twap_struct] = abi_decoder(tuple(TWAP_STRUCT_ABI))(
+            HexBytes(params.static_input)
+        )
+        return Twap.deserialize_callback(twap_struct, params.salt)
+
     @staticmethod
     def deserialize_callback(twapStruct: TWAP_STRUCT_TYPE, salt: HexStr) -> "Twap":
         return Twap(TWAP_ADDRESS, static_transform_tuple_to_data(twapStruct), salt)
@@ -289,7 +317,6 @@ class Twap(ConditionalOrder[TwapData, TwapStruct]):
 
     async def poll_validate(self, params: PollParams) -> Optional[PollResultError]:
         block_timestamp = await self.get_block_timestamp(params)
-        print(block_timestamp)
 
         try:
             start_timestamp = await self.start_timestamp(params)
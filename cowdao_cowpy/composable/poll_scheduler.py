@@ -0,0 +1,358 @@
+import asyncio
+import heapq
+import itertools
+from dataclasses import dataclass
+from logging import getLogger
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    cast,
+)
+
+from web3 import AsyncWeb3
+from web3.types import BlockData
+
+from cowdao_cowpy.common.chains import Chain
+from cowdao_cowpy.order_book.api import OrderBookApi
+from cowdao_cowpy.web3.blocks import BlockCache
+from cowdao_cowpy.web3.multicall import MulticallBatcher
+
+from .conditional_order import ConditionalOrder
+from .multicall import BatchedComposableCow
+from .types import PollParams, PollResult, PollResultCode, PollResultError
+
+logger = getLogger(__name__)
+
+Key = Tuple[str, str]
+
+
+@dataclass(frozen=True)
+class PollOutcome:
+    """The result of polling one registered order at ``block_number``."""
+
+    owner: str
+    order: ConditionalOrder
+    result: PollResult
+    block_number: int
+
+    @property
+    def dropped(self) -> bool:
+        return self.result.result == PollResultCode.DONT_TRY_AGAIN
+
+
+@dataclass
+class PollSchedulerStats:
+    ticks: int = 0
+    polls: int = 0
+    successes: int = 0
+    errors: int = 0
+    dropped: int = 0
+
+
+@dataclass
+class _Registered:
+    owner: str
+    order: ConditionalOrder
+    token: int = 0
+    errors: int = 0
+
+
+class PollScheduler:
+    """
+    Polls conditional orders only when their last `PollResult` says to.
+
+    Registered (owner, order) pairs wait in two priority queues, one keyed on
+    block number and one on block timestamp. Each `tick` pops the orders that
+    are due at that block, polls them with at most ``max_concurrency`` polls
+    in flight, and files each order again according to its result:
+
+    - ``SUCCESS`` and ``TRY_NEXT_BLOCK``: the next block.
+    - ``TRY_ON_BLOCK``: the given ``block_number``.
+    - ``TRY_AT_EPOCH``: the first block at or after ``epoch``.
+    - ``UNEXPECTED_ERROR`` (or an exception from ``poll``): after
+      ``retry_interval`` seconds of chain time, doubling with each
+      consecutive error up to ``max_retry_interval``.
+    - ``DONT_TRY_AGAIN``: the order is unregistered.
+
+    The work of a tick is proportional to the number of due orders, not to
+    the number registered. Outcomes go to `on_result` callbacks and are
+    returned by `tick`; `start` runs ticks for each new block of ``provider``.
+    Every poll of a tick gets the tick's block as `PollParams.block_info`, so
+    polls don't fetch the head themselves.
+
+    With a ``multicall`` batcher, the ComposableCoW reads of a tick's polls
+    are made at the tick's block and sent together as Multicall3 batches;
+    raise ``max_concurrency`` so that enough polls share each batch.
+
+    Args:
+        chain: The chain the orders are polled on.
+        provider: Web3 provider passed to `ConditionalOrder.poll`.
+        order_book_api: Orderbook API passed to `ConditionalOrder.poll`.
+        max_concurrency: Polls in flight at once.
+        retry_interval: First delay, in seconds, after an unexpected error.
+        max_retry_interval: Longest delay after repeated errors.
+        block_interval: Seconds between checks for a new block in `start`.
+        multicall: Batches the ComposableCoW reads of concurrent polls.
+        blocks: Where `start` reads the head from, e.g. a `BlockCache` with
+            a `TimestampExtrapolator`. Defaults to one fetching each head.
+    """
+
+    def __init__(
+        self,
+        chain: Chain,
+        provider: AsyncWeb3,
+        order_book_api: OrderBookApi,
+        max_concurrency: int = 16,
+        retry_interval: float = 12.0,
+        max_retry_interval: float = 600.0,
+        block_interval: float = 2.0,
+        multicall: Optional[MulticallBatcher] = None,
+        blocks: Optional[BlockCache] = None,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.chain = chain
+        self.provider = provider
+        self.order_book_api = order_book_api
+        self.max_concurrency = max_concurrency
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+        self.block_interval = block_interval
+        self.multicall = multicall
+        self.blocks = blocks or BlockCache(provider, max_age=0)
+        self.stats = PollSchedulerStats()
+        self.block_number: Optional[int] = None
+        self.timestamp: Optional[int] = None
+        self._registered: Dict[Key, _Registered] = {}
+        self._by_block: List[Tuple[int, int, Key]] = []
+        self._by_time: List[Tuple[int, int, Key]] = []
+        self._tokens = itertools.count(1)
+        self._callbacks: List[Callable[[PollOutcome], Any]] = []
+        self._runner: Optional["asyncio.Task[None]"] = None
+
+    def __len__(self) -> int:
+        return len(self._registered)
+
+    def __contains__(self, key: Key) -> bool:
+        return key in self._registered
+
+    async def __aenter__(self) -> "PollScheduler":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    def register(
+        self,
+        owner: str,
+        order: ConditionalOrder,
+        at_block: Optional[int] = None,
+        at_epoch: Optional[int] = None,
+    ) -> Key:
+        """
+        Start polling ``order`` of ``owner``; returns its key.
+
+        The first poll is at the next tick unless ``at_block`` or ``at_epoch``
+        is given. Registering an order again reschedules it.
+        """
+        key = (owner.lower(), order.id)
+        entry = self._registered.get(key)
+        if entry is None:
+            entry = self._registered[key] = _Registered(owner, order)
+        if at_epoch is not None:
+            self._schedule_at_epoch(key, entry, at_epoch)
+        else:
+            self._schedule_at_block(key, entry, at_block or 0)
+        return key
+
+    def unregister(self, owner: str, order_id: str) -> None:
+        # Queue entries of unregistered orders are skipped when popped.
+        self._registered.pop((owner.lower(), order_id), None)
+
+    def on_result(self, callback: Callable[[PollOutcome], Any]) -> None:
+        """Call ``callback`` with every poll outcome; exceptions are logged."""
+        self._callbacks.append(callback)
+
+    def next_due(self) -> Tuple[Optional[int], Optional[int]]:
+        """The earliest block number and timestamp any order waits for."""
+        self._discard_stale(self._by_block)
+        self._discard_stale(self._by_time)
+        return (
+            self._by_block[0][0] if self._by_block else None,
+            self._by_time[0][0] if self._by_time else None,
+        )
+
+    async def tick(
+        self,
+        block_number: int,
+        timestamp: int,
+        block: Optional[BlockData] = None,
+        estimated: bool = False,
+    ) -> List[PollOutcome]:
+        """
+        Poll every order due at this block and reschedule it.
+
+        ``estimated`` marks a head that was extrapolated rather than fetched;
+        batched reads then go to the latest block instead of its number.
+        """
+        self.block_number = block_number
+        self.timestamp = timestamp
+        self.stats.ticks += 1
+        due = self._pop_due(self._by_block, block_number)
+        due += self._pop_due(self._by_time, timestamp)
+        if not due:
+            return []
+        if block is None:
+            block = cast(BlockData, {"number": block_number, "timestamp": timestamp})
+
+        outcomes: List[PollOutcome] = []
+        pending: Iterator[Tuple[Key, _Registered]] = iter(due)
+        composable_cow = (
+            BatchedComposableCow(
+                self.multicall, self.chain, "latest" if estimated else block_number
+            )
+            if self.multicall is not None
+            else None
+        )
+
+        async def worker() -> None:
+            for key, entry in pending:
+                result = await self._poll(entry, block, composable_cow)
+                outcome = PollOutcome(entry.owner, entry.order, result, block_number)
+                self._reschedule(key, entry, result, block_number, timestamp)
+                outcomes.append(outcome)
+                self._emit(outcome)
+
+        await asyncio.gather(
+            *(worker() for _ in range(min(self.max_concurrency, len(due))))
+        )
+        return outcomes
+
+    def start(self) -> None:
+        """Tick on every new block of ``provider`` in the background."""
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+            self._runner = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                block = await self.blocks.latest()
+                number = block["number"]
+                if self.block_number is None or number > self.block_number:
+                    await self.tick(
+                        number,
+                        block["timestamp"],
+                        block,
+                        estimated=self.blocks.is_estimate(block),
+                    )
+            except Exception as e:
+                logger.warning("Polling conditional orders failed: %r", e)
+            await asyncio.sleep(self.block_interval)
+
+    async def _poll(
+        self,
+        entry: _Registered,
+        block: Optional[BlockData],
+        composable_cow: Optional[BatchedComposableCow],
+    ) -> PollResult:
+        self.stats.polls += 1
+        params = PollParams(
+            owner=entry.owner,
+            chain=self.chain,
+            provider=self.provider,
+            order_book_api=self.order_book_api,
+            block_info=block,
+            composable_cow=composable_cow,
+        )
+        try:
+            return await entry.order.poll(params)
+        except Exception as e:
+            return PollResultError(
+                result=PollResultCode.UNEXPECTED_ERROR,
+                reason=f"Unexpected error: {e!r}",
+                error=e,
+            )
+
+    def _reschedule(
+        self,
+        key: Key,
+        entry: _Registered,
+        result: PollResult,
+        block_number: int,
+        timestamp: int,
+    ) -> None:
+        if self._registered.get(key) is not entry or entry.token != 0:
+            return  # Unregistered or registered again while being polled.
+        code = result.result
+        if code != PollResultCode.UNEXPECTED_ERROR:
+            entry.errors = 0
+        if code == PollResultCode.SUCCESS:
+            self.stats.successes += 1
+            self._schedule_at_block(key, entry, block_number + 1)
+        elif code == PollResultCode.DONT_TRY_AGAIN:
+            self.stats.dropped += 1
+            del self._registered[key]
+        elif code == PollResultCode.TRY_ON_BLOCK and result.block_number is not None:
+            self._schedule_at_block(
+                key, entry, max(result.block_number, block_number + 1)
+            )
+        elif code == PollResultCode.TRY_AT_EPOCH and result.epoch is not None:
+            self._schedule_at_epoch(key, entry, max(result.epoch, timestamp + 1))
+        elif code == PollResultCode.UNEXPECTED_ERROR:
+            self.stats.errors += 1
+            entry.errors += 1
+            delay = min(
+                self.retry_interval * 2 ** (entry.errors - 1), self.max_retry_interval
+            )
+            self._schedule_at_epoch(key, entry, timestamp + max(int(delay), 1))
+        else:
+            self._schedule_at_block(key, entry, block_number + 1)
+
+    def _schedule_at_block(self, key: Key, entry: _Registered, block: int) -> None:
+        entry.token = next(self._tokens)
+        heapq.heappush(self._by_block, (block, entry.token, key))
+
+    def _schedule_at_epoch(self, key: Key, entry: _Registered, epoch: int) -> None:
+        entry.token = next(self._tokens)
+        heapq.heappush(self._by_time, (epoch, entry.token, key))
+
+    def _pop_due(
+        self, queue: List[Tuple[int, int, Key]], now: int
+    ) -> List[Tuple[Key, _Registered]]:
+        due = []
+        while queue and queue[0][0] <= now:
+            _, token, key = heapq.heappop(queue)
+            entry = self._registered.get(key)
+            if entry is None or entry.token != token:
+                continue  # Unregistered or rescheduled since.
+            # Clear the token so the entry is due nowhere until rescheduled.
+            entry.token = 0
+            due.append((key, entry))
+        return due
+
+    def _discard_stale(self, queue: List[Tuple[int, int, Key]]) -> None:
+        while queue:
+            _, token, key = queue[0]
+            entry = self._registered.get(key)
+            if entry is not None and entry.token == token:
+                return
+            heapq.heappop(queue)
+
+    def _emit(self, outcome: PollOutcome) -> None:
+        for callback in self._callbacks:
+            try:
+                callback(outcome)
+            except Exception:
+                logger.exception("Poll result callback failed")
@@ -0,0 +1,264 @@
+"""
+A binary snapshot format for `Multiplexer` books.
+
+A snapshot stores what a `Multiplexer` would otherwise recompute on load:
+the Merkle tree's nodes, the slot of each leaf, every order's `id` and its
+ABI-encoded `IConditionalOrder.Params`. All sections are fixed-width except
+the last, so a memory-mapped snapshot answers `root`, ids and proofs without
+reading anything else, and decodes an order only when it is asked for.
+
+Layout (big-endian)::
+
+    header    magic, version, location, type count, order count, root
+    types     order type names, each prefixed with its length
+    nodes     (2n - 1) x bytes32, the tree as in `MerkleTree.nodes`
+    slots     n x uint32, the slot in ``nodes`` of each leaf
+    ids       n x bytes32, the `id` of each order
+    index     n x (uint64 offset, uint32 length, uint8 type) into ``params``
+    params    the ABI-encoded params of every order, back to back
+"""
+
+import mmap
+import struct
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from hexbytes import HexBytes
+from web3 import Web3
+
+from .conditional_order import ConditionalOrder
+from .merkle import MerkleProof, MerkleTree, MultiProof
+from .types import ProofLocation
+
+SNAPSHOT_MAGIC = b"COWPYMUX"
+SNAPSHOT_VERSION = 1
+
+_HEADER = struct.Struct(">8sHBBQ32s")
+_SLOT = struct.Struct(">I")
+_INDEX = struct.Struct(">QIB")
+
+
+def encode_snapshot(
+    tree: MerkleTree,
+    orders: Sequence[ConditionalOrder],
+    ids: Sequence[str],
+    location: ProofLocation,
+) -> bytes:
+    """The snapshot of ``orders``, the leaves of ``tree`` in order."""
+    types: List[str] = []
+    type_ids: Dict[str, int] = {}
+    index = bytearray()
+    params = []
+    offset = 0
+    for order in orders:
+        type_id = type_ids.get(order.order_type)
+        if type_id is None:
+            type_id = type_ids[order.order_type] = len(types)
+            types.append(order.order_type)
+        encoded = HexBytes(order.serialize())
+        index += _INDEX.pack(offset, len(encoded), type_id)
+        params.append(encoded)
+        offset += len(encoded)
+    if len(types) > 255:
+        raise ValueError("A snapshot holds at most 255 order types")
+
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_VERSION,
+        location.value,
+        len(types),
+        len(orders),
+        bytes(tree.root or bytes(32)),
+    )
+    names = b"".join(bytes([len(name)]) + name for name in (t.encode() for t in types))
+    return b"".join(
+        [
+            header,
+            names,
+            b"".join(tree.nodes),
+            b"".join(_SLOT.pack(slot) for slot in tree.slots),
+            b"".join(HexBytes(id) for id in ids),
+            bytes(index),
+            *params,
+        ]
+    )
+
+
+class MultiplexerSnapshot:
+    """
+    Read-only, lazy access to a snapshot written by `Multiplexer.to_snapshot`.
+
+    Opening a snapshot reads its header only; orders are decoded when first
+    asked for, and each decoded order is checked against the stored tree
+    with one O(log n) proof instead of rehashing every leaf. Use
+    `Multiplexer.open_snapshot` to open one with the registered order types.
+
+    Args:
+        buffer: The snapshot, e.g. a memory-mapped file.
+        registry: Order classes by `order_type`; each needs a `deserialize`
+            for its serialized params.
+    """
+
+    def __init__(
+        self,
+        buffer: Union[bytes, bytearray, memoryview, mmap.mmap],
+        registry: Dict[str, type],
+    ):
+        self.buffer = memoryview(buffer)
+        self.registry = registry
+        self._mmap = buffer if isinstance(buffer, mmap.mmap) else None
+        self._positions: Optional[Dict[str, int]] = None
+        self._orders: Dict[int, ConditionalOrder] = {}
+
+        if len(self.buffer) < _HEADER.size:
+            raise ValueError("Truncated snapshot")
+        magic, version, location, type_count, count, root = _HEADER.unpack_from(
+            self.buffer
+        )
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("Not a Multiplexer snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {version}")
+        self.location = ProofLocation(location)
+        self.count = count
+        self._root = HexBytes(root)
+
+        offset = _HEADER.size
+        self.order_types: List[str] = []
+        for _ in range(type_count):
+            length = self.buffer[offset]
+            self.order_types.append(
+                bytes(self.buffer[offset + 1 : offset + 1 + length]).decode()
+            )
+            offset += 1 + length
+        self._nodes = offset
+        self._slots = self._nodes + 32 * max(2 * count - 1, 0)
+        self._ids = self._slots + _SLOT.size * count
+        self._index = self._ids + 32 * count
+        self._params = self._index + _INDEX.size * count
+        if len(self.buffer) < self._params:
+            raise ValueError("Truncated snapshot")
+        if count and self._node(0) != self._root:
+            raise ValueError("root mismatch")
+
+    @classmethod
+    def open(cls, path: str, registry: Dict[str, type]) -> "MultiplexerSnapshot":
+        """Memory-map the snapshot at ``path``."""
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), registry)
+
+    def close(self) -> None:
+        self.buffer.release()
+        if self._mmap is not None:
+            self._mmap.close()
+
+    def __enter__(self) -> "MultiplexerSnapshot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def root(self) -> str:
+        if not self.count:
+            raise ValueError("Merkle tree root is None")
+        return Web3.to_hex(self._root)
+
+    def order_id(self, i: int) -> str:
+        self._check(i)
+        start = self._ids + 32 * i
+        return Web3.to_hex(self.buffer[start : start + 32])
+
+    @property
+    def order_ids(self) -> List[str]:
+        return [self.order_id(i) for i in range(self.count)]
+
+    def index_of(self, id: str) -> int:
+        if self._positions is None:
+            self._positions = {self.order_id(i): i for i in range(self.count)}
+        return self._positions[id]
+
+    def serialized(self, i: int) -> Tuple[str, HexBytes]:
+        """The order type and ABI-encoded params of order ``i``."""
+        self._check(i)
+        offset, length, type_id = _INDEX.unpack_from(
+            self.buffer, self._index + _INDEX.size * i
+        )
+        start = self._params + offset
+        return self.order_types[type_id], HexBytes(self.buffer[start : start + length])
+
+    def get_by_index(self, i: int, verify: bool = True) -> ConditionalOrder:
+        """Decode order ``i``, checking it with `verify_order` unless told not to."""
+        order = self._orders.get(i)
+        if order is None:
+            order_type, params = self.serialized(i)
+            if order_type not in self.registry:
+                raise ValueError(f"Unknown order type: {order_type}")
+            if verify and not self.verify_order(i, params):
+                raise ValueError(f"Order {i} does not match the snapshot's root")
+            order = self.registry[order_type].deserialize(Web3.to_hex(params))
+            self._orders[i] = order
+        return order
+
+    def get_by_id(self, id: str) -> ConditionalOrder:
+        return self.get_by_index(self.index_of(id))
+
+    def __iter__(self) -> Iterator[ConditionalOrder]:
+        return (self.get_by_index(i) for i in range(self.count))
+
+    def proof(self, i: int) -> MerkleProof:
+        self._check(i)
+        path = []
+        slot = self._slot(i)
+        while slot > 0:
+            path.append(self._node(slot - 1 if slot % 2 == 0 else slot + 1))
+            slot = (slot - 1) // 2
+        return MerkleProof(leaf=self._node(self._slot(i)), path=path, index=i)
+
+    def multiproof(self, indices: Sequence[int]) -> MultiProof:
+        return self.tree().multiproof(indices)
+
+    def verify_order(self, i: int, params: Optional[bytes] = None) -> bool:
+        """
+        Whether order ``i``'s params hash to its id and leaf, and the leaf's
+        stored path hashes to the root.
+        """
+        if params is None:
+            _, params = self.serialized(i)
+        id = Web3.keccak(params)
+        start = self._ids + 32 * i
+        if id != bytes(self.buffer[start : start + 32]):
+            return False
+        proof = self.proof(i)
+        return proof.leaf == Web3.keccak(id) and proof.verify(self._root)
+
+    def verify(self) -> bool:
+        """Whether every order and tree node is consistent with the root, in O(n)."""
+        tree = self.tree()
+        if not tree.verify():
+            return False
+        for i in range(self.count):
+            _, params = self.serialized(i)
+            id = Web3.keccak(params)
+            if id != HexBytes(self.order_id(i)) or tree.leaf(i) != Web3.keccak(id):
+                return False
+        return True
+
+    def tree(self) -> MerkleTree:
+        """The stored tree, read without hashing."""
+        nodes = [self._node(slot) for slot in range(max(2 * self.count - 1, 0))]
+        slots = [self._slot(i) for i in range(self.count)]
+        return MerkleTree.from_nodes(nodes, slots)
+
+    def _check(self, i: int) -> None:
+        if not 0 <= i < self.count:
+            raise IndexError(f"order index {i} out of range")
+
+    def _node(self, slot: int) -> HexBytes:
+        start = self._nodes + 32 * slot
+        return HexBytes(self.buffer[start : start + 32])
+
+    def _slot(self, i: int) -> int:
+        return _SLOT.unpack_from(self.buffer, self._slots + _SLOT.size * i)[0]
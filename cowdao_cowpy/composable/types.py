@@ -2,7 +2,6 @@ from dataclasses import dataclass
 from typing import ClassVar, List, Optional, Any, Union, Literal
 from enum import Enum
 from eth_typing import HexStr
-from pymerkle import MerkleProof
 from web3 import AsyncWeb3
 from web3.types import BlockData
 
@@ -10,6 +9,8 @@ from cowdao_cowpy.common.chains import Chain
 from cowdao_cowpy.contracts.order import Order
 from cowdao_cowpy.order_book.api import OrderBookApi
 
+from .merkle import MerkleProof, MultiProof
+
 
 @dataclass
 class OwnerParams:
@@ -24,6 +25,9 @@ class PollParams(OwnerParams):
     proof: ClassVar[List[str]] = []
     block_info: Optional[BlockData] = None
     off_chain_input: str = "0x"
+    # Reads ComposableCoW instead of the order's own contract, e.g. a
+    # `BatchedComposableCow` shared by concurrent polls.
+    composable_cow: Optional[Any] = None
 
 
 class ProofLocation(Enum):
@@ -66,6 +70,13 @@ class ProofWithParams:
     params: ConditionalOrderParams
 
 
+@dataclass
+class MultiProofWithParams:
+    proof: MultiProof
+    # In the order of `MultiProof.leaves`.
+    params: List[ConditionalOrderParams]
+
+
 class PollResultCode(Enum):
     SUCCESS = "SUCCESS"
     UNEXPECTED_ERROR = "UNEXPECTED_ERROR"
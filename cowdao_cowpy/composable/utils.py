@@ -1,8 +1,11 @@
-from typing import List, Any, Dict
+import functools
+from typing import List, Any, Callable, Dict, Tuple
 from eth_typing import HexStr
 from hexbytes import HexBytes
 from web3 import Web3
 from eth_abi.abi import encode, decode
+from eth_abi.decoding import ContextFramesBytesIO, TupleDecoder
+from eth_abi.registry import registry
 
 
 from cowdao_cowpy.common.chains import Chain
@@ -49,6 +52,22 @@ def decode_params(encoded: HexStr) -> ConditionalOrderParams:
     )
 
 
+@functools.lru_cache(maxsize=None)
+def abi_decoder(types: Tuple[str, ...]) -> Callable[[bytes], Tuple[Any, ...]]:
+    """
+    A decoder of ``types``, built once, decoding values as `decode` would.
+
+    `decode` builds a new tuple decoder for its types on every call; callers
+    decoding many values of the same types share this one instead.
+    """
+    decoder = TupleDecoder(decoders=tuple(registry.get_decoder(t) for t in types))
+
+    def decode_types(data: bytes) -> Tuple[Any, ...]:
+        return decoder(ContextFramesBytesIO(data))
+
+    return decode_types
+
+
 def is_valid_abi(types: List[str], values: List[Any]) -> bool:
     try:
         encode(types, values)
@@ -0,0 +1,272 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, Iterable, List, Optional
+
+from eth_account.signers.local import LocalAccount
+from eth_typing.evm import ChecksumAddress
+from web3.types import Wei
+
+from cowdao_cowpy.app_data.utils import PartnerFee, ensure_app_data_uploaded
+from cowdao_cowpy.common.chains import Chain
+from cowdao_cowpy.common.config import SupportedChainId
+from cowdao_cowpy.contracts.sign import PreSignSignature, Signature, SigningScheme
+from cowdao_cowpy.cow.swap import (
+    CompletedOrder,
+    build_order,
+    build_quote_request,
+    get_order_quote,
+    post_order,
+    sign_order,
+)
+from cowdao_cowpy.order_book.api import OrderBookApi
+from cowdao_cowpy.order_book.config import Envs, OrderBookAPIConfigFactory
+
+
+@dataclass
+class SwapRequest:
+    """The arguments of one `swap_tokens` call, minus account, chain and env."""
+
+    amount: Wei
+    sell_token: ChecksumAddress
+    buy_token: ChecksumAddress
+    safe_address: ChecksumAddress | None = None
+    app_code: str | None = None
+    referrer_address: str | None = None
+    partner_fee: PartnerFee | None = None
+    graffiti: str | None = None
+    valid_to: int | None = None
+    slippage_tolerance: float = 0.005
+    partially_fillable: bool = False
+
+    def app_data_key(self) -> Hashable:
+        fee = self.partner_fee
+        return (
+            self.app_code,
+            self.referrer_address,
+            (fee.bps, fee.recipient) if fee else None,
+            self.graffiti,
+        )
+
+
+@dataclass
+class StageTimings:
+    """Seconds spent in each stage of a swap, excluding time queued for a slot."""
+
+    app_data: float = 0.0
+    quote: float = 0.0
+    sign: float = 0.0
+    post: float = 0.0
+    total: float = 0.0
+
+
+@dataclass
+class SwapResult:
+    request: SwapRequest
+    order: Optional[CompletedOrder] = None
+    error: Optional[Exception] = None
+    timings: StageTimings = field(default_factory=StageTimings)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class SwapPipeline:
+    """
+    Runs many swaps for one account concurrently over a shared API client.
+
+    Every swap goes through the stages of `swap_tokens`, but the batch is
+    pipelined: each distinct app-data document is registered once, quotes
+    are requested concurrently, EIP-712 signing runs in ``executor`` (a
+    thread pool by default) rather than on the event loop, and at most
+    ``max_concurrent_posts`` orders are posted at a time. The orderbook's
+    request scheduler still enforces the rate limit underneath.
+
+    Failures are reported per swap in the `SwapResult` and never abort the
+    rest of the batch.
+
+    Args:
+        account: The signing account.
+        chain: The chain to trade on.
+        env: The orderbook environment.
+        order_book_api: A shared client; one is created for ``chain``/``env``
+            (and closed by `aclose`) otherwise.
+        max_concurrent_quotes: Maximum quote requests in flight.
+        max_concurrent_posts: Maximum order submissions in flight.
+        executor: Where orders are signed.
+    """
+
+    def __init__(
+        self,
+        account: LocalAccount,
+        chain: Chain,
+        env: Envs = "prod",
+        order_book_api: Optional[OrderBookApi] = None,
+        max_concurrent_quotes: int = 16,
+        max_concurrent_posts: int = 4,
+        executor: Optional[Executor] = None,
+    ):
+        self.account = account
+        self.chain = chain
+        self._owns_api = order_book_api is None
+        self.order_book_api = order_book_api or OrderBookApi(
+            OrderBookAPIConfigFactory.get_config(env, SupportedChainId(chain.value[0]))
+        )
+        self.max_concurrent_quotes = max_concurrent_quotes
+        self.max_concurrent_posts = max_concurrent_posts
+        self._owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(thread_name_prefix="cowpy-sign")
+
+    async def __aenter__(self) -> "SwapPipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Release the API client and signing executor if they were created here."""
+        if self._owns_api:
+            await self.order_book_api.aclose()
+        if self._owns_executor:
+            self.executor.shutdown(wait=False)
+
+    async def run(self, requests: Iterable[SwapRequest]) -> List[SwapResult]:
+        """Execute ``requests``; results are returned in the same order."""
+        requests = list(requests)
+        app_data: Dict[Hashable, "asyncio.Task[str]"] = {}
+        for request in requests:
+            key = request.app_data_key()
+            if key not in app_data:
+                app_data[key] = asyncio.ensure_future(self._register(request))
+        quote_slots = asyncio.Semaphore(self.max_concurrent_quotes)
+        post_slots = asyncio.Semaphore(self.max_concurrent_posts)
+
+        try:
+            return list(
+                await asyncio.gather(
+                    *(
+                        self._swap(
+                            request,
+                            app_data[request.app_data_key()],
+                            quote_slots,
+                            post_slots,
+                        )
+                        for request in requests
+                    )
+                )
+            )
+        finally:
+            for task in app_data.values():
+                if not task.done():
+                    task.cancel()
+            # Retrieve registration errors; each is already reported per swap.
+            await asyncio.gather(*app_data.values(), return_exceptions=True)
+
+    async def _register(self, request: SwapRequest) -> str:
+        return await ensure_app_data_uploaded(
+            self.order_book_api,
+            app_code=request.app_code,
+            referrer_address=request.referrer_address,
+            partner_fee=request.partner_fee,
+            graffiti=request.graffiti,
+        )
+
+    async def _swap(
+        self,
+        request: SwapRequest,
+        app_data_task: "asyncio.Task[str]",
+        quote_slots: asyncio.Semaphore,
+        post_slots: asyncio.Semaphore,
+    ) -> SwapResult:
+        result = SwapResult(request)
+        timings = result.timings
+        started = time.perf_counter()
+        try:
+            stage = time.perf_counter()
+            app_data = await asyncio.shield(app_data_task)
+            timings.app_data = time.perf_counter() - stage
+
+            quote_request, side = build_quote_request(
+                request.amount,
+                self.account,
+                request.sell_token,
+                request.buy_token,
+                app_data,
+                request.safe_address,
+            )
+            async with quote_slots:
+                stage = time.perf_counter()
+                quote = await get_order_quote(quote_request, side, self.order_book_api)
+                timings.quote = time.perf_counter() - stage
+
+            order = build_order(
+                request.amount,
+                self.account,
+                request.sell_token,
+                request.buy_token,
+                quote,
+                app_data,
+                safe_address=request.safe_address,
+                valid_to=request.valid_to,
+                slippage_tolerance=request.slippage_tolerance,
+                partially_fillable=request.partially_fillable,
+            )
+            stage = time.perf_counter()
+            signature: Signature
+            if request.safe_address is not None:
+                signature = PreSignSignature(
+                    scheme=SigningScheme.PRESIGN, data=request.safe_address
+                )
+            else:
+                signature = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, sign_order, self.chain, self.account, order
+                )
+            timings.sign = time.perf_counter() - stage
+
+            async with post_slots:
+                stage = time.perf_counter()
+                uid = await post_order(
+                    self.account,
+                    request.safe_address,
+                    order,
+                    signature,
+                    self.order_book_api,
+                    chain=self.chain,
+                )
+                timings.post = time.perf_counter() - stage
+            result.order = CompletedOrder(
+                uid=uid, url=self.order_book_api.get_order_link(uid)
+            )
+        except Exception as e:
+            result.error = e
+        timings.total = time.perf_counter() - started
+        return result
+
+
+async def swap_tokens_many(
+    requests: Iterable[SwapRequest],
+    account: LocalAccount,
+    chain: Chain,
+    env: Envs = "prod",
+    order_book_api: Optional[OrderBookApi] = None,
+    max_concurrent_quotes: int = 16,
+    max_concurrent_posts: int = 4,
+) -> List[SwapResult]:
+    """
+    Execute many swaps for ``account`` through a `SwapPipeline`.
+
+    `CowContractAddress.VAULT_RELAYER` needs to be approved to spend every
+    sell token beforehand. Returns one `SwapResult` per request, in order;
+    check ``result.ok`` / ``result.error`` for failures.
+    """
+    async with SwapPipeline(
+        account,
+        chain,
+        env=env,
+        order_book_api=order_book_api,
+        max_concurrent_quotes=max_concurrent_quotes,
+        max_concurrent_posts=max_concurrent_posts,
+    ) as pipeline:
+        return await pipeline.run(requests)
@@ -0,0 +1,255 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Callable, Dict, Hashable, List, Optional
+
+from eth_account.signers.local import LocalAccount
+
+from cowdao_cowpy.app_data.utils import ensure_app_data_uploaded
+from cowdao_cowpy.common.chains import Chain
+from cowdao_cowpy.common.config import SupportedChainId
+from cowdao_cowpy.common.constants import CowContractAddress
+from cowdao_cowpy.contracts.domain import domain
+from cowdao_cowpy.contracts.order import Order
+from cowdao_cowpy.contracts.sign import PreSignSignature, Signature, SigningScheme
+from cowdao_cowpy.contracts.sign import sign_order as _sign_order
+from cowdao_cowpy.cow.pipeline import SwapRequest
+from cowdao_cowpy.cow.swap import (
+    CompletedOrder,
+    build_order,
+    build_quote_request,
+    get_order_quote,
+    post_order,
+)
+from cowdao_cowpy.order_book.api import OrderBookApi
+from cowdao_cowpy.order_book.config import Envs, OrderBookAPIConfigFactory
+from cowdao_cowpy.order_book.generated.model import OrderQuoteResponse
+from cowdao_cowpy.order_book.lite import MaybeLite
+from cowdao_cowpy.order_book.quote_cache import parse_expiration
+
+logger = getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PreparedSwap:
+    """A quoted swap whose unsigned order is ready to sign and post."""
+
+    request: SwapRequest
+    quote: MaybeLite[OrderQuoteResponse]
+    order: Order
+    quoted_at: float
+    expires_at: float
+
+
+class QuoteSession:
+    """
+    Keeps fresh quotes, and the orders built from them, ready ahead of execution.
+
+    Each subscribed `SwapRequest` is re-quoted ``refresh_margin`` seconds
+    before its quote expires, and the unsigned `Order` (with ``validTo`` and the
+    slippage-adjusted ``buyAmount``) is rebuilt from it. The signing domain is
+    computed, and each app-data document registered, once per session.
+    `execute` therefore only signs and posts; it quotes inline only if the
+    prepared quote has expired.
+
+    Args:
+        account: The signing account.
+        chain: The chain to trade on.
+        env: The orderbook environment.
+        order_book_api: A shared client; one is created otherwise.
+        refresh_margin: Seconds before quote expiration to re-quote.
+        retry_interval: Seconds to wait before retrying a failed quote.
+        wall_clock: POSIX time source compared with quote expirations.
+    """
+
+    def __init__(
+        self,
+        account: LocalAccount,
+        chain: Chain,
+        env: Envs = "prod",
+        order_book_api: Optional[OrderBookApi] = None,
+        refresh_margin: float = 10.0,
+        retry_interval: float = 2.0,
+        wall_clock: Callable[[], float] = time.time,
+    ):
+        self.account = account
+        self.chain = chain
+        self._owns_api = order_book_api is None
+        self.order_book_api = order_book_api or OrderBookApi(
+            OrderBookAPIConfigFactory.get_config(env, SupportedChainId(chain.value[0]))
+        )
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self.wall_clock = wall_clock
+        self.domain = domain(
+            chain=chain, verifying_contract=CowContractAddress.SETTLEMENT_CONTRACT.value
+        )
+        self._requests: Dict[str, SwapRequest] = {}
+        self._app_data: Dict[Hashable, str] = {}
+        self._prepared: Dict[str, PreparedSwap] = {}
+        self._refreshing: Dict[str, "asyncio.Task[PreparedSwap]"] = {}
+        self._loops: Dict[str, "asyncio.Task[None]"] = {}
+        self._started = False
+
+    async def __aenter__(self) -> "QuoteSession":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    @staticmethod
+    def key_for(request: SwapRequest) -> str:
+        return f"{request.sell_token}/{request.buy_token}/{request.amount}".lower()
+
+    @property
+    def keys(self) -> List[str]:
+        return list(self._requests)
+
+    def subscribe(self, request: SwapRequest, key: Optional[str] = None) -> str:
+        """Keep ``request`` quoted; returns the key to `execute` it with."""
+        key = key or self.key_for(request)
+        self._requests[key] = request
+        self._prepared.pop(key, None)
+        if self._started:
+            self._start_loop(key)
+        return key
+
+    def unsubscribe(self, key: str) -> None:
+        self._requests.pop(key, None)
+        self._prepared.pop(key, None)
+        loop = self._loops.pop(key, None)
+        if loop is not None:
+            loop.cancel()
+
+    def prepared(self, key: str) -> Optional[PreparedSwap]:
+        """The prepared swap for ``key``, or None if it is missing or expired."""
+        prepared = self._prepared.get(key)
+        if prepared is None or self.wall_clock() >= prepared.expires_at:
+            return None
+        return prepared
+
+    def start(self) -> None:
+        """Start re-quoting every subscription in the background."""
+        self._started = True
+        for key in self._requests:
+            self._start_loop(key)
+
+    async def aclose(self) -> None:
+        """Stop background re-quoting and close the client if created here."""
+        self._started = False
+        tasks = [*self._loops.values(), *self._refreshing.values()]
+        self._loops.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._owns_api:
+            await self.order_book_api.aclose()
+
+    async def refresh(self, key: str) -> PreparedSwap:
+        """Quote ``key`` now, sharing a quote already in flight."""
+        task = self._refreshing.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._quote(key))
+            self._refreshing[key] = task
+            task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def execute(self, key: str) -> CompletedOrder:
+        """
+        Sign and post the prepared order for ``key``.
+
+        The prepared swap is consumed: posting the same order twice would be
+        rejected as a duplicate, so a new quote is requested in the background.
+        """
+        prepared = self.prepared(key) or await self.refresh(key)
+        self._prepared.pop(key, None)
+        request = prepared.request
+        signature: Signature
+        if request.safe_address is not None:
+            signature = PreSignSignature(
+                scheme=SigningScheme.PRESIGN, data=request.safe_address
+            )
+        else:
+            signature = _sign_order(
+                self.domain, prepared.order, self.account, SigningScheme.EIP712
+            )
+        try:
+            uid = await post_order(
+                self.account,
+                request.safe_address,
+                prepared.order,
+                signature,
+                self.order_book_api,
+                order_domain=self.domain,
+            )
+        finally:
+            if self._started and key in self._requests:
+                self._start_loop(key, restart=True)
+        return CompletedOrder(uid=uid, url=self.order_book_api.get_order_link(uid))
+
+    def _start_loop(self, key: str, restart: bool = False) -> None:
+        loop = self._loops.get(key)
+        if loop is not None and not loop.done():
+            if not restart:
+                return
+            loop.cancel()
+        self._loops[key] = asyncio.ensure_future(self._keep_fresh(key))
+
+    async def _keep_fresh(self, key: str) -> None:
+        while key in self._requests:
+            try:
+                prepared = await self.refresh(key)
+                delay = prepared.expires_at - self.refresh_margin - self.wall_clock()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Re-quoting %s failed: %r", key, e)
+                delay = self.retry_interval
+            await asyncio.sleep(max(delay, 0.0))
+
+    async def _quote(self, key: str) -> PreparedSwap:
+        request = self._requests[key]
+        app_data_key = request.app_data_key()
+        app_data = self._app_data.get(app_data_key)
+        if app_data is None:
+            app_data = await ensure_app_data_uploaded(
+                self.order_book_api,
+                app_code=request.app_code,
+                referrer_address=request.referrer_address,
+                partner_fee=request.partner_fee,
+                graffiti=request.graffiti,
+            )
+            self._app_data[app_data_key] = app_data
+        quote_request, side = build_quote_request(
+            request.amount,
+            self.account,
+            request.sell_token,
+            request.buy_token,
+            app_data,
+            request.safe_address,
+        )
+        quote = await get_order_quote(quote_request, side, self.order_book_api)
+        order = build_order(
+            request.amount,
+            self.account,
+            request.sell_token,
+            request.buy_token,
+            quote,
+            app_data,
+            safe_address=request.safe_address,
+            valid_to=request.valid_to,
+            slippage_tolerance=request.slippage_tolerance,
+            partially_fillable=request.partially_fillable,
+        )
+        prepared = PreparedSwap(
+            request=request,
+            quote=quote,
+            order=order,
+            quoted_at=self.wall_clock(),
+            expires_at=parse_expiration(quote.expiration),
+        )
+        if self._requests.get(key) is request:
+            self._prepared[key] = prepared
+        return prepared
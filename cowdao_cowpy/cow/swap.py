@@ -1,3 +1,5 @@
+from typing import Tuple
+
 from cowdao_cowpy.app_data.utils import (
     PartnerFee,
     ensure_app_data_uploaded,
@@ -5,8 +7,8 @@ from cowdao_cowpy.app_data.utils import (
 from cowdao_cowpy.common.chains import Chain
 from cowdao_cowpy.common.config import SupportedChainId
 from cowdao_cowpy.common.constants import CowContractAddress
-from cowdao_cowpy.contracts.domain import domain
-from cowdao_cowpy.contracts.order import Order
+from cowdao_cowpy.contracts.domain import TypedDataDomain, domain
+from cowdao_cowpy.contracts.order import Order, compute_order_uid
 from cowdao_cowpy.contracts.sign import (
     EcdsaSignature,
     SigningScheme,
@@ -16,6 +18,7 @@ from cowdao_cowpy.contracts.sign import (
 from cowdao_cowpy.contracts.sign import sign_order as _sign_order
 from cowdao_cowpy.order_book.api import OrderBookApi
 from cowdao_cowpy.order_book.config import Envs, OrderBookAPIConfigFactory
+from cowdao_cowpy.order_book.lite import MaybeLite
 from web3.types import Wei
 from cowdao_cowpy.order_book.generated.model import (
     UID,
@@ -84,6 +87,46 @@ async def swap_tokens(
         graffiti=graffiti,
     )
 
+    order_quote_request, order_side = build_quote_request(
+        amount, account, sell_token, buy_token, app_data, safe_address
+    )
+    order_quote = await get_order_quote(order_quote_request, order_side, order_book_api)
+    order = build_order(
+        amount,
+        account,
+        sell_token,
+        buy_token,
+        order_quote,
+        app_data,
+        safe_address=safe_address,
+        valid_to=valid_to,
+        slippage_tolerance=slippage_tolerance,
+        partially_fillable=partially_fillable,
+    )
+
+    signature = (
+        PreSignSignature(
+            scheme=SigningScheme.PRESIGN,
+            data=safe_address,
+        )
+        if safe_address is not None
+        else sign_order(chain, account, order)
+    )
+    order_uid = await post_order(
+        account, safe_address, order, signature, order_book_api, chain=chain
+    )
+    order_link = order_book_api.get_order_link(order_uid)
+    return CompletedOrder(uid=order_uid, url=order_link)
+
+
+def build_quote_request(
+    amount: Wei,
+    account: LocalAccount,
+    sell_token: ChecksumAddress,
+    buy_token: ChecksumAddress,
+    app_data: str,
+    safe_address: ChecksumAddress | None = None,
+) -> Tuple[OrderQuoteRequest, OrderQuoteSide1]:
     order_quote_request = OrderQuoteRequest(
         sellToken=sell_token,
         buyToken=buy_token,
@@ -94,16 +137,26 @@ async def swap_tokens(
         kind=OrderQuoteSideKindSell.sell,
         sellAmountBeforeFee=TokenAmount(str(amount)),
     )
+    return order_quote_request, order_side
 
-    order_quote = await get_order_quote(order_quote_request, order_side, order_book_api)
 
-    min_valid_to = (
-        order_quote.quote.validTo
-        if valid_to is None
-        else min(order_quote.quote.validTo, valid_to)
-    )
+def build_order(
+    amount: Wei,
+    account: LocalAccount,
+    sell_token: ChecksumAddress,
+    buy_token: ChecksumAddress,
+    order_quote: MaybeLite[OrderQuoteResponse],
+    app_data: str,
+    safe_address: ChecksumAddress | None = None,
+    valid_to: int | None = None,
+    slippage_tolerance: float = 0.005,
+    partially_fillable: bool = False,
+) -> Order:
+    """Build the sell order to sign from its quote, applying slippage tolerance."""
+    quote = order_quote.quote
+    min_valid_to = quote.validTo if valid_to is None else min(quote.validTo, valid_to)
 
-    order = Order(
+    return Order(
         sell_token=sell_token,
         buy_token=buy_token,
         receiver=safe_address if safe_address is not None else account.address,
@@ -112,9 +165,7 @@ async def swap_tokens(
         sell_amount=str(
             amount
         ),  # Since it is a sell order, the sellAmountBeforeFee is the same as the sellAmount.
-        buy_amount=str(
-            int(int(order_quote.quote.buyAmount.root) * (1.0 - slippage_tolerance))
-        ),
+        buy_amount=str(int(int(quote.buyAmount.root) * (1.0 - slippage_tolerance))),
         fee_amount="0",  # CoW Swap does not charge fees.
         kind=OrderQuoteSideKindSell.sell.value,
         sell_token_balance="erc20",
@@ -122,27 +173,16 @@ async def swap_tokens(
         partially_fillable=partially_fillable,
     )
 
-    signature = (
-        PreSignSignature(
-            scheme=SigningScheme.PRESIGN,
-            data=safe_address,
-        )
-        if safe_address is not None
-        else sign_order(chain, account, order)
-    )
-    order_uid = await post_order(
-        account, safe_address, order, signature, order_book_api
-    )
-    order_link = order_book_api.get_order_link(order_uid)
-    return CompletedOrder(uid=order_uid, url=order_link)
-
 
 async def get_order_quote(
     order_quote_request: OrderQuoteRequest,
     order_side: OrderQuoteSide1,
     order_book_api: OrderBookApi,
-) -> OrderQuoteResponse:
-    return await order_book_api.post_quote(order_quote_request, order_side)
+) -> MaybeLite[OrderQuoteResponse]:
+    # The quote backs an order that is posted, so it must never come from a cache.
+    return await order_book_api.post_quote(
+        order_quote_request, order_side, use_cache=False
+    )
 
 
 def sign_order(chain: Chain, account: LocalAccount, order: Order) -> EcdsaSignature:
@@ -159,9 +199,18 @@ async def post_order(
     order: Order,
     signature: Signature,
     order_book_api: OrderBookApi,
+    chain: Chain | None = None,
+    order_domain: TypedDataDomain | None = None,
 ) -> UID:
+    """
+    Submit a signed order. With ``chain``, or the signing ``order_domain``
+    when the caller already has it, the order UID is computed locally and
+    submission is idempotent (see `OrderBookApi.post_order`), so a retry
+    after an attempt that reached the orderbook does not fail as a duplicate.
+    """
+    owner = safe_address if safe_address is not None else account.address
     order_creation = OrderCreation(
-        from_=safe_address if safe_address is not None else account.address,  # type: ignore # pyright doesn't recognize `populate_by_name=True`.
+        from_=owner,  # type: ignore # pyright doesn't recognize `populate_by_name=True`.
         sellToken=order.sellToken,
         buyToken=order.buyToken,
         sellAmount=str(order.sellAmount),
@@ -175,4 +224,11 @@ async def post_order(
         signingScheme=signature.scheme.name.lower(),
         receiver=order.receiver,
     )
-    return await order_book_api.post_order(order_creation)
+    if order_domain is None and chain is not None:
+        order_domain = domain(
+            chain=chain, verifying_contract=CowContractAddress.SETTLEMENT_CONTRACT.value
+        )
+    order_uid = None
+    if order_domain is not None:
+        order_uid = compute_order_uid(order_domain, order, owner)
+    return await order_book_api.post_order(order_creation, order_uid=order_uid)
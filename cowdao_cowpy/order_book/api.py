@@ -1,17 +1,38 @@
-from typing import Any, Dict, List, Optional, Union
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Dict,
+    List,
+    MutableSet,
+    Optional,
+    Union,
+)
 
 import httpx
 
 from cowdao_cowpy.common.api.api_base import ApiBase, Context
-from cowdao_cowpy.common.api.errors import UnexpectedResponseError
+from cowdao_cowpy.common.api.compression import CompressionConfig
+from cowdao_cowpy.common.api.errors import (
+    ApiResponseError,
+    NetworkError,
+    UnexpectedResponseError,
+)
+from cowdao_cowpy.common.api.json_stream import iter_json_array_items
+from cowdao_cowpy.common.api.scheduler import RequestScheduler
 from cowdao_cowpy.common.config import SupportedChainId, ENVS_LIST
 from cowdao_cowpy.order_book.config import OrderBookAPIConfigFactory
+from cowdao_cowpy.order_book.lite import MaybeLite
+from cowdao_cowpy.order_book.quote_cache import QuoteCache
 from cowdao_cowpy.order_book.generated.model import (
     UID,
     Address,
     AppDataHash,
     AppDataObject,
+    Auction,
+    AuctionOrder,
     CompetitionOrderStatus,
+    ErrorType,
     NativePriceResponse,
     Order,
     OrderCreation,
@@ -32,20 +53,66 @@ from cowdao_cowpy.order_book.generated.model import (
 )
 
 
+MAX_ORDERS_BY_UIDS = 128
+
+
+def _normalize_address(address: Union[Address, str, None]) -> Optional[str]:
+    if address is None:
+        return None
+    return (address.root if isinstance(address, Address) else address).lower()
+
+
 class OrderBookApi(ApiBase):
     def __init__(
         self,
         config=OrderBookAPIConfigFactory.get_config("prod", SupportedChainId.MAINNET),
         client: Optional[httpx.AsyncClient] = None,
+        trusted_responses: bool = False,
+        compression: Optional[CompressionConfig] = None,
+        quote_cache: Optional[QuoteCache] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        accepted_orders: Optional[MutableSet[str]] = None,
     ):
-        super().__init__(config, client=client)
+        """
+        Args:
+            config: The orderbook API configuration (environment and chain).
+            client: An optional shared httpx client; one is created lazily otherwise.
+            trusted_responses: Skip up-front pydantic validation of responses.
+                Object models (e.g. `Order`, `Trade`, `OrderQuoteResponse`) are
+                returned as `LiteModel` records with the same attribute names,
+                validating each field only when it is first read. Can be
+                overridden per request with ``context_override``.
+            compression: Content-encoding negotiation and request-body
+                compression. Defaults to accepting every coding that can be
+                decoded and sending bodies uncompressed. Byte counters are
+                available on `transfer_stats`.
+            quote_cache: Serve `post_quote` from this cache. May be shared
+                between clients; quotes are keyed by endpoint URL as well.
+            scheduler: Rate limiter admitting requests by priority lane. By
+                default clients share one `RequestScheduler` per host; writes
+                go in the write lane and reads in the interactive lane unless
+                ``context_override`` sets ``"lane"``.
+            accepted_orders: Record of order UIDs the orderbook has accepted.
+                `post_order` adds to it and skips orders already in it when
+                called with their ``order_uid``. Any mutable set works,
+                including a persistent one shared between processes.
+        """
+        super().__init__(
+            config,
+            client=client,
+            trusted_responses=trusted_responses,
+            compression=compression,
+            scheduler=scheduler,
+        )
+        self.quote_cache = quote_cache
+        self.accepted_orders = accepted_orders
 
     async def get_version(self, context_override: Context = {}) -> str:
         return await self._fetch("/api/v1/version", context_override=context_override)
 
     async def get_trades_by_owner(
         self, owner: Address, context_override: Context = {}
-    ) -> List[Trade]:
+    ) -> List[MaybeLite[Trade]]:
         response = await self._fetch(
             path="/api/v1/trades",
             params={"owner": owner},
@@ -56,7 +123,7 @@ class OrderBookApi(ApiBase):
 
     async def get_trades_by_order_uid(
         self, order_uid: UID, context_override: Context = {}
-    ) -> List[Trade]:
+    ) -> List[MaybeLite[Trade]]:
         response = await self._fetch(
             path="/api/v1/trades",
             params={"order_uid": order_uid},
@@ -71,7 +138,7 @@ class OrderBookApi(ApiBase):
         limit: int = 1000,
         offset: int = 0,
         context_override: Context = {},
-    ) -> List[Order]:
+    ) -> List[MaybeLite[Order]]:
         return await self._fetch(
             path=f"/api/v1/account/{owner}/orders",
             params={"limit": limit, "offset": offset},
@@ -81,16 +148,39 @@ class OrderBookApi(ApiBase):
 
     async def get_order_by_uid(
         self, order_uid: UID, context_override: Context = {}
-    ) -> Order:
+    ) -> MaybeLite[Order]:
         return await self._fetch(
             path=f"/api/v1/orders/{order_uid.root}",
             context_override=context_override,
             response_model=Order,
         )
 
+    async def get_orders_by_uids(
+        self, order_uids: List[Union[UID, str]], context_override: Context = {}
+    ) -> List[MaybeLite[Order]]:
+        """
+        Fetch up to `MAX_ORDERS_BY_UIDS` orders in a single request.
+
+        Unknown UIDs, and orders the API failed to convert, are missing from
+        the result; its ordering is not guaranteed.
+        """
+        if len(order_uids) > MAX_ORDERS_BY_UIDS:
+            raise ValueError(
+                f"At most {MAX_ORDERS_BY_UIDS} order UIDs can be fetched at once"
+            )
+        response = await self._fetch(
+            path="/api/v1/orders/by_uids",
+            method="POST",
+            json=[uid.root if isinstance(uid, UID) else uid for uid in order_uids],
+            context_override=context_override,
+        )
+        lite = context_override.get("trusted_responses", self.trusted_responses)
+        orders = [item["order"] for item in response if "order" in item]
+        return self.deserialize_model(orders, List[Order], lite=lite)  # type: ignore[return-value]
+
     async def get_order_multi_env(
         self, order_uid: UID, context_override: Context = {}
-    ) -> Order | None:
+    ) -> Optional[MaybeLite[Order]]:
         for env in ENVS_LIST:
             # TODO extract & exclude current env from loop.
             try:
@@ -103,7 +193,7 @@ class OrderBookApi(ApiBase):
 
     async def get_order_competition_status(
         self, order_uid: UID, context_override: Context = {}
-    ) -> CompetitionOrderStatus:
+    ) -> MaybeLite[CompetitionOrderStatus]:
         return await self._fetch(
             path=f"/api/v1/orders/{order_uid.root}/status",
             context_override=context_override,
@@ -115,7 +205,7 @@ class OrderBookApi(ApiBase):
 
     async def get_tx_orders(
         self, tx_hash: TransactionHash, context_override: Context = {}
-    ) -> List[Order]:
+    ) -> List[MaybeLite[Order]]:
         return await self._fetch(
             path=f"/api/v1/transactions/{tx_hash}/orders",
             context_override=context_override,
@@ -124,7 +214,7 @@ class OrderBookApi(ApiBase):
 
     async def get_native_price(
         self, token_address: Address, context_override: Context = {}
-    ) -> NativePriceResponse:
+    ) -> MaybeLite[NativePriceResponse]:
         return await self._fetch(
             path=f"/api/v1/token/{token_address}/native_price",
             context_override=context_override,
@@ -133,16 +223,75 @@ class OrderBookApi(ApiBase):
 
     async def get_total_surplus(
         self, user: Address, context_override: Context = {}
-    ) -> TotalSurplus:
+    ) -> MaybeLite[TotalSurplus]:
         return await self._fetch(
             path=f"/api/v1/users/{user}/total_surplus",
             context_override=context_override,
             response_model=TotalSurplus,
         )
 
+    async def get_auction(self, context_override: Context = {}) -> MaybeLite[Auction]:
+        return await self._fetch(
+            path="/api/v1/auction",
+            context_override=context_override,
+            response_model=Auction,
+        )
+
+    async def iter_auction_orders(
+        self,
+        owner: Union[Address, str, None] = None,
+        sell_token: Union[Address, str, None] = None,
+        buy_token: Union[Address, str, None] = None,
+        context_override: Context = {},
+    ) -> AsyncIterator[AuctionOrder]:
+        """
+        Stream the orders of the current batch auction one at a time.
+
+        Unlike `get_auction`, the response is parsed incrementally from the byte
+        stream, so memory stays bounded by a single order regardless of the
+        auction size. Filters are applied to the raw order before it is
+        validated, so skipped orders never pay for pydantic validation.
+
+        Args:
+            owner: Only yield orders from this owner.
+            sell_token: Only yield orders selling this token.
+            buy_token: Only yield orders buying this token.
+            context_override: Request-specific configuration, see `_fetch`.
+
+        Yields:
+            The matching orders of the auction, in response order.
+        """
+        filters = {
+            field: value
+            for field, value in (
+                ("owner", _normalize_address(owner)),
+                ("sellToken", _normalize_address(sell_token)),
+                ("buyToken", _normalize_address(buy_token)),
+            )
+            if value is not None
+        }
+
+        response = await self._open_stream(
+            "/api/v1/auction", context_override=context_override
+        )
+        chunks = self.request_strategy.iter_bytes(response)
+        try:
+            async for item in iter_json_array_items(chunks, "orders"):
+                if any(
+                    str(item.get(field, "")).lower() != value
+                    for field, value in filters.items()
+                ):
+                    continue
+                yield AuctionOrder(**item)
+        except httpx.TransportError as e:
+            raise NetworkError(f"Network error occurred: {str(e)}") from e
+        finally:
+            await chunks.aclose()
+            await response.aclose()
+
     async def get_solver_competition(
         self, action_id: Union[int, str] = "latest", context_override: Context = {}
-    ) -> SolverCompetitionResponse:
+    ) -> MaybeLite[SolverCompetitionResponse]:
         # v1 was decommissioned; v2 exposes a dedicated /latest path and keys
         # the by-id lookup on the auction id.
         path = (
@@ -158,7 +307,7 @@ class OrderBookApi(ApiBase):
 
     async def get_solver_competition_by_tx_hash(
         self, tx_hash: TransactionHash, context_override: Context = {}
-    ) -> SolverCompetitionResponse:
+    ) -> MaybeLite[SolverCompetitionResponse]:
         return await self._fetch(
             path=f"/api/v2/solver_competition/by_tx_hash/{tx_hash}",
             context_override=context_override,
@@ -173,29 +322,83 @@ class OrderBookApi(ApiBase):
             OrderQuoteValidity, OrderQuoteValidity1, OrderQuoteValidity2
         ] = OrderQuoteValidity1(validTo=None),
         context_override: Context = {},
-    ) -> OrderQuoteResponse:
+        use_cache: bool = True,
+    ) -> MaybeLite[OrderQuoteResponse]:
+        """
+        Request a price quote.
+
+        When the client has a `quote_cache`, a cached quote for an equivalent
+        request may be returned. Pass ``use_cache=False`` for quotes that back
+        an order which is actually going to be posted.
+        """
         json_data = {
-            **self.serialize_model(request),
+            **self.serialize_model(request),  # type: ignore
             **self.serialize_model(side),  # type: ignore
             **self.serialize_model(validity),  # type: ignore
         }
-        return await self._fetch(
-            path="/api/v1/quote",
-            method="POST",
-            json=json_data,
-            context_override=context_override,
-            response_model=OrderQuoteResponse,
+
+        def fetch() -> Awaitable[MaybeLite[OrderQuoteResponse]]:
+            return self._fetch(
+                path="/api/v1/quote",
+                method="POST",
+                json=json_data,
+                context_override=context_override,
+                response_model=OrderQuoteResponse,
+            )
+
+        if self.quote_cache is None:
+            return await fetch()
+        key = self.quote_cache.key(
+            self._resolve_url("/api/v1/quote", context_override), json_data
         )
+        pair = (json_data["sellToken"], json_data["buyToken"])
+        return await self.quote_cache.get(key, pair, fetch, use_cache=use_cache)
 
     async def post_order(
-        self, order: OrderCreation, context_override: Context = {}
+        self,
+        order: OrderCreation,
+        context_override: Context = {},
+        order_uid: Optional[str] = None,
     ) -> UID:
-        response = await self._fetch(
-            path="/api/v1/orders",
-            method="POST",
-            json=order,
-            context_override=context_override,
-        )
+        """
+        Submit a signed order.
+
+        Passing the locally computed ``order_uid`` (see `compute_order_uid`)
+        makes the call idempotent: when a retried attempt is rejected as a
+        `DuplicatedOrder` and the orderbook holds ``order_uid``, because an
+        earlier attempt did reach it, the order is reported as posted, and
+        orders already in `accepted_orders` are not sent again. A UID returned
+        by the orderbook that differs from ``order_uid`` raises
+        `UnexpectedResponseError`.
+        """
+        if order_uid is not None:
+            order_uid = order_uid.lower()
+            if self.accepted_orders is not None and order_uid in self.accepted_orders:
+                return UID(order_uid)
+        try:
+            response = await self._fetch(
+                path="/api/v1/orders",
+                method="POST",
+                json=order,
+                context_override=context_override,
+            )
+        except ApiResponseError as e:
+            if order_uid is None or e.error_type != ErrorType.DuplicatedOrder.value:
+                raise
+            # Only an order with this very UID makes the duplicate ours.
+            try:
+                await self.get_order_by_uid(UID(order_uid), context_override)
+            except Exception as lookup_error:
+                raise e from lookup_error
+            response = order_uid
+        if order_uid is not None:
+            if str(response).lower() != order_uid:
+                raise UnexpectedResponseError(
+                    f"Orderbook returned order UID {response}, expected {order_uid}",
+                    response,
+                )
+            if self.accepted_orders is not None:
+                self.accepted_orders.add(order_uid)
         return UID(response)
 
     async def delete_order(
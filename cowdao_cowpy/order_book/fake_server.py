@@ -0,0 +1,800 @@
+"""
+An in-process stand-in for the orderbook API, for offline tests and benchmarks.
+
+`FakeOrderBook` is an ASGI application whose routes are those of the
+orderbook ``openapi.yml``, shipped as the generated `ROUTES` table. It keeps
+orders, trades, app data and solver competitions in memory, seeded
+deterministically, and can add latency and inject errors and rate limiting.
+Mount it under `OrderBookApi` with `FakeOrderBook.order_book_api` (or any
+httpx client with `FakeOrderBook.transport`):
+
+    server = FakeOrderBook(latency=Latency(median=0.02, sigma=0.5))
+    server.seed(orders=1000)
+    api = server.order_book_api()
+    order = await api.get_order_by_uid(UID(server.uids[0]))
+"""
+
+import asyncio
+import json
+import math
+import random
+import re
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Pattern,
+    Tuple,
+    Union,
+    cast,
+)
+from urllib.parse import parse_qs
+
+import httpx
+from web3 import Web3
+from web3.constants import ADDRESS_ZERO
+
+from cowdao_cowpy.common.api.scheduler import RequestScheduler, TokenBucket
+from cowdao_cowpy.common.chains import Chain
+from cowdao_cowpy.common.constants import CowContractAddress
+from cowdao_cowpy.contracts.domain import domain
+from cowdao_cowpy.contracts.order import Order, compute_order_uid
+from cowdao_cowpy.order_book.api import MAX_ORDERS_BY_UIDS, OrderBookApi
+from cowdao_cowpy.order_book.config import Envs, OrderBookAPIConfigFactory
+from cowdao_cowpy.order_book.generated.routes import ROUTES
+
+_METHODS = ("get", "post", "put", "delete", "patch")
+_APP_DATA_HASH = re.compile(r"^0x[0-9a-fA-F]{64}$")
+
+JsonBody = Union[Dict[str, Any], List[Any], str, None]
+
+
+@dataclass(frozen=True)
+class Latency:
+    """
+    A log-normal response delay: ``median`` seconds, with ``sigma`` widening
+    the tail. ``sigma=0`` gives a fixed delay.
+    """
+
+    median: float = 0.0
+    sigma: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        if self.median <= 0:
+            return 0.0
+        if self.sigma <= 0:
+            return self.median
+        return rng.lognormvariate(math.log(self.median), self.sigma)
+
+
+@dataclass
+class ServerStats:
+    requests: Counter = field(default_factory=Counter)
+    throttled: int = 0
+    errors: int = 0
+
+
+@dataclass
+class _Route:
+    operation_id: str
+    method: str
+    pattern: Pattern[str]
+    literal_segments: int
+
+
+@dataclass
+class _Response:
+    status: int
+    body: JsonBody = None
+    events: Optional[List[Tuple[str, Any]]] = None
+
+
+def _error(status: int, error_type: str, description: str) -> _Response:
+    return _Response(status, {"errorType": error_type, "description": description})
+
+
+RouteTable = List[Tuple[str, str, str]]
+
+
+def read_spec_routes(spec_path: Union[str, Path]) -> RouteTable:
+    """The (operationId, method, path) of every operation in an OpenAPI spec."""
+    try:
+        import yaml
+    except ImportError as e:  # pragma: no cover - PyYAML ships with the dev tools
+        raise ImportError("Reading openapi.yml needs PyYAML") from e
+
+    with open(spec_path, "r") as f:
+        spec = yaml.safe_load(f)
+    return [
+        (operation["operationId"], method, path)
+        for path, operations in spec.get("paths", {}).items()
+        for method, operation in operations.items()
+        if method in _METHODS
+    ]
+
+
+def load_routes(spec_path: Optional[Union[str, Path]] = None) -> List[_Route]:
+    """The routes of `ROUTES`, or of the operations in the spec at ``spec_path``."""
+    table = ROUTES if spec_path is None else read_spec_routes(spec_path)
+    routes = []
+    for operation_id, method, path in table:
+        # Like request paths, drop prefixes such as `/restricted`.
+        segments = path[max(path.find("/api/"), 0) :].strip("/").split("/")
+        regex = "/".join(
+            f"(?P<{segment[1:-1]}>[^/]+)"
+            if segment.startswith("{")
+            else re.escape(segment)
+            for segment in segments
+        )
+        literal = sum(not segment.startswith("{") for segment in segments)
+        routes.append(
+            _Route(operation_id, method.upper(), re.compile(f"^/{regex}$"), literal)
+        )
+    # Literal paths (e.g. `/solver_competition/latest`) win over templates.
+    routes.sort(key=lambda route: -route.literal_segments)
+    return routes
+
+
+def write_routes(spec_path: Union[str, Path], output_path: Union[str, Path]) -> None:
+    """Generate the `ROUTES` module from an OpenAPI spec."""
+    lines = [
+        "# generated by cowdao_cowpy.order_book.fake_server from openapi.yml",
+        "from typing import List, Tuple",
+        "",
+        "ROUTES: List[Tuple[str, str, str]] = [",
+        *(f"    {route!r}," for route in read_spec_routes(spec_path)),
+        "]",
+        "",
+    ]
+    with open(output_path, "w") as f:
+        f.write("\n".join(lines))
+
+
+class FakeOrderBook:
+    """
+    An in-memory orderbook served as an ASGI application.
+
+    Every operation of the spec is routed; the ones a client of this SDK
+    uses are implemented (orders, by_uids, trades v1 and v2, quote and
+    quote/stream, auction, app_data, native prices, total surplus and solver
+    competitions) and the others answer 501. Any path prefix before ``/api/``
+    is ignored, so one server can stand in for every chain's base URL.
+
+    Each request goes through, in order: the server-side ``rate_limit``
+    (429 once exceeded), random 429s with probability ``throttle_rate``,
+    random 500s with probability ``error_rate``, then a delay drawn from the
+    operation's latency. All randomness comes from ``seed``.
+
+    Args:
+        chain: The chain whose domain is used to compute the UID of posted orders.
+        seed: Seed of fixtures, latencies and injected faults.
+        latency: Default response delay.
+        operation_latency: Delays of individual operations, by operationId.
+        error_rate: Probability of answering 500.
+        throttle_rate: Probability of answering 429.
+        rate_limit: Requests per second served before answering 429.
+        quote_lifetime: Seconds until quotes expire.
+        spec_path: An OpenAPI spec to read the routes from instead of `ROUTES`.
+        wall_clock: POSIX time source for timestamps.
+    """
+
+    def __init__(
+        self,
+        chain: Chain = Chain.MAINNET,
+        seed: int = 0,
+        latency: Latency = Latency(),
+        operation_latency: Optional[Mapping[str, Latency]] = None,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        rate_limit: Optional[float] = None,
+        quote_lifetime: float = 60.0,
+        spec_path: Optional[Union[str, Path]] = None,
+        wall_clock: Callable[[], float] = time.time,
+    ):
+        self.chain = chain
+        self.domain = domain(chain, CowContractAddress.SETTLEMENT_CONTRACT.value)
+        self.latency = latency
+        self.operation_latency = dict(operation_latency or {})
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.quote_lifetime = quote_lifetime
+        self.wall_clock = wall_clock
+        self.stats = ServerStats()
+        self.routes = load_routes(spec_path)
+        self.orders: Dict[str, Dict[str, Any]] = {}
+        self.trades: List[Dict[str, Any]] = []
+        self.app_data: Dict[str, str] = {}
+        self.competitions: Dict[int, Dict[str, Any]] = {}
+        self.native_prices: Dict[str, float] = {}
+        self._rng = random.Random(seed)
+        self._fixtures = random.Random(seed)
+        self._bucket = TokenBucket(rate_limit) if rate_limit else None
+        self._quote_id = 0
+        self._handlers: Dict[str, Callable[..., Awaitable[_Response]]] = {
+            "createOrder": self._create_order,
+            "cancelOrders": self._cancel_orders,
+            "getOrders": self._get_orders,
+            "getOrder": self._get_order,
+            "cancelOrder": self._cancel_order,
+            "getOrderStatus": self._get_order_status,
+            "getOrdersByTxHash": self._get_orders_by_tx_hash,
+            "getTrades": self._get_trades,
+            "getTradesV2": self._get_trades_v2,
+            "getCurrentBatchAuction": self._get_auction,
+            "getUserOrdersPaginated": self._get_user_orders,
+            "getTokenNativePrice": self._get_native_price,
+            "quote": self._quote,
+            "quoteStream": self._quote_stream,
+            "getSolverCompetitionByAuctionIdV2": self._get_competition,
+            "getSolverCompetitionByTxHashV2": self._get_competition_by_tx_hash,
+            "getSolverCompetitionLatestV2": self._get_latest_competition,
+            "getApiVersion": self._get_version,
+            "getAppDataByHash": self._get_app_data,
+            "registerAppDataByHash": self._put_app_data,
+            "registerAppData": self._put_app_data,
+            "getAddressTotalSurplus": self._get_total_surplus,
+        }
+
+    @property
+    def uids(self) -> List[str]:
+        """UIDs of the stored orders, in insertion order."""
+        return list(self.orders)
+
+    def transport(self) -> httpx.ASGITransport:
+        return httpx.ASGITransport(app=self)  # type: ignore[arg-type]
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=self.transport())
+
+    def order_book_api(
+        self, env: Envs = "prod", scheduler: Optional[RequestScheduler] = None, **kwargs
+    ) -> OrderBookApi:
+        """
+        An `OrderBookApi` for this server's chain sending requests here.
+
+        The client-side rate limit is lifted unless ``scheduler`` is given, so
+        the server's own limits are what a benchmark measures.
+        """
+        return OrderBookApi(
+            OrderBookAPIConfigFactory.get_config(env, self.chain.chain_id),
+            client=self.client(),
+            scheduler=scheduler or RequestScheduler(rate=1_000_000),
+            **kwargs,
+        )
+
+    def seed(
+        self,
+        orders: int = 0,
+        owners: int = 10,
+        fulfilled_ratio: float = 0.3,
+        competitions: int = 1,
+    ) -> None:
+        """
+        Add deterministic fixtures: ``orders`` orders spread over ``owners``
+        owners, of which ``fulfilled_ratio`` are settled with a trade, plus
+        ``competitions`` solver competitions.
+        """
+        rng = self._fixtures
+        owner_addresses = [
+            Web3.to_checksum_address(f"0x{rng.getrandbits(160):040x}")
+            for _ in range(max(owners, 1))
+        ]
+        tokens = [
+            Web3.to_checksum_address(f"0x{rng.getrandbits(160):040x}") for _ in range(8)
+        ]
+        for token in tokens:
+            self.native_prices.setdefault(token.lower(), rng.uniform(1e-9, 1e-3))
+        valid_to = int(self.wall_clock()) + 3600
+        for i in range(orders):
+            sell_token, buy_token = rng.sample(tokens, 2)
+            owner = owner_addresses[i % len(owner_addresses)]
+            digest = f"{rng.getrandbits(256):064x}"
+            uid = f"0x{digest}{owner[2:].lower()}{valid_to:08x}"
+            order = self._order_fields(
+                uid=uid,
+                owner=owner,
+                body={
+                    "sellToken": sell_token,
+                    "buyToken": buy_token,
+                    "receiver": owner,
+                    "sellAmount": str(rng.randrange(10**15, 10**21)),
+                    "buyAmount": str(rng.randrange(10**15, 10**21)),
+                    "validTo": valid_to,
+                    "appData": "0x" + "00" * 32,
+                    "feeAmount": "0",
+                    "kind": rng.choice(("sell", "buy")),
+                    "partiallyFillable": False,
+                    "signingScheme": "eip712",
+                    "signature": f"0x{rng.getrandbits(520):0130x}",
+                },
+            )
+            self.orders[uid] = order
+            if rng.random() < fulfilled_ratio:
+                self._settle(order, rng)
+        for _ in range(competitions):
+            self._add_competition(rng)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "lifespan":
+            while (await receive())["type"] != "lifespan.shutdown":
+                await send({"type": "lifespan.startup.complete"})
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        response = await self.handle(
+            scope["method"],
+            scope["path"],
+            parse_qs(scope.get("query_string", b"").decode()),
+            body,
+        )
+        await self._send(send, response)
+
+    async def handle(
+        self, method: str, path: str, query: Dict[str, List[str]], body: bytes
+    ) -> _Response:
+        """Answer one request."""
+        index = path.find("/api/")
+        path = (path[index:] if index >= 0 else path).rstrip("/")
+        route, params = self._match(method, path)
+        if route is None:
+            return _error(404 if params is None else 405, "NotFound", path)
+        self.stats.requests[route.operation_id] += 1
+
+        if self._bucket is not None and self._bucket.try_acquire() > 0:
+            self.stats.throttled += 1
+            return _error(429, "TooManyRequests", "rate limit exceeded")
+        if self.throttle_rate and self._rng.random() < self.throttle_rate:
+            self.stats.throttled += 1
+            return _error(429, "TooManyRequests", "injected rate limit")
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self.stats.errors += 1
+            return _error(500, "InternalServerError", "injected error")
+        delay = self.operation_latency.get(route.operation_id, self.latency).sample(
+            self._rng
+        )
+        if delay:
+            await asyncio.sleep(delay)
+
+        handler = self._handlers.get(route.operation_id)
+        if handler is None:
+            return _error(501, "NotImplemented", route.operation_id)
+        payload: Any = None
+        if body:
+            try:
+                payload = json.loads(body)
+            except json.JSONDecodeError:
+                return _error(422, "InvalidJson", "unable to parse request body")
+        query_values = {key: values[-1] for key, values in query.items()}
+        return await handler(params=params, query=query_values, body=payload)
+
+    def _match(
+        self, method: str, path: str
+    ) -> Tuple[Optional[_Route], Optional[Dict[str, str]]]:
+        """The route and path parameters; params are {} for a method mismatch."""
+        path_matched = False
+        for route in self.routes:
+            match = route.pattern.match(path)
+            if match is None:
+                continue
+            if route.method == method.upper():
+                return route, match.groupdict()
+            path_matched = True
+        return None, {} if path_matched else None
+
+    async def _send(self, send, response: _Response) -> None:
+        if response.events is not None:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": response.status,
+                    "headers": [(b"content-type", b"text/event-stream")],
+                }
+            )
+            for event, data in response.events:
+                chunk = f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": True}
+                )
+            await send({"type": "http.response.body", "body": b""})
+            return
+        content = json.dumps(response.body).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(content)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": content})
+
+    # Fixtures
+
+    def _now_iso(self, offset: float = 0.0) -> str:
+        moment = datetime.fromtimestamp(self.wall_clock() + offset, timezone.utc)
+        return moment.isoformat().replace("+00:00", "Z")
+
+    def _order_fields(
+        self, uid: str, owner: str, body: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        app_data = body["appData"]
+        return {
+            "creationDate": self._now_iso(),
+            "class": "limit",
+            "owner": owner,
+            "uid": uid,
+            "availableBalance": None,
+            "executedSellAmount": "0",
+            "executedSellAmountBeforeFees": "0",
+            "executedBuyAmount": "0",
+            "executedFeeAmount": "0",
+            "invalidated": False,
+            "status": (
+                "presignaturePending"
+                if body.get("signingScheme") == "presign"
+                else "open"
+            ),
+            "isLiquidityOrder": False,
+            "settlementContract": CowContractAddress.SETTLEMENT_CONTRACT.value,
+            "fullAppData": self.app_data.get(str(app_data).lower()),
+            "sellToken": body["sellToken"],
+            "buyToken": body["buyToken"],
+            "receiver": body.get("receiver"),
+            "sellAmount": str(body["sellAmount"]),
+            "buyAmount": str(body["buyAmount"]),
+            "validTo": int(body["validTo"]),
+            "feeAmount": str(body.get("feeAmount", "0")),
+            "kind": body["kind"],
+            "partiallyFillable": bool(body.get("partiallyFillable", False)),
+            "sellTokenBalance": body.get("sellTokenBalance", "erc20"),
+            "buyTokenBalance": body.get("buyTokenBalance", "erc20"),
+            "signingScheme": body.get("signingScheme", "eip712"),
+            "signature": body.get("signature", "0x"),
+            "appData": app_data,
+            "interactions": {"pre": [], "post": []},
+        }
+
+    def _settle(self, order: Dict[str, Any], rng: random.Random) -> None:
+        order["status"] = "fulfilled"
+        order["executedSellAmount"] = order["sellAmount"]
+        order["executedSellAmountBeforeFees"] = order["sellAmount"]
+        order["executedBuyAmount"] = order["buyAmount"]
+        self.trades.append(
+            {
+                "blockNumber": 20_000_000 + len(self.trades),
+                "logIndex": rng.randrange(500),
+                "orderUid": order["uid"],
+                "owner": order["owner"],
+                "sellToken": order["sellToken"],
+                "buyToken": order["buyToken"],
+                "sellAmount": order["sellAmount"],
+                "sellAmountBeforeFees": order["sellAmount"],
+                "buyAmount": order["buyAmount"],
+                "txHash": f"0x{rng.getrandbits(256):064x}",
+            }
+        )
+
+    def _add_competition(self, rng: random.Random) -> None:
+        auction_id = 9_000_000 + len(self.competitions)
+        tx_hash = f"0x{rng.getrandbits(256):064x}"
+        self.competitions[auction_id] = {
+            "auctionId": auction_id,
+            "auctionStartBlock": 20_000_000 + auction_id % 1000,
+            "auctionDeadlineBlock": 20_000_003 + auction_id % 1000,
+            "transactionHashes": [tx_hash],
+            "solutions": [
+                {
+                    "ranking": 1,
+                    "solverAddress": f"0x{rng.getrandbits(160):040x}",
+                    "score": str(rng.randrange(10**15, 10**18)),
+                    "txHash": tx_hash,
+                }
+            ],
+        }
+
+    def _quote_response(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        self._quote_id += 1
+        sell_token, buy_token = body["sellToken"], body["buyToken"]
+        price = self._price(buy_token) / self._price(sell_token)
+        if body.get("kind") == "buy":
+            buy_amount = int(body["buyAmountAfterFee"])
+            sell_amount = int(buy_amount / price) + 1
+        else:
+            sell_amount = int(
+                body.get("sellAmountBeforeFee") or body.get("sellAmountAfterFee")
+            )
+            buy_amount = int(sell_amount * price)
+        return {
+            "quote": {
+                "sellToken": sell_token,
+                "buyToken": buy_token,
+                "receiver": body.get("receiver") or body.get("from"),
+                "sellAmount": str(sell_amount),
+                "buyAmount": str(buy_amount),
+                "feeAmount": "0",
+                "validTo": body.get("validTo")
+                or int(self.wall_clock() + body.get("validFor", 1800)),
+                "appData": body.get("appData") or "0x" + "00" * 32,
+                "partiallyFillable": False,
+                "sellTokenBalance": body.get("sellTokenBalance", "erc20"),
+                "buyTokenBalance": body.get("buyTokenBalance", "erc20"),
+                "kind": body.get("kind", "sell"),
+                "signingScheme": body.get("signingScheme", "eip712"),
+                "gasAmount": "150000",
+                "gasPrice": "15000000000",
+                "sellTokenPrice": str(self._price(sell_token)),
+            },
+            "from": body.get("from"),
+            "expiration": self._now_iso(self.quote_lifetime),
+            "id": self._quote_id,
+            "verified": True,
+        }
+
+    def _price(self, token: str) -> float:
+        """Native price of ``token``, fixed per token from the seed."""
+        key = token.lower()
+        if key not in self.native_prices:
+            self.native_prices[key] = random.Random(f"{key}").uniform(1e-9, 1e-3)
+        return self.native_prices[key]
+
+    def _uid_of(self, body: Dict[str, Any], owner: str) -> str:
+        app_data = body["appData"]
+        if not _APP_DATA_HASH.match(str(app_data)):
+            app_data = body.get("appDataHash") or Web3.to_hex(
+                Web3.keccak(text=app_data)
+            )
+        receiver = body.get("receiver")
+        order = Order(
+            sell_token=body["sellToken"],
+            buy_token=body["buyToken"],
+            # The zero address and no receiver both mean the owner.
+            receiver=None if receiver == ADDRESS_ZERO else receiver,  # type: ignore[arg-type]
+            sell_amount=str(body["sellAmount"]),
+            buy_amount=str(body["buyAmount"]),
+            valid_to=int(body["validTo"]),
+            app_data=app_data,
+            fee_amount=str(body.get("feeAmount", "0")),
+            kind=body["kind"],
+            partially_fillable=bool(body.get("partiallyFillable", False)),
+            sell_token_balance=body.get("sellTokenBalance"),
+            buy_token_balance=body.get("buyTokenBalance"),
+        )
+        return compute_order_uid(self.domain, order, owner).lower()
+
+    def _auction_order(self, order: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "uid": order["uid"],
+            "sellToken": order["sellToken"],
+            "buyToken": order["buyToken"],
+            "sellAmount": order["sellAmount"],
+            "buyAmount": order["buyAmount"],
+            "created": str(int(self.wall_clock())),
+            "validTo": order["validTo"],
+            "kind": order["kind"],
+            "receiver": order["receiver"],
+            "owner": order["owner"],
+            "partiallyFillable": order["partiallyFillable"],
+            "executed": order["executedSellAmount"],
+            "preInteractions": [],
+            "postInteractions": [],
+            "sellTokenBalance": order["sellTokenBalance"],
+            "buyTokenBalance": order["buyTokenBalance"],
+            "class": order["class"],
+            "appData": order["appData"],
+            "signature": order["signature"],
+            "protocolFees": [],
+        }
+
+    # Handlers
+
+    async def _create_order(self, body: Any, **_) -> _Response:
+        if not isinstance(body, dict):
+            return _error(400, "InvalidJson", "expected an order object")
+        owner = body.get("from")
+        if not owner:
+            return _error(400, "MissingFrom", "the order owner must be set")
+        try:
+            uid = self._uid_of(body, owner)
+        except (KeyError, TypeError, ValueError) as e:
+            return _error(400, "InvalidOrder", repr(e))
+        if uid in self.orders:
+            return _error(400, "DuplicatedOrder", "order already exists")
+        self.orders[uid] = self._order_fields(uid, owner, body)
+        return _Response(201, uid)
+
+    async def _cancel_orders(self, body: Any, **_) -> _Response:
+        uids = [uid.lower() for uid in (body or {}).get("orderUids", [])]
+        if any(uid not in self.orders for uid in uids):
+            return _error(404, "OrderNotFound", "unknown order")
+        for uid in uids:
+            self.orders[uid]["status"] = "cancelled"
+            self.orders[uid]["invalidated"] = True
+        return _Response(200, "Cancelled")
+
+    async def _cancel_order(self, params: Dict[str, str], **_) -> _Response:
+        return await self._cancel_orders(body={"orderUids": [params["UID"]]})
+
+    async def _get_orders(self, body: Any, **_) -> _Response:
+        if not isinstance(body, list) or len(body) > MAX_ORDERS_BY_UIDS:
+            return _error(400, "InvalidRequest", "expected up to 128 order uids")
+        found = (self.orders.get(str(uid).lower()) for uid in body)
+        return _Response(200, [{"order": order} for order in found if order])
+
+    async def _get_order(self, params: Dict[str, str], **_) -> _Response:
+        order = self.orders.get(params["UID"].lower())
+        if order is None:
+            return _error(404, "OrderNotFound", "order was not found")
+        return _Response(200, order)
+
+    async def _get_order_status(self, params: Dict[str, str], **_) -> _Response:
+        order = self.orders.get(params["UID"].lower())
+        if order is None:
+            return _error(404, "OrderNotFound", "order was not found")
+        status = {"fulfilled": "traded", "cancelled": "cancelled"}.get(
+            order["status"], "open"
+        )
+        return _Response(200, {"type": status, "value": []})
+
+    async def _get_orders_by_tx_hash(self, params: Dict[str, str], **_) -> _Response:
+        tx_hash = params["txHash"].lower()
+        uids = [
+            trade["orderUid"] for trade in self.trades if trade["txHash"] == tx_hash
+        ]
+        return _Response(200, [self.orders[uid] for uid in uids])
+
+    def _matching_trades(self, query: Dict[str, str]) -> Optional[List[Dict]]:
+        owner = query.get("owner")
+        # The SDK sends `order_uid`; the spec names it `orderUid`.
+        order_uid = query.get("orderUid") or query.get("order_uid")
+        if (owner is None) == (order_uid is None):
+            return None
+        if owner is not None:
+            trades = [t for t in self.trades if t["owner"].lower() == owner.lower()]
+        else:
+            uid = cast(str, order_uid).lower()
+            trades = [t for t in self.trades if t["orderUid"] == uid]
+        return sorted(
+            trades, key=lambda t: (t["blockNumber"], t["logIndex"]), reverse=True
+        )
+
+    async def _get_trades(self, query: Dict[str, str], **_) -> _Response:
+        trades = self._matching_trades(query)
+        if trades is None:
+            return _error(400, "InvalidRequest", "set exactly one of owner, orderUid")
+        return _Response(200, trades)
+
+    async def _get_trades_v2(self, query: Dict[str, str], **_) -> _Response:
+        trades = self._matching_trades(query)
+        if trades is None:
+            return _error(400, "InvalidRequest", "set exactly one of owner, orderUid")
+        offset, limit = int(query.get("offset", 0)), int(query.get("limit", 10))
+        if not 1 <= limit <= 1000:
+            return _error(400, "InvalidLimit", "limit must be between 1 and 1000")
+        return _Response(200, trades[offset : offset + limit])
+
+    async def _get_auction(self, **_) -> _Response:
+        orders = [
+            self._auction_order(order)
+            for order in self.orders.values()
+            if order["status"] == "open"
+        ]
+        tokens = {o["sellToken"].lower() for o in orders} | {
+            o["buyToken"].lower() for o in orders
+        }
+        return _Response(
+            200,
+            {
+                "id": 9_000_000 + len(self.competitions),
+                "block": 20_000_000,
+                "orders": orders,
+                "prices": {t: str(int(self._price(t) * 10**18)) for t in tokens},
+                "surplusCapturingJitOrderOwners": [],
+            },
+        )
+
+    async def _get_user_orders(
+        self, params: Dict[str, str], query: Dict[str, str], **_
+    ) -> _Response:
+        owner = params["owner"].lower()
+        offset, limit = int(query.get("offset", 0)), int(query.get("limit", 10))
+        orders = [o for o in self.orders.values() if o["owner"].lower() == owner]
+        orders.reverse()  # Newest first.
+        return _Response(200, orders[offset : offset + limit])
+
+    async def _get_native_price(self, params: Dict[str, str], **_) -> _Response:
+        return _Response(200, {"price": self._price(params["token"])})
+
+    async def _quote(self, body: Any, **_) -> _Response:
+        if not isinstance(body, dict) or not body.get("from"):
+            return _error(400, "MissingFrom", "the quote owner must be set")
+        return _Response(200, self._quote_response(body))
+
+    async def _quote_stream(self, body: Any, **_) -> _Response:
+        if not isinstance(body, dict) or not body.get("from"):
+            return _error(400, "MissingFrom", "the quote owner must be set")
+        # One event per simulated solver.
+        events = []
+        for _solver in range(3):
+            quote = self._quote_response(body)
+            quote["id"] = None
+            events.append(("quote", quote))
+        return _Response(200, events=events)
+
+    async def _get_competition(self, params: Dict[str, str], **_) -> _Response:
+        try:
+            competition = self.competitions.get(int(params["auction_id"]))
+        except ValueError:
+            return _error(400, "InvalidAuctionId", params["auction_id"])
+        if competition is None:
+            return _error(404, "NotFound", "no competition for this auction")
+        return _Response(200, competition)
+
+    async def _get_competition_by_tx_hash(
+        self, params: Dict[str, str], **_
+    ) -> _Response:
+        tx_hash = params["tx_hash"].lower()
+        for competition in self.competitions.values():
+            if tx_hash in competition["transactionHashes"]:
+                return _Response(200, competition)
+        return _error(404, "NotFound", "no competition for this transaction")
+
+    async def _get_latest_competition(self, **_) -> _Response:
+        if not self.competitions:
+            return _error(404, "NotFound", "no competition yet")
+        return _Response(200, self.competitions[max(self.competitions)])
+
+    async def _get_version(self, **_) -> _Response:
+        return _Response(200, "fake")
+
+    async def _get_app_data(self, params: Dict[str, str], **_) -> _Response:
+        document = self.app_data.get(params["app_data_hash"].lower())
+        if document is None:
+            return _error(404, "NotFound", "unknown app data")
+        return _Response(200, {"fullAppData": document})
+
+    async def _put_app_data(self, body: Any, params: Dict[str, str], **_) -> _Response:
+        document = (body or {}).get("fullAppData")
+        if not isinstance(document, str):
+            return _error(400, "InvalidAppData", "fullAppData must be a string")
+        app_data_hash = (
+            params.get("app_data_hash") or Web3.to_hex(Web3.keccak(text=document))
+        ).lower()
+        created = app_data_hash not in self.app_data
+        self.app_data[app_data_hash] = document
+        return _Response(201 if created else 200, app_data_hash)
+
+    async def _get_total_surplus(self, params: Dict[str, str], **_) -> _Response:
+        user = params["address"].lower()
+        surplus = sum(
+            int(order["executedBuyAmount"]) // 100
+            for order in self.orders.values()
+            if order["owner"].lower() == user and order["status"] == "fulfilled"
+        )
+        return _Response(200, {"totalSurplus": str(surplus)})
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(
+            "Usage: python -m cowdao_cowpy.order_book.fake_server "
+            "<openapi_spec_path> <output_path>"
+        )
+        sys.exit(1)
+    write_routes(sys.argv[1], sys.argv[2])
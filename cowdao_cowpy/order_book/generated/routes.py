@@ -0,0 +1,38 @@
+# generated by cowdao_cowpy.order_book.fake_server from openapi.yml
+from typing import List, Tuple
+
+ROUTES: List[Tuple[str, str, str]] = [
+    ("createOrder", "post", "/api/v1/orders"),
+    ("cancelOrders", "delete", "/api/v1/orders"),
+    ("getOrders", "post", "/api/v1/orders/by_uids"),
+    ("getOrder", "get", "/api/v1/orders/{UID}"),
+    ("cancelOrder", "delete", "/api/v1/orders/{UID}"),
+    ("getOrderStatus", "get", "/api/v1/orders/{UID}/status"),
+    ("getOrdersByTxHash", "get", "/api/v1/transactions/{txHash}/orders"),
+    ("getTrades", "get", "/api/v1/trades"),
+    ("getTradesV2", "get", "/api/v2/trades"),
+    ("getCurrentBatchAuction", "get", "/api/v1/auction"),
+    ("getUserOrdersPaginated", "get", "/api/v1/account/{owner}/orders"),
+    ("getTokenNativePrice", "get", "/api/v1/token/{token}/native_price"),
+    ("quote", "post", "/api/v1/quote"),
+    ("quoteStream", "post", "/api/v1/quote/stream"),
+    (
+        "getSolverCompetitionByAuctionIdV2",
+        "get",
+        "/api/v2/solver_competition/{auction_id}",
+    ),
+    (
+        "getSolverCompetitionByTxHashV2",
+        "get",
+        "/api/v2/solver_competition/by_tx_hash/{tx_hash}",
+    ),
+    ("getSolverCompetitionLatestV2", "get", "/api/v2/solver_competition/latest"),
+    ("getApiVersion", "get", "/api/v1/version"),
+    ("getAppDataByHash", "get", "/api/v1/app_data/{app_data_hash}"),
+    ("registerAppDataByHash", "put", "/api/v1/app_data/{app_data_hash}"),
+    ("registerAppData", "put", "/api/v1/app_data"),
+    ("getAddressTotalSurplus", "get", "/api/v1/users/{address}/total_surplus"),
+    ("debugSimulationPost", "post", "/restricted/api/v1/debug/simulation"),
+    ("debugSimulation", "get", "/restricted/api/v1/debug/simulation/{uid}"),
+    ("debugOrder", "get", "/restricted/api/v1/debug/order/{uid}"),
+]
@@ -0,0 +1,110 @@
+from typing import Annotated, Any, ClassVar, Dict, Tuple, Type, TypeVar, Union
+
+from pydantic import BaseModel, TypeAdapter
+from pydantic.fields import FieldInfo
+
+M = TypeVar("M", bound=BaseModel)
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+class LiteModel:
+    """
+    A read-only, slotted record over a trusted response item.
+
+    Holds the decoded JSON dict and validates a field only when it is first
+    read, with the same type the full pydantic model would produce, so
+    `lite.orderUid` is a `UID` just like `Order(**data).orderUid`. Fields that
+    are never read are never validated. Use `to_model()` to get the fully
+    validated model.
+    """
+
+    __slots__ = ("_raw", "_values")
+
+    model: ClassVar[Type[BaseModel]]
+    _fields: ClassVar[Dict[str, Tuple[str, FieldInfo]]]
+    _adapters: ClassVar[Dict[str, TypeAdapter]]
+
+    def __init__(self, raw: Dict[str, Any]):
+        object.__setattr__(self, "_raw", raw)
+        object.__setattr__(self, "_values", {})
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            alias, field = self._fields[name]
+        except KeyError:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            ) from None
+
+        values = self._values
+        if name in values:
+            return values[name]
+
+        raw = self._raw.get(alias, _MISSING)
+        if raw is _MISSING:
+            raw = self._raw.get(name, _MISSING)
+        if raw is _MISSING:
+            if field.is_required():
+                raise ValueError(f"Missing required field '{alias}'")
+            raw = field.get_default(call_default_factory=True)
+
+        adapter = self._adapters.get(name)
+        if adapter is None:
+            annotation = field.annotation
+            if field.metadata:
+                annotation = Annotated[(annotation, *field.metadata)]
+            adapter = TypeAdapter(annotation)
+            self._adapters[name] = adapter
+        value = adapter.validate_python(raw)
+        values[name] = value
+        return value
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"'{type(self).__name__}' is read-only")
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, LiteModel):
+            return self.model is other.model and self._raw == other._raw
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._raw!r})"
+
+    @property
+    def raw(self) -> Dict[str, Any]:
+        """The undecoded response item."""
+        return self._raw
+
+    def to_model(self) -> BaseModel:
+        """Fully validate the record into its pydantic model."""
+        return self.model(**self._raw)
+
+
+# What an API method returns for model ``T``: the model itself, or its
+# `LiteModel` record when the client runs with ``trusted_responses``.
+MaybeLite = Union[T, LiteModel]
+
+_lite_classes: Dict[Type[BaseModel], Type[LiteModel]] = {}
+
+
+def lite_model_class(model: Type[M]) -> Type[LiteModel]:
+    """Return (and cache) the `LiteModel` subclass mirroring a pydantic model."""
+    lite_class = _lite_classes.get(model)
+    if lite_class is None:
+        lite_class = type(
+            f"Lite{model.__name__}",
+            (LiteModel,),
+            {
+                "__slots__": (),
+                "model": model,
+                "_fields": {
+                    name: (field.alias or name, field)
+                    for name, field in model.model_fields.items()
+                },
+                "_adapters": {},
+            },
+        )
+        _lite_classes[model] = lite_class
+    return lite_class
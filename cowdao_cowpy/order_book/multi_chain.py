@@ -0,0 +1,203 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    TypeVar,
+)
+
+import httpx
+
+from cowdao_cowpy.common.api.api_base import Context
+from cowdao_cowpy.common.api.compression import CompressionConfig
+from cowdao_cowpy.common.api.scheduler import RequestScheduler
+from cowdao_cowpy.common.config import SupportedChainId
+from cowdao_cowpy.order_book.api import OrderBookApi
+from cowdao_cowpy.order_book.config import Envs, OrderBookAPIConfigFactory
+from cowdao_cowpy.order_book.generated.model import Address, Order, TotalSurplus
+from cowdao_cowpy.order_book.lite import MaybeLite
+
+T = TypeVar("T")
+
+
+@dataclass
+class ChainResults(Generic[T]):
+    """
+    The outcome of a query fanned out to several chains.
+
+    Chains that failed or timed out are reported in ``errors`` instead of
+    failing the whole query.
+    """
+
+    results: Dict[SupportedChainId, T] = field(default_factory=dict)
+    errors: Dict[SupportedChainId, BaseException] = field(default_factory=dict)
+
+    @property
+    def complete(self) -> bool:
+        return not self.errors
+
+
+class MultiChainOrderBook:
+    """
+    Orderbook clients for many chains over one connection pool.
+
+    The `OrderBookApi` of each chain is built on first use and shares the HTTP
+    client, and with it the connection pool, with every other chain. Rate
+    limits are shared as well: all clients use the per-host request scheduler
+    registry, or ``scheduler`` when one is given.
+
+    Fan-out helpers such as `get_orders_all_chains` query every chain
+    concurrently. Each chain gets ``timeout`` seconds and a slow or failing
+    chain only shows up in `ChainResults.errors`.
+
+    Args:
+        env: The orderbook environment.
+        chains: The chains fan-out queries go to; every `SupportedChainId` by
+            default.
+        client: A shared httpx client; one is created (and closed by `aclose`)
+            otherwise.
+        timeout: Default per-chain timeout, in seconds, of fan-out queries.
+        max_connections: Connection pool size of the client created here.
+        trusted_responses: See `OrderBookApi`.
+        compression: See `OrderBookApi`.
+        scheduler: See `OrderBookApi`.
+        bearer_token: Authorization bearer token sent to every chain.
+        api_key: Partner API key used for every chain.
+    """
+
+    def __init__(
+        self,
+        env: Envs = "prod",
+        chains: Optional[Iterable[SupportedChainId]] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        timeout: Optional[float] = 10.0,
+        max_connections: int = 100,
+        trusted_responses: bool = False,
+        compression: Optional[CompressionConfig] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        bearer_token: Optional[str] = None,
+        api_key: Optional[str] = None,
+    ):
+        self.env = env
+        self.chains = list(SupportedChainId if chains is None else chains)
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.trusted_responses = trusted_responses
+        self.compression = compression
+        self.scheduler = scheduler
+        self.bearer_token = bearer_token
+        self.api_key = api_key
+        self._client = client
+        self._owns_client = client is None
+        self._apis: Dict[SupportedChainId, OrderBookApi] = {}
+
+    async def __aenter__(self) -> "MultiChainOrderBook":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def __getitem__(self, chain_id: SupportedChainId) -> OrderBookApi:
+        return self.api(chain_id)
+
+    def api(self, chain_id: SupportedChainId) -> OrderBookApi:
+        """The client for ``chain_id``, built on first use."""
+        api = self._apis.get(chain_id)
+        if api is None:
+            api = OrderBookApi(
+                OrderBookAPIConfigFactory.get_config(
+                    self.env,
+                    chain_id,
+                    bearer_token=self.bearer_token,
+                    api_key=self.api_key,
+                ),
+                client=self._get_client(),
+                trusted_responses=self.trusted_responses,
+                compression=self.compression,
+                scheduler=self.scheduler,
+            )
+            self._apis[chain_id] = api
+        return api
+
+    async def aclose(self) -> None:
+        """Close the connection pool if it was created here."""
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._apis.clear()
+
+    async def fan_out(
+        self,
+        call: Callable[[OrderBookApi], Awaitable[T]],
+        chains: Optional[Iterable[SupportedChainId]] = None,
+        timeout: Optional[float] = None,
+    ) -> ChainResults[T]:
+        """
+        Run ``call`` against the client of every chain concurrently.
+
+        Args:
+            call: The query, given the chain's `OrderBookApi`.
+            chains: Overrides the session's ``chains``.
+            timeout: Overrides the session's per-chain ``timeout``.
+        """
+        chain_ids = self.chains if chains is None else list(chains)
+        limit = self.timeout if timeout is None else timeout
+
+        async def run(chain_id: SupportedChainId) -> T:
+            return await asyncio.wait_for(call(self.api(chain_id)), limit)
+
+        outcomes = await asyncio.gather(
+            *(run(chain_id) for chain_id in chain_ids), return_exceptions=True
+        )
+        results: ChainResults[T] = ChainResults()
+        for chain_id, outcome in zip(chain_ids, outcomes):
+            if isinstance(outcome, BaseException):
+                results.errors[chain_id] = outcome
+            else:
+                results.results[chain_id] = outcome
+        return results
+
+    async def get_total_surplus_all_chains(
+        self,
+        user: Address,
+        chains: Optional[Iterable[SupportedChainId]] = None,
+        timeout: Optional[float] = None,
+        context_override: Context = {},
+    ) -> ChainResults[MaybeLite[TotalSurplus]]:
+        return await self.fan_out(
+            lambda api: api.get_total_surplus(user, context_override=context_override),
+            chains=chains,
+            timeout=timeout,
+        )
+
+    async def get_orders_all_chains(
+        self,
+        owner: Address,
+        limit: int = 1000,
+        offset: int = 0,
+        chains: Optional[Iterable[SupportedChainId]] = None,
+        timeout: Optional[float] = None,
+        context_override: Context = {},
+    ) -> ChainResults[List[MaybeLite[Order]]]:
+        return await self.fan_out(
+            lambda api: api.get_orders_by_owner(
+                owner, limit=limit, offset=offset, context_override=context_override
+            ),
+            chains=chains,
+            timeout=timeout,
+        )
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                )
+            )
+        return self._client
@@ -0,0 +1,262 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Callable, Dict, Iterable, List, Optional, Set, Union
+
+from cowdao_cowpy.common.api.scheduler import Lane
+from cowdao_cowpy.order_book.api import OrderBookApi
+from cowdao_cowpy.order_book.generated.model import Address
+
+logger = getLogger(__name__)
+
+Token = Union[Address, str]
+
+
+def _key(token: Token) -> str:
+    return (token.root if isinstance(token, Address) else token).lower()
+
+
+@dataclass(frozen=True)
+class PricePoint:
+    """A native price and the (monotonic) time it was fetched."""
+
+    price: Optional[float]
+    updated_at: float
+
+
+@dataclass
+class OracleStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    fetches: int = 0
+    errors: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        reads = self.hits + self.stale_hits + self.misses
+        return (self.hits + self.stale_hits) / reads if reads else 0.0
+
+
+class NativePriceOracle:
+    """
+    An in-memory table of token native prices kept warm in the background.
+
+    Reads (`get`) never await: they return the last fetched price from memory
+    and, when it is missing or stale, schedule a fetch. Fetches for the same
+    token are coalesced. While running (`start` or ``async with``), a
+    background task refreshes the most read tokens, plus any `track`-ed ones,
+    shortly before they go stale, with at most ``max_concurrency`` requests in
+    flight.
+
+    Args:
+        order_book_api: The API used to fetch prices.
+        max_age: Seconds after which a price is stale.
+        refresh_interval: Seconds between background refresh rounds.
+        max_concurrency: Maximum concurrent price requests.
+        max_refresh: Maximum number of tokens refreshed per round, hottest first.
+        evict_after: Untracked tokens not read for this many seconds are dropped.
+        retry_after: Seconds before reads retry a token whose fetch failed.
+        clock: Monotonic time source.
+    """
+
+    def __init__(
+        self,
+        order_book_api: OrderBookApi,
+        max_age: float = 30.0,
+        refresh_interval: float = 5.0,
+        max_concurrency: int = 4,
+        max_refresh: int = 200,
+        evict_after: float = 600.0,
+        retry_after: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.order_book_api = order_book_api
+        self.max_age = max_age
+        self.refresh_interval = refresh_interval
+        self.max_concurrency = max_concurrency
+        self.max_refresh = max_refresh
+        self.evict_after = evict_after
+        self.retry_after = retry_after
+        self.clock = clock
+        self.stats = OracleStats()
+        self._prices: Dict[str, PricePoint] = {}
+        self._attempted_at: Dict[str, float] = {}
+        self._failed: Set[str] = set()
+        self._scores: Dict[str, float] = {}
+        self._last_read: Dict[str, float] = {}
+        self._tracked: Set[str] = set()
+        self._pending: Dict[str, "asyncio.Task[Optional[float]]"] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._runner: Optional["asyncio.Task[None]"] = None
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    async def __aenter__(self) -> "NativePriceOracle":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    def get(self, token: Token, max_age: Optional[float] = None) -> Optional[float]:
+        """
+        Return the last known price of ``token`` without awaiting.
+
+        Returns None if the token has no price yet, or if it is older than
+        ``max_age`` when one is given. A missing or stale price schedules a
+        fetch when called from a running event loop.
+        """
+        key = _key(token)
+        now = self.clock()
+        self._scores[key] = self._scores.get(key, 0.0) + 1.0
+        self._last_read[key] = now
+
+        point = self._prices.get(key)
+        if point is None:
+            self.stats.misses += 1
+            self._schedule(key)
+            return None
+        age = now - point.updated_at
+        if age < self.max_age:
+            self.stats.hits += 1
+        else:
+            self.stats.stale_hits += 1
+            self._schedule(key)
+        if max_age is not None and age > max_age:
+            return None
+        return point.price
+
+    def price_point(self, token: Token) -> Optional[PricePoint]:
+        return self._prices.get(_key(token))
+
+    async def fetch(self, token: Token) -> Optional[float]:
+        """Fetch the price of ``token`` now, sharing any request in flight."""
+        return await asyncio.shield(self._load(_key(token)))
+
+    async def prefetch(self, tokens: Iterable[Token]) -> None:
+        """Load prices for ``tokens``; failures are counted, not raised."""
+        await asyncio.gather(
+            *(self._load(_key(token)) for token in tokens), return_exceptions=True
+        )
+
+    def track(self, tokens: Iterable[Token]) -> None:
+        """Always refresh ``tokens`` in the background, read or not."""
+        self._tracked.update(_key(token) for token in tokens)
+
+    def untrack(self, tokens: Iterable[Token]) -> None:
+        self._tracked.difference_update(_key(token) for token in tokens)
+
+    def start(self) -> None:
+        """Start the background refresh task."""
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop background refreshes and cancel fetches in flight."""
+        tasks = list(self._pending.values())
+        if self._runner is not None:
+            tasks.append(self._runner)
+            self._runner = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def refresh(self) -> List[str]:
+        """
+        Run one refresh round and return the tokens it refreshed.
+
+        Tokens due for a refresh are those that will be stale before the next
+        round; the ``max_refresh`` hottest of them are fetched. Read counts
+        decay by half every round, and unread untracked tokens are evicted.
+        """
+        now = self.clock()
+        self._evict(now)
+        horizon = now - (self.max_age - self.refresh_interval)
+        due = [
+            key
+            for key in self._tracked | set(self._scores)
+            if self._attempted_at.get(key, float("-inf")) <= horizon
+        ]
+        due.sort(key=lambda key: (key in self._tracked, self._scores.get(key, 0.0)))
+        due = due[::-1][: self.max_refresh]
+        await asyncio.gather(*(self._load(key) for key in due), return_exceptions=True)
+        for key in self._scores:
+            self._scores[key] /= 2
+        return due
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Native price refresh round failed")
+            await asyncio.sleep(self.refresh_interval)
+
+    def _evict(self, now: float) -> None:
+        cutoff = now - self.evict_after
+        for key, read_at in list(self._last_read.items()):
+            if read_at < cutoff and key not in self._tracked:
+                del self._last_read[key]
+                self._scores.pop(key, None)
+                self._prices.pop(key, None)
+                self._attempted_at.pop(key, None)
+                self._failed.discard(key)
+
+    def _schedule(self, key: str) -> None:
+        if key in self._pending:
+            return
+        attempted_at = self._attempted_at.get(key)
+        if attempted_at is not None:
+            # Don't fire a request per read for a token that was just fetched
+            # or just failed; the refresh rounds still retry it.
+            backoff = self.retry_after if key in self._failed else self.max_age
+            if self.clock() - attempted_at < backoff:
+                return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No loop: picked up by the next refresh round.
+        self._load(key)
+
+    def _load(self, key: str) -> "asyncio.Task[Optional[float]]":
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._fetch_price(key))
+            self._pending[key] = task
+            task.add_done_callback(lambda task: self._done(key, task))
+        return task
+
+    def _done(self, key: str, task: "asyncio.Task[Optional[float]]") -> None:
+        self._pending.pop(key, None)
+        if not task.cancelled():
+            # Retrieved so fire-and-forget fetches scheduled by `get` don't
+            # log "exception was never retrieved"; failures are in `stats`.
+            task.exception()
+
+    async def _fetch_price(self, key: str) -> Optional[float]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            self._attempted_at[key] = self.clock()
+            self.stats.fetches += 1
+            try:
+                response = await self.order_book_api.get_native_price(
+                    key,  # type: ignore[arg-type]
+                    context_override={"lane": Lane.BACKGROUND},
+                )
+            except Exception as e:
+                self.stats.errors += 1
+                self._failed.add(key)
+                logger.debug("Native price fetch for %s failed: %r", key, e)
+                raise
+        now = self.clock()
+        self._failed.discard(key)
+        self._prices[key] = PricePoint(response.price, now)
+        # Tokens loaded by `fetch` or `prefetch` alone age out like read ones.
+        self._last_read.setdefault(key, now)
+        return response.price
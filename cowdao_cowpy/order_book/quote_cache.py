@@ -0,0 +1,258 @@
+import asyncio
+import math
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from logging import getLogger
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from cowdao_cowpy.order_book.generated.model import OrderQuoteResponse
+from cowdao_cowpy.order_book.lite import MaybeLite
+
+logger = getLogger(__name__)
+
+# Request fields holding addresses or hashes, compared case-insensitively.
+_HEX_FIELDS = ("sellToken", "buyToken", "receiver", "from", "appDataHash")
+_AMOUNT_FIELDS = ("sellAmountBeforeFee", "sellAmountAfterFee", "buyAmountAfterFee")
+_FRACTION = re.compile(r"\.(\d+)")
+
+QuoteKey = Tuple[Hashable, ...]
+Pair = Tuple[str, str]
+
+
+def parse_expiration(expiration: str) -> float:
+    """Parse an orderbook ``expiration`` timestamp into a POSIX timestamp."""
+    value = expiration.strip().replace("Z", "+00:00").replace("z", "+00:00")
+    # The API may return nanosecond precision; datetime only takes microseconds.
+    value = _FRACTION.sub(lambda m: "." + m.group(1)[:6].ljust(6, "0"), value, 1)
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        raise ValueError(f"Quote expiration {expiration!r} has no timezone")
+    return parsed.timestamp()
+
+
+@dataclass
+class PairStats:
+    """Cache counters for one (sellToken, buyToken) pair."""
+
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    bypasses: int = 0
+    refreshes: int = 0
+    refresh_errors: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.stale_hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of cached lookups answered without waiting on the API."""
+        if not self.lookups:
+            return 0.0
+        return (self.hits + self.stale_hits) / self.lookups
+
+
+@dataclass
+class _Entry:
+    response: MaybeLite[OrderQuoteResponse]
+    fresh_until: float
+    expires_at: float
+
+
+@dataclass
+class QuoteCache:
+    """
+    A TTL cache for `OrderBookApi.post_quote` responses.
+
+    Requests are keyed by their normalized quote request, side and validity
+    (addresses lower-cased, amounts bucketed) together with the endpoint URL,
+    so one cache can be shared by several API clients. An entry is never
+    served after its quote ``expiration`` (minus ``expiry_margin``). During
+    the last ``stale_window`` seconds before that, or once it is older than
+    ``max_age``, it is still served but refreshed in the background. Concurrent
+    misses for the same key share a single request.
+
+    A cached quote was computed for the *first* amount seen in its bucket.
+    Quotes backing orders that are actually posted should bypass the cache
+    (``post_quote(..., use_cache=False)``), which always hits the API and
+    stores the fresh response for later lookups.
+
+    Args:
+        amount_tolerance: Relative width of the amount buckets, e.g. ``0.01``
+            lets amounts within ~1% of each other share a quote. ``0`` (the
+            default) only shares quotes for identical amounts.
+        max_age: Optional cap, in seconds, on how long an entry is served
+            without a refresh regardless of its expiration.
+        stale_window: Seconds before expiry during which the entry is served
+            while a refresh runs.
+        expiry_margin: Seconds subtracted from the quote expiration, leaving
+            time to sign and post an order.
+        max_entries: Least recently used entries beyond this are evicted.
+        clock: Wall-clock source, comparable with the quote expiration.
+    """
+
+    amount_tolerance: float = 0.0
+    max_age: Optional[float] = None
+    stale_window: float = 10.0
+    expiry_margin: float = 5.0
+    max_entries: int = 10_000
+    clock: Callable[[], float] = time.time
+    stats: Dict[Pair, PairStats] = field(default_factory=dict, init=False)
+    _entries: "OrderedDict[QuoteKey, _Entry]" = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+    _inflight: Dict[QuoteKey, "asyncio.Task[MaybeLite[OrderQuoteResponse]]"] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _refreshing: Set["asyncio.Task[MaybeLite[OrderQuoteResponse]]"] = field(
+        default_factory=set, init=False, repr=False
+    )
+
+    def __post_init__(self):
+        if self.amount_tolerance < 0:
+            raise ValueError("amount_tolerance must not be negative")
+        if self.max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, url: str, body: Dict[str, Any]) -> QuoteKey:
+        """Normalize a serialized quote request body into a cache key."""
+        items = []
+        for name, value in body.items():
+            if value is None:
+                continue
+            if name in _HEX_FIELDS and isinstance(value, str):
+                value = value.lower()
+            elif name in _AMOUNT_FIELDS:
+                value = self._bucket(int(value))
+            elif isinstance(value, (dict, list)):
+                value = repr(value)
+            items.append((name, value))
+        return (url, *sorted(items))
+
+    def _bucket(self, amount: int) -> int:
+        if not self.amount_tolerance or amount <= 0:
+            return amount
+        return math.floor(math.log(amount) / math.log1p(self.amount_tolerance))
+
+    def pair_stats(self, sell_token: str, buy_token: str) -> PairStats:
+        return self.stats.setdefault(
+            (sell_token.lower(), buy_token.lower()), PairStats()
+        )
+
+    @property
+    def total_stats(self) -> PairStats:
+        total = PairStats()
+        for stats in self.stats.values():
+            for name in vars(total):
+                setattr(total, name, getattr(total, name) + getattr(stats, name))
+        return total
+
+    async def get(
+        self,
+        key: QuoteKey,
+        pair: Pair,
+        fetch: Callable[[], Awaitable[MaybeLite[OrderQuoteResponse]]],
+        use_cache: bool = True,
+    ) -> MaybeLite[OrderQuoteResponse]:
+        """
+        Return the quote for ``key``, calling ``fetch`` on a miss.
+
+        With ``use_cache=False`` the cached entry is ignored and ``fetch`` is
+        always awaited; its response still replaces the cached one.
+        """
+        stats = self.pair_stats(*pair)
+        if not use_cache:
+            stats.bypasses += 1
+            response = await fetch()
+            self._store(key, response)
+            return response
+
+        entry = self._entries.get(key)
+        now = self.clock()
+        if entry is not None and now < entry.expires_at:
+            self._entries.move_to_end(key)
+            if now < entry.fresh_until:
+                stats.hits += 1
+            else:
+                stats.stale_hits += 1
+                self._refresh(key, stats, fetch)
+            return entry.response
+
+        stats.misses += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._start(key, fetch)
+        # Shielded so one cancelled caller does not fail the others.
+        return await asyncio.shield(task)
+
+    def invalidate(self, key: Optional[QuoteKey] = None) -> None:
+        """Drop one entry, or every entry when no key is given."""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    async def aclose(self) -> None:
+        """Cancel background refreshes still running."""
+        tasks = list(self._refreshing)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _start(
+        self,
+        key: QuoteKey,
+        fetch: Callable[[], Awaitable[MaybeLite[OrderQuoteResponse]]],
+    ) -> "asyncio.Task[MaybeLite[OrderQuoteResponse]]":
+        async def run() -> MaybeLite[OrderQuoteResponse]:
+            try:
+                response = await fetch()
+                self._store(key, response)
+                return response
+            finally:
+                self._inflight.pop(key, None)
+
+        task = asyncio.ensure_future(run())
+        self._inflight[key] = task
+        return task
+
+    def _refresh(
+        self,
+        key: QuoteKey,
+        stats: PairStats,
+        fetch: Callable[[], Awaitable[MaybeLite[OrderQuoteResponse]]],
+    ) -> None:
+        if key in self._inflight:
+            return
+        stats.refreshes += 1
+        task = self._start(key, fetch)
+        self._refreshing.add(task)
+
+        def done(task: "asyncio.Task[MaybeLite[OrderQuoteResponse]]") -> None:
+            self._refreshing.discard(task)
+            if not task.cancelled() and task.exception() is not None:
+                stats.refresh_errors += 1
+                logger.warning("Quote refresh failed: %r", task.exception())
+
+        task.add_done_callback(done)
+
+    def _store(self, key: QuoteKey, response: MaybeLite[OrderQuoteResponse]) -> None:
+        now = self.clock()
+        expires_at = parse_expiration(response.expiration) - self.expiry_margin
+        if expires_at <= now:
+            self._entries.pop(key, None)
+            return
+        fresh_until = expires_at - self.stale_window
+        if self.max_age is not None:
+            fresh_until = min(fresh_until, now + self.max_age)
+        self._entries[key] = _Entry(response, fresh_until, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,329 @@
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass
+from logging import getLogger
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from cowdao_cowpy.common.api.scheduler import Lane
+from cowdao_cowpy.order_book.api import MAX_ORDERS_BY_UIDS, OrderBookApi
+from cowdao_cowpy.order_book.generated.model import UID, Order, OrderStatus
+
+logger = getLogger(__name__)
+
+TERMINAL_STATUSES = frozenset(
+    {OrderStatus.fulfilled, OrderStatus.cancelled, OrderStatus.expired}
+)
+
+
+def _uid_key(uid: Union[UID, str]) -> str:
+    return (uid.root if isinstance(uid, UID) else uid).lower()
+
+
+@dataclass(frozen=True)
+class OrderStatusChange:
+    """
+    A status transition of a watched order.
+
+    ``previous`` is None the first time an order is seen. ``status`` and
+    ``order`` are None when the order was dropped after not being found
+    ``max_missing`` polls in a row.
+    """
+
+    uid: str
+    previous: Optional[OrderStatus]
+    status: Optional[OrderStatus]
+    order: Optional[Order]
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.status is None or self.status in TERMINAL_STATUSES
+
+
+@dataclass
+class WatcherStats:
+    requests: int = 0
+    orders_polled: int = 0
+    transitions: int = 0
+    dropped: int = 0
+    errors: int = 0
+
+
+@dataclass
+class _Tracked:
+    uid: str
+    valid_to: Optional[int]
+    tracked_at: float
+    status: Optional[OrderStatus] = None
+    missing: int = 0
+    due: float = 0.0
+
+
+class OrderStatusWatcher:
+    """
+    Tracks many orders' statuses through batched `/api/v1/orders/by_uids` polls.
+
+    Each order is polled on its own schedule: quickly after it is tracked,
+    backing off as it ages (up to ``max_interval``), and again right after its
+    ``validTo`` so expiry is noticed promptly. Orders are dropped once they are
+    fulfilled, cancelled or expired. Whatever the number of tracked orders, the
+    watcher sends at most ``requests_per_second`` requests of up to
+    ``batch_size`` orders, most overdue first, so a large backlog stretches the
+    effective interval instead of the request rate.
+
+    Transitions are delivered to `on_change` callbacks and `changes` iterators.
+
+    Args:
+        order_book_api: The API used to poll orders.
+        requests_per_second: Request budget of the polling loop.
+        batch_size: Orders per request, at most `MAX_ORDERS_BY_UIDS`.
+        min_interval: Shortest delay, in seconds, between polls of one order.
+        max_interval: Longest delay, in seconds, between polls of one order.
+        max_missing: Drop an order not found this many polls in a row.
+        clock: Monotonic time source used for scheduling.
+        wall_clock: POSIX time source compared with order ``validTo``.
+    """
+
+    def __init__(
+        self,
+        order_book_api: OrderBookApi,
+        requests_per_second: float = 2.0,
+        batch_size: int = MAX_ORDERS_BY_UIDS,
+        min_interval: float = 2.0,
+        max_interval: float = 60.0,
+        max_missing: int = 10,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+    ):
+        if not 0 < batch_size <= MAX_ORDERS_BY_UIDS:
+            raise ValueError(f"batch_size must be in 1..{MAX_ORDERS_BY_UIDS}")
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second must be positive")
+        self.order_book_api = order_book_api
+        self.requests_per_second = requests_per_second
+        self.batch_size = batch_size
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_missing = max_missing
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.stats = WatcherStats()
+        self._tracked: Dict[str, _Tracked] = {}
+        self._queue: List[Tuple[float, int, str]] = []
+        self._sequence = itertools.count()
+        self._callbacks: List[Callable[[OrderStatusChange], Any]] = []
+        self._subscribers: List[Tuple["asyncio.Queue[Any]", bool]] = []
+        self._runner: Optional["asyncio.Task[None]"] = None
+
+    def __len__(self) -> int:
+        return len(self._tracked)
+
+    def __contains__(self, uid: Union[UID, str]) -> bool:
+        return _uid_key(uid) in self._tracked
+
+    async def __aenter__(self) -> "OrderStatusWatcher":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    def track(self, uid: Union[UID, str], valid_to: Optional[int] = None) -> None:
+        """Start watching an order; its first poll is due immediately."""
+        key = _uid_key(uid)
+        if key in self._tracked:
+            return
+        now = self.clock()
+        entry = _Tracked(uid=key, valid_to=valid_to, tracked_at=now)
+        self._tracked[key] = entry
+        self._schedule(entry, now, interval=0.0)
+
+    def track_many(
+        self,
+        uids: Iterable[Union[UID, str]],
+        valid_to: Optional[Mapping[Union[UID, str], int]] = None,
+    ) -> None:
+        """
+        Start watching several orders, as `track` does.
+
+        ``valid_to`` maps UIDs to their orders' ``validTo`` where known, so
+        their polling follows it before the first poll reports it.
+        """
+        valid_tos = {_uid_key(uid): value for uid, value in (valid_to or {}).items()}
+        for uid in uids:
+            self.track(uid, valid_tos.get(_uid_key(uid)))
+
+    def untrack(self, uid: Union[UID, str]) -> None:
+        if self._tracked.pop(_uid_key(uid), None) is not None:
+            self._notify_if_idle()
+
+    def status(self, uid: Union[UID, str]) -> Optional[OrderStatus]:
+        """The last seen status of a tracked order."""
+        entry = self._tracked.get(_uid_key(uid))
+        return entry.status if entry else None
+
+    def on_change(self, callback: Callable[[OrderStatusChange], Any]) -> None:
+        """Call ``callback`` with every transition; exceptions are logged."""
+        self._callbacks.append(callback)
+
+    def changes(self, until_idle: bool = False) -> AsyncIterator[OrderStatusChange]:
+        """
+        Iterate over transitions from now on.
+
+        The iterator ends when the watcher is stopped or, with
+        ``until_idle=True``, once no orders are left to watch.
+        """
+        queue: "asyncio.Queue[Any]" = asyncio.Queue()
+        self._subscribers.append((queue, until_idle))
+        if until_idle and not self._tracked:
+            queue.put_nowait(None)
+        return self._drain(queue)
+
+    def start(self) -> None:
+        """Start the background polling loop."""
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop polling and end all `changes` iterators."""
+        if self._runner is not None:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+            self._runner = None
+        for queue, _ in self._subscribers:
+            queue.put_nowait(None)
+        self._subscribers.clear()
+
+    async def poll_once(self) -> int:
+        """Poll the most overdue batch of orders; returns the number polled."""
+        now = self.clock()
+        batch: List[_Tracked] = []
+        while self._queue and self._queue[0][0] <= now:
+            due, _, uid = heapq.heappop(self._queue)
+            entry = self._tracked.get(uid)
+            if entry is None or entry.due != due:
+                continue  # Untracked or rescheduled since.
+            batch.append(entry)
+            if len(batch) == self.batch_size:
+                break
+        if not batch:
+            return 0
+
+        self.stats.requests += 1
+        try:
+            orders = await self.order_book_api.get_orders_by_uids(
+                [entry.uid for entry in batch],
+                context_override={"lane": Lane.BACKGROUND},
+            )
+        except Exception as e:
+            self.stats.errors += 1
+            logger.warning("Polling %d orders failed: %r", len(batch), e)
+            for entry in batch:
+                self._schedule(entry, now, self.min_interval)
+            return 0
+
+        self.stats.orders_polled += len(batch)
+        by_uid = {_uid_key(order.uid): order for order in orders}
+        for entry in batch:
+            if entry.uid in self._tracked:
+                self._observe(entry, by_uid.get(entry.uid), now)
+        return len(batch)
+
+    async def _run(self) -> None:
+        period = 1 / self.requests_per_second
+        while True:
+            started = self.clock()
+            await self.poll_once()
+            await asyncio.sleep(max(0.0, period - (self.clock() - started)))
+
+    def _observe(self, entry: _Tracked, order: Optional[Order], now: float) -> None:
+        if order is None:
+            entry.missing += 1
+            if entry.missing >= self.max_missing:
+                self._drop(
+                    entry, OrderStatusChange(entry.uid, entry.status, None, None)
+                )
+            else:
+                self._schedule(entry, now)
+            return
+
+        entry.missing = 0
+        entry.valid_to = order.validTo
+        status = order.status
+        change = None
+        if status != entry.status:
+            change = OrderStatusChange(entry.uid, entry.status, status, order)
+            entry.status = status
+        if status in TERMINAL_STATUSES:
+            self._drop(entry, change)
+            return
+        self._schedule(entry, now)
+        if change is not None:
+            self._emit(change)
+
+    def _interval(self, entry: _Tracked, now: float) -> float:
+        # Most fills happen soon after creation, so back off with age.
+        interval = (now - entry.tracked_at) / 2
+        if entry.valid_to is not None:
+            until_expiry = entry.valid_to - self.wall_clock()
+            # Poll again just after validTo, then keep checking quickly until
+            # the API reports the order as expired.
+            interval = min(interval, max(until_expiry, 0.0) + 1.0)
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def _schedule(
+        self, entry: _Tracked, now: float, interval: Optional[float] = None
+    ) -> None:
+        if interval is None:
+            interval = self._interval(entry, now)
+        entry.due = now + interval
+        heapq.heappush(self._queue, (entry.due, next(self._sequence), entry.uid))
+
+    def _drop(self, entry: _Tracked, change: Optional[OrderStatusChange]) -> None:
+        del self._tracked[entry.uid]
+        self.stats.dropped += 1
+        if change is not None:
+            self._emit(change)
+        self._notify_if_idle()
+
+    def _notify_if_idle(self) -> None:
+        if self._tracked:
+            return
+        for queue, until_idle in self._subscribers:
+            if until_idle:
+                queue.put_nowait(None)
+        self._subscribers = [s for s in self._subscribers if not s[1]]
+
+    def _emit(self, change: OrderStatusChange) -> None:
+        self.stats.transitions += 1
+        for callback in self._callbacks:
+            try:
+                callback(change)
+            except Exception:
+                logger.exception("Order status callback failed")
+        for queue, _ in self._subscribers:
+            queue.put_nowait(change)
+
+    async def _drain(
+        self, queue: "asyncio.Queue[Any]"
+    ) -> AsyncIterator[OrderStatusChange]:
+        try:
+            while True:
+                change = await queue.get()
+                if change is None:
+                    return
+                yield change
+        finally:
+            self._subscribers = [s for s in self._subscribers if s[0] is not queue]
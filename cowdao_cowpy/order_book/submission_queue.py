@@ -0,0 +1,444 @@
+import asyncio
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from logging import getLogger
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from cowdao_cowpy.common.api.api_base import Context
+from cowdao_cowpy.common.api.errors import ApiResponseError
+from cowdao_cowpy.order_book.api import OrderBookApi
+from cowdao_cowpy.order_book.generated.model import UID, OrderCreation
+
+logger = getLogger(__name__)
+
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    uid TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+_INSERT = (
+    "INSERT INTO submissions (uid, payload, status, created_at, updated_at) "
+    "VALUES (?, ?, 'pending', ?, ?) ON CONFLICT (uid) DO UPDATE SET "
+    "payload = excluded.payload, status = 'pending', attempts = 0, error = NULL, "
+    "updated_at = excluded.updated_at"
+)
+_FINISH = (
+    "UPDATE submissions SET status = ?, attempts = ?, error = ?, updated_at = ? "
+    "WHERE uid = ?"
+)
+
+_RETRY = (
+    "UPDATE submissions SET attempts = ?, error = ?, updated_at = ? "
+    "WHERE uid = ? AND status = 'pending'"
+)
+
+_Statement = Tuple[str, Sequence]
+
+
+class SubmissionStatus(str, Enum):
+    PENDING = "pending"
+    POSTED = "posted"
+    FAILED = "failed"
+
+
+@dataclass
+class QueueStats:
+    enqueued: int = 0
+    replayed: int = 0
+    posted: int = 0
+    failed: int = 0
+    retries: int = 0
+    commits: int = 0
+    compacted: int = 0
+
+
+class SubmissionQueue:
+    """
+    A crash-safe write-ahead queue for signed orders, backed by SQLite.
+
+    `enqueue` returns only once the order and its precomputed UID are on disk;
+    workers then post queued orders with at most ``max_concurrency`` in
+    flight. If the process dies before an order is confirmed, `start` replays
+    it on the next run. Posting is idempotent by UID (see
+    `OrderBookApi.post_order`), so an order that did reach the orderbook
+    before the crash is not reported as a duplicate.
+
+    Writes from concurrent callers and workers are grouped into one
+    transaction, so each commit (and fsync) covers a batch. ``commit_interval``
+    trades latency for larger batches and ``synchronous`` sets SQLite's
+    durability level: "FULL" survives power loss, "NORMAL" survives process
+    crashes.
+
+    Posted entries are deleted by `compact`, which runs automatically every
+    ``compact_every`` posted orders. Rejected orders are kept, with their
+    error, for inspection.
+
+    Args:
+        order_book_api: The API orders are posted to.
+        path: The SQLite database file.
+        max_concurrency: Maximum order submissions in flight.
+        synchronous: SQLite ``synchronous`` mode, one of `SYNCHRONOUS_MODES`.
+        commit_interval: Seconds to gather writes before each commit.
+        max_attempts: Give up on an order after this many failed posts, each
+            already retried with backoff by the API client. Attempts are
+            recorded, so they count across restarts.
+        retry_interval: Seconds before retrying an order after a transient failure.
+        compact_every: Compact after this many posted orders; None disables it.
+        context_override: Passed to each `OrderBookApi.post_order` call, e.g.
+            to tune the per-request ``backoff_opts``.
+    """
+
+    def __init__(
+        self,
+        order_book_api: OrderBookApi,
+        path: Union[str, os.PathLike],
+        max_concurrency: int = 4,
+        synchronous: str = "NORMAL",
+        commit_interval: float = 0.0,
+        max_attempts: int = 5,
+        retry_interval: float = 1.0,
+        compact_every: Optional[int] = 1000,
+        context_override: Optional[Context] = None,
+    ):
+        if synchronous.upper() not in SYNCHRONOUS_MODES:
+            raise ValueError(f"synchronous must be one of {SYNCHRONOUS_MODES}")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.order_book_api = order_book_api
+        self.path = os.fspath(path)
+        self.max_concurrency = max_concurrency
+        self.synchronous = synchronous.upper()
+        self.commit_interval = commit_interval
+        self.max_attempts = max_attempts
+        self.retry_interval = retry_interval
+        self.compact_every = compact_every
+        self.context_override = context_override or {}
+        self.stats = QueueStats()
+        self._db: Optional[sqlite3.Connection] = None
+        # SQLite connections are used from a single thread, off the event loop.
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._batch: List[_Statement] = []
+        self._batch_waiters: List["asyncio.Future[None]"] = []
+        self._flusher: Optional["asyncio.Task[None]"] = None
+        self._work: "asyncio.Queue[str]" = asyncio.Queue()
+        self._payloads: Dict[str, OrderCreation] = {}
+        self._results: Dict[str, "asyncio.Future[UID]"] = {}
+        self._attempts: Dict[str, int] = {}
+        self._workers: List["asyncio.Task[None]"] = []
+        self._since_compaction = 0
+
+    async def __aenter__(self) -> "SubmissionQueue":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    def __len__(self) -> int:
+        """Orders enqueued or replayed in this process and not yet settled."""
+        return len(self._payloads)
+
+    async def start(self) -> None:
+        """Replay orders left pending by a previous run and start posting."""
+        if self._workers:
+            return
+        await self._open()
+        rows = await self._run(self._load_pending)
+        loop = asyncio.get_running_loop()
+        for uid, payload, attempts in rows:
+            if uid in self._results:
+                continue
+            self._payloads[uid] = OrderCreation.model_validate_json(payload)
+            self._results[uid] = loop.create_future()
+            self._attempts[uid] = attempts
+            self._work.put_nowait(uid)
+        self.stats.replayed += len(rows)
+        self._workers = [
+            asyncio.ensure_future(self._worker()) for _ in range(self.max_concurrency)
+        ]
+
+    async def stop(self) -> None:
+        """
+        Stop posting and close the database.
+
+        Orders still pending stay on disk and are replayed by the next `start`.
+        """
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        if self._flusher is not None:
+            await asyncio.gather(self._flusher, return_exceptions=True)
+        if self._db is not None:
+            await self._run(self._db.close)
+            self._db = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self._payloads.clear()
+        self._attempts.clear()
+        for result in self._results.values():
+            result.cancel()
+        self._results.clear()
+        self._work = asyncio.Queue()
+
+    async def enqueue(
+        self, order: OrderCreation, order_uid: str
+    ) -> "asyncio.Future[UID]":
+        """
+        Durably record ``order`` under its precomputed ``order_uid`` (see
+        `compute_order_uid`) and queue it for posting.
+
+        Returns a future resolving to the posted UID, or to the error that made
+        the order fail.
+        """
+        (result,) = await self.enqueue_many([(order, order_uid)])
+        return result
+
+    async def enqueue_many(
+        self, orders: Iterable[Tuple[OrderCreation, str]]
+    ) -> List["asyncio.Future[UID]"]:
+        """`enqueue` several orders, recorded in a single transaction."""
+        await self._open()
+        loop = asyncio.get_running_loop()
+        now = time.time()
+        results: List["asyncio.Future[UID]"] = []
+        added: List[str] = []
+        statements: List[_Statement] = []
+        for order, order_uid in orders:
+            uid = order_uid.lower()
+            existing = self._results.get(uid)
+            if existing is not None:
+                results.append(existing)
+                continue
+            payload = order.model_dump_json(by_alias=True)
+            statements.append((_INSERT, (uid, payload, now, now)))
+            self._payloads[uid] = order
+            self._results[uid] = loop.create_future()
+            results.append(self._results[uid])
+            added.append(uid)
+        try:
+            await self._write(statements)
+        except BaseException:
+            for uid in added:
+                self._payloads.pop(uid, None)
+                self._results.pop(uid).cancel()
+            raise
+        for uid in added:
+            self._work.put_nowait(uid)
+        self.stats.enqueued += len(added)
+        return results
+
+    async def submit(self, order: OrderCreation, order_uid: str) -> UID:
+        """`enqueue` ``order`` and wait until it is posted."""
+        return await (await self.enqueue(order, order_uid))
+
+    async def drain(self) -> None:
+        """Wait until every order enqueued or replayed so far has settled."""
+        await asyncio.gather(*self._results.values(), return_exceptions=True)
+
+    async def counts(self) -> Dict[SubmissionStatus, int]:
+        """The number of stored entries in each status."""
+        await self._open()
+        rows = await self._run(self._count)
+        return {SubmissionStatus(status): count for status, count in rows}
+
+    async def compact(self) -> int:
+        """Delete posted entries and shrink the write-ahead log."""
+        await self._open()
+        self._since_compaction = 0
+        removed = await self._run(self._delete_posted)
+        self.stats.compacted += removed
+        return removed
+
+    async def _worker(self) -> None:
+        while True:
+            uid = await self._work.get()
+            if uid not in self._payloads:
+                continue
+            try:
+                await self._post(uid)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Keep the worker alive; the order stays pending on disk.
+                logger.exception("Processing order %s failed: %r", uid, e)
+
+    async def _post(self, uid: str) -> None:
+        attempts = self._attempts.get(uid, 0) + 1
+        self._attempts[uid] = attempts
+        try:
+            posted = await self.order_book_api.post_order(
+                self._payloads[uid],
+                context_override=self.context_override,
+                order_uid=uid,
+            )
+        except asyncio.CancelledError:
+            raise
+        except ApiResponseError as e:
+            # Rejected by the orderbook: posting it again would not help.
+            await self._settle(uid, SubmissionStatus.FAILED, error=e)
+        except Exception as e:
+            if attempts >= self.max_attempts:
+                await self._settle(uid, SubmissionStatus.FAILED, error=e)
+                return
+            logger.warning("Posting order %s failed, retrying: %r", uid, e)
+            self.stats.retries += 1
+            try:
+                # So a restarted queue doesn't start counting attempts again.
+                await self._write([(_RETRY, (attempts, repr(e), time.time(), uid))])
+            except asyncio.CancelledError:
+                raise
+            except Exception as write_error:
+                logger.error(
+                    "Recording attempt %d of order %s failed: %r",
+                    attempts,
+                    uid,
+                    write_error,
+                )
+            asyncio.get_running_loop().call_later(
+                self.retry_interval, self._requeue, uid
+            )
+        else:
+            await self._settle(uid, SubmissionStatus.POSTED, posted=posted)
+
+    def _requeue(self, uid: str) -> None:
+        if uid in self._payloads:
+            self._work.put_nowait(uid)
+
+    async def _settle(
+        self,
+        uid: str,
+        status: SubmissionStatus,
+        posted: Optional[UID] = None,
+        error: Optional[Exception] = None,
+    ) -> None:
+        attempts = self._attempts.get(uid, 0)
+        try:
+            await self._write(
+                [
+                    (
+                        _FINISH,
+                        (
+                            status.value,
+                            attempts,
+                            None if error is None else repr(error),
+                            time.time(),
+                            uid,
+                        ),
+                    )
+                ]
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # The entry stays pending on disk and is replayed by the next start.
+            logger.error("Recording order %s as %s failed: %r", uid, status.value, e)
+            status, error = SubmissionStatus.PENDING, e
+        self._attempts.pop(uid, None)
+        self._payloads.pop(uid, None)
+        result = self._results.pop(uid, None)
+        if status is SubmissionStatus.PENDING:
+            if result is not None and not result.done():
+                result.set_exception(error)  # type: ignore[arg-type]
+        elif status is SubmissionStatus.POSTED:
+            self.stats.posted += 1
+            self._since_compaction += 1
+            if result is not None and not result.done():
+                result.set_result(posted)  # type: ignore[arg-type]
+            if self.compact_every and self._since_compaction >= self.compact_every:
+                await self.compact()
+        else:
+            self.stats.failed += 1
+            if result is not None and not result.done():
+                result.set_exception(error)  # type: ignore[arg-type]
+
+    async def _write(self, statements: List[_Statement]) -> None:
+        """Commit ``statements`` as part of the next group commit."""
+        if not statements:
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._batch.extend(statements)
+        self._batch_waiters.append(waiter)
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.ensure_future(self._flush())
+        await asyncio.shield(waiter)
+
+    async def _flush(self) -> None:
+        # Yield (or wait) first so writes issued concurrently join the batch.
+        await asyncio.sleep(self.commit_interval)
+        while self._batch:
+            batch, waiters = self._batch, self._batch_waiters
+            self._batch, self._batch_waiters = [], []
+            try:
+                await self._run(self._commit, batch)
+            except Exception as e:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(e)
+            else:
+                self.stats.commits += 1
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+
+    async def _run(self, func, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="cowpy-queue"
+            )
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, func, *args
+        )
+
+    async def _open(self) -> None:
+        if self._db is None:
+            self._db = await self._run(self._connect)
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(f"PRAGMA synchronous={self.synchronous}")
+        with db:
+            db.execute(_SCHEMA)
+        return db
+
+    def _commit(self, batch: List[_Statement]) -> None:
+        assert self._db is not None
+        with self._db:
+            for sql, params in batch:
+                self._db.execute(sql, params)
+
+    def _load_pending(self) -> List[Tuple[str, str, int]]:
+        assert self._db is not None
+        return self._db.execute(
+            "SELECT uid, payload, attempts FROM submissions "
+            "WHERE status = 'pending' ORDER BY created_at, rowid"
+        ).fetchall()
+
+    def _count(self) -> List[Tuple[str, int]]:
+        assert self._db is not None
+        return self._db.execute(
+            "SELECT status, COUNT(*) FROM submissions GROUP BY status"
+        ).fetchall()
+
+    def _delete_posted(self) -> int:
+        assert self._db is not None
+        with self._db:
+            removed = self._db.execute(
+                "DELETE FROM submissions WHERE status = 'posted'"
+            ).rowcount
+        self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return removed
@@ -0,0 +1,208 @@
+import asyncio
+import dataclasses
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar, cast
+
+from web3 import AsyncWeb3
+from web3.types import BlockData
+
+from cowdao_cowpy.common.chains import Chain
+
+P = TypeVar("P")
+
+# Seconds between blocks on chains that produce them on a fixed schedule.
+BLOCK_TIMES: Dict[Chain, float] = {
+    Chain.MAINNET: 12.0,
+    Chain.SEPOLIA: 12.0,
+    Chain.GNOSIS: 5.0,
+    Chain.BASE: 2.0,
+    Chain.INK: 1.0,
+}
+
+
+@dataclass
+class BlockCacheStats:
+    fetches: int = 0
+    hits: int = 0
+    extrapolated: int = 0
+
+
+class TimestampExtrapolator:
+    """
+    Estimates block numbers and timestamps from one observed block.
+
+    On chains with fast, regular block times the head advances predictably,
+    so polls can use an estimated head instead of fetching one per block.
+    Estimates drift with missed slots; `observe` a fetched block now and then
+    to re-anchor.
+
+    Args:
+        block_time: Seconds between blocks.
+        clock: Wall clock in seconds, `time.time` by default.
+    """
+
+    def __init__(self, block_time: float, clock: Callable[[], float] = time.time):
+        if block_time <= 0:
+            raise ValueError("block_time must be positive")
+        self.block_time = block_time
+        self.clock = clock
+        self._anchor: Optional[Tuple[int, int, float]] = None
+
+    @classmethod
+    def for_chain(cls, chain: Chain, **kwargs: Any) -> "TimestampExtrapolator":
+        if chain not in BLOCK_TIMES:
+            raise ValueError(f"{chain.name} has no regular block time")
+        return cls(BLOCK_TIMES[chain], **kwargs)
+
+    @property
+    def anchored(self) -> bool:
+        return self._anchor is not None
+
+    def observe(self, block: BlockData) -> None:
+        """Anchor estimates to ``block``, as seen now."""
+        number, timestamp = int(block["number"]), int(block["timestamp"])
+        if self._anchor is None or number >= self._anchor[0]:
+            self._anchor = (number, timestamp, self.clock())
+
+    def timestamp_at(self, number: int) -> int:
+        number_0, timestamp_0, _ = self._anchored()
+        return timestamp_0 + int((number - number_0) * self.block_time)
+
+    def block_at(self, timestamp: int) -> int:
+        """The first block estimated to have a timestamp at or after ``timestamp``."""
+        number_0, timestamp_0, _ = self._anchored()
+        blocks = -(-(timestamp - timestamp_0) // self.block_time)
+        return number_0 + int(blocks)
+
+    def head(self) -> BlockData:
+        """The estimated latest block, with only ``number`` and ``timestamp``."""
+        number_0, _, seen_at = self._anchored()
+        number = number_0 + max(int((self.clock() - seen_at) // self.block_time), 0)
+        return cast(
+            BlockData, {"number": number, "timestamp": self.timestamp_at(number)}
+        )
+
+    def _anchored(self) -> Tuple[int, int, float]:
+        if self._anchor is None:
+            raise RuntimeError("No block observed yet")
+        return self._anchor
+
+
+class BlockCache:
+    """
+    Shares block headers between concurrent readers.
+
+    `latest` fetches the head at most once per ``max_age`` seconds; callers
+    arriving while a fetch is in flight wait for it instead of sending their
+    own. Blocks by number are fetched once and kept for the last ``history``
+    numbers. With an ``extrapolator``, `latest` estimates the head from the
+    last fetched block and fetches again only every ``resync_interval``
+    seconds; `is_estimate` tells such heads from fetched ones.
+
+    Use `inject` to fill in `PollParams.block_info` so that every poll of a
+    block reads the same header.
+
+    Args:
+        provider: The provider blocks are fetched from.
+        max_age: Seconds a fetched head is served before fetching again.
+        history: Blocks kept by number.
+        extrapolator: Estimates the head between fetches.
+        resync_interval: Seconds between fetches when extrapolating.
+        clock: Monotonic clock in seconds, `time.monotonic` by default.
+    """
+
+    def __init__(
+        self,
+        provider: AsyncWeb3,
+        max_age: float = 1.0,
+        history: int = 256,
+        extrapolator: Optional[TimestampExtrapolator] = None,
+        resync_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.provider = provider
+        self.max_age = max_age
+        self.history = history
+        self.extrapolator = extrapolator
+        self.resync_interval = resync_interval
+        self.clock = clock
+        self.stats = BlockCacheStats()
+        self._head: Optional[BlockData] = None
+        self._head_at = float("-inf")
+        self._blocks: "OrderedDict[int, BlockData]" = OrderedDict()
+        self._fetching: Dict[Any, "asyncio.Task[BlockData]"] = {}
+
+    async def latest(self) -> BlockData:
+        age = self.clock() - self._head_at
+        if self._head is not None and age < self.max_age:
+            self.stats.hits += 1
+            return self._head
+        if (
+            self.extrapolator is not None
+            and self.extrapolator.anchored
+            and age < self.resync_interval
+        ):
+            self.stats.extrapolated += 1
+            return self.extrapolator.head()
+        return await self._fetch("latest")
+
+    def is_estimate(self, block: BlockData) -> bool:
+        """
+        Whether ``block`` is an extrapolated head past the last fetched one.
+
+        The chain may not have reached such a block yet, so reads should not
+        be made at its number.
+        """
+        return self._head is None or int(block["number"]) > int(self._head["number"])
+
+    async def get_block(self, number: int) -> BlockData:
+        block = self._blocks.get(number)
+        if block is not None:
+            self.stats.hits += 1
+            return block
+        return await self._fetch(number)
+
+    async def inject(self, params: P) -> P:
+        """A copy of ``params`` with ``block_info`` set to the latest block."""
+        if getattr(params, "block_info", None) is not None:
+            return params
+        return dataclasses.replace(params, block_info=await self.latest())  # type: ignore[type-var]
+
+    def _remember(self, block: BlockData) -> None:
+        number = int(block["number"])
+        self._blocks[number] = block
+        self._blocks.move_to_end(number)
+        while len(self._blocks) > self.history:
+            self._blocks.popitem(last=False)
+
+    async def _fetch(self, block_identifier: Any) -> BlockData:
+        fetching = self._fetching.get(block_identifier)
+        if fetching is not None:
+            self.stats.hits += 1
+        else:
+            fetching = asyncio.ensure_future(self._get_block(block_identifier))
+            # Waiters re-raise errors; don't warn if they have all gone.
+            fetching.add_done_callback(
+                lambda task: task.cancelled() or task.exception()
+            )
+            self._fetching[block_identifier] = fetching
+        # A cancelled caller only stops waiting; the fetch goes on for the others.
+        return await asyncio.shield(fetching)
+
+    async def _get_block(self, block_identifier: Any) -> BlockData:
+        try:
+            self.stats.fetches += 1
+            block = await self.provider.eth.get_block(block_identifier)
+        finally:
+            del self._fetching[block_identifier]
+
+        self._remember(block)
+        if block_identifier == "latest" and (
+            self._head is None or block["number"] >= self._head["number"]
+        ):
+            self._head, self._head_at = block, self.clock()
+            if self.extrapolator is not None:
+                self.extrapolator.observe(block)
+        return block
@@ -0,0 +1,150 @@
+import asyncio
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Dict, List, Set, Union
+
+from eth_abi.abi import decode, encode
+from eth_typing import BlockIdentifier
+from hexbytes import HexBytes
+from web3 import AsyncWeb3, Web3
+from web3.exceptions import ContractLogicError
+
+logger = getLogger(__name__)
+
+# Multicall3 is deployed at the same address on every supported chain.
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+# aggregate3((address target, bool allowFailure, bytes callData)[])
+AGGREGATE3_SELECTOR = bytes.fromhex("82ad56cb")
+
+
+@dataclass
+class MulticallStats:
+    calls: int = 0
+    batches: int = 0
+    reverts: int = 0
+    errors: int = 0
+
+
+@dataclass
+class _PendingCall:
+    target: str
+    data: bytes
+    future: "asyncio.Future[HexBytes]"
+
+
+class MulticallBatcher:
+    """
+    Coalesces concurrent ``eth_call``s into Multicall3 ``aggregate3`` calls.
+
+    `call` queues a read and waits. Reads against the same block that arrive
+    within ``window`` seconds of each other (or until ``max_batch_size`` are
+    queued) go out as one ``aggregate3`` with ``allowFailure`` set, and each
+    caller gets its own return data. A reverted read raises
+    `ContractLogicError` with the revert data, as a direct call would; a
+    failed ``eth_call`` fails every read of the batch.
+
+    Args:
+        provider: The provider batches are sent through.
+        address: The Multicall3 deployment.
+        window: Seconds to wait for more reads before sending a batch.
+        max_batch_size: Reads per ``aggregate3``; a full batch is sent at once.
+    """
+
+    def __init__(
+        self,
+        provider: AsyncWeb3,
+        address: str = MULTICALL3_ADDRESS,
+        window: float = 0.005,
+        max_batch_size: int = 500,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.provider = provider
+        self.address = Web3.to_checksum_address(address)
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.stats = MulticallStats()
+        self._pending: Dict[BlockIdentifier, List[_PendingCall]] = {}
+        self._timers: Dict[BlockIdentifier, asyncio.TimerHandle] = {}
+        self._in_flight: Set["asyncio.Task[None]"] = set()
+
+    async def call(
+        self,
+        target: str,
+        data: Union[bytes, str],
+        block_identifier: BlockIdentifier = "latest",
+    ) -> HexBytes:
+        """Read ``data`` from ``target`` as part of the next batch."""
+        loop = asyncio.get_running_loop()
+        pending = _PendingCall(
+            Web3.to_checksum_address(target), HexBytes(data), loop.create_future()
+        )
+        batch = self._pending.setdefault(block_identifier, [])
+        batch.append(pending)
+        self.stats.calls += 1
+        if len(batch) >= self.max_batch_size:
+            self._send(block_identifier)
+        elif block_identifier not in self._timers:
+            self._timers[block_identifier] = loop.call_later(
+                self.window, self._send, block_identifier
+            )
+        return await pending.future
+
+    async def flush(self) -> None:
+        """Send every queued read now and wait for all batches to complete."""
+        for block_identifier in list(self._pending):
+            self._send(block_identifier)
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    def _send(self, block_identifier: BlockIdentifier) -> None:
+        timer = self._timers.pop(block_identifier, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(block_identifier, [])
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(
+            self._aggregate(batch, block_identifier)
+        )
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _aggregate(
+        self, batch: List[_PendingCall], block_identifier: BlockIdentifier
+    ) -> None:
+        self.stats.batches += 1
+        calldata = AGGREGATE3_SELECTOR + encode(
+            ["(address,bool,bytes)[]"],
+            [[(call.target, True, call.data) for call in batch]],
+        )
+        try:
+            response = await self.provider.eth.call(
+                {"to": self.address, "data": Web3.to_hex(calldata)},
+                block_identifier,
+            )
+            [results] = decode(["(bool,bytes)[]"], response)
+            if len(results) != len(batch):
+                raise ValueError(
+                    f"aggregate3 returned {len(results)} results for {len(batch)} calls"
+                )
+        except Exception as e:
+            self.stats.errors += 1
+            logger.warning("Multicall of %d reads failed: %r", len(batch), e)
+            for call in batch:
+                if not call.future.done():
+                    call.future.set_exception(e)
+            return
+
+        for call, (success, return_data) in zip(batch, results):
+            if call.future.done():
+                continue  # The caller was cancelled.
+            if success:
+                call.future.set_result(HexBytes(return_data))
+            else:
+                self.stats.reverts += 1
+                call.future.set_exception(
+                    ContractLogicError(
+                        "execution reverted", data=Web3.to_hex(return_data)
+                    )
+                )
@@ -1,4 +1,4 @@
-from unittest.mock import AsyncMock, Mock, patch
+from unittest.mock import Mock, patch
 
 import httpx
 import pytest
@@ -39,10 +39,8 @@ def sut():
 
 @pytest.fixture
 def mock_success_response():
-    return AsyncMock(
-        status_code=200,
-        headers={"content-type": "application/json"},
-        json=Mock(return_value=OK_RESPONSE),
+    return httpx.Response(
+        200, json=OK_RESPONSE, request=Request("GET", "http://localhost")
     )
 
 
@@ -0,0 +1,124 @@
+import gzip
+import json
+
+import pytest
+from pytest_httpx import HTTPXMock, IteratorStream
+
+from cowdao_cowpy.common.api import compression
+from cowdao_cowpy.common.api.compression import (
+    CompressionConfig,
+    available_encodings,
+)
+from cowdao_cowpy.common.config import SupportedChainId
+from cowdao_cowpy.order_book.api import OrderBookApi
+from cowdao_cowpy.order_book.config import OrderBookAPIConfigFactory
+
+BASE_URL = "https://api.cow.fi/mainnet"
+
+
+def make_api(compression=None) -> OrderBookApi:
+    return OrderBookApi(
+        OrderBookAPIConfigFactory.get_config("prod", SupportedChainId.MAINNET),
+        compression=compression,
+    )
+
+
+def test_available_encodings_follow_installed_codecs():
+    expected = {"gzip", "deflate"}
+    if compression.brotli is not None:
+        expected.add("br")
+    if compression.zstandard is not None:
+        expected.add("zstd")
+    assert set(available_encodings()) == expected
+
+
+def test_rejects_encodings_that_cannot_be_decoded():
+    with pytest.raises(ValueError, match="Cannot decode"):
+        CompressionConfig(accept_encodings=["snappy"])
+
+
+@pytest.mark.asyncio
+async def test_advertises_configured_encodings(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json="1.0.0")
+    httpx_mock.add_response(json="1.0.0")
+
+    await make_api().get_version()
+    await make_api(CompressionConfig(accept_encodings=[])).get_version()
+
+    default, identity = httpx_mock.get_requests()
+    assert default.headers["accept-encoding"] == ", ".join(available_encodings())
+    assert identity.headers["accept-encoding"] == "identity"
+
+
+@pytest.mark.asyncio
+async def test_records_wire_and_decoded_response_bytes(httpx_mock: HTTPXMock):
+    body = json.dumps({"totalSurplus": "1" * 4000}).encode()
+    httpx_mock.add_response(
+        url=f"{BASE_URL}/api/v1/users/0xabc/total_surplus",
+        # Passed as a stream so httpx sees the body as wire bytes to decode.
+        stream=IteratorStream([gzip.compress(body)]),
+        headers={"content-type": "application/json", "content-encoding": "gzip"},
+    )
+
+    api = make_api()
+    surplus = await api.get_total_surplus("0xabc")
+
+    stats = api.transfer_stats
+    assert surplus.totalSurplus == "1" * 4000
+    assert stats.responses == 1
+    assert stats.response_bytes == len(body)
+    assert stats.response_wire_bytes == len(gzip.compress(body))
+    assert stats.by_encoding["gzip"].count == 1
+    assert stats.response_compression_ratio > 10
+    assert stats.bytes_saved > 0
+
+
+@pytest.mark.asyncio
+async def test_streamed_responses_are_measured(httpx_mock: HTTPXMock):
+    payload = json.dumps(
+        {"id": 1, "orders": [{"uid": f"0x{i:0112x}"} for i in range(50)]}
+    ).encode()
+    httpx_mock.add_response(
+        url=f"{BASE_URL}/api/v1/auction",
+        stream=IteratorStream([gzip.compress(payload)]),
+        headers={"content-encoding": "gzip"},
+    )
+
+    api = make_api()
+    chunks = api.request_strategy.iter_bytes(await api._open_stream("/api/v1/auction"))
+    body = b"".join([chunk async for chunk in chunks])
+
+    assert body == payload
+    assert api.transfer_stats.response_bytes == len(payload)
+    assert api.transfer_stats.response_wire_bytes == len(gzip.compress(payload))
+
+
+@pytest.mark.asyncio
+async def test_request_bodies_are_compressed_when_enabled(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="DELETE", json="Cancelled")
+    httpx_mock.add_response(method="DELETE", json="Cancelled")
+    cancellation = {"orderUids": ["0x" + "ab" * 56] * 50, "signature": "0x00"}
+
+    plain_api = make_api()
+    compressed_api = make_api(CompressionConfig(compress_requests=True))
+    await plain_api.delete_order(cancellation)  # type: ignore[arg-type]
+    await compressed_api.delete_order(cancellation)  # type: ignore[arg-type]
+
+    plain, compressed = httpx_mock.get_requests()
+    assert "content-encoding" not in plain.headers
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert json.loads(gzip.decompress(compressed.content)) == cancellation
+    stats = compressed_api.transfer_stats
+    assert stats.request_wire_bytes == len(compressed.content)
+    assert stats.request_bytes > stats.request_wire_bytes
+
+
+@pytest.mark.asyncio
+async def test_small_request_bodies_are_sent_uncompressed(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method="DELETE", json="Cancelled")
+
+    api = make_api(CompressionConfig(compress_requests=True, min_request_size=4096))
+    await api.delete_order({"orderUids": [], "signature": "0x00"})  # type: ignore[arg-type]
+
+    (request,) = httpx_mock.get_requests()
+    assert "content-encoding" not in request.headers
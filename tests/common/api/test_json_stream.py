@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from cowdao_cowpy.common.api.errors import SerializationError
+from cowdao_cowpy.common.api.json_stream import iter_json_array_items
+
+
+async def chunked(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+async def collect(data: bytes, key: str, size: int = 7):
+    return [item async for item in iter_json_array_items(chunked(data, size), key)]
+
+
+DOCUMENT = {
+    "id": 12345,
+    "prices": {"0xabc": "100", "0xdef": "200"},
+    "orders": [
+        {"uid": "0x01", "amount": 1.5e3, "tags": ["a", "b"], "note": 'say "hi"'},
+        {"uid": "0x02", "amount": 7, "tags": [], "note": "ünïcødé ✓"},
+        {"uid": "0x03", "amount": None, "tags": [{"x": True}], "note": "}]{["},
+    ],
+    "tail": [1, 2, 3],
+}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 100_000])
+async def test_yields_items_regardless_of_chunk_boundaries(size):
+    data = json.dumps(DOCUMENT, ensure_ascii=False).encode()
+
+    assert await collect(data, "orders", size) == DOCUMENT["orders"]
+
+
+@pytest.mark.asyncio
+async def test_numbers_split_across_chunks_are_not_truncated():
+    data = b'{"id": 1234567890, "orders": [1234567890, 42]}'
+
+    assert await collect(data, "orders", size=1) == [1234567890, 42]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"{}",
+        b'{"id": 1}',
+        b'{"orders": null}',
+        b'{"orders": []}',
+        b' { "orders" : [ ] } ',
+    ],
+)
+async def test_missing_null_or_empty_array_yields_nothing(data):
+    assert await collect(data, "orders") == []
+
+
+@pytest.mark.asyncio
+async def test_stops_reading_after_the_array():
+    consumed = []
+
+    async def chunks():
+        for chunk in (b'{"orders": [1, 2]', b', "rest": ', b"never read"):
+            consumed.append(chunk)
+            yield chunk
+
+    items = [item async for item in iter_json_array_items(chunks(), "orders")]
+
+    assert items == [1, 2]
+    assert len(consumed) == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "data", [b'{"orders": [{"uid": "0x01"}, {"uid": ', b'["orders"]', b'{"orders": {}}']
+)
+async def test_malformed_stream_raises_serialization_error(data):
+    with pytest.raises(SerializationError):
+        await collect(data, "orders")
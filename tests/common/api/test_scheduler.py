@@ -0,0 +1,176 @@
+import asyncio
+from collections import Counter
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from cowdao_cowpy.common.api.scheduler import (
+    Lane,
+    RequestScheduler,
+    get_host_scheduler,
+    set_host_scheduler,
+)
+from cowdao_cowpy.common.config import SupportedChainId
+from cowdao_cowpy.order_book.api import OrderBookApi
+from cowdao_cowpy.order_book.config import OrderBookAPIConfigFactory
+
+
+async def admit_all(scheduler: RequestScheduler, lanes):
+    """Queue one request per lane entry at once; return the admission order."""
+    admitted = []
+
+    async def request(lane):
+        await scheduler.acquire(lane)
+        admitted.append(lane)
+
+    await asyncio.gather(*(request(lane) for lane in lanes))
+    return admitted
+
+
+@pytest.mark.asyncio
+async def test_requests_within_burst_are_admitted_immediately():
+    scheduler = RequestScheduler(rate=5, per=1)
+
+    for _ in range(5):
+        await asyncio.wait_for(scheduler.acquire(Lane.BACKGROUND), 0.01)
+
+    stats = scheduler.stats[Lane.BACKGROUND]
+    assert (stats.admitted, stats.max_wait, stats.max_depth) == (5, 0.0, 0)
+
+
+@pytest.mark.asyncio
+async def test_backlogged_lanes_share_the_budget_by_weight():
+    # Burst of 1, then one request every 2ms.
+    scheduler = RequestScheduler(rate=1, per=0.002, max_wait=10)
+    lanes = [Lane.BACKGROUND] * 40 + [Lane.INTERACTIVE] * 40 + [Lane.WRITE] * 40
+
+    admitted = await admit_all(scheduler, lanes)
+
+    # While all three lanes were backlogged, shares follow the 6:3:1 weights.
+    first = Counter(admitted[1:41])
+    assert first[Lane.WRITE] == 24
+    assert first[Lane.INTERACTIVE] == 12
+    assert first[Lane.BACKGROUND] == 4
+    # One background request took the single burst token.
+    assert scheduler.stats[Lane.BACKGROUND].max_depth == 39
+
+
+@pytest.mark.asyncio
+async def test_writes_jump_ahead_of_queued_reads():
+    scheduler = RequestScheduler(rate=1, per=0.002, max_wait=10)
+    reads = asyncio.ensure_future(admit_all(scheduler, [Lane.BACKGROUND] * 30))
+    await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(scheduler.acquire(Lane.WRITE), 0.05)
+
+    assert scheduler.queue_depth(Lane.BACKGROUND) > 10
+    assert scheduler.stats[Lane.WRITE].max_wait < 0.01
+    await reads
+
+
+@pytest.mark.asyncio
+async def test_starving_requests_are_promoted():
+    scheduler = RequestScheduler(
+        rate=1, per=0.002, weights={Lane.BACKGROUND: 0.001}, max_wait=0.02
+    )
+    await scheduler.acquire(Lane.WRITE)
+    writes = []
+
+    async def keep_writing():
+        # Writes arrive faster than the rate, so the write lane never drains.
+        while True:
+            writes.append(asyncio.ensure_future(scheduler.acquire(Lane.WRITE)))
+            await asyncio.sleep(0.001)
+
+    producer = asyncio.ensure_future(keep_writing())
+    try:
+        await asyncio.wait_for(admit_all(scheduler, [Lane.BACKGROUND] * 3), 1)
+    finally:
+        producer.cancel()
+        for write in writes:
+            write.cancel()
+        await asyncio.gather(producer, *writes, return_exceptions=True)
+
+    stats = scheduler.stats[Lane.BACKGROUND]
+    assert stats.promoted >= 1
+    assert stats.max_wait < 0.5
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiters_leave_the_queue():
+    scheduler = RequestScheduler(rate=1, per=10)
+    await scheduler.acquire()
+    waiter = asyncio.ensure_future(scheduler.acquire(Lane.BACKGROUND))
+    await asyncio.sleep(0)
+    assert scheduler.queue_depth(Lane.BACKGROUND) == 1
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert scheduler.queue_depth(Lane.BACKGROUND) == 0
+    assert scheduler.stats[Lane.BACKGROUND].depth == 0
+
+
+def test_host_schedulers_are_shared():
+    assert get_host_scheduler("api.cow.fi") is get_host_scheduler("api.cow.fi")
+    assert get_host_scheduler("api.cow.fi") is not get_host_scheduler("barn.api.cow.fi")
+    with pytest.raises(ValueError):
+        RequestScheduler(weights={Lane.WRITE: 0})
+
+    scheduler = RequestScheduler(rate=1)
+    set_host_scheduler("orderbook.invalid", scheduler)
+    assert get_host_scheduler("orderbook.invalid") is scheduler
+
+
+def test_host_schedulers_are_kept_per_event_loop():
+    async def host_scheduler():
+        scheduler = get_host_scheduler("api.cow.fi")
+        assert get_host_scheduler("api.cow.fi") is scheduler
+        return scheduler
+
+    first = asyncio.run(host_scheduler())
+    second = asyncio.run(host_scheduler())
+    assert first is not second
+    assert first.bucket is second.bucket
+
+
+def test_waiters_of_another_loop_are_cancelled():
+    scheduler = RequestScheduler(rate=1, per=100)
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(scheduler.acquire())
+        waiter = loop.create_task(scheduler.acquire(Lane.BACKGROUND))
+        loop.run_until_complete(asyncio.sleep(0))
+        assert scheduler.queue_depth(Lane.BACKGROUND) == 1
+
+        scheduler.bucket.release()
+        asyncio.run(scheduler.acquire())
+
+        assert scheduler.queue_depth(Lane.BACKGROUND) == 0
+        with pytest.raises(asyncio.CancelledError):
+            loop.run_until_complete(waiter)
+    finally:
+        loop.close()
+
+
+@pytest.mark.asyncio
+async def test_api_requests_are_scheduled_by_lane(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json="1.0.0")
+    httpx_mock.add_response(json="1.0.0")
+    httpx_mock.add_response(method="DELETE", json="Cancelled")
+    scheduler = RequestScheduler()
+    api = OrderBookApi(
+        OrderBookAPIConfigFactory.get_config("prod", SupportedChainId.MAINNET),
+        scheduler=scheduler,
+    )
+
+    await api.get_version()
+    await api.get_version(context_override={"lane": "background"})
+    await api.delete_order({"orderUids": [], "signature": "0x00"})  # type: ignore[arg-type]
+
+    assert {lane: stats.admitted for lane, stats in scheduler.stats.items()} == {
+        Lane.WRITE: 1,
+        Lane.INTERACTIVE: 1,
+        Lane.BACKGROUND: 1,
+    }
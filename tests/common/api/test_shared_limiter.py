@@ -0,0 +1,102 @@
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+
+from cowdao_cowpy.common.api.scheduler import Lane, RequestScheduler
+from cowdao_cowpy.common.api.shared_limiter import SharedTokenBucket
+
+RATE = 20
+PER = 0.2
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_buckets_opening_one_file_share_tokens(tmp_path):
+    clock = FakeClock()
+    path = tmp_path / "bucket"
+    with SharedTokenBucket(path, rate=4, per=1, clock=clock) as first:
+        with SharedTokenBucket(path, rate=4, per=1, clock=clock) as second:
+            assert [first.try_acquire(), second.try_acquire()] == [0.0, 0.0]
+            assert [second.try_acquire(), first.try_acquire()] == [0.0, 0.0]
+            # The burst is spent for both; the next token is 1/4s away.
+            assert second.try_acquire() == pytest.approx(0.25)
+
+            clock.now += 0.5
+            assert first.tokens == pytest.approx(2)
+            first.release()
+            assert second.tokens == pytest.approx(3)
+            clock.now += 10
+            assert second.tokens == 4
+
+
+def run_worker(path, deadline, results):
+    bucket = SharedTokenBucket(path, rate=RATE, per=PER)
+    started = time.monotonic()
+    acquired = 0
+    while time.monotonic() < deadline:
+        wait = bucket.try_acquire()
+        if wait == 0:
+            acquired += 1
+        else:
+            time.sleep(wait)
+    results.put((acquired, started))
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="needs fork"
+)
+def test_processes_stay_within_one_budget(tmp_path):
+    path = tmp_path / "bucket"
+    SharedTokenBucket(path, rate=RATE, per=PER).close()
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    created = time.monotonic()
+    deadline = created + 0.6
+    workers = [
+        context.Process(target=run_worker, args=(path, deadline, results))
+        for _ in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    outcomes = [results.get(timeout=10) for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    total = sum(acquired for acquired, _ in outcomes)
+    # The burst plus the refill since the bucket was created.
+    budget = RATE + (deadline - created) * RATE / PER
+    assert total <= budget + 1
+    # Each worker alone would take the whole budget; together they fill it.
+    assert total >= 0.8 * budget
+    assert all(acquired > 0 for acquired, _ in outcomes)
+
+
+@pytest.mark.asyncio
+async def test_schedulers_share_a_bucket(tmp_path):
+    path = tmp_path / "bucket"
+    schedulers = [
+        RequestScheduler(bucket=SharedTokenBucket(path, rate=5, per=0.1))
+        for _ in range(2)
+    ]
+
+    started = time.monotonic()
+    await asyncio.gather(
+        *(
+            scheduler.acquire(Lane.BACKGROUND)
+            for scheduler in schedulers
+            for _ in range(10)
+        )
+    )
+    elapsed = time.monotonic() - started
+
+    # 5 requests fit the burst; the other 15 need 0.3s of refill at 50/s.
+    assert elapsed >= 0.28
+    assert sum(s.stats[Lane.BACKGROUND].admitted for s in schedulers) == 20
@@ -1,20 +1,25 @@
-from dataclasses import asdict
+from dataclasses import asdict, replace
 import pytest
 from unittest.mock import AsyncMock, Mock
 from web3 import Web3
+from eth_abi.abi import decode, encode
 from eth_typing import HexStr
+from hexbytes import HexBytes
 
 
 from cowdao_cowpy.common.chains import Chain
+from cowdao_cowpy.composable.conditional_order import ConditionalOrderFactory
 from cowdao_cowpy.composable.order_types.twap import (
     Twap,
     TwapData,
     TWAP_ADDRESS,
+    TWAP_STRUCT_ABI,
     DurationType,
     StartType,
 )
 from cowdao_cowpy.contracts.order import Order
 from cowdao_cowpy.composable.types import PollParams, PollResultCode, PollResultError
+from cowdao_cowpy.composable.utils import abi_decoder
 
 # Constants
 OWNER = "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"
@@ -111,6 +116,34 @@ class TestTwapId:
             == "0xe993544057dbc8504c4e38a6fe35845a81e0849c11242a6070f9d25152598df6"
         )
 
+    def test_id_and_encodings_are_computed_once(self, monkeypatch):
+        twap = Twap.from_data(TWAP_PARAMS_TEST, SALT)
+        assert twap.id == TWAP_ID
+        assert twap.composableCow is twap.composableCow
+
+        encode = Mock(side_effect=AssertionError("encoded again"))
+        monkeypatch.setattr("cowdao_cowpy.composable.order_types.twap.encode", encode)
+        assert twap.is_valid().is_valid
+        assert twap.leaf.static_input == twap.encode_static_input()
+        assert twap.id == TWAP_ID
+
+    def test_id_follows_changes_to_the_order(self):
+        twap = Twap.from_data(TWAP_PARAMS_TEST, SALT)
+        assert twap.id == TWAP_ID
+        twap.salt = SALT_2
+        assert twap.id == TWAP_ID_2
+
+        twap.data = TwapData(**{**TWAP_PARAMS_TEST.__dict__})
+        twap.data.start_type = StartType.AT_EPOCH
+        twap.data.start_time_epoch = 123456789
+        assert twap.id == TWAP_ID_2
+        twap.salt = SALT
+        twap.invalidate()
+        assert (
+            twap.id
+            == "0xe993544057dbc8504c4e38a6fe35845a81e0849c11242a6070f9d25152598df6"
+        )
+
 
 class TestTwapValidate:
     def test_valid_twap(self):
@@ -196,6 +229,35 @@ class TestTwapSerialization:
         deserialized = Twap.deserialize(serialized)
         assert deserialized.id == twap.id
 
+    def test_params_decode_in_bulk(self):
+        twap = Twap.from_data(TWAP_PARAMS_TEST, SALT)
+        unknown = replace(twap.leaf, handler=ZERO_ADDRESS)
+        corrupt = replace(twap.leaf, static_input="0x1234")
+        decoded = ConditionalOrderFactory.from_params_many(
+            [twap.leaf, unknown, corrupt, Twap.from_data(TWAP_PARAMS_TEST, SALT_2).leaf]
+        )
+
+        assert [order and order.id for order in decoded.orders] == [
+            TWAP_ID,
+            None,
+            None,
+            TWAP_ID_2,
+        ]
+        assert decoded.unknown == [1] and list(decoded.errors) == [2]
+        assert ConditionalOrderFactory.from_params(twap.leaf).id == TWAP_ID
+        with pytest.raises(ValueError, match="HandlerMismatch"):
+            Twap.from_params(unknown)
+
+    def test_cached_decoders_match_eth_abi(self):
+        static_input = HexBytes(Twap.from_data(TWAP_PARAMS_TEST).encode_static_input())
+        assert abi_decoder(tuple(TWAP_STRUCT_ABI))(static_input) == decode(
+            TWAP_STRUCT_ABI, static_input
+        )
+        types = ["(uint256,(bytes32,bytes))", "bytes32[]"]
+        encoded = encode(types, [(7, (b"\1" * 32, b"data")), [b"\2" * 32]])
+        assert abi_decoder(tuple(types))(encoded) == decode(types, encoded)
+        assert abi_decoder(tuple(types)) is abi_decoder(tuple(types))
+
 
 # @pytest.mark.asyncio
 # class TestTwapPollValidate:
@@ -0,0 +1,156 @@
+import asyncio
+from dataclasses import replace
+
+import pytest
+
+from cowdao_cowpy.common.chains import Chain
+from cowdao_cowpy.composable.order_types.twap import (
+    DurationType,
+    StartType,
+    Twap,
+    TwapData,
+)
+from cowdao_cowpy.composable.types import PollParams, PollResultError
+from cowdao_cowpy.web3.blocks import BlockCache, TimestampExtrapolator
+
+
+class Clock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeChain:
+    """Answers get_block with a head that advances when told to."""
+
+    def __init__(self, number: int = 100, block_time: int = 5):
+        self.eth = self
+        self.number = number
+        self.block_time = block_time
+        self.requests = []
+
+    async def get_block(self, block_identifier):
+        self.requests.append(block_identifier)
+        await asyncio.sleep(0.001)
+        number = self.number if block_identifier == "latest" else block_identifier
+        return {"number": number, "timestamp": 1_000 + number * self.block_time}
+
+
+class Unauthorized:
+    """A ComposableCoW on which the order started at 1_000 but is not authorized."""
+
+    async def cabinet(self, owner, ctx) -> bytes:
+        return (1_000).to_bytes(32, "big")
+
+    async def single_orders(self, owner, id) -> bool:
+        return False
+
+
+@pytest.mark.asyncio
+async def test_concurrent_readers_share_one_fetch_per_head():
+    chain, clock = FakeChain(), Clock()
+    blocks = BlockCache(chain, max_age=1.0, clock=clock)  # type: ignore[arg-type]
+
+    heads = await asyncio.gather(*(blocks.latest() for _ in range(50)))
+    assert chain.requests == ["latest"]
+    assert {head["number"] for head in heads} == {100}
+
+    chain.number = 101
+    clock.now = 0.5
+    assert (await blocks.latest())["number"] == 100
+    clock.now = 1.0
+    assert (await blocks.latest())["number"] == 101
+    assert (await blocks.get_block(100))["timestamp"] == 1_500
+    assert chain.requests == ["latest", "latest"]
+
+
+@pytest.mark.asyncio
+async def test_a_cancelled_reader_leaves_the_shared_fetch_running():
+    chain = FakeChain()
+    blocks = BlockCache(chain, max_age=1.0)  # type: ignore[arg-type]
+
+    first = asyncio.ensure_future(blocks.latest())
+    await asyncio.sleep(0)
+    others = [asyncio.ensure_future(blocks.latest()) for _ in range(3)]
+    await asyncio.sleep(0)
+    first.cancel()
+
+    heads = await asyncio.gather(*others)
+    assert first.cancelled()
+    assert [head["number"] for head in heads] == [100] * 3
+    assert chain.requests == ["latest"]
+
+
+@pytest.mark.asyncio
+async def test_extrapolated_heads_between_resyncs():
+    chain, clock, wall = FakeChain(), Clock(), Clock(50.0)
+    blocks = BlockCache(
+        chain,  # type: ignore[arg-type]
+        max_age=0,
+        extrapolator=TimestampExtrapolator.for_chain(Chain.GNOSIS, clock=wall),
+        resync_interval=30,
+        clock=clock,
+    )
+    head = await blocks.latest()
+    assert head["number"] == 100 and not blocks.is_estimate(head)
+
+    clock.now, wall.now = 12, 62.0
+    head = await blocks.latest()
+    assert head == {"number": 102, "timestamp": 1_510} and blocks.is_estimate(head)
+    assert blocks.extrapolator.block_at(1_511) == 103  # type: ignore[union-attr]
+
+    chain.number = 107
+    clock.now, wall.now = 30, 80.0
+    assert (await blocks.latest())["number"] == 107
+    assert chain.requests == ["latest", "latest"]
+    assert blocks.stats.extrapolated == 1
+
+
+@pytest.mark.asyncio
+async def test_a_twap_poll_reads_the_injected_block():
+    chain = FakeChain()
+    twap = Twap.from_data(
+        TwapData(
+            sell_token="0x" + "11" * 20,
+            buy_token="0x" + "22" * 20,
+            receiver="0x" + "33" * 20,
+            sell_amount=10**19,
+            buy_amount=10**18,
+            start_type=StartType.AT_EPOCH,
+            start_time_epoch=1_000,
+            number_of_parts=10,
+            time_between_parts=3600,
+            duration_type=DurationType.AUTO,
+            app_data="0x" + "00" * 32,
+        )
+    )
+    params = PollParams(
+        owner="0x" + "44" * 20,
+        chain=Chain.GNOSIS,
+        provider=chain,  # type: ignore[arg-type]
+        order_book_api=None,  # type: ignore[arg-type]
+    )
+
+    # Without a block, a poll fetches the head once for all of its checks,
+    # and leaves the caller's params alone.
+    assert await twap.get_block_timestamp(params) == 1_500
+    chain.requests.clear()
+    result = await twap.poll(replace(params, composable_cow=Unauthorized()))
+    assert chain.requests == ["latest"]
+    assert isinstance(result, PollResultError) and "NotAuthorized" in result.reason
+    assert params.block_info is None
+    chain.requests.clear()
+
+    blocks = BlockCache(chain)  # type: ignore[arg-type]
+    params = PollParams(
+        owner=params.owner,
+        chain=params.chain,
+        provider=params.provider,
+        order_book_api=params.order_book_api,
+    )
+    injected = await asyncio.gather(*(blocks.inject(params) for _ in range(10)))
+    assert {p.block_info["number"] for p in injected} == {100}  # type: ignore[index]
+    assert params.block_info is None
+    assert chain.requests == ["latest"]
@@ -0,0 +1,104 @@
+import pytest
+from eth_abi.abi import encode
+from hexbytes import HexBytes
+from web3 import AsyncEthereumTesterProvider, AsyncWeb3, Web3
+
+from cowdao_cowpy.composable.indexer import (
+    CONDITIONAL_ORDER_CREATED_TOPIC,
+    MERKLE_ROOT_SET_TOPIC,
+    ComposableCowIndexer,
+    ConditionalOrderCreatedEvent,
+    FileCheckpoint,
+    MerkleRootSetEvent,
+    is_range_error,
+)
+from cowdao_cowpy.composable.order_types.twap import Twap
+
+from .order_types.mock_twap_data import generate_random_twap_data
+
+# Emits LOG2(calldata[64:], topic0=calldata[0:32], topic1=calldata[32:64]).
+EMITTER = bytes.fromhex("6040360380604060003760203590600035906000a200")
+OWNER = Web3.to_checksum_address("0x" + "0a" * 20)
+MAX_RESULTS = 3
+
+
+async def deploy_emitter(w3: AsyncWeb3) -> str:
+    init = bytes.fromhex("60%02x80600b6000396000f3" % len(EMITTER)) + EMITTER
+    sender = (await w3.eth.accounts)[0]
+    tx = await w3.eth.send_transaction({"from": sender, "data": init})
+    return (await w3.eth.wait_for_transaction_receipt(tx))["contractAddress"]
+
+
+async def emit(w3: AsyncWeb3, emitter: str, topic: bytes, data: bytes) -> None:
+    sender = (await w3.eth.accounts)[0]
+    owner = HexBytes(OWNER).rjust(32, b"\0")
+    tx = await w3.eth.send_transaction(
+        {"from": sender, "to": emitter, "data": Web3.to_hex(topic + owner + data)}
+    )
+    await w3.eth.wait_for_transaction_receipt(tx)
+
+
+def limit_results(w3: AsyncWeb3) -> None:
+    """Make eth_getLogs refuse ranges with more than MAX_RESULTS logs, as providers do."""
+    get_logs = w3.eth.get_logs
+
+    async def limited(params):
+        logs = await get_logs(params)
+        if len(logs) > MAX_RESULTS:
+            raise ValueError(f"query returned more than {MAX_RESULTS} results")
+        return logs
+
+    w3.eth.get_logs = limited  # type: ignore[method-assign]
+
+
+@pytest.mark.asyncio
+async def test_indexer_splits_ranges_and_resumes_from_its_checkpoint(tmp_path):
+    w3 = AsyncWeb3(AsyncEthereumTesterProvider())
+    emitter = await deploy_emitter(w3)
+    twaps = [Twap.from_data(generate_random_twap_data()) for _ in range(8)]
+    for twap in twaps:
+        await emit(
+            w3, emitter, CONDITIONAL_ORDER_CREATED_TOPIC, HexBytes(twap.serialize())
+        )
+    unknown = encode(["(address,bytes32,bytes)"], [("0x" + "01" * 20, b"\1" * 32, b"")])
+    await emit(w3, emitter, CONDITIONAL_ORDER_CREATED_TOPIC, unknown)
+    root_set = encode(["bytes32", "(uint256,bytes)"], [b"\2" * 32, (1, b"\3")])
+    await emit(w3, emitter, MERKLE_ROOT_SET_TOPIC, root_set)
+    limit_results(w3)
+
+    checkpoint = FileCheckpoint(str(tmp_path / "checkpoint.json"))
+    indexer = ComposableCowIndexer(
+        w3, address=emitter, checkpoint=checkpoint, range_size=8, concurrency=2
+    )
+    events = await indexer.scan()
+
+    assert indexer.stats.splits > 0 and indexer.stats.logs == 10
+    created = [e for e in events if isinstance(e, ConditionalOrderCreatedEvent)]
+    assert [e.order.id for e in created[:8]] == [t.id for t in twaps]  # type: ignore[union-attr]
+    assert all(e.owner == OWNER for e in events)
+    assert created[8].order is None and "Unknown handler" in str(created[8].error)
+    assert events[-1] == MerkleRootSetEvent(
+        OWNER,
+        Web3.to_hex(b"\2" * 32),
+        1,
+        "0x03",
+        events[-1].block_number,
+        events[-1].transaction_hash,
+        0,
+    )
+    head = await w3.eth.block_number
+    assert checkpoint.load(emitter) == head + 1
+
+    await emit(w3, emitter, MERKLE_ROOT_SET_TOPIC, root_set)
+    resumed = ComposableCowIndexer(w3, address=emitter, checkpoint=checkpoint)
+    assert resumed.next_block == head + 1
+    assert [e.block_number for e in await resumed.scan()] == [head + 1]
+    with pytest.raises(ValueError, match="Checkpoint"):
+        ComposableCowIndexer(w3, checkpoint=checkpoint)
+
+
+def test_range_errors_are_recognized():
+    assert is_range_error(ValueError("query returned more than 10000 results"))
+    assert is_range_error(ValueError("Log response size exceeded."))
+    assert is_range_error(ValueError("block range is too wide"))
+    assert not is_range_error(ValueError("execution reverted"))
@@ -0,0 +1,108 @@
+import os
+import random
+
+import pytest
+from hexbytes import HexBytes
+from web3 import Web3
+
+from cowdao_cowpy.composable.merkle import (
+    MerkleProof,
+    MerkleTree,
+    MultiProof,
+    hash_pair,
+)
+
+
+def test_pairs_are_hashed_in_sorted_order():
+    a, b = HexBytes(b"\x01" * 32), HexBytes(b"\x02" * 32)
+    assert hash_pair(a, b) == hash_pair(b, a) == Web3.keccak(a + b)
+
+
+def test_leaves_fill_a_complete_tree():
+    leaves = [HexBytes(os.urandom(32)) for _ in range(3)]
+    tree = MerkleTree(leaves)
+    # Appending the third leaf split the slot of the first.
+    assert tree.nodes[2:] == [leaves[1], leaves[0], leaves[2]]
+    assert tree.root == hash_pair(hash_pair(leaves[0], leaves[2]), leaves[1])
+    assert tree.proof(1).path == [hash_pair(leaves[0], leaves[2])]
+    assert MerkleTree(leaves[:1]).root == leaves[0]
+    assert MerkleTree().root is None
+
+
+def standard_merkle_tree_root(leaves):
+    """The root of ``leaves`` in OpenZeppelin's StandardMerkleTree layout."""
+    n = len(leaves)
+    nodes = [HexBytes(b"")] * (2 * n - 1)
+    for i, leaf in enumerate(leaves):
+        nodes[2 * n - 2 - i] = leaf
+    for i in range(n - 2, -1, -1):
+        nodes[i] = hash_pair(nodes[2 * i + 1], nodes[2 * i + 2])
+    return nodes[0]
+
+
+def test_roots_are_pinned_and_differ_from_standard_merkle_tree():
+    leaves = [Web3.keccak(bytes([i])) for i in range(5)]
+    root = MerkleTree(leaves).root
+
+    assert Web3.to_hex(root) == (
+        "0x272080b67014b0bb15f8dd1e5a154c9656eab7b51c99e18aebd3020d25d93de7"
+    )
+    assert Web3.to_hex(standard_merkle_tree_root(leaves)) == (
+        "0x4012e3527351abde51ed075bbd7c41097ede613e3e77bc14c1b2900fee859002"
+    )
+
+
+def test_edits_match_a_rebuilt_tree():
+    rng = random.Random(7)
+    tree, leaves = MerkleTree(), []
+    for _ in range(1_000):
+        roll = rng.random()
+        if roll < 0.5 or not leaves:
+            leaves.append(HexBytes(os.urandom(32)))
+            tree.append(leaves[-1])
+        elif roll < 0.75:
+            i = rng.randrange(len(leaves))
+            leaves[i] = HexBytes(os.urandom(32))
+            tree.update(i, leaves[i])
+        else:
+            i = rng.randrange(len(leaves))
+            last = leaves.pop()
+            if i < len(leaves):
+                leaves[i] = last
+            tree.remove(i)
+
+        assert tree.nodes == MerkleTree(leaves).nodes
+        if leaves:
+            proof = tree.proof(rng.randrange(len(leaves)))
+            assert proof.verify(tree.root)  # type: ignore[arg-type]
+
+
+def test_proofs_only_verify_their_own_leaf():
+    tree = MerkleTree(os.urandom(32) for _ in range(10))
+    proof = tree.proof(4)
+    assert proof.verify(tree.root)  # type: ignore[arg-type]
+    assert not MerkleProof(tree.leaf(5), proof.path).verify(tree.root)  # type: ignore[arg-type]
+    with pytest.raises(IndexError):
+        tree.proof(10)
+
+
+def test_multiproofs_share_siblings_and_expand_to_single_proofs():
+    rng = random.Random(3)
+    tree = MerkleTree(os.urandom(32) for _ in range(100))
+    indices = rng.sample(range(100), 40)
+    multiproof = tree.multiproof(indices)
+
+    assert multiproof.verify(tree.root)  # type: ignore[arg-type]
+    assert sorted(multiproof.indices) == sorted(indices)
+    assert len(multiproof.proof) < sum(len(tree.proof(i).path) for i in indices)
+    for proof in multiproof.expand():
+        assert proof.path == tree.proof(proof.index).path  # type: ignore[arg-type]
+
+    tampered = MultiProof(
+        multiproof.leaves[::-1], multiproof.proof, multiproof.proof_flags
+    )
+    assert not tampered.verify(tree.root)  # type: ignore[arg-type]
+    assert tree.multiproof([]).verify(tree.root)  # type: ignore[arg-type]
+    assert tree.multiproof(range(100)).proof == []
+    with pytest.raises(ValueError, match="duplicated"):
+        tree.multiproof([1, 1])
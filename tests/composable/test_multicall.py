@@ -0,0 +1,201 @@
+import asyncio
+from typing import List, Tuple
+
+import pytest
+from eth_abi.abi import decode, encode
+from eth_utils.abi import function_signature_to_4byte_selector
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.exceptions import ContractLogicError
+
+from cowdao_cowpy.common.chains import Chain
+from cowdao_cowpy.composable.multicall import BatchedComposableCow
+from cowdao_cowpy.composable.order_types.twap import (
+    DurationType,
+    StartType,
+    Twap,
+    TwapData,
+)
+from cowdao_cowpy.composable.poll_scheduler import PollScheduler
+from cowdao_cowpy.composable.types import PollResultCode
+from cowdao_cowpy.web3.multicall import AGGREGATE3_SELECTOR, MulticallBatcher
+
+OWNER = Web3.to_checksum_address("0x" + "0a" * 20)
+STRANGER = Web3.to_checksum_address("0x" + "0b" * 20)
+START = 1_700_000_000
+SINGLE_ORDERS = function_signature_to_4byte_selector("singleOrders(address,bytes32)")
+CABINET = function_signature_to_4byte_selector("cabinet(address,bytes32)")
+GET_TRADEABLE = function_signature_to_4byte_selector(
+    "getTradeableOrderWithSignature(address,(address,bytes32,bytes),bytes,bytes32[])"
+)
+NOT_AUTHED = function_signature_to_4byte_selector("SingleOrderNotAuthed()")
+KIND_SELL = Web3.keccak(text="sell")
+BALANCE_ERC20 = Web3.keccak(text="erc20")
+
+
+class FakeMulticall3:
+    """A provider whose Multicall3 runs calls against a fake ComposableCoW."""
+
+    def __init__(self):
+        self.eth = self
+        self.requests: List[Tuple[int, object]] = []
+        self.fail = False
+
+    async def call(self, transaction, block_identifier):
+        data = HexBytes(transaction["data"])
+        assert data[:4] == AGGREGATE3_SELECTOR
+        [calls] = decode(["(address,bool,bytes)[]"], data[4:])
+        self.requests.append((len(calls), block_identifier))
+        await asyncio.sleep(0.001)
+        if self.fail:
+            raise ConnectionError("rpc unavailable")
+        return encode(
+            ["(bool,bytes)[]"], [[self.execute(call_data) for _, _, call_data in calls]]
+        )
+
+    def execute(self, call_data: bytes) -> Tuple[bool, bytes]:
+        selector, arguments = call_data[:4], call_data[4:]
+        if selector == CABINET:
+            return True, START.to_bytes(32, "big")
+        if selector == SINGLE_ORDERS:
+            owner, _ = decode(["address", "bytes32"], arguments)
+            if Web3.to_checksum_address(owner) != OWNER:
+                return False, NOT_AUTHED
+            return True, encode(["bool"], [True])
+        if selector == GET_TRADEABLE:
+            owner, (handler, salt, static_input), _, _ = decode(
+                ["address", "(address,bytes32,bytes)", "bytes", "bytes32[]"],
+                arguments,
+            )
+            order = (
+                "0x" + "11" * 20,
+                "0x" + "22" * 20,
+                owner,
+                10**18,
+                10**17,
+                START + 600,
+                salt,
+                0,
+                KIND_SELL,
+                False,
+                BALANCE_ERC20,
+                BALANCE_ERC20,
+            )
+            return True, encode(
+                [
+                    "(address,address,address,uint256,uint256,uint32,bytes32,uint256,bytes32,bool,bytes32,bytes32)",
+                    "bytes",
+                ],
+                [order, b"signature"],
+            )
+        return False, b""
+
+
+class NoOrders:
+    async def get_order_by_uid(self, uid, context_override={}):
+        raise LookupError("not found")
+
+
+def make_twap(i: int) -> Twap:
+    return Twap.from_data(
+        TwapData(
+            sell_token="0x" + "11" * 20,
+            buy_token="0x" + "22" * 20,
+            receiver=OWNER,
+            sell_amount=10**19,
+            buy_amount=10**18,
+            start_type=StartType.AT_MINING_TIME,
+            number_of_parts=10,
+            time_between_parts=3600,
+            duration_type=DurationType.AUTO,
+            app_data="0x" + "00" * 32,
+        ),
+        salt=f"0x{i:064x}",  # type: ignore[arg-type]
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reads_share_one_aggregate3():
+    provider = FakeMulticall3()
+    batcher = MulticallBatcher(provider, window=0.01)  # type: ignore[arg-type]
+    composable_cow = BatchedComposableCow(batcher, Chain.MAINNET, block_identifier=10)
+    ids = [HexBytes(f"0x{i:064x}") for i in range(50)]
+
+    authorized = await asyncio.gather(
+        *(composable_cow.single_orders(OWNER, id) for id in ids),
+        composable_cow.single_orders(STRANGER, ids[0]),
+        return_exceptions=True,
+    )
+
+    assert provider.requests == [(51, 10)]
+    assert authorized[:50] == [True] * 50
+    assert isinstance(authorized[50], ContractLogicError)
+    assert authorized[50].data == Web3.to_hex(NOT_AUTHED)
+    assert batcher.stats.reverts == 1
+
+
+@pytest.mark.asyncio
+async def test_full_batches_go_out_at_once_and_failures_reach_every_caller():
+    provider = FakeMulticall3()
+    batcher = MulticallBatcher(provider, window=10, max_batch_size=4)  # type: ignore[arg-type]
+    composable_cow = BatchedComposableCow(batcher)
+
+    cabinets = await asyncio.gather(
+        *(composable_cow.cabinet(OWNER, HexBytes(32)) for _ in range(8))
+    )
+    assert [size for size, _ in provider.requests] == [4, 4]
+    assert {Web3.to_int(cabinet) for cabinet in cabinets} == {START}
+
+    provider.fail = True
+    outcomes = await asyncio.gather(
+        composable_cow.cabinet(OWNER, HexBytes(32)),
+        composable_cow.cabinet(OWNER, HexBytes(32)),
+        batcher.flush(),
+        return_exceptions=True,
+    )
+    assert all(isinstance(o, ConnectionError) for o in outcomes[:2])
+
+
+@pytest.mark.asyncio
+async def test_polls_of_a_tick_are_batched_per_read():
+    provider = FakeMulticall3()
+    scheduler = PollScheduler(
+        Chain.MAINNET,
+        provider=provider,  # type: ignore[arg-type]
+        order_book_api=NoOrders(),  # type: ignore[arg-type]
+        max_concurrency=100,
+        multicall=MulticallBatcher(provider),  # type: ignore[arg-type]
+    )
+    twaps = [make_twap(i) for i in range(60)]
+    for twap in twaps:
+        scheduler.register(OWNER, twap)
+    scheduler.register(STRANGER, twaps[0])
+
+    block = {"number": 123, "timestamp": START + 60}
+    outcomes = await scheduler.tick(123, START + 60, block)  # type: ignore[arg-type]
+
+    codes = [outcome.result.result for outcome in outcomes]
+    assert codes.count(PollResultCode.SUCCESS) == 60
+    assert codes.count(PollResultCode.UNEXPECTED_ERROR) == 1
+    success = next(o for o in outcomes if o.result.result == PollResultCode.SUCCESS)
+    assert success.result.order.receiver == OWNER
+    # One aggregate3 per read of the poll (cabinet, singleOrders,
+    # getTradeableOrderWithSignature) instead of 183 eth_calls.
+    assert provider.requests == [(61, 123), (61, 123), (60, 123)]
+
+
+@pytest.mark.asyncio
+async def test_reads_of_an_estimated_head_go_to_the_latest_block():
+    provider = FakeMulticall3()
+    scheduler = PollScheduler(
+        Chain.MAINNET,
+        provider=provider,  # type: ignore[arg-type]
+        order_book_api=NoOrders(),  # type: ignore[arg-type]
+        multicall=MulticallBatcher(provider),  # type: ignore[arg-type]
+    )
+    scheduler.register(OWNER, make_twap(0))
+
+    block = {"number": 130, "timestamp": START + 60}
+    await scheduler.tick(130, START + 60, block, estimated=True)  # type: ignore[arg-type]
+
+    assert {identifier for _, identifier in provider.requests} == {"latest"}
@@ -1,7 +1,12 @@
+import json
+
 import pytest
+from hexbytes import HexBytes
+from web3 import Web3
 
 from cowdao_cowpy.common.chains import Chain
-from cowdao_cowpy.composable.multiplexer import Multiplexer
+from cowdao_cowpy.composable.merkle import MerkleTree, hash_leaf
+from cowdao_cowpy.composable.multiplexer import Multiplexer, order_leaf
 from cowdao_cowpy.composable.types import ProofLocation
 from cowdao_cowpy.composable.order_types.twap import Twap
 from cowdao_cowpy.composable.utils import getComposableCoW
@@ -96,6 +101,26 @@ class TestMultiplexerCRUD:
         assert order3 is not None
         assert order3 == twap
 
+    def test_query_follows_edits(self):
+        twaps = [Twap.from_data(generate_random_twap_data()) for _ in range(6)]
+        for twap in twaps:
+            self.m.add(twap)
+        token = twaps[2].data.sell_token
+
+        assert self.m.query(start=1, limit=2) == twaps[1:3]
+        assert self.m.query(token=token.upper()) == [twaps[2]]
+        assert self.m.query(order_type="twap", start=4) == twaps[4:]
+        assert self.m.query(handler=twaps[0].handler, token="0x00") == []
+
+        replacement = Twap.from_data(generate_random_twap_data())
+        self.m.update(twaps[2].id, lambda order, ctx: replacement)
+        self.m.remove(twaps[0].id)
+        assert self.m.query(token=token) == []
+        assert self.m.index_of(replacement.id) == 2
+        assert self.m.query(token=replacement.data.buy_token) == [replacement]
+        assert self.m.query(handler=twaps[0].handler.lower()) == self.m.get_orders()
+        assert len(self.m.query(order_type="twap")) == 5
+
     def test_cannot_add_invalid_orders(self):
         # Create invalid TWAP with negative time between parts
         invalid_data = generate_random_twap_data()
@@ -159,12 +184,85 @@ class TestMultiplexerSerialization:
         order_after = m2.get_by_id(order_id)
         assert order_before.id == order_after.id
 
+    def test_version_1_exports_are_checked_against_their_order_ids(self):
+        for _ in range(3):
+            self.m.add(Twap.from_data(generate_random_twap_data()))
+        data = json.loads(self.m.to_json())
+        del data["version"]
+        data["root"] = "0x" + "ab" * 32  # A pymerkle root.
+
+        m2 = Multiplexer.from_json(json.dumps(data))
+        assert m2.root == self.m.root
+        assert m2.order_ids == self.m.order_ids
+
+        order_id = self.m.order_ids[0]
+        data["orders"][order_id]["salt"] = "0x" + "00" * 32
+        with pytest.raises(ValueError, match="order id mismatch"):
+            Multiplexer.from_json(json.dumps(data))
+
+        with pytest.raises(ValueError, match="root mismatch"):
+            Multiplexer.from_json(json.dumps({**data, "version": 2}))
+
 
 class TestMultiplexerProofs:
     def setup_method(self):
         Multiplexer.register_order_type("twap", Twap)
         self.m = Multiplexer()
 
+    def test_root_and_proofs_follow_composable_cow(self):
+        twaps = [Twap.from_data(generate_random_twap_data()) for _ in range(5)]
+        for twap in twaps:
+            self.m.add(twap)
+
+        # ComposableCoW: keccak256(bytes.concat(keccak256(abi.encode(params))))
+        leaves = [hash_leaf(HexBytes(twap.serialize())) for twap in twaps]
+        assert leaves == [order_leaf(twap) for twap in twaps]
+        assert self.m.root == Web3.to_hex(MerkleTree(leaves).root)
+        for twap, proof in zip(twaps, self.m.get_proofs()):
+            assert proof.params == twap.leaf
+            assert proof.proof.verify(HexBytes(self.m.root))
+
+    def test_edits_update_the_tree_in_place(self):
+        twaps = [Twap.from_data(generate_random_twap_data()) for _ in range(6)]
+        for twap in twaps:
+            self.m.add(twap)
+        tree = self.m.get_or_generate_tree()
+
+        self.m.remove(twaps[1].id)
+        replacement = Twap.from_data(generate_random_twap_data())
+        self.m.update(twaps[3].id, lambda order, ctx: replacement)
+        self.m.add(twaps[1])
+
+        assert self.m.tree is tree
+        expected = [twaps[0], twaps[5], twaps[2], replacement, twaps[4], twaps[1]]
+        assert self.m.get_orders() == expected
+        assert self.m.root == Web3.to_hex(
+            MerkleTree(order_leaf(twap) for twap in expected).root
+        )
+        m2 = Multiplexer.from_json(self.m.to_json())
+        assert m2.root == self.m.root
+
+    def test_compact_proofs_decode_to_the_same_proofs(self):
+        for _ in range(64):
+            self.m.add(Twap.from_data(generate_random_twap_data()))
+        wanted = set(self.m.order_ids[::2])
+
+        def keep(order):
+            return order.id in wanted
+
+        multiproof = self.m.get_multiproof(keep)
+        assert multiproof.proof.verify(HexBytes(self.m.root))
+
+        full = self.m.encode_to_json(keep)
+        compact = self.m.encode_to_compact_json(keep)
+        assert len(compact) < len(full)
+        by_salt = {p.params.salt: p for p in Multiplexer.decode_proofs(full)}
+        decoded = Multiplexer.decode_proofs(compact)
+        assert len(decoded) == len(by_salt) == 32
+        for proof in decoded:
+            assert proof.proof.verify(HexBytes(self.m.root))
+            assert proof.proof.path == by_salt[proof.params.salt].proof.path
+
     @pytest.mark.asyncio
     async def test_prepare_proof_struct_basic(self):
         # Add multiple TWAP orders
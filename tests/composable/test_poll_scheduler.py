@@ -0,0 +1,135 @@
+import asyncio
+import time
+from typing import List
+
+import pytest
+
+from cowdao_cowpy.common.chains import Chain
+from cowdao_cowpy.composable.poll_scheduler import PollScheduler
+from cowdao_cowpy.composable.types import (
+    PollResult,
+    PollResultCode,
+    PollResultError,
+    PollResultSuccess,
+)
+
+OWNER = "0x" + "AB" * 20
+
+
+def error(code: PollResultCode, **kwargs) -> PollResultError:
+    return PollResultError(result=code, reason=code.value, **kwargs)
+
+
+class ScriptedOrder:
+    """A conditional order answering polls from a script, then TRY_NEXT_BLOCK."""
+
+    def __init__(self, id: str, *results: PollResult):
+        self.id = id
+        self.results = list(results)
+        self.polled_at: List[int] = []
+
+    async def poll(self, params) -> PollResult:
+        self.polled_at.append(params.block_info["number"])
+        result = self.results.pop(0) if self.results else None
+        if isinstance(result, Exception):
+            raise result
+        return result or error(PollResultCode.TRY_NEXT_BLOCK)
+
+
+@pytest.fixture
+def scheduler():
+    return PollScheduler(Chain.MAINNET, provider=None, order_book_api=None)
+
+
+async def run_blocks(scheduler: PollScheduler, first: int, last: int) -> None:
+    for number in range(first, last + 1):
+        timestamp = 1_000 + 12 * number
+        await scheduler.tick(number, timestamp, {"number": number})
+
+
+@pytest.mark.asyncio
+async def test_orders_are_polled_when_their_result_says(scheduler):
+    success = PollResultSuccess(
+        result=PollResultCode.SUCCESS, order=None, signature="0x"
+    )
+    at_block = ScriptedOrder(
+        "at_block", error(PollResultCode.TRY_ON_BLOCK, block_number=5)
+    )
+    # Block 4 has timestamp 1048, the first at or after epoch 1045.
+    at_epoch = ScriptedOrder("at_epoch", error(PollResultCode.TRY_AT_EPOCH, epoch=1045))
+    done = ScriptedOrder("done", success, error(PollResultCode.DONT_TRY_AGAIN))
+    outcomes = []
+    scheduler.on_result(outcomes.append)
+    for order in (at_block, at_epoch, done):
+        scheduler.register(OWNER, order)
+
+    await run_blocks(scheduler, 1, 6)
+
+    assert at_block.polled_at == [1, 5, 6]
+    assert at_epoch.polled_at == [1, 4, 5, 6]
+    assert done.polled_at == [1, 2]
+    assert (OWNER.lower(), "done") not in scheduler
+    assert len(scheduler) == 2
+    assert [o.order.id for o in outcomes if o.dropped] == ["done"]
+    assert scheduler.stats.successes == 1
+
+
+@pytest.mark.asyncio
+async def test_errors_back_off_and_unregistered_orders_are_skipped(scheduler):
+    flaky = ScriptedOrder(
+        "flaky",
+        RuntimeError("rpc down"),
+        error(PollResultCode.UNEXPECTED_ERROR),
+        error(PollResultCode.TRY_ON_BLOCK, block_number=100),
+    )
+    gone = ScriptedOrder("gone")
+    scheduler.register(OWNER, flaky)
+    scheduler.register(OWNER, gone)
+    await run_blocks(scheduler, 1, 1)
+    scheduler.unregister(OWNER, "gone")
+
+    # Retry after 12s (one block), then 24s (two blocks).
+    await run_blocks(scheduler, 2, 6)
+    assert flaky.polled_at == [1, 2, 4]
+    assert gone.polled_at == [1]
+    assert scheduler.stats.errors == 2
+    assert scheduler.next_due() == (100, None)
+
+
+@pytest.mark.asyncio
+async def test_polls_run_with_bounded_concurrency():
+    scheduler = PollScheduler(
+        Chain.MAINNET, provider=None, order_book_api=None, max_concurrency=4
+    )
+    in_flight = peak = 0
+
+    class SlowOrder(ScriptedOrder):
+        async def poll(self, params) -> PollResult:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return await super().poll(params)
+
+    for i in range(20):
+        scheduler.register(OWNER, SlowOrder(str(i)))
+    outcomes = await scheduler.tick(1, 1_000, {"number": 1})
+
+    assert len(outcomes) == 20
+    assert peak == 4
+
+
+@pytest.mark.asyncio
+async def test_tick_cost_follows_due_orders_not_registered_ones(scheduler):
+    for i in range(100_000):
+        scheduler.register(OWNER, ScriptedOrder(f"twap-{i}"), at_epoch=10_000 + i)
+
+    started = time.perf_counter()
+    outcomes = await scheduler.tick(1, 10_009, {"number": 1})
+    elapsed = time.perf_counter() - started
+
+    assert len(outcomes) == 10
+    assert scheduler.stats.polls == 10
+    assert elapsed < 0.1
+    assert scheduler.next_due() == (2, 10_010)
@@ -0,0 +1,60 @@
+import pytest
+from hexbytes import HexBytes
+
+from cowdao_cowpy.composable.multiplexer import Multiplexer
+from cowdao_cowpy.composable.order_types.twap import Twap
+from cowdao_cowpy.composable.snapshot import MultiplexerSnapshot
+
+from .order_types.mock_twap_data import generate_random_twap_data
+
+
+class TestMultiplexerSnapshot:
+    def setup_method(self):
+        Multiplexer.register_order_type("twap", Twap)
+        self.m = Multiplexer()
+        for _ in range(13):
+            self.m.add(Twap.from_data(generate_random_twap_data()))
+
+    def teardown_method(self):
+        Multiplexer.reset_order_type_registry()
+
+    def test_snapshot_reads_lazily(self):
+        with Multiplexer.open_snapshot(self.m.to_snapshot()) as snapshot:
+            assert len(snapshot) == 13
+            assert snapshot.root == self.m.root
+            assert snapshot.order_ids == self.m.order_ids
+            assert snapshot._orders == {}
+
+            order = snapshot.get_by_id(self.m.order_ids[7])
+            assert order.id == self.m.order_ids[7]
+            assert list(snapshot._orders) == [7]
+            assert snapshot.proof(7).path == self.m.tree.proof(7).path
+            assert snapshot.multiproof([1, 7]).verify(HexBytes(self.m.root))
+            assert snapshot.verify()
+
+    def test_snapshot_loads_into_an_editable_multiplexer(self, tmp_path):
+        path = tmp_path / "book.snapshot"
+        path.write_bytes(self.m.to_snapshot())
+
+        m2 = Multiplexer.from_snapshot(str(path), verify=True)
+        assert m2.root == self.m.root
+        assert m2.order_ids == self.m.order_ids
+        m2.remove(self.m.order_ids[0])
+        m2.add(Twap.from_data(generate_random_twap_data()))
+        assert Multiplexer.from_json(m2.to_json()).root == m2.root
+
+    def test_corrupt_snapshots_are_rejected(self):
+        data = bytearray(self.m.to_snapshot())
+        with pytest.raises(ValueError, match="Not a Multiplexer snapshot"):
+            MultiplexerSnapshot(b"X" + bytes(data[1:]), Multiplexer.order_type_registry)
+        with pytest.raises(ValueError, match="Truncated snapshot"):
+            MultiplexerSnapshot(bytes(data[:100]), Multiplexer.order_type_registry)
+
+        # Flip a byte of the last order's params.
+        data[-1] ^= 0xFF
+        snapshot = MultiplexerSnapshot(bytes(data), Multiplexer.order_type_registry)
+        assert not snapshot.verify()
+        with pytest.raises(ValueError, match="does not match"):
+            snapshot.get_by_index(12)
+        with pytest.raises(ValueError, match="root mismatch"):
+            Multiplexer.from_snapshot(bytes(data), verify=True)
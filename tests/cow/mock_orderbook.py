@@ -0,0 +1,30 @@
+import json
+
+import httpx
+
+from cowdao_cowpy.common.chains import Chain
+from cowdao_cowpy.common.constants import CowContractAddress
+from cowdao_cowpy.contracts.domain import domain
+from cowdao_cowpy.contracts.order import Order, compute_order_uid
+
+GNOSIS_DOMAIN = domain(Chain.GNOSIS, CowContractAddress.SETTLEMENT_CONTRACT.value)
+
+
+def posted_uid(request: httpx.Request) -> str:
+    """The UID the Gnosis Chain orderbook gives the order posted in ``request``."""
+    body = json.loads(request.content)
+    order = Order(
+        sell_token=body["sellToken"],
+        buy_token=body["buyToken"],
+        receiver=body.get("receiver"),  # type: ignore[arg-type]
+        sell_amount=body["sellAmount"],
+        buy_amount=body["buyAmount"],
+        valid_to=body["validTo"],
+        app_data=body["appData"],
+        fee_amount=body["feeAmount"],
+        kind=body["kind"],
+        partially_fillable=body["partiallyFillable"],
+        sell_token_balance=body.get("sellTokenBalance"),
+        buy_token_balance=body.get("buyTokenBalance"),
+    )
+    return compute_order_uid(GNOSIS_DOMAIN, order, body["from"])
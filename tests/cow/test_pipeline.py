@@ -0,0 +1,198 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from eth_account import Account
+from pytest_httpx import HTTPXMock
+from web3 import Web3
+from web3.types import Wei
+
+from cowdao_cowpy.app_data.utils import _app_data_upload_cache, generate_app_data
+from cowdao_cowpy.common.api.scheduler import RequestScheduler
+from cowdao_cowpy.common.chains import Chain
+from cowdao_cowpy.common.config import SupportedChainId
+from cowdao_cowpy.cow.pipeline import SwapPipeline, SwapRequest, swap_tokens_many
+from cowdao_cowpy.order_book.api import OrderBookApi
+from cowdao_cowpy.order_book.config import OrderBookAPIConfigFactory
+
+from .mock_orderbook import posted_uid
+
+GNOSIS_PROD_BASE_URL = "https://api.cow.fi/xdai"
+WXDAI = Web3.to_checksum_address("0xe91D153E0b41518A2Ce8Dd3D7944Fa863463a97d")
+COW = Web3.to_checksum_address("0x177127622c4A00F3d409B75571e12cB3c8973d3c")
+FAILING_AMOUNT = Wei(13)
+
+
+@pytest.fixture(autouse=True)
+def _clear_app_data_cache():
+    _app_data_upload_cache.clear()
+    yield
+    _app_data_upload_cache.clear()
+
+
+@pytest.fixture
+def throwaway_eoa():
+    return Account.create()
+
+
+@pytest.fixture
+def order_book_api():
+    # A generous budget keeps the tests fast; the default host limit would
+    # serialize the mocked requests at 5 per second.
+    return OrderBookApi(
+        OrderBookAPIConfigFactory.get_config("prod", SupportedChainId.GNOSIS_CHAIN),
+        scheduler=RequestScheduler(rate=1000),
+    )
+
+
+def quote_callback(request: httpx.Request) -> httpx.Response:
+    body = json.loads(request.content)
+    if body["sellAmountBeforeFee"] == str(FAILING_AMOUNT):
+        return httpx.Response(
+            400, json={"errorType": "NoLiquidity", "description": "no route"}
+        )
+    return httpx.Response(
+        200,
+        json={
+            "quote": {
+                "sellToken": body["sellToken"],
+                "buyToken": body["buyToken"],
+                "receiver": body["from"],
+                "sellAmount": body["sellAmountBeforeFee"],
+                "buyAmount": "3000000000000000000000",
+                "feeAmount": "0",
+                "validTo": 1893456000,
+                "appData": body["appData"],
+                "partiallyFillable": False,
+                "sellTokenBalance": "erc20",
+                "buyTokenBalance": "erc20",
+                "kind": "sell",
+                "signingScheme": "eip712",
+                "gasAmount": "150000",
+                "gasPrice": "15000000000",
+                "sellTokenPrice": "1000000000",
+            },
+            "from": body["from"],
+            "expiration": "2030-01-01T00:00:00Z",
+            "id": 1,
+            "verified": True,
+        },
+    )
+
+
+class OrderEndpoint:
+    """Answers order submissions with their UID, tracking concurrency."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.posted = []
+        self.uids = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.005)
+            self.posted.append(json.loads(request.content))
+            self.uids.append(posted_uid(request))
+            return httpx.Response(201, json=self.uids[-1])
+        finally:
+            self.in_flight -= 1
+
+
+def mock_orderbook(httpx_mock: HTTPXMock) -> OrderEndpoint:
+    orders = OrderEndpoint()
+    httpx_mock.add_callback(
+        lambda request: httpx.Response(201, json=request.url.path.rsplit("/", 1)[-1]),
+        method="PUT",
+    )
+    httpx_mock.add_callback(
+        quote_callback, method="POST", url=f"{GNOSIS_PROD_BASE_URL}/api/v1/quote"
+    )
+    httpx_mock.add_callback(
+        orders, method="POST", url=f"{GNOSIS_PROD_BASE_URL}/api/v1/orders"
+    )
+    return orders
+
+
+@pytest.mark.asyncio
+async def test_swaps_share_app_data_registration_and_bound_posts(
+    throwaway_eoa, order_book_api, httpx_mock: HTTPXMock
+):
+    orders = mock_orderbook(httpx_mock)
+    requests = [
+        SwapRequest(
+            amount=Wei(10**18 + i),
+            sell_token=WXDAI,
+            buy_token=COW,
+            app_code="rebalancer" if i % 2 else None,
+        )
+        for i in range(12)
+    ]
+
+    results = await swap_tokens_many(
+        requests,
+        throwaway_eoa,
+        Chain.GNOSIS,
+        order_book_api=order_book_api,
+        max_concurrent_posts=2,
+    )
+
+    assert all(result.ok for result in results)
+    assert len({result.order.uid.root for result in results}) == 12  # type: ignore[union-attr]
+    assert [result.request for result in results] == requests
+    # One upload per distinct app-data document.
+    puts = httpx_mock.get_requests(method="PUT")
+    assert sorted(put.url.path.rsplit("/", 1)[-1] for put in puts) == sorted(
+        [
+            generate_app_data().app_data_hash.root,
+            generate_app_data(app_code="rebalancer").app_data_hash.root,
+        ]
+    )
+    assert orders.max_in_flight == 2
+    assert {order["sellAmount"] for order in orders.posted} == {
+        str(request.amount) for request in requests
+    }
+    timings = results[0].timings
+    assert timings.quote > 0 and timings.sign > 0 and timings.post > 0
+    assert timings.total >= timings.quote + timings.sign + timings.post
+
+
+@pytest.mark.asyncio
+async def test_failed_swaps_are_reported_without_aborting_the_batch(
+    throwaway_eoa, order_book_api, httpx_mock: HTTPXMock
+):
+    orders = mock_orderbook(httpx_mock)
+    requests = [
+        SwapRequest(amount=amount, sell_token=WXDAI, buy_token=COW)
+        for amount in (Wei(10**18), FAILING_AMOUNT, Wei(2 * 10**18))
+    ]
+
+    async with SwapPipeline(
+        throwaway_eoa, Chain.GNOSIS, order_book_api=order_book_api
+    ) as pipeline:
+        results = await pipeline.run(requests)
+
+    assert [result.ok for result in results] == [True, False, True]
+    assert "no route" in str(results[1].error)
+    assert results[1].timings.post == 0
+    assert len(orders.posted) == 2
+    assert results[0].order.uid.root in orders.uids  # type: ignore[union-attr]
+
+
+@pytest.mark.asyncio
+async def test_safe_swaps_are_presigned(throwaway_eoa, httpx_mock: HTTPXMock):
+    orders = mock_orderbook(httpx_mock)
+    safe = Web3.to_checksum_address("0x" + "33" * 20)
+
+    (result,) = await swap_tokens_many(
+        [SwapRequest(Wei(10**18), WXDAI, COW, safe_address=safe)],
+        throwaway_eoa,
+        Chain.GNOSIS,
+    )
+
+    assert result.ok
+    assert orders.posted[0]["signingScheme"] == "presign"
+    assert orders.posted[0]["from"] == safe
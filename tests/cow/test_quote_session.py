@@ -0,0 +1,222 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from eth_account import Account
+from pytest_httpx import HTTPXMock
+from web3 import Web3
+from web3.types import Wei
+
+from cowdao_cowpy.app_data.utils import _app_data_upload_cache
+from cowdao_cowpy.common.api.scheduler import RequestScheduler
+from cowdao_cowpy.common.chains import Chain
+from cowdao_cowpy.common.config import SupportedChainId
+from cowdao_cowpy.common.constants import CowContractAddress
+from cowdao_cowpy.contracts.domain import domain
+from cowdao_cowpy.contracts.order import compute_order_uid
+from cowdao_cowpy.contracts.sign import SigningScheme, sign_order
+from cowdao_cowpy.cow import quote_session
+from cowdao_cowpy.cow.pipeline import SwapRequest
+from cowdao_cowpy.cow.quote_session import QuoteSession
+from cowdao_cowpy.order_book.api import OrderBookApi
+from cowdao_cowpy.order_book.config import OrderBookAPIConfigFactory
+
+from .mock_orderbook import GNOSIS_DOMAIN, posted_uid
+
+GNOSIS_PROD_BASE_URL = "https://api.cow.fi/xdai"
+WXDAI = Web3.to_checksum_address("0xe91D153E0b41518A2Ce8Dd3D7944Fa863463a97d")
+COW = Web3.to_checksum_address("0x177127622c4A00F3d409B75571e12cB3c8973d3c")
+
+
+@pytest.fixture(autouse=True)
+def _clear_app_data_cache():
+    _app_data_upload_cache.clear()
+    yield
+    _app_data_upload_cache.clear()
+
+
+@pytest.fixture
+def throwaway_eoa():
+    return Account.create()
+
+
+@pytest.fixture
+def order_book_api():
+    return OrderBookApi(
+        OrderBookAPIConfigFactory.get_config("prod", SupportedChainId.GNOSIS_CHAIN),
+        scheduler=RequestScheduler(rate=1000),
+    )
+
+
+class QuoteEndpoint:
+    """Quotes that expire ``lifetime`` seconds after they are issued."""
+
+    def __init__(self, lifetime: float):
+        self.lifetime = lifetime
+        self.quoted = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.quoted += 1
+        expiration = datetime.now(timezone.utc) + timedelta(seconds=self.lifetime)
+        return httpx.Response(
+            200,
+            json={
+                "quote": {
+                    "sellToken": body["sellToken"],
+                    "buyToken": body["buyToken"],
+                    "receiver": body["from"],
+                    "sellAmount": body["sellAmountBeforeFee"],
+                    "buyAmount": str(3000 * 10**18 + self.quoted),
+                    "feeAmount": "0",
+                    "validTo": 1893456000,
+                    "appData": body["appData"],
+                    "partiallyFillable": False,
+                    "sellTokenBalance": "erc20",
+                    "buyTokenBalance": "erc20",
+                    "kind": "sell",
+                    "signingScheme": "eip712",
+                    "gasAmount": "150000",
+                    "gasPrice": "15000000000",
+                    "sellTokenPrice": "1000000000",
+                },
+                "from": body["from"],
+                "expiration": expiration.isoformat(),
+                "id": self.quoted,
+                "verified": True,
+            },
+        )
+
+
+def mock_orderbook(
+    httpx_mock: HTTPXMock, lifetime: float, orders: bool = True
+) -> QuoteEndpoint:
+    quotes = QuoteEndpoint(lifetime)
+    httpx_mock.add_callback(
+        lambda request: httpx.Response(201, json=request.url.path.rsplit("/", 1)[-1]),
+        method="PUT",
+    )
+    httpx_mock.add_callback(
+        quotes, method="POST", url=f"{GNOSIS_PROD_BASE_URL}/api/v1/quote"
+    )
+    if orders:
+        httpx_mock.add_callback(
+            lambda request: httpx.Response(201, json=posted_uid(request)),
+            method="POST",
+            url=f"{GNOSIS_PROD_BASE_URL}/api/v1/orders",
+        )
+    return quotes
+
+
+def posted_orders(httpx_mock: HTTPXMock):
+    return [
+        json.loads(request.content)
+        for request in httpx_mock.get_requests(
+            method="POST", url=f"{GNOSIS_PROD_BASE_URL}/api/v1/orders"
+        )
+    ]
+
+
+@pytest.mark.asyncio
+async def test_execute_only_signs_and_posts_the_prepared_order(
+    throwaway_eoa, order_book_api, httpx_mock: HTTPXMock, monkeypatch
+):
+    quotes = mock_orderbook(httpx_mock, lifetime=60)
+    session = QuoteSession(throwaway_eoa, Chain.GNOSIS, order_book_api=order_book_api)
+    key = session.subscribe(SwapRequest(Wei(10**18), WXDAI, COW))
+    prepared = await session.refresh(key)
+    # The order UID is computed with the session's domain.
+    monkeypatch.setattr("cowdao_cowpy.cow.swap.domain", None)
+
+    completed = await session.execute(key)
+
+    assert quotes.quoted == 1
+    assert completed.uid.root == compute_order_uid(
+        GNOSIS_DOMAIN, prepared.order, throwaway_eoa.address
+    )
+    (posted,) = posted_orders(httpx_mock)
+    assert posted["buyAmount"] == prepared.order.buy_amount
+    expected = sign_order(
+        domain(Chain.GNOSIS, CowContractAddress.SETTLEMENT_CONTRACT.value),
+        prepared.order,
+        throwaway_eoa,
+        SigningScheme.EIP712,
+    )
+    assert posted["signature"] == expected.data
+    # The prepared order is consumed by execution.
+    assert session.prepared(key) is None
+
+
+@pytest.mark.asyncio
+async def test_quotes_are_refreshed_before_they_expire(
+    throwaway_eoa, order_book_api, httpx_mock: HTTPXMock
+):
+    quotes = mock_orderbook(httpx_mock, lifetime=0.3, orders=False)
+    session = QuoteSession(
+        throwaway_eoa, Chain.GNOSIS, order_book_api=order_book_api, refresh_margin=0.2
+    )
+    key = session.subscribe(SwapRequest(Wei(10**18), WXDAI, COW))
+
+    async with session:
+        await asyncio.sleep(0.05)
+        first = session.prepared(key)
+        await asyncio.sleep(0.4)
+        latest = session.prepared(key)
+
+    assert first is not None and latest is not None
+    assert latest.quote.id != first.quote.id
+    assert quotes.quoted >= 3
+    # Every quote was replaced before expiring, so one was always ready.
+    assert latest.expires_at > latest.quoted_at
+
+
+@pytest.mark.asyncio
+async def test_expired_quotes_are_requoted_at_execution(
+    throwaway_eoa, order_book_api, httpx_mock: HTTPXMock, monkeypatch
+):
+    quotes = mock_orderbook(httpx_mock, lifetime=0.01)
+    registrations = []
+    upload = quote_session.ensure_app_data_uploaded
+
+    async def ensure_app_data_uploaded(order_book_api, **kwargs):
+        registrations.append(kwargs)
+        return await upload(order_book_api, **kwargs)
+
+    monkeypatch.setattr(
+        quote_session, "ensure_app_data_uploaded", ensure_app_data_uploaded
+    )
+    session = QuoteSession(throwaway_eoa, Chain.GNOSIS, order_book_api=order_book_api)
+    key = session.subscribe(SwapRequest(Wei(10**18), WXDAI, COW))
+    await session.refresh(key)
+    await asyncio.sleep(0.02)
+    assert session.prepared(key) is None
+
+    await session.execute(key)
+
+    assert quotes.quoted == 2
+    assert len(posted_orders(httpx_mock)) == 1
+    # The app data is registered once per session, not once per quote.
+    assert len(registrations) == 1
+
+
+@pytest.mark.asyncio
+async def test_a_new_quote_is_prepared_after_execution(
+    throwaway_eoa, order_book_api, httpx_mock: HTTPXMock
+):
+    mock_orderbook(httpx_mock, lifetime=60)
+    async with QuoteSession(
+        throwaway_eoa, Chain.GNOSIS, order_book_api=order_book_api
+    ) as session:
+        key = session.subscribe(SwapRequest(Wei(10**18), WXDAI, COW))
+        first = await session.refresh(key)
+
+        await session.execute(key)
+        await asyncio.sleep(0.05)
+
+        second = session.prepared(key)
+        assert second is not None and second.quote.id != first.quote.id
+
+        session.unsubscribe(key)
+        assert session.keys == []
@@ -8,6 +8,7 @@ always registers the app-data document the order references.
 
 import json
 
+import httpx
 import pytest
 from eth_account import Account
 from pytest_httpx import HTTPXMock
@@ -24,11 +25,12 @@ from cowdao_cowpy.common.chains import Chain
 from cowdao_cowpy.cow.swap import swap_tokens
 from cowdao_cowpy.order_book.generated.model import UID
 
+from .mock_orderbook import posted_uid
+
 GNOSIS_PROD_BASE_URL = "https://api.cow.fi/xdai"
 WXDAI = Web3.to_checksum_address("0xe91D153E0b41518A2Ce8Dd3D7944Fa863463a97d")
 COW = Web3.to_checksum_address("0x177127622c4A00F3d409B75571e12cB3c8973d3c")
 SELL_AMOUNT = Wei(10**18)
-FAKE_ORDER_UID = "0x" + "ab" * 56
 
 
 @pytest.fixture(autouse=True)
@@ -74,10 +76,10 @@ def _add_quote_and_order_mocks(httpx_mock: HTTPXMock, receiver: str):
             "verified": True,
         },
     )
-    httpx_mock.add_response(
+    httpx_mock.add_callback(
+        lambda request: httpx.Response(201, json=posted_uid(request)),
         method="POST",
         url=f"{GNOSIS_PROD_BASE_URL}/api/v1/orders",
-        json=FAKE_ORDER_UID,
     )
 
 
@@ -87,11 +89,15 @@ def _put_app_data_request(httpx_mock: HTTPXMock):
     return puts[0]
 
 
-def _posted_order_app_data(httpx_mock: HTTPXMock) -> str:
+def _posted_order_request(httpx_mock: HTTPXMock):
     (order_request,) = httpx_mock.get_requests(
         method="POST", url=f"{GNOSIS_PROD_BASE_URL}/api/v1/orders"
     )
-    return json.loads(order_request.content)["appData"]
+    return order_request
+
+
+def _posted_order_app_data(httpx_mock: HTTPXMock) -> str:
+    return json.loads(_posted_order_request(httpx_mock).content)["appData"]
 
 
 @pytest.mark.asyncio
@@ -118,7 +124,7 @@ async def test_swap_uploads_custom_app_data_and_references_its_hash(
         app_code=custom_app_code,
     )
 
-    assert completed.uid == UID(FAKE_ORDER_UID)
+    assert completed.uid == UID(posted_uid(_posted_order_request(httpx_mock)))
 
     # The custom document was uploaded to its own hash...
     put_request = _put_app_data_request(httpx_mock)
@@ -147,7 +153,7 @@ async def test_swap_uploads_default_app_data_when_no_overrides(
         buy_token=COW,
     )
 
-    assert completed.uid == UID(FAKE_ORDER_UID)
+    assert completed.uid == UID(posted_uid(_posted_order_request(httpx_mock)))
     put_request = _put_app_data_request(httpx_mock)
     assert put_request.url.path.endswith(f"/api/v1/app_data/{DEFAULT_APP_DATA_HASH}")
     assert _posted_order_app_data(httpx_mock) == DEFAULT_APP_DATA_HASH
@@ -0,0 +1,70 @@
+import json
+from copy import deepcopy
+from typing import Any, Dict, List
+
+WETH = "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+USDC = "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48"
+COW = "0xdef1ca1fb7fbcdc777520aa7f396b4e015f497ab"
+
+# A single solvable order as returned by /api/v1/auction on mainnet.
+AUCTION_ORDER: Dict[str, Any] = {
+    "uid": "0x" + "11" * 56,
+    "sellToken": WETH,
+    "buyToken": USDC,
+    "sellAmount": "1000000000000000000",
+    "buyAmount": "2500000000",
+    "created": "1718000000",
+    "validTo": 1718003600,
+    "kind": "sell",
+    "receiver": "0x" + "22" * 20,
+    "owner": "0x" + "22" * 20,
+    "partiallyFillable": False,
+    "executed": "0",
+    "preInteractions": [],
+    "postInteractions": [
+        {
+            "target": "0x" + "33" * 20,
+            "value": "0",
+            "callData": "0x" + "ab" * 68,
+        }
+    ],
+    "sellTokenBalance": "erc20",
+    "buyTokenBalance": "erc20",
+    "class": "limit",
+    "appData": "0x" + "44" * 32,
+    "signature": "0x" + "55" * 65,
+    "protocolFees": [{"surplus": {"factor": 0.5, "maxVolumeFactor": 0.01}}],
+    "quote": {
+        "sellAmount": "1000000000000000000",
+        "buyAmount": "2510000000",
+        "fee": "1000",
+    },
+}
+
+
+def make_auction_orders(count: int, owners: int = 10) -> List[Dict[str, Any]]:
+    """Replicate the recorded order with distinct uids, owners and token pairs."""
+    orders = []
+    for i in range(count):
+        order = deepcopy(AUCTION_ORDER)
+        order["uid"] = "0x" + f"{i:0112x}"
+        order["owner"] = "0x" + f"{i % owners:040x}"
+        if i % 2:
+            order["sellToken"], order["buyToken"] = COW, WETH
+        orders.append(order)
+    return orders
+
+
+def make_auction_payload(count: int, owners: int = 10) -> bytes:
+    return json.dumps(
+        {
+            "id": 9876543,
+            "block": 20000000,
+            "prices": {
+                WETH: "1000000000000000000",
+                USDC: "400000000000000000000000000",
+            },
+            "orders": make_auction_orders(count, owners),
+            "surplusCapturingJitOrderOwners": [],
+        }
+    ).encode()
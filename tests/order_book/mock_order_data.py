@@ -0,0 +1,62 @@
+from typing import Any, Dict
+
+WETH = "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+USDC = "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48"
+OWNER = "0x" + "22" * 20
+
+
+def make_order_uid(i: int) -> str:
+    return "0x" + f"{i:0112x}"
+
+
+def make_order(
+    i: int = 0, status: str = "open", valid_to: int = 1718003600
+) -> Dict[str, Any]:
+    """An orderbook `Order` as returned by the account orders / by_uids endpoints."""
+    return {
+        "creationDate": "2024-06-10T06:13:20.123456Z",
+        "class": "limit",
+        "owner": OWNER,
+        "uid": make_order_uid(i),
+        "availableBalance": None,
+        "executedSellAmount": "0",
+        "executedSellAmountBeforeFees": "0",
+        "executedBuyAmount": "0",
+        "executedFeeAmount": "0",
+        "invalidated": False,
+        "status": status,
+        "isLiquidityOrder": False,
+        "settlementContract": "0x9008d19f58aabd9ed0d60971565aa8510560ab41",
+        "fullAppData": '{"version":"1.1.0","metadata":{}}',
+        "sellToken": WETH,
+        "buyToken": USDC,
+        "receiver": OWNER,
+        "sellAmount": str(10**18 + i),
+        "buyAmount": "2500000000",
+        "validTo": valid_to,
+        "feeAmount": "0",
+        "kind": "sell",
+        "partiallyFillable": False,
+        "sellTokenBalance": "erc20",
+        "buyTokenBalance": "erc20",
+        "signingScheme": "eip712",
+        "signature": "0x" + "55" * 65,
+        "from": OWNER,
+        "appData": "0x" + "44" * 32,
+        "interactions": {"pre": [], "post": []},
+    }
+
+
+def make_trade(i: int = 0) -> Dict[str, Any]:
+    return {
+        "blockNumber": 20000000 + i,
+        "logIndex": i,
+        "orderUid": make_order_uid(i),
+        "owner": OWNER,
+        "sellToken": WETH,
+        "buyToken": USDC,
+        "sellAmount": str(10**18),
+        "sellAmountBeforeFees": str(10**18),
+        "buyAmount": "2500000000",
+        "txHash": "0x" + f"{i:064x}",
+    }
@@ -1,5 +1,7 @@
 # test_order_book_api.py
-from unittest.mock import AsyncMock, Mock, patch
+from unittest.mock import AsyncMock, patch
+
+import httpx
 import pytest
 from cowdao_cowpy.order_book.api import OrderBookApi
 from cowdao_cowpy.order_book.config import OrderBookAPIConfigFactory
@@ -19,6 +21,16 @@ from cowdao_cowpy.order_book.generated.model import (
     UID,
 )
 
+BASE_URL = "https://api.cow.fi/mainnet"
+
+
+def json_response(data) -> httpx.Response:
+    return httpx.Response(200, json=data, request=httpx.Request("GET", BASE_URL))
+
+
+def text_response(text: str) -> httpx.Response:
+    return httpx.Response(200, text=text, request=httpx.Request("GET", BASE_URL))
+
 
 @pytest.fixture
 def order_book_api():
@@ -59,7 +71,7 @@ def test_with_env_preserves_auth_context():
 async def test_get_version(order_book_api):
     expected_version = "1.0.0"
     with patch("httpx.AsyncClient.request", new_callable=AsyncMock) as mock_request:
-        mock_request.return_value.text = expected_version
+        mock_request.return_value = text_response(expected_version)
         version = await order_book_api.get_version()
         mock_request.assert_awaited_once()
         assert version == expected_version
@@ -82,11 +94,7 @@ async def test_get_trades_by_order_uid(order_book_api):
         }
     ]
     with patch("httpx.AsyncClient.request", new_callable=AsyncMock) as mock_request:
-        mock_request.return_value = AsyncMock(
-            status_code=200,
-            headers={"content-type": "application/json"},
-            json=Mock(return_value=mock_trade_data),
-        )
+        mock_request.return_value = json_response(mock_trade_data)
         trades = await order_book_api.get_trades_by_order_uid("mock_order_uid")
         mock_request.assert_awaited_once()
         assert len(trades) == 1
@@ -134,11 +142,7 @@ async def test_post_quote(order_book_api):
         "expiration": "2023-05-01T00:00:00Z",
     }
     with patch("httpx.AsyncClient.request", new_callable=AsyncMock) as mock_request:
-        mock_request.return_value = AsyncMock(
-            status_code=200,
-            headers={"content-type": "application/json"},
-            json=Mock(return_value=mock_order_quote_response_data),
-        )
+        mock_request.return_value = json_response(mock_order_quote_response_data)
         response = await order_book_api.post_quote(
             mock_order_quote_request, mock_order_quote_side
         )
@@ -170,7 +174,7 @@ async def test_post_order(order_book_api):
         from_="0x",  # type: ignore # pyright doesn't recognize `populate_by_name=True`.
     )
     with patch("httpx.AsyncClient.request", new_callable=AsyncMock) as mock_request:
-        mock_request.return_value.text = mock_uid
+        mock_request.return_value = text_response(mock_uid)
         response = await order_book_api.post_order(mock_order_creation)
         mock_request.assert_awaited_once()
         assert isinstance(response, UID)
@@ -191,11 +195,7 @@ async def test_order_status(order_book_api):
         ],
     }
     with patch("httpx.AsyncClient.request", new_callable=AsyncMock) as mock_request:
-        mock_request.return_value = AsyncMock(
-            status_code=200,
-            headers={"content-type": "application/json"},
-            json=Mock(return_value=mock_status),
-        )
+        mock_request.return_value = json_response(mock_status)
         response = await order_book_api.get_order_competition_status(UID(mock_uid))
         mock_request.assert_awaited_once()
         # The bare hex UID is interpolated into the URL, not the model repr.
@@ -212,11 +212,7 @@ async def test_order_status(order_book_api):
 async def test_get_solver_competition_latest_uses_v2_latest_path(order_book_api):
     # v1 was decommissioned; the default "latest" must hit the dedicated v2 path.
     with patch("httpx.AsyncClient.request", new_callable=AsyncMock) as mock_request:
-        mock_request.return_value = AsyncMock(
-            status_code=200,
-            headers={"content-type": "application/json"},
-            json=Mock(return_value={"auctionId": 42}),
-        )
+        mock_request.return_value = json_response({"auctionId": 42})
         response = await order_book_api.get_solver_competition()
         mock_request.assert_awaited_once()
         requested_url = mock_request.call_args.kwargs["url"]
@@ -228,11 +224,7 @@ async def test_get_solver_competition_latest_uses_v2_latest_path(order_book_api)
 @pytest.mark.asyncio
 async def test_get_solver_competition_by_auction_id_uses_v2_path(order_book_api):
     with patch("httpx.AsyncClient.request", new_callable=AsyncMock) as mock_request:
-        mock_request.return_value = AsyncMock(
-            status_code=200,
-            headers={"content-type": "application/json"},
-            json=Mock(return_value={"auctionId": 123}),
-        )
+        mock_request.return_value = json_response({"auctionId": 123})
         response = await order_book_api.get_solver_competition(123)
         mock_request.assert_awaited_once()
         requested_url = mock_request.call_args.kwargs["url"]
@@ -245,11 +237,7 @@ async def test_get_solver_competition_by_auction_id_uses_v2_path(order_book_api)
 async def test_get_solver_competition_by_tx_hash_uses_v2_path(order_book_api):
     tx_hash = "0x" + "ab" * 32
     with patch("httpx.AsyncClient.request", new_callable=AsyncMock) as mock_request:
-        mock_request.return_value = AsyncMock(
-            status_code=200,
-            headers={"content-type": "application/json"},
-            json=Mock(return_value={"auctionId": 7}),
-        )
+        mock_request.return_value = json_response({"auctionId": 7})
         response = await order_book_api.get_solver_competition_by_tx_hash(tx_hash)
         mock_request.assert_awaited_once()
         requested_url = mock_request.call_args.kwargs["url"]
@@ -0,0 +1,152 @@
+import gc
+import json
+import tracemalloc
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+from web3 import Web3
+
+from cowdao_cowpy.common.api.errors import ApiResponseError
+from cowdao_cowpy.common.config import SupportedChainId
+from cowdao_cowpy.order_book.api import OrderBookApi
+from cowdao_cowpy.order_book.config import OrderBookAPIConfigFactory
+from cowdao_cowpy.order_book.generated.model import Address, Auction, AuctionOrder
+
+from .mock_auction_data import COW, WETH, make_auction_payload
+
+AUCTION_URL = "https://api.cow.fi/mainnet/api/v1/auction"
+
+
+@pytest.fixture
+def order_book_api():
+    config = OrderBookAPIConfigFactory.get_config("prod", SupportedChainId.MAINNET)
+    return OrderBookApi(config=config)
+
+
+@pytest.mark.asyncio
+async def test_get_auction(order_book_api, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        url=AUCTION_URL,
+        content=make_auction_payload(3),
+        headers={"content-type": "application/json"},
+    )
+
+    auction = await order_book_api.get_auction()
+
+    assert isinstance(auction, Auction)
+    assert auction.id == 9876543
+    assert auction.orders is not None and len(auction.orders) == 3
+
+
+@pytest.mark.asyncio
+async def test_iter_auction_orders_matches_full_parse(
+    order_book_api, httpx_mock: HTTPXMock
+):
+    payload = make_auction_payload(25)
+    httpx_mock.add_response(url=AUCTION_URL, content=payload)
+
+    orders = [order async for order in order_book_api.iter_auction_orders()]
+
+    expected = Auction(**json.loads(payload)).orders
+    assert all(isinstance(order, AuctionOrder) for order in orders)
+    assert orders == expected
+
+
+@pytest.mark.asyncio
+async def test_iter_auction_orders_filters_by_owner_and_pair(
+    order_book_api, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(url=AUCTION_URL, content=make_auction_payload(40))
+    httpx_mock.add_response(url=AUCTION_URL, content=make_auction_payload(40))
+
+    owner = "0x" + f"{3:040x}"
+    by_owner = [
+        order async for order in order_book_api.iter_auction_orders(owner=owner)
+    ]
+    by_pair = [
+        order
+        async for order in order_book_api.iter_auction_orders(
+            sell_token=Web3.to_checksum_address(COW), buy_token=Address(WETH)
+        )
+    ]
+
+    assert len(by_owner) == 4
+    assert {order.owner.root for order in by_owner} == {owner}
+    assert len(by_pair) == 20
+    assert all(order.sellToken.root == COW for order in by_pair)
+
+
+@pytest.mark.asyncio
+async def test_iter_auction_orders_surfaces_api_errors(
+    order_book_api, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(
+        url=AUCTION_URL,
+        status_code=400,
+        json={"errorType": "Forbidden", "description": "nope"},
+    )
+
+    with pytest.raises(ApiResponseError) as exc_info:
+        async for _ in order_book_api.iter_auction_orders():
+            pass
+
+    assert exc_info.value.error_type == "Forbidden"
+
+
+class ChunkedStream(httpx.AsyncByteStream):
+    """Deliver a body in socket-sized chunks, as a real connection would."""
+
+    def __init__(self, payload: bytes, chunk_size: int = 1 << 16):
+        self.payload = payload
+        self.chunk_size = chunk_size
+
+    async def __aiter__(self):
+        for i in range(0, len(self.payload), self.chunk_size):
+            yield self.payload[i : i + self.chunk_size]
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_iter_auction_orders_memory_benchmark():
+    # ~20MB auction; streaming must stay far below the full-document parse.
+    payload = make_auction_payload(15_000)
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(
+            200,
+            headers={"content-type": "application/json"},
+            stream=ChunkedStream(payload),
+        )
+    )
+    api = OrderBookApi(
+        OrderBookAPIConfigFactory.get_config("prod", SupportedChainId.MAINNET),
+        client=httpx.AsyncClient(transport=transport),
+    )
+
+    async def peak_bytes(consume) -> int:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            await consume()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    async def full_parse():
+        auction = await api.get_auction()
+        assert auction.orders is not None and len(auction.orders) == 15_000
+
+    async def streamed():
+        count = 0
+        async for _ in api.iter_auction_orders():
+            count += 1
+        assert count == 15_000
+
+    full_peak = await peak_bytes(full_parse)
+    streamed_peak = await peak_bytes(streamed)
+    print(
+        f"\nauction of {len(payload) / 1e6:.1f}MB: full parse peak "
+        f"{full_peak / 1e6:.1f}MB, streamed peak {streamed_peak / 1e6:.1f}MB"
+    )
+
+    assert streamed_peak * 10 < full_peak
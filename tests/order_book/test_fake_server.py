@@ -0,0 +1,191 @@
+import asyncio
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from eth_account import Account
+from web3 import Web3
+
+from cowdao_cowpy.common.api.errors import ApiResponseError
+from cowdao_cowpy.common.chains import Chain
+from cowdao_cowpy.common.constants import CowContractAddress
+from cowdao_cowpy.contracts.domain import domain
+from cowdao_cowpy.contracts.order import Order, compute_order_uid
+from cowdao_cowpy.cow.swap import post_order, sign_order
+import cowdao_cowpy
+from cowdao_cowpy.order_book.fake_server import FakeOrderBook, Latency, load_routes
+from cowdao_cowpy.order_book.generated.model import (
+    UID,
+    AppDataObject,
+    OrderQuoteRequest,
+    OrderQuoteSide1,
+    OrderQuoteSideKindSell,
+    TokenAmount,
+)
+
+FAST_BACKOFF = {"backoff_opts": {"max_tries": 1}}
+
+
+def make_order(account) -> Order:
+    return Order(
+        sell_token=Web3.to_checksum_address("0x" + "11" * 20),
+        buy_token=Web3.to_checksum_address("0x" + "22" * 20),
+        receiver=account.address,
+        sell_amount=str(10**18),
+        buy_amount=str(10**20),
+        valid_to=1893456000,
+        app_data="0x" + "00" * 32,
+        fee_amount="0",
+        kind="sell",
+        partially_fillable=False,
+        sell_token_balance="erc20",
+        buy_token_balance="erc20",
+    )
+
+
+@pytest.mark.asyncio
+async def test_seeded_fixtures_are_deterministic_and_served():
+    first, second = FakeOrderBook(seed=7), FakeOrderBook(seed=7)
+    first.seed(orders=50, owners=5)
+    second.seed(orders=50, owners=5)
+    assert first.uids == second.uids
+    assert len(first.trades) == len(second.trades) > 0
+
+    api = first.order_book_api()
+    order = await api.get_order_by_uid(UID(first.uids[0]))
+    assert order.uid.root == first.uids[0]
+    by_uids = await api.get_orders_by_uids([UID(uid) for uid in first.uids[:3]])
+    assert [found.uid.root for found in by_uids] == first.uids[:3]
+
+    trade = first.trades[0]
+    trades = await api.get_trades_by_owner(trade["owner"])
+    assert trade["txHash"] in [t.txHash.root for t in trades]
+    owner_orders = await api.get_orders_by_owner(trade["owner"], limit=100)
+    assert len(owner_orders) == 10
+    auction = await api.get_auction()
+    assert len(auction.orders) == 50 - len(first.trades)
+    competition = await api.get_solver_competition()
+    assert competition.auctionId == 9_000_000
+    assert first.stats.requests["getOrder"] == 1
+
+
+@pytest.mark.asyncio
+async def test_posted_orders_get_their_real_uid_and_duplicates_are_rejected():
+    server = FakeOrderBook(chain=Chain.GNOSIS)
+    api = server.order_book_api()
+    account = Account.create()
+    order = make_order(account)
+    signature = sign_order(Chain.GNOSIS, account, order)
+    gnosis = domain(Chain.GNOSIS, CowContractAddress.SETTLEMENT_CONTRACT.value)
+    expected = compute_order_uid(gnosis, order, account.address).lower()
+
+    uid = await post_order(account, None, order, signature, api)
+    assert uid.root == expected
+    assert server.orders[expected]["owner"] == account.address
+
+    with pytest.raises(ApiResponseError) as error:
+        await post_order(account, None, order, signature, api)
+    assert error.value.error_type == "DuplicatedOrder"
+    # With the UID known up front the retry counts as posted.
+    again = await post_order(account, None, order, signature, api, chain=Chain.GNOSIS)
+    assert again.root == expected
+
+
+@pytest.mark.asyncio
+async def test_quotes_and_app_data():
+    server = FakeOrderBook(quote_lifetime=30, wall_clock=lambda: 1_700_000_000)
+    api = server.order_book_api()
+    account = Account.create()
+    request = OrderQuoteRequest(
+        sellToken="0x" + "11" * 20,
+        buyToken="0x" + "22" * 20,
+        from_=account.address,  # type: ignore # pyright doesn't recognize `populate_by_name=True`.
+    )
+    side = OrderQuoteSide1(
+        sellAmountBeforeFee=TokenAmount(str(10**18)), kind=OrderQuoteSideKindSell.sell
+    )
+
+    first = await api.post_quote(request, side)
+    second = await api.post_quote(request, side)
+    assert first.quote.buyAmount == second.quote.buyAmount
+    assert first.expiration == "2023-11-14T22:13:50Z"
+
+    document = '{"appCode":"fake","metadata":{},"version":"1.1.0"}'
+    app_data_hash = await api.put_app_data(AppDataObject(fullAppData=document))
+    assert app_data_hash.root == Web3.to_hex(Web3.keccak(text=document))
+    assert (await api.get_app_data(app_data_hash)) == {"fullAppData": document}
+
+
+@pytest.mark.asyncio
+async def test_injected_faults_and_latency():
+    server = FakeOrderBook(seed=1, error_rate=0.5, throttle_rate=0.2)
+    server.seed(orders=1)
+    api = server.order_book_api()
+    outcomes = await asyncio.gather(
+        *(
+            api.get_order_by_uid(UID(server.uids[0]), context_override=FAST_BACKOFF)
+            for _ in range(200)
+        ),
+        return_exceptions=True,
+    )
+    failures = [o for o in outcomes if isinstance(o, BaseException)]
+    assert len(failures) == server.stats.throttled + server.stats.errors
+    assert 100 < len(failures) < 180
+    assert server.stats.throttled > 20
+
+    slow = FakeOrderBook(operation_latency={"getApiVersion": Latency(median=0.1)})
+    started = time.monotonic()
+    await asyncio.gather(*(slow.order_book_api().get_version() for _ in range(10)))
+    # Delays overlap; the server handles requests concurrently.
+    assert 0.1 <= time.monotonic() - started < 0.5
+
+
+@pytest.mark.asyncio
+async def test_server_side_rate_limit():
+    server = FakeOrderBook(rate_limit=5)
+    api = server.order_book_api()
+    outcomes = await asyncio.gather(
+        *(api.get_version(context_override=FAST_BACKOFF) for _ in range(8)),
+        return_exceptions=True,
+    )
+    assert outcomes.count("fake") == 5
+    assert server.stats.throttled == 3
+    with pytest.raises(ApiResponseError) as error:
+        await api._fetch("/api/v1/debug/simulation", method="POST", json={})
+    assert error.value.response.status_code == 501
+
+
+INSTALLED_SERVER = """
+import asyncio, sys
+sys.modules["yaml"] = None  # PyYAML is not a dependency of the package
+import cowdao_cowpy
+from cowdao_cowpy.order_book.fake_server import FakeOrderBook
+assert cowdao_cowpy.__file__.startswith(sys.argv[1]), cowdao_cowpy.__file__
+print(asyncio.run(FakeOrderBook().order_book_api().get_version()))
+"""
+
+
+def test_server_runs_from_an_installed_package(tmp_path):
+    # Only the package is copied: no openapi.yml and no repo root on the path.
+    package = Path(cowdao_cowpy.__file__).parent
+    shutil.copytree(package, tmp_path / "cowdao_cowpy")
+    result = subprocess.run(
+        [sys.executable, "-c", INSTALLED_SERVER, str(tmp_path)],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+        env={"PYTHONPATH": str(tmp_path)},
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "fake"
+
+
+def test_shipped_routes_match_the_spec():
+    spec = Path(cowdao_cowpy.__file__).parents[1] / "openapi.yml"
+    shipped = [(r.operation_id, r.method, r.pattern.pattern) for r in load_routes()]
+    assert shipped == [
+        (r.operation_id, r.method, r.pattern.pattern) for r in load_routes(spec)
+    ]
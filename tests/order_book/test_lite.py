@@ -0,0 +1,133 @@
+import gc
+import time
+import tracemalloc
+from typing import List
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from cowdao_cowpy.common.api.api_base import ApiBase
+from cowdao_cowpy.common.config import SupportedChainId
+from cowdao_cowpy.order_book.api import OrderBookApi
+from cowdao_cowpy.order_book.config import OrderBookAPIConfigFactory
+from cowdao_cowpy.order_book.generated.model import (
+    UID,
+    Order,
+    OrderClass,
+    OrderStatus,
+    Trade,
+)
+from cowdao_cowpy.order_book.lite import LiteModel, lite_model_class
+
+from .mock_order_data import OWNER, make_order, make_trade
+
+ORDERS_URL = (
+    f"https://api.cow.fi/mainnet/api/v1/account/{OWNER}/orders?limit=1000&offset=0"
+)
+
+
+def make_api(trusted_responses: bool = False) -> OrderBookApi:
+    return OrderBookApi(
+        OrderBookAPIConfigFactory.get_config("prod", SupportedChainId.MAINNET),
+        trusted_responses=trusted_responses,
+    )
+
+
+def test_lite_fields_match_validated_model():
+    data = make_order(7)
+    full = Order(**data)
+    lite = lite_model_class(Order)(data)
+
+    for name in Order.model_fields:
+        assert getattr(lite, name) == getattr(full, name), name
+    assert isinstance(lite.uid, UID)
+    assert lite.class_ == OrderClass.limit
+    assert lite.to_model() == full
+
+
+def test_lite_validates_lazily_and_caches():
+    data = make_order(1, status="not-a-status")
+    lite = lite_model_class(Order)(data)
+
+    # Untouched invalid fields cost nothing...
+    assert lite.uid == UID(data["uid"])
+    # ...and fail with pydantic's error once read.
+    with pytest.raises(ValueError):
+        lite.status
+    assert lite.sellAmount is lite.sellAmount
+
+
+def test_lite_records_are_slotted_and_read_only():
+    lite = lite_model_class(Trade)(make_trade())
+
+    assert not hasattr(lite, "__dict__")
+    with pytest.raises(AttributeError):
+        lite.owner = "0x"
+    with pytest.raises(AttributeError):
+        lite.notAField
+    assert lite_model_class(Trade) is type(lite)
+
+
+def test_lite_records_serialize_like_their_model():
+    data = make_order(3)
+    lite = lite_model_class(Order)(data)
+
+    serialized = ApiBase.serialize_model(lite)
+    assert serialized == data
+    assert serialized is not lite.raw
+    assert Order(**serialized) == Order(**ApiBase.serialize_model(Order(**data)))  # type: ignore[arg-type]
+
+
+@pytest.mark.asyncio
+async def test_trusted_responses_returns_lite_records(httpx_mock: HTTPXMock):
+    orders = [make_order(i) for i in range(3)]
+    httpx_mock.add_response(url=ORDERS_URL, json=orders)
+
+    result = await make_api(trusted_responses=True).get_orders_by_owner(OWNER)
+
+    assert all(isinstance(order, LiteModel) for order in result)
+    assert [order.uid for order in result] == [Order(**o).uid for o in orders]
+    assert result[0].status == OrderStatus.open
+
+
+@pytest.mark.asyncio
+async def test_trusted_responses_can_be_toggled_per_request(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url=ORDERS_URL, json=[make_order()])
+    httpx_mock.add_response(url=ORDERS_URL, json=[make_order()])
+
+    api = make_api()
+    (validated,) = await api.get_orders_by_owner(OWNER)
+    (lite,) = await api.get_orders_by_owner(
+        OWNER, context_override={"trusted_responses": True}
+    )
+
+    assert isinstance(validated, Order)
+    assert isinstance(lite, LiteModel)
+
+
+@pytest.mark.slow
+def test_lite_deserialization_benchmark():
+    data = [make_order(i) for i in range(20_000)]
+
+    def measure(lite: bool):
+        gc.collect()
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = ApiBase.deserialize_model(data, List[Order], lite=lite)
+        # Typical listing consumer: read a couple of fields per item.
+        for order in result:
+            order.uid, order.status
+        elapsed = time.perf_counter() - started
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return elapsed, current
+
+    full_time, full_mem = measure(lite=False)
+    lite_time, lite_mem = measure(lite=True)
+    print(
+        f"\n20k orders: validated {full_time * 1e3:.0f}ms / {full_mem / 1e6:.1f}MB, "
+        f"lite {lite_time * 1e3:.0f}ms / {lite_mem / 1e6:.1f}MB"
+    )
+
+    assert lite_time < full_time
+    assert lite_mem < full_mem
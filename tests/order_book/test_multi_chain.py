@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from cowdao_cowpy.common.api.errors import ApiResponseError
+from cowdao_cowpy.common.api.scheduler import RequestScheduler
+from cowdao_cowpy.common.config import SupportedChainId
+from cowdao_cowpy.order_book.multi_chain import MultiChainOrderBook
+
+from .mock_order_data import OWNER, make_order
+
+SLOW = {SupportedChainId.POLYGON}
+BROKEN = {SupportedChainId.BNB}
+
+
+async def orderbook(request: httpx.Request) -> httpx.Response:
+    """Every chain answers after 50ms; POLYGON hangs and BNB has no such user."""
+    prefix = request.url.path.split("/")[1]
+    await asyncio.sleep(0.05)
+    if prefix == "polygon":
+        await asyncio.sleep(10)
+    if prefix == "bnb":
+        return httpx.Response(
+            404, json={"errorType": "NotFound", "description": "unknown user"}
+        )
+    if request.url.path.endswith("/total_surplus"):
+        return httpx.Response(200, json={"totalSurplus": str(len(prefix))})
+    return httpx.Response(200, json=[make_order(len(prefix))])
+
+
+@pytest.fixture
+def multi_chain():
+    return MultiChainOrderBook(timeout=1.0, scheduler=RequestScheduler(rate=1000))
+
+
+@pytest.mark.asyncio
+async def test_fan_out_returns_partial_results_within_the_timeout(
+    multi_chain, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_callback(orderbook)
+
+    started = time.monotonic()
+    async with multi_chain:
+        surplus = await multi_chain.get_total_surplus_all_chains(OWNER, timeout=0.5)
+    elapsed = time.monotonic() - started
+
+    # Chains are queried concurrently, so the slowest one bounds the latency.
+    assert elapsed < 1.0
+    assert set(surplus.results) == set(SupportedChainId) - SLOW - BROKEN
+    assert surplus.results[SupportedChainId.MAINNET].totalSurplus == str(len("mainnet"))
+    assert isinstance(surplus.errors[SupportedChainId.POLYGON], asyncio.TimeoutError)
+    assert isinstance(surplus.errors[SupportedChainId.BNB], ApiResponseError)
+    assert not surplus.complete
+
+
+@pytest.mark.asyncio
+async def test_orders_of_selected_chains(multi_chain, httpx_mock: HTTPXMock):
+    httpx_mock.add_callback(orderbook)
+    chains = [SupportedChainId.MAINNET, SupportedChainId.GNOSIS_CHAIN]
+
+    async with multi_chain:
+        orders = await multi_chain.get_orders_all_chains(OWNER, chains=chains)
+
+    assert orders.complete
+    assert {chain: len(found) for chain, found in orders.results.items()} == {
+        SupportedChainId.MAINNET: 1,
+        SupportedChainId.GNOSIS_CHAIN: 1,
+    }
+    requested = {request.url.path for request in httpx_mock.get_requests()}
+    assert requested == {
+        f"/mainnet/api/v1/account/{OWNER}/orders",
+        f"/xdai/api/v1/account/{OWNER}/orders",
+    }
+
+
+@pytest.mark.asyncio
+async def test_chain_clients_are_lazy_and_share_one_pool():
+    multi_chain = MultiChainOrderBook(env="staging")
+
+    mainnet = multi_chain[SupportedChainId.MAINNET]
+    base = multi_chain.api(SupportedChainId.BASE)
+
+    assert multi_chain.api(SupportedChainId.MAINNET) is mainnet
+    assert mainnet._get_client() is base._get_client()
+    assert base.config.get_base_url() == "https://barn.api.cow.fi/base"
+    await multi_chain.aclose()
+    assert mainnet._get_client().is_closed
@@ -0,0 +1,208 @@
+import asyncio
+from typing import Dict, List
+
+import pytest
+
+from cowdao_cowpy.common.api.errors import UnexpectedResponseError
+from cowdao_cowpy.order_book.generated.model import NativePriceResponse
+from cowdao_cowpy.order_book.native_prices import NativePriceOracle
+
+from .mock_order_data import USDC, WETH
+
+COW = "0xdef1ca1fb7fbcdc777520aa7f396b4e015f497ab"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeOrderBookApi:
+    def __init__(self, prices: Dict[str, float], delay: float = 0.0):
+        self.prices = prices
+        self.delay = delay
+        self.calls: List[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get_native_price(
+        self, token: str, context_override={}
+    ) -> NativePriceResponse:
+        self.calls.append(token)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if token not in self.prices:
+                raise UnexpectedResponseError("NoLiquidity")
+            return NativePriceResponse(price=self.prices[token])
+        finally:
+            self.in_flight -= 1
+
+
+def make_oracle(api, clock=None, **kwargs) -> NativePriceOracle:
+    return NativePriceOracle(api, clock=clock or FakeClock(), **kwargs)  # type: ignore[arg-type]
+
+
+async def settle(oracle: NativePriceOracle) -> None:
+    while oracle._pending:
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_reads_are_served_from_memory_after_first_miss():
+    api = FakeOrderBookApi({WETH: 1.0})
+    oracle = make_oracle(api)
+
+    assert oracle.get(WETH) is None
+    await settle(oracle)
+    assert oracle.get(WETH.upper()) == 1.0
+    assert oracle.get(WETH) == 1.0
+
+    assert api.calls == [WETH]
+    assert (oracle.stats.misses, oracle.stats.hits) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_are_coalesced():
+    api = FakeOrderBookApi({WETH: 1.0}, delay=0.01)
+    oracle = make_oracle(api)
+
+    for _ in range(5):
+        oracle.get(WETH)
+    prices = await asyncio.gather(*(oracle.fetch(WETH) for _ in range(5)))
+
+    assert prices == [1.0] * 5
+    assert api.calls == [WETH]
+
+
+@pytest.mark.asyncio
+async def test_stale_prices_are_served_and_refetched():
+    api = FakeOrderBookApi({WETH: 1.0})
+    clock = FakeClock()
+    oracle = make_oracle(api, clock, max_age=30)
+    await oracle.fetch(WETH)
+
+    clock.now += 31
+    api.prices[WETH] = 2.0
+    assert oracle.get(WETH) == 1.0
+    assert oracle.get(WETH, max_age=30) is None
+    await settle(oracle)
+
+    assert oracle.get(WETH) == 2.0
+    assert oracle.stats.stale_hits == 2
+
+
+@pytest.mark.asyncio
+async def test_refresh_round_prefers_hot_and_tracked_tokens():
+    api = FakeOrderBookApi({WETH: 1.0, USDC: 2.0, COW: 3.0})
+    clock = FakeClock()
+    oracle = make_oracle(api, clock, max_refresh=2)
+    oracle.track([COW])
+    for _ in range(3):
+        oracle.get(WETH)
+    oracle.get(USDC)
+    await settle(oracle)
+    api.calls.clear()
+
+    clock.now += 60
+    refreshed = await oracle.refresh()
+
+    assert refreshed == [COW, WETH]
+    assert sorted(api.calls) == sorted([COW, WETH])
+
+
+@pytest.mark.asyncio
+async def test_refresh_respects_concurrency_bound():
+    tokens = [f"0x{i:040x}" for i in range(20)]
+    api = FakeOrderBookApi({token: 1.0 for token in tokens}, delay=0.01)
+    oracle = make_oracle(api, max_concurrency=3)
+    oracle.track(tokens)
+
+    await oracle.refresh()
+
+    assert len(oracle) == 20
+    assert api.max_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_failures_are_counted_and_not_retried_every_read():
+    api = FakeOrderBookApi({})
+    oracle = make_oracle(api)
+
+    oracle.get(WETH)
+    await settle(oracle)
+    refreshed = await oracle.refresh()
+
+    assert oracle.get(WETH) is None
+    assert oracle.stats.errors == 1
+    assert refreshed == []
+
+
+@pytest.mark.asyncio
+async def test_reads_back_off_after_a_failed_fetch():
+    api = FakeOrderBookApi({})
+    clock = FakeClock()
+    oracle = make_oracle(api, clock, retry_after=10)
+
+    for _ in range(5):
+        oracle.get(WETH)
+        await settle(oracle)
+    assert api.calls == [WETH]
+
+    clock.now += 11
+    api.prices[WETH] = 1.0
+    oracle.get(WETH)
+    await settle(oracle)
+    assert oracle.get(WETH) == 1.0
+    assert api.calls == [WETH, WETH]
+
+
+@pytest.mark.asyncio
+async def test_unread_tokens_are_evicted():
+    api = FakeOrderBookApi({WETH: 1.0, USDC: 2.0})
+    clock = FakeClock()
+    oracle = make_oracle(api, clock, evict_after=100)
+    oracle.track([USDC])
+    oracle.get(WETH)
+    oracle.get(USDC)
+    await settle(oracle)
+
+    clock.now += 101
+    await oracle.refresh()
+
+    assert oracle.price_point(WETH) is None
+    assert oracle.price_point(USDC) is not None
+
+
+@pytest.mark.asyncio
+async def test_prefetched_tokens_are_evicted_unless_read():
+    api = FakeOrderBookApi({WETH: 1.0, USDC: 2.0})
+    clock = FakeClock()
+    oracle = make_oracle(api, clock, evict_after=100)
+    await oracle.prefetch([WETH, USDC])
+
+    clock.now += 60
+    oracle.get(USDC)
+    clock.now += 41
+    await oracle.refresh()
+
+    assert oracle.price_point(WETH) is None
+    assert oracle.price_point(USDC) is not None
+
+
+@pytest.mark.asyncio
+async def test_background_task_keeps_prices_warm():
+    api = FakeOrderBookApi({WETH: 1.0})
+    oracle = NativePriceOracle(api, max_age=0.02, refresh_interval=0.01)  # type: ignore[arg-type]
+    oracle.track([WETH])
+
+    async with oracle:
+        await asyncio.sleep(0.1)
+        assert oracle.get(WETH) == 1.0
+
+    assert len(api.calls) > 2
+    assert oracle._runner is None
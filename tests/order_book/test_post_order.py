@@ -0,0 +1,259 @@
+import json
+
+import httpx
+import pytest
+from eth_abi.abi import encode
+from eth_account import Account
+from pytest_httpx import HTTPXMock
+from web3 import Web3
+
+from cowdao_cowpy.common.api.errors import ApiResponseError, UnexpectedResponseError
+from cowdao_cowpy.common.chains import Chain
+from cowdao_cowpy.common.config import SupportedChainId
+from cowdao_cowpy.common.constants import CowContractAddress
+from cowdao_cowpy.contracts.domain import domain
+from cowdao_cowpy.contracts.order import Order, compute_order_uid
+from cowdao_cowpy.cow.swap import post_order, sign_order
+from cowdao_cowpy.order_book.api import OrderBookApi
+from cowdao_cowpy.order_book.config import OrderBookAPIConfigFactory
+from cowdao_cowpy.order_book.generated.model import OrderCreation
+
+from .mock_order_data import make_order
+
+ORDERS_URL = "https://api.cow.fi/xdai/api/v1/orders"
+FAST_BACKOFF = {"backoff_opts": {"max_tries": 3, "jitter": None, "factor": 0.01}}
+DUPLICATE = {"errorType": "DuplicatedOrder", "description": "order already exists"}
+NOT_FOUND = {"errorType": "OrderNotFound", "description": "order was not found"}
+ORDER_TYPE = (
+    b"Order(address sellToken,address buyToken,address receiver,uint256 sellAmount,"
+    b"uint256 buyAmount,uint32 validTo,bytes32 appData,uint256 feeAmount,string kind,"
+    b"bool partiallyFillable,string sellTokenBalance,string buyTokenBalance)"
+)
+DOMAIN_TYPE = b"EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)"
+
+
+@pytest.fixture
+def order_book_api():
+    return OrderBookApi(
+        OrderBookAPIConfigFactory.get_config("prod", SupportedChainId.GNOSIS_CHAIN)
+    )
+
+
+@pytest.fixture
+def account():
+    return Account.create()
+
+
+@pytest.fixture
+def order(account):
+    return Order(
+        sell_token=Web3.to_checksum_address("0x" + "11" * 20),
+        buy_token=Web3.to_checksum_address("0x" + "22" * 20),
+        receiver=account.address,
+        sell_amount=str(10**18),
+        buy_amount=str(10**20),
+        valid_to=1893456000,
+        app_data="0x" + "00" * 32,
+        fee_amount="0",
+        kind="sell",
+        partially_fillable=False,
+        sell_token_balance="erc20",
+        buy_token_balance="erc20",
+    )
+
+
+def local_uid(order: Order, owner: str) -> str:
+    gnosis = domain(Chain.GNOSIS, CowContractAddress.SETTLEMENT_CONTRACT.value)
+    return compute_order_uid(gnosis, order, owner)
+
+
+def server_uid(body: dict) -> str:
+    """The UID the orderbook derives from a posted order, following EIP-712."""
+    domain_separator = Web3.keccak(
+        encode(
+            ["bytes32", "bytes32", "bytes32", "uint256", "address"],
+            [
+                Web3.keccak(DOMAIN_TYPE),
+                Web3.keccak(b"Gnosis Protocol"),
+                Web3.keccak(b"v2"),
+                Chain.GNOSIS.chain_id.value,
+                CowContractAddress.SETTLEMENT_CONTRACT.value,
+            ],
+        )
+    )
+    struct_hash = Web3.keccak(
+        encode(
+            ["bytes32", "address", "address", "address", "uint256", "uint256"]
+            + ["uint32", "bytes32", "uint256", "bytes32", "bool", "bytes32", "bytes32"],
+            [
+                Web3.keccak(ORDER_TYPE),
+                body["sellToken"],
+                body["buyToken"],
+                body["receiver"],
+                int(body["sellAmount"]),
+                int(body["buyAmount"]),
+                body["validTo"],
+                Web3.to_bytes(hexstr=body["appData"]),
+                int(body["feeAmount"]),
+                Web3.keccak(text=body["kind"]),
+                body["partiallyFillable"],
+                Web3.keccak(text=body.get("sellTokenBalance", "erc20")),
+                Web3.keccak(text=body.get("buyTokenBalance", "erc20")),
+            ],
+        )
+    )
+    digest = Web3.keccak(b"\x19\x01" + domain_separator + struct_hash)
+    owner = Web3.to_bytes(hexstr=body["from"])
+    return Web3.to_hex(digest + owner + body["validTo"].to_bytes(4, "big"))
+
+
+def order_creation(order: Order, owner: str) -> OrderCreation:
+    return OrderCreation(
+        from_=owner,  # type: ignore # pyright doesn't recognize `populate_by_name=True`.
+        sellToken=order.sellToken,
+        buyToken=order.buyToken,
+        sellAmount=order.sellAmount,
+        feeAmount=order.feeAmount,
+        buyAmount=order.buyAmount,
+        validTo=order.validTo,
+        kind=order.kind,
+        partiallyFillable=order.partiallyFillable,
+        appData=order.appData,
+        signature="0x" + "00" * 65,
+        signingScheme="eip712",
+        receiver=order.receiver,
+    )
+
+
+@pytest.mark.asyncio
+async def test_retry_rejected_as_duplicate_is_reported_as_posted(
+    order_book_api, account, order, httpx_mock: HTTPXMock
+):
+    # The first attempt reached the orderbook but its response was lost.
+    httpx_mock.add_response(url=ORDERS_URL, method="POST", status_code=502)
+    httpx_mock.add_response(
+        url=ORDERS_URL, method="POST", status_code=400, json=DUPLICATE
+    )
+    uid = local_uid(order, account.address)
+    httpx_mock.add_response(
+        url=f"{ORDERS_URL}/{uid}", method="GET", json={**make_order(), "uid": uid}
+    )
+
+    posted = await order_book_api.post_order(
+        order_creation(order, account.address),
+        context_override=FAST_BACKOFF,
+        order_uid=uid,
+    )
+
+    assert posted.root == uid
+    assert len(httpx_mock.get_requests()) == 3
+
+
+@pytest.mark.asyncio
+async def test_duplicates_of_another_order_are_not_reported_as_posted(
+    order_book_api, account, order, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(
+        url=ORDERS_URL, method="POST", status_code=400, json=DUPLICATE
+    )
+    uid = local_uid(order, account.address)
+    httpx_mock.add_response(
+        url=f"{ORDERS_URL}/{uid}", method="GET", status_code=404, json=NOT_FOUND
+    )
+
+    with pytest.raises(ApiResponseError) as exc_info:
+        await order_book_api.post_order(
+            order_creation(order, account.address), order_uid=uid
+        )
+
+    assert exc_info.value.error_type == "DuplicatedOrder"
+
+
+@pytest.mark.asyncio
+async def test_uid_mismatches_are_raised(
+    order_book_api, account, order, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(
+        url=ORDERS_URL, method="POST", status_code=201, json="0x" + "ab" * 56
+    )
+
+    with pytest.raises(UnexpectedResponseError, match="expected"):
+        await order_book_api.post_order(
+            order_creation(order, account.address),
+            order_uid=local_uid(order, account.address),
+        )
+
+
+@pytest.mark.asyncio
+async def test_duplicates_still_fail_without_an_order_uid(
+    order_book_api, account, order, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(
+        url=ORDERS_URL, method="POST", status_code=400, json=DUPLICATE
+    )
+
+    with pytest.raises(ApiResponseError) as exc_info:
+        await order_book_api.post_order(order_creation(order, account.address))
+
+    assert exc_info.value.error_type == "DuplicatedOrder"
+
+
+@pytest.mark.asyncio
+async def test_other_rejections_are_not_swallowed(
+    order_book_api, account, order, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(
+        url=ORDERS_URL,
+        method="POST",
+        status_code=400,
+        json={"errorType": "InvalidSignature", "description": "bad signature"},
+    )
+
+    with pytest.raises(ApiResponseError):
+        await order_book_api.post_order(
+            order_creation(order, account.address),
+            order_uid=local_uid(order, account.address),
+        )
+
+
+@pytest.mark.asyncio
+async def test_accepted_orders_are_not_posted_again(
+    account, order, httpx_mock: HTTPXMock
+):
+    accepted: set = set()
+    api = OrderBookApi(
+        OrderBookAPIConfigFactory.get_config("prod", SupportedChainId.GNOSIS_CHAIN),
+        accepted_orders=accepted,
+    )
+    uid = local_uid(order, account.address)
+    httpx_mock.add_response(url=ORDERS_URL, method="POST", status_code=201, json=uid)
+    signature = sign_order(Chain.GNOSIS, account, order)
+
+    first = await post_order(account, None, order, signature, api, chain=Chain.GNOSIS)
+    second = await post_order(account, None, order, signature, api, chain=Chain.GNOSIS)
+
+    assert first.root == second.root == uid
+    assert accepted == {uid}
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_server_uid_matches_local_computation(
+    order_book_api, account, order, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_callback(
+        lambda request: httpx.Response(
+            201, json=server_uid(json.loads(request.content))
+        ),
+        url=ORDERS_URL,
+        method="POST",
+    )
+    signature = sign_order(Chain.GNOSIS, account, order)
+
+    # Posting with a chain checks the server's UID against the local one.
+    posted = await post_order(
+        account, None, order, signature, order_book_api, chain=Chain.GNOSIS
+    )
+
+    assert posted.root == local_uid(order, account.address)
+    assert len(posted.root) == 2 + 2 * 56
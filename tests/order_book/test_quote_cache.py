@@ -0,0 +1,211 @@
+import asyncio
+import json
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from cowdao_cowpy.common.api.errors import UnexpectedResponseError
+from cowdao_cowpy.common.config import SupportedChainId
+from cowdao_cowpy.order_book.api import OrderBookApi
+from cowdao_cowpy.order_book.config import OrderBookAPIConfigFactory
+from cowdao_cowpy.order_book.generated.model import (
+    OrderQuoteRequest,
+    OrderQuoteResponse,
+    OrderQuoteSide1,
+    OrderQuoteSideKindSell,
+    TokenAmount,
+)
+from cowdao_cowpy.order_book.quote_cache import QuoteCache, parse_expiration
+
+from .mock_order_data import OWNER, USDC, WETH
+
+QUOTE_URL = "https://api.cow.fi/mainnet/api/v1/quote"
+NOW = 1_700_000_000.0
+
+
+class FakeClock:
+    def __init__(self, now: float = NOW):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def quote_response(sell_amount: str, expires_in: int = 60) -> dict:
+    return {
+        "quote": {
+            "sellToken": WETH,
+            "buyToken": USDC,
+            "sellAmount": sell_amount,
+            "buyAmount": "3000000000",
+            "validTo": int(NOW) + 600,
+            "appData": "0x" + "00" * 32,
+            "feeAmount": "0",
+            "kind": "sell",
+            "partiallyFillable": False,
+            "gasAmount": "100000",
+            "gasPrice": "10000000000",
+            "sellTokenPrice": "1",
+            "creationDate": "2023-11-14T22:13:20Z",
+            "class": "market",
+        },
+        "from": OWNER,
+        # 1_700_000_000 is 2023-11-14T22:13:20Z.
+        "expiration": f"2023-11-14T22:{13 + expires_in // 60:02d}:20.123456789Z",
+        "id": 1,
+        "verified": True,
+    }
+
+
+def make_api(cache: QuoteCache) -> OrderBookApi:
+    return OrderBookApi(
+        OrderBookAPIConfigFactory.get_config("prod", SupportedChainId.MAINNET),
+        quote_cache=cache,
+    )
+
+
+def quote_args(amount: int, sell_token: str = WETH):
+    request = OrderQuoteRequest(
+        sellToken=sell_token,
+        buyToken=USDC,
+        from_=OWNER,  # type: ignore # pyright doesn't recognize `populate_by_name=True`.
+    )
+    side = OrderQuoteSide1(
+        kind=OrderQuoteSideKindSell.sell,
+        sellAmountBeforeFee=TokenAmount(str(amount)),
+    )
+    return request, side
+
+
+def test_parse_expiration_accepts_nanoseconds():
+    assert parse_expiration("2023-11-14T22:13:20.5Z") == NOW + 0.5
+    assert parse_expiration("2023-11-14T22:13:20.123456789Z") == pytest.approx(
+        NOW + 0.123456
+    )
+    with pytest.raises(ValueError):
+        parse_expiration("2023-11-14T22:13:20")
+
+
+def test_keys_normalize_addresses_and_bucket_amounts():
+    cache = QuoteCache(amount_tolerance=0.01)
+    body = {"sellToken": WETH, "buyToken": USDC, "sellAmountBeforeFee": "1000000"}
+
+    key = cache.key(QUOTE_URL, body)
+
+    assert key == cache.key(QUOTE_URL, {**body, "sellToken": WETH.upper()})
+    assert key == cache.key(QUOTE_URL, {**body, "sellAmountBeforeFee": "1004000"})
+    assert key != cache.key(QUOTE_URL, {**body, "sellAmountBeforeFee": "1100000"})
+    assert key != cache.key(QUOTE_URL, {**body, "validFor": 60})
+    assert key != cache.key(QUOTE_URL.replace("mainnet", "xdai"), body)
+    assert QuoteCache().key(QUOTE_URL, body) != QuoteCache().key(
+        QUOTE_URL, {**body, "sellAmountBeforeFee": "1000001"}
+    )
+
+
+@pytest.mark.asyncio
+async def test_repeated_quotes_are_served_from_cache(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url=QUOTE_URL, json=quote_response("1000000"))
+    cache = QuoteCache(amount_tolerance=0.01, clock=FakeClock())
+    api = make_api(cache)
+
+    first = await api.post_quote(*quote_args(1_000_000))
+    second = await api.post_quote(*quote_args(1_002_000, sell_token=WETH.upper()))
+
+    assert second is first
+    assert len(httpx_mock.get_requests()) == 1
+    stats = cache.pair_stats(WETH, USDC)
+    assert (stats.misses, stats.hits) == (1, 1)
+    assert stats.hit_rate == 0.5
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_request(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url=QUOTE_URL, json=quote_response("1000000"))
+    api = make_api(QuoteCache(clock=FakeClock()))
+
+    quotes = await asyncio.gather(
+        *(api.post_quote(*quote_args(1_000_000)) for _ in range(10))
+    )
+
+    assert all(quote is quotes[0] for quote in quotes)
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_entries_are_served_while_refreshing(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url=QUOTE_URL, json=quote_response("1"))
+    httpx_mock.add_response(url=QUOTE_URL, json=quote_response("2", expires_in=120))
+    clock = FakeClock()
+    cache = QuoteCache(stale_window=10, expiry_margin=5, clock=clock)
+    api = make_api(cache)
+    await api.post_quote(*quote_args(1_000_000))
+
+    # Expires at +55s; fresh until +45s.
+    clock.now = NOW + 50
+    stale = await api.post_quote(*quote_args(1_000_000))
+    await asyncio.sleep(0)
+    assert stale.quote.sellAmount.root == "1"
+    while cache._refreshing:
+        await asyncio.sleep(0)
+
+    refreshed = await api.post_quote(*quote_args(1_000_000))
+
+    assert refreshed.quote.sellAmount.root == "2"
+    stats = cache.pair_stats(WETH, USDC)
+    assert (stats.misses, stats.stale_hits, stats.hits) == (1, 1, 1)
+    assert stats.refreshes == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_never_served(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url=QUOTE_URL, json=quote_response("1"))
+    httpx_mock.add_response(url=QUOTE_URL, json=quote_response("2"))
+    clock = FakeClock()
+    api = make_api(QuoteCache(clock=clock))
+    await api.post_quote(*quote_args(1_000_000))
+
+    clock.now = NOW + 56
+    quote = await api.post_quote(*quote_args(1_000_000))
+
+    assert quote.quote.sellAmount.root == "2"
+
+
+@pytest.mark.asyncio
+async def test_bypass_fetches_and_refreshes_the_entry(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url=QUOTE_URL, json=quote_response("1"))
+    httpx_mock.add_response(url=QUOTE_URL, json=quote_response("2"))
+    cache = QuoteCache(clock=FakeClock())
+    api = make_api(cache)
+    await api.post_quote(*quote_args(1_000_000))
+
+    fresh = await api.post_quote(*quote_args(1_000_000), use_cache=False)
+    cached = await api.post_quote(*quote_args(1_000_000))
+
+    assert fresh.quote.sellAmount.root == "2"
+    assert cached is fresh
+    assert cache.pair_stats(WETH, USDC).bypasses == 1
+    body = json.loads(httpx_mock.get_requests()[1].content)
+    assert body["sellAmountBeforeFee"] == "1000000"
+
+
+@pytest.mark.asyncio
+async def test_failed_quotes_are_not_cached(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url=QUOTE_URL, status_code=400, json={"errorType": "X"})
+    httpx_mock.add_response(url=QUOTE_URL, json=quote_response("1"))
+    api = make_api(QuoteCache(clock=FakeClock()))
+
+    with pytest.raises(UnexpectedResponseError):
+        await api.post_quote(*quote_args(1_000_000))
+    quote = await api.post_quote(*quote_args(1_000_000))
+
+    assert quote.quote.sellAmount.root == "1"
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = QuoteCache(max_entries=2, clock=FakeClock())
+    response = OrderQuoteResponse(**quote_response("1"))
+    for key in ("a", "b", "c"):
+        cache._store((key,), response)
+
+    assert len(cache) == 2
+    assert ("a",) not in cache._entries
@@ -0,0 +1,266 @@
+import asyncio
+import json
+from typing import Dict, List
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from cowdao_cowpy.common.config import SupportedChainId
+from cowdao_cowpy.order_book.api import OrderBookApi
+from cowdao_cowpy.order_book.config import OrderBookAPIConfigFactory
+from cowdao_cowpy.order_book.generated.model import UID, Order, OrderStatus
+from cowdao_cowpy.order_book.lite import lite_model_class
+from cowdao_cowpy.order_book.status_watcher import OrderStatusWatcher
+
+from .mock_order_data import make_order, make_order_uid
+
+VALID_TO = 1718003600
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeOrderBookApi:
+    """Serves `get_orders_by_uids` from a mutable uid -> status table."""
+
+    def __init__(self, statuses: Dict[str, str], valid_to: int = VALID_TO):
+        self.statuses = statuses
+        self.valid_to = valid_to
+        self.requests: List[List[str]] = []
+
+    async def get_orders_by_uids(self, uids, context_override={}):
+        self.requests.append(uids)
+        assert len(uids) <= 128
+        lite_order = lite_model_class(Order)
+        return [
+            lite_order(
+                {
+                    **make_order(0, self.statuses[uid], self.valid_to),
+                    "uid": uid,
+                }
+            )
+            for uid in uids
+            if uid in self.statuses
+        ]
+
+
+def make_watcher(api, clock, wall_time: float = VALID_TO - 3600, **kwargs):
+    return OrderStatusWatcher(
+        api,  # type: ignore[arg-type]
+        clock=clock,
+        wall_clock=lambda: wall_time + clock.now,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_orders_by_uids_skips_errors(httpx_mock: HTTPXMock):
+    uids = [make_order_uid(1), make_order_uid(2)]
+    httpx_mock.add_response(
+        url="https://api.cow.fi/mainnet/api/v1/orders/by_uids",
+        json=[
+            {"order": make_order(1)},
+            {"error": {"uid": uids[1], "description": "conversion failed"}},
+        ],
+    )
+    api = OrderBookApi(
+        OrderBookAPIConfigFactory.get_config("prod", SupportedChainId.MAINNET)
+    )
+
+    orders = await api.get_orders_by_uids(uids)
+
+    assert [order.uid.root for order in orders] == [uids[0]]
+    assert json.loads(httpx_mock.get_requests()[0].content) == uids
+    with pytest.raises(ValueError):
+        await api.get_orders_by_uids([make_order_uid(i) for i in range(129)])
+
+
+@pytest.mark.asyncio
+async def test_emits_transitions_and_drops_terminal_orders():
+    uid = make_order_uid(1)
+    api = FakeOrderBookApi({uid: "open"})
+    clock = FakeClock()
+    watcher = make_watcher(api, clock)
+    seen = []
+    watcher.on_change(seen.append)
+    watcher.track(uid)
+
+    await watcher.poll_once()
+    assert watcher.status(uid) == OrderStatus.open
+    # Not due again yet.
+    assert await watcher.poll_once() == 0
+
+    api.statuses[uid] = "fulfilled"
+    clock.now += watcher.min_interval
+    await watcher.poll_once()
+
+    assert [(c.previous, c.status) for c in seen] == [
+        (None, OrderStatus.open),
+        (OrderStatus.open, OrderStatus.fulfilled),
+    ]
+    assert seen[-1].is_terminal
+    assert uid not in watcher
+    assert len(api.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_changes_iterator_ends_when_idle():
+    uids = [make_order_uid(i) for i in range(3)]
+    api = FakeOrderBookApi({uid: "cancelled" for uid in uids})
+    watcher = OrderStatusWatcher(api, requests_per_second=100)  # type: ignore[arg-type]
+    watcher.track_many(uids)
+
+    async with watcher:
+        changes = [change async for change in watcher.changes(until_idle=True)]
+
+    assert sorted(change.uid for change in changes) == uids
+    assert all(change.status == OrderStatus.cancelled for change in changes)
+
+
+@pytest.mark.asyncio
+async def test_untracking_the_last_order_ends_idle_iterators():
+    uids = [make_order_uid(i) for i in range(2)]
+    watcher = OrderStatusWatcher(FakeOrderBookApi({}))  # type: ignore[arg-type]
+    watcher.track_many(uids)
+    changes = watcher.changes(until_idle=True)
+    forever = watcher.changes()
+
+    watcher.untrack(uids[0])
+    watcher.untrack(uids[0])
+    assert len(watcher._subscribers) == 2
+    watcher.untrack(uids[1])
+
+    assert [change async for change in changes] == []
+    assert [until_idle for _, until_idle in watcher._subscribers] == [False]
+    await watcher.stop()
+    assert [change async for change in forever] == []
+
+
+@pytest.mark.asyncio
+async def test_polling_backs_off_with_age_and_catches_expiry():
+    uid = make_order_uid(1)
+    api = FakeOrderBookApi({uid: "open"})
+    clock = FakeClock()
+    # validTo is 100s away.
+    watcher = make_watcher(api, clock, wall_time=VALID_TO - 100, max_interval=60)
+    watcher.track(uid)
+
+    poll_times = []
+    while clock.now < 120:
+        if await watcher.poll_once():
+            poll_times.append(clock.now)
+        clock.now += 0.5
+
+    before = [t for t in poll_times if t <= 100]
+    gaps = [b - a for a, b in zip(before, before[1:])]
+    assert gaps[0] == watcher.min_interval
+    assert gaps == sorted(gaps) and gaps[-1] > 10
+    # The first poll after validTo comes right away despite the backoff, and
+    # polling stays fast while the API still reports the order as open.
+    after = [t for t in poll_times if t > 100]
+    assert after[0] <= 101.5
+    assert {b - a for a, b in zip(after, after[1:])} == {watcher.min_interval}
+
+
+@pytest.mark.asyncio
+async def test_missing_orders_are_dropped_after_max_missing():
+    uid = make_order_uid(1)
+    api = FakeOrderBookApi({})
+    clock = FakeClock()
+    watcher = make_watcher(api, clock, max_missing=3)
+    seen = []
+    watcher.on_change(seen.append)
+    watcher.track(uid)
+
+    for _ in range(3):
+        await watcher.poll_once()
+        clock.now += 60
+
+    assert uid not in watcher
+    assert seen[0].status is None and seen[0].is_terminal
+
+
+@pytest.mark.asyncio
+async def test_bulk_tracked_orders_follow_a_known_valid_to():
+    expiring, unknown = make_order_uid(1), make_order_uid(2)
+    clock = FakeClock()
+    watcher = make_watcher(
+        FakeOrderBookApi({}), clock, wall_time=VALID_TO - 10, max_missing=10
+    )
+    watcher.track_many([UID(expiring), unknown], valid_to={expiring: VALID_TO})
+
+    # Neither order is known to the API yet, so only the given validTo helps.
+    await watcher.poll_once()
+    clock.now = 60
+    await watcher.poll_once()
+
+    entries = watcher._tracked
+    assert entries[expiring].valid_to == VALID_TO
+    assert entries[unknown].valid_to is None
+    assert entries[expiring].due == clock.now + watcher.min_interval
+    assert entries[unknown].due > entries[expiring].due
+
+
+@pytest.mark.asyncio
+async def test_failed_polls_are_retried():
+    uid = make_order_uid(1)
+    clock = FakeClock()
+
+    class FailingApi(FakeOrderBookApi):
+        async def get_orders_by_uids(self, uids, context_override={}):
+            raise ConnectionError("boom")
+
+    watcher = make_watcher(FailingApi({uid: "open"}), clock)
+    watcher.track(uid)
+
+    assert await watcher.poll_once() == 0
+    clock.now += watcher.min_interval
+    assert await watcher.poll_once() == 0
+    assert watcher.stats.errors == 2
+    assert uid in watcher
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "orders", [5_000, pytest.param(50_000, marks=pytest.mark.slow)]
+)
+async def test_large_watch_sets_stay_within_request_budget(orders):
+    uids = [make_order_uid(i) for i in range(orders)]
+    api = FakeOrderBookApi({uid: "open" for uid in uids})
+    clock = FakeClock()
+    rps = 10
+    watcher = make_watcher(api, clock, requests_per_second=rps)
+    watcher.track_many(uids)
+
+    # Drive the loop by hand: one poll per request slot for 2 minutes.
+    polled: Dict[str, int] = {}
+    watcher.on_change(lambda change: polled.setdefault(change.uid, 0))
+    slots = 120 * rps
+    for _ in range(slots):
+        await watcher.poll_once()
+        clock.now += 1 / rps
+
+    assert len(api.requests) <= slots
+    assert all(len(batch) <= 128 for batch in api.requests)
+    # Every order was seen, and most requests carried full batches.
+    assert len(polled) == orders
+    assert watcher.stats.orders_polled / len(api.requests) > 100
+
+
+@pytest.mark.asyncio
+async def test_watcher_loop_respects_request_rate():
+    uids = [make_order_uid(i) for i in range(1_000)]
+    api = FakeOrderBookApi({uid: "open" for uid in uids})
+    watcher = OrderStatusWatcher(api, requests_per_second=50)  # type: ignore[arg-type]
+    watcher.track_many(uids)
+
+    async with watcher:
+        await asyncio.sleep(0.1)
+
+    # 1000 orders need 8 batches; 0.1s at 50 rps allows about 5 requests.
+    assert 3 <= len(api.requests) <= 6
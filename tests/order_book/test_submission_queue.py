@@ -0,0 +1,245 @@
+import asyncio
+import json
+import re
+import sqlite3
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from cowdao_cowpy.common.api.errors import ApiResponseError
+from cowdao_cowpy.common.api.scheduler import RequestScheduler
+from cowdao_cowpy.common.config import SupportedChainId
+from cowdao_cowpy.order_book.api import OrderBookApi
+from cowdao_cowpy.order_book.config import OrderBookAPIConfigFactory
+from cowdao_cowpy.order_book.generated.model import OrderCreation
+from cowdao_cowpy.order_book.submission_queue import (
+    SubmissionQueue,
+    SubmissionStatus,
+)
+
+from .mock_order_data import make_order
+
+ORDERS_URL = "https://api.cow.fi/xdai/api/v1/orders"
+ORDER_URL = re.compile(re.escape(ORDERS_URL) + "/0x[0-9a-f]+")
+
+
+def order_uid(i: int) -> str:
+    return "0x" + f"{i:0112x}"
+
+
+def signed_order(i: int) -> OrderCreation:
+    return OrderCreation(
+        from_="0x" + "11" * 20,  # type: ignore # pyright doesn't recognize `populate_by_name=True`.
+        sellToken="0x" + "22" * 20,
+        buyToken="0x" + "33" * 20,
+        sellAmount=str(i),
+        buyAmount="1",
+        validTo=1893456000,
+        feeAmount="0",
+        kind="sell",
+        partiallyFillable=False,
+        appData="0x" + "00" * 32,
+        signingScheme="eip712",
+        signature="0x" + "00" * 65,
+        receiver="0x" + "11" * 20,
+    )
+
+
+class OrderEndpoint:
+    """Accepts each order once; later submissions are duplicates."""
+
+    def __init__(self, fail_first: int = 0):
+        self.accepted = set()
+        self.requests = 0
+        self.fail_first = fail_first
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.001)
+            if self.requests <= self.fail_first:
+                raise httpx.ConnectError("connection reset")
+            sell_amount = int(json.loads(request.content)["sellAmount"])
+            if sell_amount < 0:
+                return httpx.Response(
+                    400, json={"errorType": "InvalidSignature", "description": "no"}
+                )
+            uid = order_uid(sell_amount)
+            if uid in self.accepted:
+                return httpx.Response(
+                    400, json={"errorType": "DuplicatedOrder", "description": "dup"}
+                )
+            self.accepted.add(uid)
+            return httpx.Response(201, json=uid)
+        finally:
+            self.in_flight -= 1
+
+    def get_order(self, request: httpx.Request) -> httpx.Response:
+        uid = request.url.path.rsplit("/", 1)[-1]
+        if uid not in self.accepted:
+            return httpx.Response(
+                404, json={"errorType": "OrderNotFound", "description": "no"}
+            )
+        return httpx.Response(200, json={**make_order(), "uid": uid})
+
+
+@pytest.fixture
+def order_book_api():
+    return OrderBookApi(
+        OrderBookAPIConfigFactory.get_config("prod", SupportedChainId.GNOSIS_CHAIN),
+        scheduler=RequestScheduler(rate=1000),
+    )
+
+
+@pytest.fixture
+def endpoint(httpx_mock: HTTPXMock):
+    endpoint = OrderEndpoint()
+    httpx_mock.add_callback(endpoint, url=ORDERS_URL, method="POST")
+    return endpoint
+
+
+@pytest.mark.asyncio
+async def test_orders_are_posted_with_bounded_concurrency(
+    order_book_api, endpoint, tmp_path
+):
+    async with SubmissionQueue(
+        order_book_api, tmp_path / "orders.db", max_concurrency=3
+    ) as queue:
+        results = await queue.enqueue_many(
+            [(signed_order(i), order_uid(i)) for i in range(1, 31)]
+        )
+        # All thirty orders were recorded in a single transaction.
+        assert queue.stats.commits == 1
+        posted = await asyncio.gather(*results)
+
+        assert [uid.root for uid in posted] == [order_uid(i) for i in range(1, 31)]
+        assert endpoint.max_in_flight == 3
+        assert await queue.counts() == {SubmissionStatus.POSTED: 30}
+        assert await queue.compact() == 30
+        assert await queue.counts() == {}
+
+
+@pytest.mark.asyncio
+async def test_pending_orders_are_replayed_after_a_crash(
+    order_book_api, endpoint, tmp_path, httpx_mock: HTTPXMock
+):
+    # A replayed duplicate is confirmed by looking the order up.
+    httpx_mock.add_callback(endpoint.get_order, url=ORDER_URL, method="GET")
+    path = tmp_path / "orders.db"
+    # The process dies after recording the orders; one had already reached
+    # the orderbook.
+    crashed = SubmissionQueue(order_book_api, path)
+    await crashed.enqueue_many([(signed_order(i), order_uid(i)) for i in (1, 2, 3)])
+    await crashed.stop()
+    endpoint.accepted.add(order_uid(2))
+
+    async with SubmissionQueue(order_book_api, path) as queue:
+        assert queue.stats.replayed == 3
+        await queue.drain()
+        assert await queue.counts() == {SubmissionStatus.POSTED: 3}
+
+    assert endpoint.accepted == {order_uid(1), order_uid(2), order_uid(3)}
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried_and_rejections_recorded(
+    order_book_api, tmp_path, httpx_mock: HTTPXMock
+):
+    endpoint = OrderEndpoint(fail_first=2)
+    httpx_mock.add_callback(endpoint, url=ORDERS_URL, method="POST")
+    async with SubmissionQueue(
+        order_book_api,
+        tmp_path / "orders.db",
+        retry_interval=0.01,
+        context_override={"backoff_opts": {"max_tries": 1}},
+    ) as queue:
+        uid = await queue.submit(signed_order(7), order_uid(7))
+        with pytest.raises(ApiResponseError):
+            await queue.submit(signed_order(-1), order_uid(99))
+
+        assert uid.root == order_uid(7)
+        assert queue.stats.retries >= 1
+        assert await queue.counts() == {
+            SubmissionStatus.POSTED: 1,
+            SubmissionStatus.FAILED: 1,
+        }
+        # Rejected orders are kept for inspection.
+        assert await queue.compact() == 1
+        assert await queue.counts() == {SubmissionStatus.FAILED: 1}
+
+
+@pytest.mark.asyncio
+async def test_attempts_count_across_restarts(
+    order_book_api, tmp_path, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_callback(OrderEndpoint(fail_first=3), url=ORDERS_URL, method="POST")
+    path = tmp_path / "orders.db"
+
+    def run():
+        return SubmissionQueue(
+            order_book_api,
+            path,
+            max_attempts=3,
+            retry_interval=60,
+            context_override={"backoff_opts": {"max_tries": 1}},
+        )
+
+    # Each run fails once and is stopped before its retry comes up.
+    for attempts in (1, 2):
+        async with run() as queue:
+            if attempts == 1:
+                await queue.enqueue(signed_order(1), order_uid(1))
+            while not queue.stats.retries:
+                await asyncio.sleep(0.001)
+        with sqlite3.connect(path) as db:
+            assert db.execute("SELECT attempts FROM submissions").fetchall() == [
+                (attempts,)
+            ]
+
+    async with run() as queue:
+        await queue.drain()
+        assert queue.stats.failed == 1
+        assert await queue.counts() == {SubmissionStatus.FAILED: 1}
+
+
+def test_rejects_unknown_synchronous_mode(order_book_api, tmp_path):
+    with pytest.raises(ValueError):
+        SubmissionQueue(order_book_api, tmp_path / "orders.db", synchronous="SOMETIMES")
+
+
+@pytest.mark.asyncio
+async def test_failed_writes_settle_the_order_and_keep_workers_alive(
+    order_book_api, endpoint, tmp_path
+):
+    queue = SubmissionQueue(order_book_api, tmp_path / "orders.db", max_concurrency=1)
+    await queue.start()
+    commit = queue._commit
+
+    def fail_updates(batch):
+        if any(sql.startswith("UPDATE") for sql, _ in batch):
+            raise sqlite3.OperationalError("disk I/O error")
+        commit(batch)
+
+    queue._commit = fail_updates  # type: ignore[method-assign]
+    with pytest.raises(sqlite3.OperationalError):
+        await queue.submit(signed_order(1), order_uid(1))
+    queue._commit = commit  # type: ignore[method-assign]
+    assert (await queue.submit(signed_order(2), order_uid(2))).root == order_uid(2)
+    assert await queue.counts() == {
+        SubmissionStatus.PENDING: 1,
+        SubmissionStatus.POSTED: 1,
+    }
+
+    # Enqueueing a settled UID again records it as pending once more.
+    restarted = SubmissionQueue(order_book_api, tmp_path / "orders.db")
+    await restarted.enqueue(signed_order(2), order_uid(2))
+    assert await restarted.counts() == {SubmissionStatus.PENDING: 2}
+
+    await queue.stop()
+    await restarted.stop()
+    assert queue._executor is None and restarted._executor is None
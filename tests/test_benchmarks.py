@@ -0,0 +1,73 @@
+import json
+
+from benchmarks.harness import Result, compare, measure, report
+from benchmarks.run import main
+
+
+def test_results_report_throughput_and_percentiles():
+    result = Result("op", [0.001] * 98 + [0.010, 0.020], elapsed=0.5)
+    data = result.to_dict()
+    assert data["count"] == 100
+    assert data["ops_per_sec"] == 200
+    assert data["p50_ms"] == 1
+    assert data["p99_ms"] == 20
+
+    batch = measure("batch", lambda: None, 2, operations=500, orders=500)
+    assert batch.count == 1000
+    assert batch.params == {"orders": 500}
+
+
+def test_compare_flags_throughput_regressions():
+    baseline = report([Result("fast", [0.01] * 10, 0.1), Result("slow", [0.01], 1)])
+    current = report([Result("fast", [0.01] * 10, 0.2), Result("slow", [0.01], 1)])
+    changes = {change["name"]: change for change in compare(current, baseline)}
+    assert changes["fast"]["ops_per_sec_ratio"] == 0.5
+    assert changes["fast"]["regressed"]
+    assert not changes["slow"]["regressed"]
+
+
+def test_suite_writes_a_json_report(tmp_path):
+    output = tmp_path / "results.json"
+    args = ["--quick", "--only", "signing,multiplexer", "--multiplexer-sizes", "16"]
+    assert main([*args, "--output", str(output)]) == 0
+
+    document = json.loads(output.read_text())
+    assert {"python", "package_version"} <= set(document["environment"])
+    names = [result["name"] for result in document["results"]]
+    assert names == [
+        "order.hash",
+        "order.sign",
+        "multiplexer.tree",
+        "multiplexer.proofs",
+        "multiplexer.update",
+        "factory.from_params_many",
+    ]
+    assert document["results"][-2]["params"] == {"orders": 16}
+
+
+def test_baseline_comparison_exit_codes(tmp_path, capsys):
+    args = ["--quick", "--only", "signing", "--output", str(tmp_path / "run.json")]
+    baseline = tmp_path / "baseline.json"
+
+    def write_baseline(ops_per_sec: float) -> None:
+        document = report([Result("order.hash", [0.01], 0.01)])
+        document["results"][0]["ops_per_sec"] = ops_per_sec
+        baseline.write_text(json.dumps(document))
+
+    # Far slower than any run: no regression.
+    write_baseline(1e-6)
+    assert main([*args, "--baseline", str(baseline)]) == 0
+    lines = [
+        line for line in capsys.readouterr().err.splitlines() if "x throughput" in line
+    ]
+    assert len(lines) == 1 and lines[0].startswith("order.hash")
+    assert "REGRESSED" not in lines[0]
+
+    # Far faster than any run: a regression.
+    write_baseline(1e12)
+    assert main([*args, "--baseline", str(baseline)]) == 1
+    lines = [
+        line for line in capsys.readouterr().err.splitlines() if "x throughput" in line
+    ]
+    assert len(lines) == 1 and lines[0].startswith("order.hash")
+    assert lines[0].endswith("REGRESSED")